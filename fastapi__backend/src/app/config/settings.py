@@ -32,12 +32,91 @@ class Settings(BaseSettings):
     # 临时文件目录 (用于存放生成的图表、中间计算结果，符合 Stateless 原则)
     TEMP_DIR: str = "./temp"
 
+    # 列式旁路缓存：首次解析后把 DataFrame 写成 Arrow IPC 文件 (TEMP_DIR/columnar)
+    # 之后同一文件直接内存映射读取，跳过文本解析 (需安装 pyarrow)
+    COLUMNAR_CACHE_ENABLED: bool = True
+
+    # 进程级 DataFrame 缓存 (三个模块的加载器共享)，预算按 memory_usage(deep=True) 计
+    DATAFRAME_CACHE_ENABLED: bool = True
+    DATAFRAME_CACHE_MAX_BYTES: int = 512 * 1024 * 1024
+
+    # 解析后的 dtype 压缩 (整数下转型 / 低基数字符串转 category)，默认关闭
+    # ARROW_STRINGS：其余字符串列转 Arrow 字符串 (需安装 pyarrow)
+    DATAFRAME_COMPACT_DTYPES: bool = False
+    DATAFRAME_ARROW_STRINGS: bool = False
+    DATAFRAME_CATEGORY_MAX_RATIO: float = 0.5
+
     # Pandas 读取大文件时的分块大小 (行数)，防止内存溢出
     CHUNK_SIZE: int = 50000
 
+    # 质量分析流式模式：CSV 超过该大小 (MB) 时按 CHUNK_SIZE 分块两遍扫描，不再受分析大小上限约束
+    QUALITY_STREAMING_ENABLED: bool = True
+    QUALITY_STREAMING_THRESHOLD_MB: int = 100
+
+    # 宽表质量分析的进程池：数值列经共享内存分块交给 worker 并行检测
+    # WORKERS: 1 = 关闭 (单线程)，0 = 使用全部 CPU 核数；数值列少于 MIN_COLUMNS 时不值得跨进程
+    # SHM_BYTES: 每一轮放入共享内存的数值块上限，超出时按列分多轮
+    QUALITY_PARALLEL_WORKERS: int = 1
+    QUALITY_PARALLEL_MIN_COLUMNS: int = 64
+    QUALITY_PARALLEL_SHM_BYTES: int = 512 * 1024 * 1024
+
+    # 增量质量分析：单列统计按列内容指纹缓存，重新分析 (如清洗后) 只重算内容变化的列
+    # COLUMN_STATS_TTL: 列统计在 Redis 中的保留时间 (秒)
+    QUALITY_INCREMENTAL_ENABLED: bool = True
+    QUALITY_COLUMN_STATS_TTL: int = 86400
+
+    # 质量分析结果缓存按文件内容指纹寻址：默认对整个文件做 MD5 (按路径 / 大小 / 修改时间缓存，每次上传只读一遍)
+    # 关闭 FULL_HASH 时改用采样块指纹 + 修改时间：省去全量读盘，但内容相同的不同文件不再共用结果
+    QUALITY_CACHE_FULL_HASH: bool = True
+
+    # 近似质量分析 (mode=approximate) 的目标样本行数；重复率来自覆盖全部行的哈希草图
+    QUALITY_APPROX_SAMPLE_ROWS: int = 50000
+
+    # 分析进度上报：计算线程的进度事件按 INTERVAL_MS 合并后写一次任务状态，
+    # 进度变化小于 MIN_DELTA (百分点) 且阶段未变时不写
+    QUALITY_PROGRESS_INTERVAL_MS: int = 500
+    QUALITY_PROGRESS_MIN_DELTA: float = 1.0
+
+    # 进程内后台任务 (异步提交的质量分析)：同时执行的任务数 / 排队上限 (超出时返回 503)
+    JOB_MAX_CONCURRENCY: int = 2
+    JOB_QUEUE_SIZE: int = 100
+
+    # 跨副本任务去重 (Redis 租约锁)：相同任务只由一个副本计算，其余副本等待完成通知后读取结果
+    # TTL_MS: 租约时长 (持有期间每 1/3 TTL 续约)；POLL_INTERVAL_MS: 等待时检查锁是否仍在的间隔
+    # WAIT_TIMEOUT_S: 最长等待时间，超时后本地计算；RESULT_TTL: 清洗 / 分析结果共享给等待者的保留时间 (秒)
+    LOCK_TTL_MS: int = 30000
+    LOCK_POLL_INTERVAL_MS: int = 1000
+    LOCK_WAIT_TIMEOUT_S: int = 600
+    LOCK_RESULT_TTL: int = 120
+
+    # 任务进度 SSE 推送：无状态变化时发送心跳注释的间隔 (秒)，防止网关 / 代理断开空闲连接
+    QUALITY_SSE_HEARTBEAT_S: int = 15
+
     # 支持的编码格式尝试列表 (用于解决 Pandas 读取中文乱码)
     ENCODING_LIST: List[str] = ["utf-8", "gbk", "gb18030"]
 
+    # 编码探测：每次喂给探测器的块大小 / 最多探测的字节预算 / 中部与尾部校验块大小
+    ENCODING_CHUNK_SIZE: int = 16384
+    ENCODING_SAMPLE_SIZE: int = 1048576
+    ENCODING_VALIDATE_BLOCK_SIZE: int = 65536
+
+    # CSV 解析是否优先尝试 pyarrow 引擎 (需安装 pyarrow)
+    # 默认关闭：pyarrow 会把 ISO 日期列推断为 datetime，与 C/python 引擎的 dtype 不一致
+    CSV_PYARROW_ENGINE: bool = False
+
+    # CSV 方言判定的头部采样大小 (字节)
+    CSV_DIALECT_SAMPLE_BYTES: int = 65536
+
+    # 文件探查 (/quality/inspect) 只读取头部的行数，dtype / 预览 / 内存估算都基于这部分样本
+    INSPECT_SAMPLE_ROWS: int = 1000
+
+    # /analysis/run 的列投影 / 行区间下推：缓存未命中且文件小于该大小 (MB) 时先全量加载一次
+    # (写入内存缓存和 sidecar，后续请求直接切片)；更大的文件只解析需要的列和行
+    PROJECTION_PUSHDOWN_THRESHOLD_MB: int = 64
+
+    # 行数统计时每次扫描的字节块大小
+    ROW_COUNT_CHUNK_BYTES: int = 4 * 1024 * 1024
+
     # =========================
     # 4. Redis 配置 (Infrastructure)
     # =========================
@@ -46,6 +125,13 @@ class Settings(BaseSettings):
     REDIS_DB: int = 0
     REDIS_PASSWORD: str = ""  # 生产环境必备
 
+    # 大体积缓存值 (质量报告) 的编码：msgpack / json，可选压缩 zstd / zlib / none
+    # msgpack、zstandard 为可选依赖，缺失时分别退回 json (优先 orjson) 与 zlib；
+    # 小于 COMPRESS_MIN_BYTES 的值不压缩
+    CACHE_CODEC: str = "msgpack"
+    CACHE_COMPRESSION: str = "zstd"
+    CACHE_COMPRESS_MIN_BYTES: int = 1024
+
     # =========================
     # 5. 日志配置 (Logging)
     # =========================
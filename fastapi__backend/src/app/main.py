@@ -7,6 +7,8 @@ from src.shared.utils.logger import logger
 # 1. 基础设施与核心初始化
 from src.app.core.initializers.init_filesystem import initialize_filesystem
 from src.infrastructure.cache.redis_client import redis_manager
+from src.infrastructure.compute.process_pool import process_pool_manager
+from src.infrastructure.jobs.scheduler import job_scheduler
 
 # 2. 中间件
 from src.app.middleware.cors import setup_cors
@@ -34,6 +36,9 @@ async def lifespan(app: FastAPI):
     # 2. 连接 Redis 缓存
     # 使用 Infrastructure 层提供的单例管理器
     await redis_manager.connect()
+
+    # 3. 启动后台任务 worker (异步提交的分析任务)
+    job_scheduler.start()
     
     yield # 应用运行中...
     
@@ -41,10 +46,16 @@ async def lifespan(app: FastAPI):
     # 🛑 Shutdown (关闭阶段)
     # ==========================
     logger.info("🛑 Shutting down application...")
+
+    # 先停后台任务 (执行中的任务会被取消)，再断开它依赖的 Redis
+    await job_scheduler.shutdown()
     
-    # 3. 优雅断开 Redis
+    # 4. 优雅断开 Redis
     await redis_manager.disconnect()
 
+    # 5. 回收计算进程池 (未启用 / 未使用时为空操作)
+    process_pool_manager.shutdown()
+
 def create_app() -> FastAPI:
     """
     应用工厂函数
@@ -1,15 +1,31 @@
 from __future__ import annotations
 
+import asyncio
+
 from ..schema.analysis_request_schema import AnalysisRunRequest
 from ..schema.analysis_response_schema import AnalysisRunResponse
 from ..service.analysis_runner_service import run_analysis
+from src.infrastructure.cache.distributed_lock import distributed_flight
 from src.shared.utils.logger import logger  # 复用你项目 logger
+from src.shared.utils.single_flight import SingleFlight, payload_key
 
 
 class AnalysisController:
-    def run_task(self, request: AnalysisRunRequest) -> AnalysisRunResponse:
+    def __init__(self):
+        # 请求体完全相同的并发分析只执行一次
+        self._flight = SingleFlight("analysis")
+
+    async def run_task(self, request: AnalysisRunRequest) -> AnalysisRunResponse:
         logger.info(f"Controller: Received analysis request for File {request.file_id}")
-        return run_analysis(request)
+        key = payload_key("analysis:run", request.model_dump(mode="json"))
+
+        # 进程内合并 + 跨副本租约锁 (其他副本等待后读取共享结果)
+        async def compute() -> dict:
+            response = await asyncio.to_thread(run_analysis, request)
+            return response.model_dump(mode="json")
+
+        result = await self._flight.do(key, lambda: distributed_flight.do(key, compute))
+        return AnalysisRunResponse.model_validate(result)
 
     def check_health(self) -> dict:
         return {"status": "ok", "module": "analysis"}
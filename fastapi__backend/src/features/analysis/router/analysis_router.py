@@ -22,11 +22,11 @@ router = APIRouter(tags=["Analysis"])
     6. Return Summary, Charts, Logs
     """,
 )
-def run_analysis_endpoint(request: AnalysisRunRequest) -> AnalysisRunResponse:
+async def run_analysis_endpoint(request: AnalysisRunRequest) -> AnalysisRunResponse:
     """
     分析任务入口
     """
-    return analysis_controller.run_task(request)
+    return await analysis_controller.run_task(request)
 
 
 @router.get(
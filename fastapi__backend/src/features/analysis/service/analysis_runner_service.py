@@ -51,7 +51,11 @@ def run_analysis(req: AnalysisRunRequest) -> AnalysisRunResponse:
     try:
         # --- Load ---
         stage = STAGE_LOAD
-        df0, load_profile, load_logs = load_dataframe(req.data_ref)
+        df0, load_profile, load_logs = load_dataframe(
+            req.data_ref,
+            selection=req.data_selection,
+            required_columns=_referenced_columns(req),
+        )
         logs.extend(load_logs)
 
         # --- Select (may raise validate-stage errors by design) ---
@@ -59,7 +63,7 @@ def run_analysis(req: AnalysisRunRequest) -> AnalysisRunResponse:
         # - rows out of range -> validate
         # - columns missing -> validate
         # - rows=0 -> validate
-        df1, selection_profile, select_logs = apply_selection(df0, req.data_selection)
+        df1, selection_profile, select_logs = apply_selection(df0, req.data_selection, load_profile)
         logs.extend(select_logs)
 
         # --- Validate ---
@@ -193,6 +197,14 @@ def run_analysis(req: AnalysisRunRequest) -> AnalysisRunResponse:
         )
 
 
+def _referenced_columns(req: AnalysisRunRequest) -> List[str]:
+    """分析配置引用到的全部列 (columns + target + group_by)，用于 load 阶段的列投影下推"""
+    cfg = req.analysis_config
+    cols = list(cfg.columns or [])
+    cols.extend(c for c in (cfg.target, cfg.group_by) if c)
+    return cols
+
+
 def _dev_detail(detail: Any) -> Any:
     """
     dev/prod detail 策略留口子：
@@ -1,22 +1,29 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 import os
+import re
 import pandas as pd
 
-from src.shared.utils.file_parser import parse_file
+from src.shared.utils.file_parser import count_file_rows, parse_file_projection, read_file_columns
 
-from ..schema.analysis_request_schema import DataRef
+from ..schema.analysis_request_schema import DataRef, DataSelection
 from ..utils.analysis_exception_util import AnalysisException
 from ..constant.stage_constant import STAGE_LOAD
 
 
-def load_dataframe(data_ref: DataRef) -> Tuple[pd.DataFrame, Dict[str, Any], List[str]]:
+def load_dataframe(
+    data_ref: DataRef,
+    selection: Optional[DataSelection] = None,
+    required_columns: Optional[List[str]] = None,
+) -> Tuple[pd.DataFrame, Dict[str, Any], List[str]]:
     """
     Load -> df + load_profile + logs
 
     ✅ MVP：只支持 local_file
     ✅ 失败必须归因到 stage=load
+    ✅ 选择下推：只物化 selection.columns ∪ required_columns，行区间只读到 rows.end
+       load_profile["pushdown"] 记录下推内容，apply_selection 据此跳过已完成的切片
     """
     logs: List[str] = []
 
@@ -41,18 +48,57 @@ def load_dataframe(data_ref: DataRef) -> Tuple[pd.DataFrame, Dict[str, Any], Lis
     try:
         # 2. 🚀 抛弃死板的 pd.read_csv，拥抱智能解析入口
         # parse_file 内部会自动处理：自动探测编码、自动嗅探分隔符
-        df = parse_file(path, original_filename=os.path.basename(path))
+        filename = os.path.basename(path)
+        parse_profile: Dict[str, Any] = {}
 
-        # 3. 组装 Profile
+        # 先读表头：列投影只在列名可以确定时下推
+        header = read_file_columns(path, original_filename=filename, sheet_name=data_ref.sheet_name)
+        usecols = _projection_columns(header, selection, required_columns)
+        row_range = _pushdown_rows(selection)
+
+        df = parse_file_projection(
+            path,
+            original_filename=filename,
+            columns=usecols,
+            rows=row_range,
+            load_profile=parse_profile,
+            sheet_name=data_ref.sheet_name,
+        )
+
+        # 总行数：缓存 / sidecar 命中时精确已知；没有行区间时就是读到的行数；否则廉价计数
+        if parse_profile.get("num_rows") is not None:
+            total_rows = int(parse_profile["num_rows"])
+        elif row_range is None:
+            total_rows = int(df.shape[0])
+        else:
+            total_rows = int(count_file_rows(path, load_profile=parse_profile, sheet_name=data_ref.sheet_name))
+
+        # 3. 组装 Profile (rows / cols / columns 描述的是整个文件，而不是下推后的结果)
         load_profile: Dict[str, Any] = {
             "path": path,
             "format": fmt,
-            "rows": int(df.shape[0]),
-            "cols": int(df.shape[1]),
-            "columns": [str(c) for c in df.columns.tolist()],
+            "rows": total_rows,
+            "cols": len(header),
+            "columns": header,
+            "engine": parse_profile.get("engine"),
+            "sheet_name": data_ref.sheet_name,
+            "pushdown": {
+                "columns": usecols,
+                "rows": {"start": row_range[0], "end": row_range[1]} if row_range else None,
+                "materialized_shape": [int(df.shape[0]), int(df.shape[1])],
+            },
         }
 
-        logs.append(f"Load: Success (Smart Inferred). Shape=({load_profile['rows']}, {load_profile['cols']})")
+        logs.append(
+            f"Load: Success (Smart Inferred). Shape=({load_profile['rows']}, {load_profile['cols']}) "
+            f"Engine={load_profile['engine']}"
+        )
+        if usecols is not None or row_range is not None:
+            logs.append(
+                f"Load: Pushdown cols={len(usecols) if usecols is not None else len(header)}/{len(header)} "
+                f"rows={'[%d,%d)' % row_range if row_range else 'all'} "
+                f"materialized=({df.shape[0]}, {df.shape[1]})"
+            )
         return df, load_profile, logs
 
     except Exception as e:
@@ -63,3 +109,42 @@ def load_dataframe(data_ref: DataRef) -> Tuple[pd.DataFrame, Dict[str, Any], Lis
             details={"path": path, "format": fmt, "error": str(e)},
         )
 
+
+
+# pandas 对重复列名的改写：a, a.1, a.2 ...
+_MANGLED_DUP = re.compile(r"^(.*)\.(\d+)$")
+
+
+def _projection_columns(
+    header: List[str],
+    selection: Optional[DataSelection],
+    required_columns: Optional[List[str]],
+) -> Optional[List[str]]:
+    """
+    计算需要物化的列 (按表头顺序)，None 表示不做列投影
+
+    - selection.columns 非空：selection.columns ∪ required_columns
+    - selection.columns 为 None：只需 required_columns (分析配置引用的列)
+    - 请求了不存在的列 / 表头含被 pandas 改写的重复列名：不下推，
+      交给 selector / validator 按原逻辑报错
+    """
+    needed = set(required_columns or [])
+    if selection is not None and selection.columns:
+        needed.update(selection.columns)
+    if not needed:
+        return None
+
+    header_set = set(header)
+    if not needed.issubset(header_set):
+        return None
+    if any(m and m.group(1) in header_set for m in map(_MANGLED_DUP.match, header)):
+        return None
+    if len(needed) == len(header):
+        return None
+    return [c for c in header if c in needed]
+
+
+def _pushdown_rows(selection: Optional[DataSelection]) -> Optional[Tuple[int, int]]:
+    if selection is None or selection.rows is None:
+        return None
+    return int(selection.rows.start), int(selection.rows.end)
@@ -31,7 +31,8 @@ def run_group_compare(
         charts: List[Dict[str, Any]] = []
         return key_metrics, charts, warnings, logs
 
-    g = sub.groupby(group_by)[target]
+    # observed=True：group_by 为 category (dtype 压缩) 时不输出被筛掉的空分组，对普通列无影响
+    g = sub.groupby(group_by, observed=True)[target]
 
 # 1. 完善统计维度：在 g.agg 里加上 "sum"
     stats_df = g.agg(["count", "mean", "median", "min", "max", "sum"]).reset_index()
@@ -11,10 +11,14 @@ from ..constant.stage_constant import STAGE_VALIDATE
 def apply_selection(
     df: pd.DataFrame,
     selection: Optional[DataSelection],
+    load_profile: Optional[Dict[str, Any]] = None,
 ) -> Tuple[pd.DataFrame, Dict[str, Any], List[str]]:
     """
     Apply selection -> df_selected + selection_profile + logs
 
+    ✅ load_profile 带 pushdown 时：df 已经是下推后的结果 (列投影 / 行区间已完成)，
+       rows_before / cols_before / 列存在性按 load_profile 记录的整个文件计算
+
     ✅ rows: df.iloc[start:end] (end exclusive)
     ✅ columns: None -> keep all; list -> df[columns] (keeps order)
     ✅ rows out of range -> failed(stage=validate)
@@ -24,8 +28,15 @@ def apply_selection(
     """
     logs: List[str] = []
 
-    rows_before = int(df.shape[0])
-    cols_before = int(df.shape[1])
+    pushdown = (load_profile or {}).get("pushdown") or {}
+    if pushdown:
+        all_columns = [str(c) for c in load_profile["columns"]]
+        rows_before = int(load_profile["rows"])
+    else:
+        all_columns = [str(c) for c in df.columns.tolist()]
+        rows_before = int(df.shape[0])
+    cols_before = len(all_columns)
+    rows_pushed = pushdown.get("rows") is not None
 
     if selection is None:
         selection_profile: Dict[str, Any] = {
@@ -34,7 +45,7 @@ def apply_selection(
             "cols_before": cols_before,
             "cols_after": cols_before,
             "row_range": None,
-            "selected_columns": [str(c) for c in df.columns.tolist()],
+            "selected_columns": all_columns,
         }
         logs.append(f"Select: skipped (no selection). Shape=({rows_before}, {cols_before})")
         return df, selection_profile, logs
@@ -60,7 +71,8 @@ def apply_selection(
                 details={"start": start, "end": end, "totalRows": total_rows},
             )
 
-        df = df.iloc[start:end]
+        if not rows_pushed:
+            df = df.iloc[start:end]
         row_range = {"start": start, "end": end}
 
     # ✅ selection 后空集直接失败（MVP 必做）
@@ -75,7 +87,7 @@ def apply_selection(
     selected_columns: List[str]
     if selection.columns is None:
         # ✅ None => 全列（保持原顺序）
-        selected_columns = [str(c) for c in df.columns.tolist()]
+        selected_columns = all_columns
     else:
         # columns provided
         if len(selection.columns) == 0:
@@ -86,7 +98,7 @@ def apply_selection(
             )
 
         # 必须全部存在
-        df_cols = set([str(c) for c in df.columns.tolist()])
+        df_cols = set(all_columns)
         missing = [c for c in selection.columns if c not in df_cols]
         if missing:
             raise AnalysisException(
@@ -100,7 +112,7 @@ def apply_selection(
         selected_columns = [str(c) for c in selection.columns]
 
     rows_after = int(df.shape[0])
-    cols_after = int(df.shape[1])
+    cols_after = len(selected_columns)
 
     selection_profile: Dict[str, Any] = {
         "rows_before": rows_before,
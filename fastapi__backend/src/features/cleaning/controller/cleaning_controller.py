@@ -1,9 +1,13 @@
 from __future__ import annotations
 
+import asyncio
+
 from ..schema.cleaning_request_schema import CleaningRunRequest
 from ..schema.cleaning_response_schema import CleaningRunResponse
 from ..service.cleaning_runner_service import run_cleaning
+from src.infrastructure.cache.distributed_lock import distributed_flight
 from src.shared.utils.logger import logger
+from src.shared.utils.single_flight import SingleFlight, payload_key
 
 class CleaningController:
     """
@@ -16,16 +20,27 @@ class CleaningController:
     注意：此类不包含 HTTP 路由逻辑
     """
 
-    def run_task(self, request: CleaningRunRequest) -> CleaningRunResponse:
+    def __init__(self):
+        # 请求体完全相同的并发清洗只执行一次 (网关重试 / 重复点击)
+        self._flight = SingleFlight("cleaning")
+
+    async def run_task(self, request: CleaningRunRequest) -> CleaningRunResponse:
         """
         执行清洗任务
         
-        注意：这里使用同步 `def` 而非 `async def`。
-        因为 run_cleaning 是 CPU 密集型 (Pandas) 操作，
-        FastAPI 会自动将其放入 ThreadPool 执行，避免阻塞 EventLoop。
+        run_cleaning 是 CPU 密集型 (Pandas) 操作，放入线程执行 (asyncio.to_thread)，避免阻塞 EventLoop；
+        请求体哈希相同的并发调用共享同一次执行的结果或异常 (进程内)，
+        其他副本上的相同请求等待租约持有者完成后读取共享结果。
         """
         logger.info(f"Controller: Received cleaning request for File {request.file_id}")
-        return run_cleaning(request)
+        key = payload_key("cleaning:run", request.model_dump(mode="json"))
+
+        async def compute() -> dict:
+            response = await asyncio.to_thread(run_cleaning, request)
+            return response.model_dump(mode="json")
+
+        result = await self._flight.do(key, lambda: distributed_flight.do(key, compute))
+        return CleaningRunResponse.model_validate(result)
 
     def check_health(self) -> dict:
         """
@@ -20,11 +20,11 @@ router = APIRouter(tags=["Cleaning"])
     5. Return Summary & Asset Ref
     """,
 )
-def run_cleaning_endpoint(request: CleaningRunRequest) -> CleaningRunResponse:
+async def run_cleaning_endpoint(request: CleaningRunRequest) -> CleaningRunResponse:
     """
     清洗任务入口
     """
-    return cleaning_controller.run_task(request)
+    return await cleaning_controller.run_task(request)
 
 
 @router.get(
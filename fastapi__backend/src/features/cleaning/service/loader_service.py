@@ -8,6 +8,8 @@ import pandas as pd
 from ..schema.data_source_ref_schema import DataSourceRef
 from ..utils.cleaning_exception_util import CleaningException
 from src.shared.utils.logger import logger  # 假设已有统一 Logger
+from src.infrastructure.cache.dataframe_cache import dataframe_cache
+from src.shared.utils.excel_reader import read_excel_streaming
 
 # 常量定义：常见空值表示
 DEFAULT_NULL_VALUES = ["", "NA", "N/A", "null", "NULL", "None", "none"]
@@ -83,44 +85,16 @@ def _check_shape_limits(df: pd.DataFrame, max_rows: int, max_cols: int) -> None:
             },
         )
 
-def load_dataframe(
-    data_ref: DataSourceRef,
-    *,
-    max_file_bytes: int = 50 * 1024 * 1024,   # 默认 50MB
-    max_rows: int = 200_000,                  # 默认 20万行
-    max_cols: int = 2_000,                    # 默认 2千列
-) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+def _read_source(data_ref: DataSourceRef) -> pd.DataFrame:
     """
-    数据加载主入口
-    
-    :param data_ref: 数据源引用对象
-    :param max_file_bytes: 文件字节大小限制
-    :param max_rows: DataFrame 行数限制
-    :param max_cols: DataFrame 列数限制
-    :return: (DataFrame, ProfileDict)
+    按 data_ref 读取原始文件 (不经过缓存)
     """
-    
-    # 1. 源类型校验 (MVP 阶段)
-    if data_ref.type != "local_file":
-        raise CleaningException(
-            stage="load",
-            message=f"Unsupported data source type: {data_ref.type}",
-            detail={"type": data_ref.type},
-        )
-
     path = data_ref.path
-    logger.info(f"Loader: Starting to load data from {path} (Format: {data_ref.format})")
-
-    # 2. 物理校验
-    _check_file_exists(path)
-    _check_file_size(path, max_file_bytes)
-
-    # 3. 读取逻辑
     try:
         if data_ref.format == "csv":
             # 策略：优先使用 C 引擎 (默认)，除非用户明确要求分隔符推断
             # 注意：Schema 中 encoding 有默认值 utf-8
-            df = pd.read_csv(
+            return pd.read_csv(
                 path,
                 encoding=data_ref.encoding,
                 sep=data_ref.delimiter or ",", # 默认逗号，保证 C 引擎性能
@@ -132,7 +106,8 @@ def load_dataframe(
             
         elif data_ref.format == "xlsx":
             # ✅ 修复：透传 sheet_name
-            df = pd.read_excel(
+            # read_only 流式逐行读取，不为每个单元格构造 Cell 对象
+            return read_excel_streaming(
                 path,
                 sheet_name=data_ref.sheet_name or 0, # 默认第一个 sheet
                 na_values=DEFAULT_NULL_VALUES,
@@ -140,10 +115,10 @@ def load_dataframe(
             )
             
         elif data_ref.format == "parquet":
-            df = pd.read_parquet(path)
+            return pd.read_parquet(path)
             
         elif data_ref.format == "json":
-            df = pd.read_json(path)
+            return pd.read_json(path)
             
         else:
             raise CleaningException(
@@ -171,6 +146,54 @@ def load_dataframe(
             detail={"error": str(e), "path": path, "format": data_ref.format},
         )
 
+def load_dataframe(
+    data_ref: DataSourceRef,
+    *,
+    max_file_bytes: int = 50 * 1024 * 1024,   # 默认 50MB
+    max_rows: int = 200_000,                  # 默认 20万行
+    max_cols: int = 2_000,                    # 默认 2千列
+) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """
+    数据加载主入口
+    
+    :param data_ref: 数据源引用对象
+    :param max_file_bytes: 文件字节大小限制
+    :param max_rows: DataFrame 行数限制
+    :param max_cols: DataFrame 列数限制
+    :return: (DataFrame, ProfileDict)
+    """
+    
+    # 1. 源类型校验 (MVP 阶段)
+    if data_ref.type != "local_file":
+        raise CleaningException(
+            stage="load",
+            message=f"Unsupported data source type: {data_ref.type}",
+            detail={"type": data_ref.type},
+        )
+
+    path = data_ref.path
+    logger.info(f"Loader: Starting to load data from {path} (Format: {data_ref.format})")
+
+    # 2. 物理校验
+    _check_file_exists(path)
+    _check_file_size(path, max_file_bytes)
+
+    # 3. 读取逻辑 (经过进程级 DataFrame 缓存，同一文件 + 同一读取参数只解析一次)
+    cache_options = {
+        "loader": "cleaning",
+        "format": data_ref.format,
+        "encoding": data_ref.encoding,
+        "delimiter": data_ref.delimiter,
+        "sheet_name": data_ref.sheet_name,
+    }
+    df, _, cache_hit = dataframe_cache.get_or_load(
+        path,
+        lambda: (_read_source(data_ref), {}),
+        options=cache_options,
+    )
+    if cache_hit:
+        logger.info(f"Loader: Memory cache hit for {path}")
+
     # 4. 逻辑维度校验
     _check_shape_limits(df, max_rows=max_rows, max_cols=max_cols)
 
@@ -8,6 +8,7 @@ import numpy as np
 from ..schema.clean_rules_schema import CleanRules
 from ..utils.cleaning_exception_util import CleaningException
 from src.shared.utils.logger import logger
+from src.shared.utils.row_hash import find_duplicate_groups
 
 def _profile(df: pd.DataFrame) -> Dict[str, Any]:
     """
@@ -157,11 +158,13 @@ def _apply_deduplicate_rule(
         _safe_columns(df, subset)
 
     try:
-        df2 = df.drop_duplicates(subset=subset, keep=keep_param).reset_index(drop=True)
+        # 行哈希分组 + 逐值复核 (删除数据必须精确)，与 drop_duplicates 结果一致
+        groups = find_duplicate_groups(df, subset=subset, verify=True)
+        df2 = df[~groups.duplicate_mask(keep_param)].reset_index(drop=True)
         removed = before_rows - len(df2)
         
         logs.append(f"Applied: Deduplication. Removed {removed} rows (subset={subset or 'ALL'}, keep={keep_param}).")
-        metrics["deduplicate"] = {"removed_rows": removed}
+        metrics["deduplicate"] = {"removed_rows": removed, "duplicate_groups": groups.group_count}
         return df2
     except Exception as e:
         raise CleaningException(
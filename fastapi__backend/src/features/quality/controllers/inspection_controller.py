@@ -3,7 +3,7 @@ from src.shared.schemas.response import ResponseSchema
 from src.shared.utils.response import success_response
 
 # 引入契约 (Request/Response Schemas)
-from src.features.quality.schemas.inspection import FileInspectionRequest, FileInspectionResponse
+from src.features.quality.schemas.inspection import FileInspectionRequest, FileInspectionResponse, SheetListResponse
 
 # 引入业务服务 (Singleton)
 from src.features.quality.services.inspection_service import inspection_service
@@ -35,4 +35,20 @@ def inspect_dataset(request: FileInspectionRequest):
     return success_response(
         data=result,
         message="File inspection completed successfully"
-    )
\ No newline at end of file
+    )
+
+@router.post(
+    "/sheets",
+    summary="Excel 工作表列表",
+    description="只读取工作簿结构与 dimension 元数据，返回工作表名称与行列数，不解析单元格数据。",
+    response_model=ResponseSchema[SheetListResponse]
+)
+def list_sheets(request: FileInspectionRequest):
+    """
+    工作表列表接口 (Sync，理由同 /inspect)
+    """
+    result = inspection_service.list_sheets(request)
+    return success_response(
+        data=result,
+        message="Sheet listing completed successfully"
+    )
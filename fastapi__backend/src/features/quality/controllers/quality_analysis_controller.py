@@ -1,8 +1,13 @@
-from fastapi import APIRouter, Body
-from typing import Dict, Any
+from fastapi import APIRouter, Body, Header, Query
+from fastapi.responses import StreamingResponse
+from typing import Dict, Any, List, Optional
 
 from src.shared.schemas.response import ResponseSchema
+from src.app.config.settings import settings
 from src.shared.utils.response import success_response
+from src.shared.utils.sse import SSE_HEADERS, SSE_HEARTBEAT, SSE_MEDIA_TYPE, format_sse
+from src.shared.constants.error_codes import ErrorCode
+from src.shared.exceptions.base import BaseAppException
 
 # 引入契约
 # 注意：你需要确保 QualityCheckRequest 在 schema定义 中包含 file_path 字段，
@@ -12,16 +17,22 @@ from src.features.quality.schemas.quality_analysis import QualityCheckRequest, Q
 
 # 引入业务服务
 from src.features.quality.services.quality_analysis_service import analysis_service
+from src.infrastructure.cache.codec import payload_codec
+from src.infrastructure.cache.distributed_lock import distributed_flight
+from src.infrastructure.jobs.scheduler import job_scheduler
 
 router = APIRouter()
 
+# 批量查询任务状态时一次最多的任务数
+MAX_BATCH_TASKS = 100
+
 # -----------------------------------------------------------------------------
 # 1. 提交分析任务
 # -----------------------------------------------------------------------------
 @router.post(
     "/analyze",
     summary="执行深度质量检测",
-    description="计算缺失值、重复行、异常值(IQR)并生成评分。支持缓存。",
+    description="计算缺失值、重复行、异常值(IQR / Z-score / MAD / 分位区间，可多选)并生成评分。支持缓存；mode=approximate 时抽样估计并返回置信区间。background=true 时立即返回 202 + 任务 ID，通过 /tasks/{file_id} 轮询结果。",
     response_model=ResponseSchema[Dict[str, Any]] # 这里可以是 Dict 或 QualityCheckResponse
 )
 async def analyze_quality(
@@ -41,12 +52,31 @@ async def analyze_quality(
          # 这里为了演示，我们假设 request 必定携带 file_path
          pass
 
+    # 异步提交：不占用 HTTP 连接等待计算 (长任务会触发上游网关超时)
+    if request.background:
+        task = await analysis_service.submit_analysis(
+            file_id=request.file_id,
+            file_path=request.file_path,
+            force_refresh=request.force_refresh,
+            methods=request.methods,
+            mode=request.mode,
+            followup_exact=request.followup_exact,
+        )
+        return success_response(
+            data=task,
+            message="Quality analysis accepted",
+            status_code=202
+        )
+
     # 调用 Service (Async)
     # 因为 Service 内部使用了 await (Redis操作) 和 to_thread (Pandas操作)
     result = await analysis_service.perform_analysis(
         file_id=request.file_id,
         file_path=request.file_path, # ⚠️ 确保 Request Schema 中定义了此字段
-        force_refresh=request.force_refresh
+        force_refresh=request.force_refresh,
+        methods=request.methods,
+        mode=request.mode,
+        followup_exact=request.followup_exact,
     )
     
     return success_response(
@@ -57,16 +87,39 @@ async def analyze_quality(
 # -----------------------------------------------------------------------------
 # 2. 查询任务进度 (Polling)
 # -----------------------------------------------------------------------------
+@router.get(
+    "/tasks",
+    summary="批量查询分析任务进度",
+    description="一次查询多个任务的状态 (?file_ids=a&file_ids=b，最多 100 个)，不附带分析报告；不存在的任务为 null"
+)
+async def get_analysis_status_batch(
+    file_ids: List[str] = Query(..., description="任务 (文件) ID 列表")
+):
+    """
+    批量获取任务状态 (列表页同时轮询多个文件时使用)
+    """
+    if len(file_ids) > MAX_BATCH_TASKS:
+        raise BaseAppException(
+            message=f"At most {MAX_BATCH_TASKS} tasks per request",
+            code=ErrorCode.VALIDATION_ERROR,
+            details={"count": len(file_ids)}
+        )
+    tasks = await analysis_service.get_progress_batch(file_ids)
+    return success_response(data=tasks)
+
 @router.get(
     "/tasks/{file_id}",
     summary="查询分析任务进度",
-    description="前端轮询此接口以获取进度条状态 (status: processing/completed/failed, progress: 0-100)"
+    description="前端轮询此接口以获取进度条状态 (status: pending/processing/completed/failed, progress: 0-100)；completed 时 result 字段为分析报告"
 )
-async def get_analysis_status(file_id: str):
+async def get_analysis_status(
+    file_id: str,
+    include_result: bool = Query(True, description="任务完成时是否附带分析报告")
+):
     """
-    获取任务状态
+    获取任务状态 (异步提交的任务在完成后由此取回结果)
     """
-    status = await analysis_service.get_progress(file_id)
+    status = await analysis_service.get_task_result(file_id, include_result=include_result)
     
     # 如果没有任务记录，返回 unknown 或 finished
     if not status:
@@ -77,6 +130,37 @@ async def get_analysis_status(file_id: str):
         
     return success_response(data=status)
 
+@router.get(
+    "/tasks/{file_id}/events",
+    summary="订阅分析任务进度 (SSE)",
+    description="Server-Sent Events 推送任务状态 (event: status，id 为状态序号 seq)，任务结束 (completed/failed) 后关闭；"
+                "无变化时定期发送心跳注释；断线重连带 Last-Event-ID 时不重复发送未变化的状态。报告本体仍通过 /tasks/{file_id} 获取"
+)
+async def stream_analysis_status(
+    file_id: str,
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID"),
+    resume_from: Optional[int] = Query(None, description="首次连接时无法设置请求头的客户端，可用此参数代替 Last-Event-ID")
+):
+    """
+    任务进度推送 (替代轮询：一个空闲长连接代替每秒多次 GET)
+    """
+    try:
+        resume = int(last_event_id) if last_event_id else resume_from
+    except ValueError:
+        resume = resume_from
+    heartbeat = getattr(settings, "QUALITY_SSE_HEARTBEAT_S", 15)
+
+    async def events():
+        first = True
+        async for state in analysis_service.stream_progress(file_id, resume, heartbeat=heartbeat):
+            if state is None:
+                yield SSE_HEARTBEAT
+                continue
+            yield format_sse(state, event="status", event_id=state.get("seq"), retry_ms=3000 if first else None)
+            first = False
+
+    return StreamingResponse(events(), media_type=SSE_MEDIA_TYPE, headers=SSE_HEADERS)
+
 # -----------------------------------------------------------------------------
 # 3. 缓存管理
 # -----------------------------------------------------------------------------
@@ -96,4 +180,38 @@ async def clear_analysis_cache(file_id: str):
     await analysis_service.cache_repo.delete_analysis_result(file_id)
     await analysis_service.task_repo.delete_task(file_id)
     
-    return success_response(message=f"Cache cleared for {file_id}")
\ No newline at end of file
+    return success_response(message=f"Cache cleared for {file_id}")
+
+
+@router.get(
+    "/cache/stats",
+    summary="分析报告缓存的编码统计",
+    description="缓存值编码格式、编码前后体积与压缩比、编解码平均耗时 (进程级累计)"
+)
+async def get_cache_codec_stats():
+    """
+    缓存体积指标
+    """
+    return success_response(data=payload_codec.stats())
+
+@router.get(
+    "/jobs/stats",
+    summary="后台任务队列统计",
+    description="异步提交的分析任务：worker 数、排队 / 执行中数量、拒绝次数与平均等待 / 执行耗时 (进程级累计)"
+)
+async def get_job_stats():
+    """
+    后台任务队列指标
+    """
+    return success_response(data=job_scheduler.stats())
+
+@router.get(
+    "/locks/stats",
+    summary="跨副本任务去重统计",
+    description="租约获取 / 等待次数、由其他副本提供结果的次数、等待超时与 Redis 降级次数、平均 / 最长等待耗时 (进程级累计)"
+)
+async def get_lock_stats():
+    """
+    锁等待指标
+    """
+    return success_response(data=distributed_flight.stats())
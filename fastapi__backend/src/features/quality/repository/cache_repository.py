@@ -1,19 +1,26 @@
-import json
 from typing import Optional, Dict, Any
 # 1. 导入 get_redis 辅助函数，而不是类本身
-from src.infrastructure.cache.redis_client import get_redis
+from src.infrastructure.cache.redis_client import get_redis, get_redis_binary
+from src.infrastructure.cache.codec import CodecError, payload_codec
+from src.shared.utils.hash_util import generate_cache_key
+from src.shared.utils.logger import logger
 
 class CacheRepository:
     """
     Quality 模块缓存仓储
-    
+
     职责：
     1. 管理 Redis Key 命名空间
-    2. 处理 JSON 序列化/反序列化 (Dict <-> String)
-    3. 调用底层 Redis 客户端
+    2. 处理序列化/反序列化 (Dict <-> bytes，经 payload_codec 编码 + 压缩，兼容旧版 JSON 文本)
+    3. 调用底层 Redis 客户端 (报告本体走二进制客户端，反向索引走文本客户端)
+
+    结果按内容寻址：Key = 文件内容指纹 + 分析参数哈希，
+    文件被替换后指纹变化，旧结果不会再被命中；相同内容以不同 file_id 上传时共用一份结果。
+    另维护 file_id -> 指纹 的反向索引，用于按 file_id 清理缓存。
     """
 
     CACHE_PREFIX = "quality:analysis"
+    INDEX_PREFIX = "quality:fileref"
     DEFAULT_TTL = 3600
 
     def __init__(self):
@@ -30,46 +37,79 @@ class CacheRepository:
         """
         return get_redis()
 
-    def _make_key(self, file_id: str) -> str:
-        return f"{self.CACHE_PREFIX}:{file_id}"
+    @property
+    def binary_redis(self):
+        """二进制安全的客户端，读写编码后的报告 (bytes)"""
+        return get_redis_binary()
+
+    def _make_key(self, fingerprint: str, params: Dict[str, Any]) -> str:
+        """e.g. quality:analysis:{文件指纹}:{参数哈希}"""
+        return generate_cache_key(self.CACHE_PREFIX, fingerprint, params)
+
+    def _make_index_key(self, file_id: str) -> str:
+        return f"{self.INDEX_PREFIX}:{file_id}"
 
-    async def get_analysis_result(self, file_id: str) -> Optional[Dict[str, Any]]:
+    async def get_analysis_result(
+        self, file_id: str, fingerprint: str, params: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
         """
-        获取分析结果 (自动反序列化 JSON)
+        获取分析结果 (自动解码)
+        结果可能由同内容的其他 file_id 写入，返回前把 file_id 改为当前请求的 ID
         """
-        key = self._make_key(file_id)
-        
-        # 1. 从 Redis 读取字符串
-        #  - conceptually: Redis String -> JSON Load -> Python Dict
-        data_str = await self.redis.get(key)
-        
-        if not data_str:
+        key = self._make_key(fingerprint, params)
+
+        # 1. 从 Redis 读取原始字节
+        #  - conceptually: Redis bytes -> 头部选择解码器 -> Python Dict
+        data = await self.binary_redis.get(key)
+
+        if not data:
             return None
-            
+
         try:
-            # 2. 反序列化: String -> Dict
-            return json.loads(data_str)
-        except json.JSONDecodeError:
-            # 防御性编程：万一缓存里的数据格式坏了，返回 None 并打印日志，不要崩掉整个请求
-            # (这里假设你有 logger，如果没有可以 print 或者忽略)
+            # 2. 反序列化: bytes -> Dict (无头部的旧值按 JSON 文本解码)
+            result = payload_codec.decode(data)
+        except CodecError as e:
+            # 防御性编程：万一缓存里的数据格式坏了，按未命中处理，不要崩掉整个请求
+            logger.warning(f"⚠️ [CacheRepo] Undecodable cache entry {key}: {e}")
             return None
 
-    async def save_analysis_result(self, file_id: str, result: Dict[str, Any], ttl: int = DEFAULT_TTL):
+        result["file_id"] = file_id
+        await self.redis.set(self._make_index_key(file_id), fingerprint, ex=self.DEFAULT_TTL)
+        return result
+
+    async def save_analysis_result(
+        self,
+        file_id: str,
+        fingerprint: str,
+        params: Dict[str, Any],
+        result: Dict[str, Any],
+        ttl: int = DEFAULT_TTL,
+    ):
         """
-        保存分析结果 (自动序列化为 JSON)
+        保存分析结果 (编码 + 压缩)，同时更新 file_id -> 指纹 的反向索引
         """
-        key = self._make_key(file_id)
-        
-        # 1. 序列化: Dict -> JSON String
-        # ensure_ascii=False 保证中文能正常显示，而不是 \uXXXX
-        data_str = json.dumps(result, ensure_ascii=False)
-        
+        key = self._make_key(fingerprint, params)
+
+        # 1. 序列化: Dict -> bytes (带格式头)
+        data = payload_codec.encode(result)
+
         # 2. 存入 Redis
-        await self.redis.set(key, data_str, ex=ttl)
+        await self.binary_redis.set(key, data, ex=ttl)
+        logger.debug(f"📦 [CacheRepo] Saved {key} ({len(data)} bytes, {payload_codec.name})")
+        await self.redis.set(self._make_index_key(file_id), fingerprint, ex=ttl)
+
+    async def get_fingerprint(self, file_id: str) -> Optional[str]:
+        """反向索引：file_id 最近一次分析时的文件指纹"""
+        return await self.redis.get(self._make_index_key(file_id))
 
     async def delete_analysis_result(self, file_id: str):
         """
-        删除缓存
+        删除缓存 (该文件内容对应的所有参数组合的结果，以及反向索引)
+        同内容的其他 file_id 共用这些结果，下次请求时会重新计算
         """
-        key = self._make_key(file_id)
-        await self.redis.delete(key)
\ No newline at end of file
+        keys = [self._make_index_key(file_id)]
+        fingerprint = await self.get_fingerprint(file_id)
+        if fingerprint:
+            async for key in self.redis.scan_iter(match=f"{self.CACHE_PREFIX}:{fingerprint}:*"):
+                keys.append(key)
+        await self.redis.delete(*keys)
@@ -0,0 +1,50 @@
+import json
+from typing import Any, Dict, List, Optional, Sequence
+
+from src.infrastructure.cache.redis_client import get_redis
+
+class ColumnStatsRepository:
+    """
+    列级统计仓储 (增量质量分析)
+
+    职责：
+    按“检测参数签名 + 列内容指纹”存取单列统计 (缺失数 / dtype / 离群值命中)。
+    Key 与文件无关：清洗前后内容未变的列、甚至不同文件里相同的列都能复用。
+    """
+
+    CACHE_PREFIX = "quality:colstats"
+    DEFAULT_TTL = 86400
+
+    @property
+    def redis(self):
+        """动态获取 Redis 客户端实例"""
+        return get_redis()
+
+    def _make_key(self, signature: str, fingerprint: str) -> str:
+        return f"{self.CACHE_PREFIX}:{signature}:{fingerprint}"
+
+    async def get_many(self, signature: str, fingerprints: Sequence[str]) -> List[Optional[Dict[str, Any]]]:
+        """
+        批量读取 (一次 MGET)，返回与 fingerprints 对齐的列表，未命中或数据损坏为 None
+        """
+        if not fingerprints:
+            return []
+        raw = await self.redis.mget([self._make_key(signature, fp) for fp in fingerprints])
+        result: List[Optional[Dict[str, Any]]] = []
+        for item in raw:
+            try:
+                result.append(json.loads(item) if item else None)
+            except json.JSONDecodeError:
+                result.append(None)
+        return result
+
+    async def save_many(self, signature: str, partials: Dict[str, Dict[str, Any]], ttl: int = DEFAULT_TTL):
+        """
+        批量写入 {列指纹: 列统计} (一次 pipeline)
+        """
+        if not partials:
+            return
+        pipe = self.redis.pipeline(transaction=False)
+        for fingerprint, partial in partials.items():
+            pipe.set(self._make_key(signature, fingerprint), json.dumps(partial), ex=ttl)
+        await pipe.execute()
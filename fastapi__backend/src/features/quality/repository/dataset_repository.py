@@ -1,8 +1,12 @@
 # 文件路径: src/features/quality/repositories/dataset_repository.py
 
 import pandas as pd
-from typing import Optional
-from src.shared.utils.file_parser import parse_file
+from typing import Any, Dict, Iterator, List, Optional
+from src.shared.utils.excel_reader import list_sheets
+from src.shared.utils.file_parser import (
+    parse_file, parse_file_head, count_file_rows, read_file_columns, iter_csv_chunks,
+    iter_csv_records, parse_csv_records
+)
 from src.shared.utils.logger import logger  # 使用统一的 logger
 
 class DatasetRepository:
@@ -36,12 +40,73 @@ class DatasetRepository:
 
         # 核心逻辑：调用 Shared 层的通用解析器
         # Repository 层不需要捕获异常，异常应向上冒泡给 Service 或 Global Exception Handler
-        df = parse_file(file_path)
+        parse_profile: dict = {}
+        df = parse_file(file_path, load_profile=parse_profile)
 
-        # 记录加载成功的元数据
-        logger.info(f"✅ [DatasetRepo] Loaded successfully. ID: {log_id}, Shape: {df.shape}")
+        # 记录加载成功的元数据 (含实际使用的解析引擎)
+        logger.info(
+            f"✅ [DatasetRepo] Loaded successfully. ID: {log_id}, Shape: {df.shape}, "
+            f"Engine: {parse_profile.get('engine', 'unknown')}"
+        )
 
         return df
 
+    def load_preview(
+        self,
+        file_path: str,
+        file_id: Optional[str] = None,
+        nrows: Optional[int] = None,
+        load_profile: Optional[Dict[str, Any]] = None,
+    ) -> pd.DataFrame:
+        """
+        只加载头部 nrows 行 (用于探查 / 预览，不做全量解析)
+
+        Args:
+            load_profile: 可选，写入解析元信息；缓存命中时含精确总行数 num_rows
+        """
+        log_id = file_id if file_id else "unknown_id"
+        profile: Dict[str, Any] = load_profile if load_profile is not None else {}
+        df = parse_file_head(file_path, nrows=nrows, load_profile=profile)
+
+        logger.info(
+            f"✅ [DatasetRepo] Preview loaded. ID: {log_id}, Shape: {df.shape}, "
+            f"Engine: {profile.get('engine', 'unknown')}"
+        )
+        return df
+
+    def count_rows(self, file_path: str, load_profile: Optional[Dict[str, Any]] = None) -> int:
+        """
+        统计数据行数 (不含表头)，CSV 走字节扫描，Excel 走工作表元数据
+        """
+        return count_file_rows(file_path, load_profile=load_profile)
+
+    def list_sheets(self, file_path: str) -> List[Dict[str, Any]]:
+        """
+        列出 Excel 工作表元数据；CSV 等单表格式返回空列表
+        """
+        if not file_path.lower().endswith(('.xlsx', '.xlsm')):
+            return []
+        return list_sheets(file_path)
+
+    def read_columns(self, file_path: str) -> List[str]:
+        """只读表头，返回列名"""
+        return read_file_columns(file_path)
+
+    def iter_chunks(self, file_path: str, chunk_size: Optional[int] = None) -> Iterator[pd.DataFrame]:
+        """
+        按块迭代数据 (流式分析用)，所有列按文本读入，由调用方统一做类型判断
+        """
+        return iter_csv_chunks(file_path, chunksize=chunk_size, dtype=str)
+
+    def iter_records(self, file_path: str) -> Iterator[List[bytes]]:
+        """
+        按块迭代 CSV 数据记录的原始字节 (近似分析用，不解析字段)
+        """
+        return iter_csv_records(file_path)
+
+    def parse_records(self, file_path: str, records: List[bytes]) -> pd.DataFrame:
+        """按文件自身的方言与表头解析部分记录 (近似分析的样本)"""
+        return parse_csv_records(file_path, records)
+
 # 单例模式导出 (如果项目使用依赖注入框架，可去掉此行改为注入)
 dataset_repository = DatasetRepository()
\ No newline at end of file
@@ -1,19 +1,85 @@
+import asyncio
 import json
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Sequence
+from redis.exceptions import ResponseError
 # 1. 导入获取实例的辅助函数
 from src.infrastructure.cache.redis_client import get_redis
+from src.infrastructure.cache.pubsub_hub import PubSubHub
+
+# 状态变更通知频道前缀：每次写入后发布 {频道前缀}:{task_id}，消息为完整状态 (含递增序号 seq)
+EVENTS_PREFIX = "quality:task-events"
+
+# 序号递增 + 发布完整状态 (与写入在同一次原子执行中，订阅者看到的顺序与写入顺序一致)
+_PUBLISH_STATE = """
+local function publish_state(key, channel)
+    local seq = redis.call('hincrby', key, 'seq', 1)
+    local flat = redis.call('hgetall', key)
+    local state = {}
+    for i = 1, #flat, 2 do
+        state[flat[i]] = flat[i + 1]
+    end
+    redis.call('publish', channel, cjson.encode(state))
+    return seq
+end
+"""
+
+# 写入后发布 (供 MULTI 管道中的字段写入使用)
+# ARGV: channel
+PUBLISH_STATE_SCRIPT = _PUBLISH_STATE + """
+return publish_state(KEYS[1], ARGV[1])
+"""
+
+# 进度更新脚本：一次往返完成 "读当前进度 -> 比较 -> 写字段 -> 续期"
+# - 进度只增不减 (并发写入 / 迟到的旧进度不会让进度条倒退)
+# - 任务已结束 (completed / failed) 时忽略，结束状态不会被进度覆盖
+# - 旧版 JSON String 格式的 Key 直接删除后按 Hash 重建
+# ARGV: progress, status, message, phase, timings(JSON), ttl, channel  (phase / timings 为空串时不写)
+UPDATE_PROGRESS_SCRIPT = _PUBLISH_STATE + """
+if redis.call('type', KEYS[1]).ok == 'string' then
+    redis.call('del', KEYS[1])
+end
+local status = redis.call('hget', KEYS[1], 'status')
+if status == 'completed' or status == 'failed' then
+    return 0
+end
+local current = tonumber(redis.call('hget', KEYS[1], 'progress') or '0')
+if tonumber(ARGV[1]) < current then
+    return 0
+end
+redis.call('hset', KEYS[1], 'status', ARGV[2], 'progress', ARGV[1], 'message', ARGV[3])
+if ARGV[4] ~= '' then
+    redis.call('hset', KEYS[1], 'phase', ARGV[4])
+end
+if ARGV[5] ~= '' then
+    redis.call('hset', KEYS[1], 'timings', ARGV[5])
+end
+redis.call('expire', KEYS[1], ARGV[6])
+publish_state(KEYS[1], ARGV[7])
+return 1
+"""
+
+# Hash 中以 JSON 文本存放的字段
+_JSON_FIELDS = ("timings", "result_ref")
+
+# 任务状态字段 (新任务开始时清除；seq 保留，跨多次运行保持递增，客户端断点续传不会误判)
+_STATE_FIELDS = ("status", "progress", "message", "result_id", "phase", "timings", "result_ref")
+
+# 进程内共享的状态变更订阅 (SSE 等长连接共用一个 Redis 订阅连接)
+task_events = PubSubHub(f"{EVENTS_PREFIX}:*")
 
 class TaskRepository:
     """
     任务状态仓储层
-    
+
     职责：
     维护异步任务(Analysis)的实时进度和状态。
-    数据存储在 Redis 中 (JSON String)，允许无状态的 API 服务随时查询进度。
+    数据存储在 Redis Hash 中 (按字段读写，不再整体重写 JSON)，允许无状态的 API 服务随时查询进度。
+    兼容旧版 JSON String 格式：读取时回退为 GET + json.loads，下一次写入时转换为 Hash。
+    每次写入都会递增 seq 并发布完整状态，长连接 (SSE) 订阅后无需轮询。
     """
-    
+
     CACHE_PREFIX = "quality:task"
-    DEFAULT_TTL = 86400 
+    DEFAULT_TTL = 86400
 
     def __init__(self):
         # 不在 init 中初始化连接，避免启动时序问题
@@ -27,109 +93,232 @@ class TaskRepository:
     def _make_key(self, task_id: str) -> str:
         return f"{self.CACHE_PREFIX}:{task_id}"
 
+    def _make_channel(self, task_id: str) -> str:
+        return f"{EVENTS_PREFIX}:{task_id}"
+
+    @staticmethod
+    def _encode(fields: Dict[str, Any]) -> Dict[str, str]:
+        """Python 值 -> Hash 字段 (None 存为空串，dict 存为 JSON 文本)"""
+        encoded = {}
+        for name, value in fields.items():
+            if value is None:
+                encoded[name] = ""
+            elif isinstance(value, (dict, list)):
+                encoded[name] = json.dumps(value, ensure_ascii=False)
+            else:
+                encoded[name] = str(value)
+        return encoded
+
+    @staticmethod
+    def _decode(raw: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        """Hash 字段 -> 与旧版 JSON 相同结构的 Dict"""
+        if not raw:
+            return None
+        data: Dict[str, Any] = dict(raw)
+        try:
+            data["progress"] = float(data.get("progress") or 0.0)
+        except ValueError:
+            data["progress"] = 0.0
+        data["result_id"] = data.get("result_id") or None
+        if "seq" in data:
+            data["seq"] = int(data["seq"] or 0)
+        for name in _JSON_FIELDS:
+            if data.get(name):
+                try:
+                    data[name] = json.loads(data[name])
+                except json.JSONDecodeError:
+                    data.pop(name)
+            else:
+                data.pop(name, None)
+        return data
+
+    async def _write(
+        self,
+        task_id: str,
+        fields: Dict[str, Any],
+        remove: Sequence[str] = (),
+        reset: bool = False,
+    ):
+        """
+        一次往返写入多个字段 (MULTI 管道：[HDEL 状态字段] / HSET / [HDEL] / EXPIRE / 发布状态)
+
+        Args:
+            remove: 需要清除的字段 (上一次运行遗留的结果等)
+            reset: 先清除全部状态字段 (新任务开始，seq 保留)
+        """
+        key = self._make_key(task_id)
+
+        async def execute():
+            pipe = self.redis.pipeline(transaction=True)
+            if reset:
+                pipe.hdel(key, *_STATE_FIELDS)
+            pipe.hset(key, mapping=self._encode(fields))
+            if remove:
+                pipe.hdel(key, *remove)
+            pipe.expire(key, self.DEFAULT_TTL)
+            pipe.eval(PUBLISH_STATE_SCRIPT, 1, key, self._make_channel(task_id))
+            await pipe.execute()
+
+        try:
+            await execute()
+        except ResponseError:
+            # 旧版 JSON String 格式的 Key：删除后按 Hash 重写
+            # (按 Key 类型判断：redis-py 对管道内错误的改写会丢掉 WRONGTYPE 原文)
+            if await self.redis.type(key) != "string":
+                raise
+            await self.redis.delete(key)
+            await execute()
+
     async def init_task(self, task_id: str):
         """
         初始化任务状态 (Pending, 0%)
         """
-        key = self._make_key(task_id)
-        initial_data = {
-            "status": "pending",
-            "progress": 0.0,
-            "message": "Task initialized",
-            "result_id": None 
-        }
-        # 2. 序列化 Dict -> JSON String
-        # 3. 使用 ex 参数设置过期时间
-        await self.redis.set(
-            key, 
-            json.dumps(initial_data, ensure_ascii=False), 
-            ex=self.DEFAULT_TTL
+        await self._write(
+            task_id,
+            {
+                "status": "pending",
+                "progress": 0.0,
+                "message": "Task initialized",
+                "result_id": None
+            },
+            reset=True,
         )
 
-    async def update_progress(self, task_id: str, progress: float, status: str = "processing", message: str = ""):
+    async def update_progress(
+        self,
+        task_id: str,
+        progress: float,
+        status: str = "processing",
+        message: str = "",
+        phase: Optional[str] = None,
+        timings: Optional[Dict[str, float]] = None,
+    ) -> bool:
         """
-        更新任务进度 (Read-Modify-Write)
+        更新任务进度 (服务端脚本，一次往返；进度只增不减)
+
+        Args:
+            phase: 可选，当前计算阶段
+            timings: 可选，已完成阶段的耗时 (毫秒)
+
+        Returns:
+            是否写入 (进度倒退或任务已结束时为 False)
         """
         key = self._make_key(task_id)
-        
-        # 先读取现有状态
-        current_str = await self.redis.get(key)
-        
-        if current_str:
-            try:
-                current_data = json.loads(current_str)
-            except json.JSONDecodeError:
-                current_data = {}
-        else:
-            # 如果 Key 不存在（可能过期了），重建一个基础对象
-            current_data = {}
-
-        # 更新字段
-        current_data.update({
-            "status": status,
-            "progress": progress,
-            "message": message
-        })
-        
-        # 写回 Redis (序列化)
-        await self.redis.set(
-            key, 
-            json.dumps(current_data, ensure_ascii=False), 
-            ex=self.DEFAULT_TTL
+        written = await self.redis.eval(
+            UPDATE_PROGRESS_SCRIPT,
+            1,
+            key,
+            progress,
+            status,
+            message,
+            phase or "",
+            json.dumps(timings, ensure_ascii=False) if timings else "",
+            self.DEFAULT_TTL,
+            self._make_channel(task_id),
         )
+        return bool(written)
 
-    async def mark_completed(self, task_id: str, result_id: str):
+    async def mark_completed(
+        self,
+        task_id: str,
+        result_id: str,
+        timings: Optional[Dict[str, float]] = None,
+        result_ref: Optional[Dict[str, Any]] = None,
+    ):
         """
         标记任务完成 (100%)
+
+        Args:
+            timings: 可选，各计算阶段耗时 (毫秒)，随任务状态一起返回
+            result_ref: 可选，结果在缓存中的定位信息 (文件指纹 + 分析参数)，轮询时据此取回报告
         """
-        key = self._make_key(task_id)
-        data = {
+        data: Dict[str, Any] = {
             "status": "completed",
             "progress": 100.0,
             "message": "Analysis completed successfully",
             "result_id": result_id
         }
-        await self.redis.set(
-            key, 
-            json.dumps(data, ensure_ascii=False), 
-            ex=self.DEFAULT_TTL
-        )
+        remove = ["phase"]
+        if timings:
+            data["timings"] = timings
+        if result_ref:
+            data["result_ref"] = result_ref
+        else:
+            remove.append("result_ref")
+        await self._write(task_id, data, remove=remove)
 
     async def mark_failed(self, task_id: str, error_msg: str):
         """
-        标记任务失败
+        标记任务失败 (保留失败时所处的阶段 phase)
         """
-        key = self._make_key(task_id)
-        data = {
-            "status": "failed",
-            "progress": 0.0,
-            "message": error_msg,
-            "result_id": None
-        }
-        await self.redis.set(
-            key, 
-            json.dumps(data, ensure_ascii=False), 
-            ex=self.DEFAULT_TTL
+        await self._write(
+            task_id,
+            {
+                "status": "failed",
+                "progress": 0.0,
+                "message": error_msg,
+                "result_id": None
+            },
+            remove=["result_ref"],
         )
 
     async def get_task(self, task_id: str) -> Optional[Dict[str, Any]]:
         """
         获取当前任务状态
         """
-        key = self._make_key(task_id)
-        data_str = await self.redis.get(key)
-        
-        if not data_str:
-            return None
-            
+        return (await self.get_tasks([task_id]))[task_id]
+
+    async def get_tasks(self, task_ids: Sequence[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        批量获取任务状态 (一次管道往返)，不存在的任务为 None
+        """
+        if not task_ids:
+            return {}
+        pipe = self.redis.pipeline(transaction=False)
+        for task_id in task_ids:
+            pipe.hgetall(self._make_key(task_id))
+        raw = await pipe.execute(raise_on_error=False)
+
+        result: Dict[str, Optional[Dict[str, Any]]] = {}
+        legacy: List[str] = []
+        for task_id, item in zip(task_ids, raw):
+            if isinstance(item, ResponseError) and "WRONGTYPE" in str(item):
+                legacy.append(task_id)
+            elif isinstance(item, Exception):
+                raise item
+            else:
+                result[task_id] = self._decode(item)
+
+        # 旧版 JSON String 格式
+        if legacy:
+            values = await self.redis.mget([self._make_key(task_id) for task_id in legacy])
+            for task_id, data_str in zip(legacy, values):
+                try:
+                    result[task_id] = json.loads(data_str) if data_str else None
+                except json.JSONDecodeError:
+                    result[task_id] = None
+        return {task_id: result[task_id] for task_id in task_ids}
+
+    async def subscribe(self, task_id: str) -> "asyncio.Queue[Optional[str]]":
+        """
+        订阅任务状态变更 (订阅生效后返回)，队列中是原始消息，用 decode_event 解析；
+        收到 None 表示订阅连接断开，调用方应结束并重新订阅
+        """
+        return await task_events.subscribe(self._make_channel(task_id))
+
+    def unsubscribe(self, task_id: str, queue: "asyncio.Queue[Optional[str]]") -> None:
+        task_events.unsubscribe(self._make_channel(task_id), queue)
+
+    def decode_event(self, message: str) -> Optional[Dict[str, Any]]:
+        """状态变更消息 -> 与 get_task 相同结构的 Dict (含 seq)"""
         try:
-            return json.loads(data_str)
-        except json.JSONDecodeError:
+            return self._decode(json.loads(message))
+        except (json.JSONDecodeError, TypeError):
             return None
-    
+
     async def delete_task(self, task_id: str):
         """
         手动清理任务状态
         """
         key = self._make_key(task_id)
-        await self.redis.delete(key)
\ No newline at end of file
+        await self.redis.delete(key)
@@ -42,11 +42,31 @@ class FileInspectionResponse(BaseSchema):
     # 基础元数据
     rows: int = Field(..., description="总行数")
     cols: int = Field(..., description="总列数")
-    size_mb: float = Field(..., description="内存占用 (MB)")
+    size_mb: float = Field(..., description="内存占用 (MB)，基于头部样本外推的估算值")
+    size_mb_error: float = Field(default=0.0, description="内存估算的误差范围 (±MB, 约 95% 置信)，精确值时为 0")
+    sampled_rows: int = Field(default=0, description="实际读取的样本行数 (dtype / 预览 / 内存估算的依据)")
     encoding: str = Field(default="utf-8", description="检测到的文件编码")
     
     # 核心结构 (前端用于生成配置表单)
     columns: List[ColumnInfo] = Field(..., description="列结构详情列表")
     
     # 数据预览 (通常取前 5-10 行)
-    preview: List[Dict[str, Any]] = Field(default=[], description="预览数据 (JSON 数组格式)")
\ No newline at end of file
+    preview: List[Dict[str, Any]] = Field(default=[], description="预览数据 (JSON 数组格式)")
+
+class SheetInfo(BaseSchema):
+    """
+    工作表元数据 (不解析单元格)
+    """
+    name: str = Field(..., description="工作表名称")
+    index: int = Field(..., description="工作表序号 (从 0 开始)")
+    rows: Optional[int] = Field(None, description="物理行数 (含表头)，来自 dimension 元数据，缺失时为 null")
+    cols: Optional[int] = Field(None, description="列数，来自 dimension 元数据，缺失时为 null")
+    state: str = Field("visible", description="可见性: 'visible' | 'hidden' | 'veryHidden'")
+
+class SheetListResponse(BaseSchema):
+    """
+    工作表列表
+    CSV 等单表格式返回空列表
+    """
+    file_id: str = Field(..., description="文件 ID")
+    sheets: List[SheetInfo] = Field(default=[], description="工作表列表 (按工作簿顺序)")
@@ -1,4 +1,4 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Literal, Optional
 from pydantic import Field
 from src.shared.schemas.base import BaseSchema
 
@@ -17,7 +17,29 @@ class QualityCheckRequest(BaseSchema):
     file_path: str = Field(..., description="文件的绝对路径 (由 Node.js/前端 传递)")
     
     force_refresh: bool = Field(False, description="是否强制重新计算 (忽略缓存)")
+
+    # 异常检测方法，可多选 (共享同一遍数值统计)；每种组合的结果单独缓存
+    methods: List[Literal["iqr", "zscore", "mad", "percentile"]] = Field(
+        default_factory=lambda: ["iqr"],
+        description="异常检测方法: iqr (IQR x 3.0) / zscore (|Z| > 3.0) / mad (修正 Z 分数 > 3.5) / percentile (P0.5 - P99.5 之外)"
+    )
     
+    # 近似模式：分层抽样 + 哈希草图，百万行文件也能在秒级给出评分 (附置信区间)
+    mode: Literal["exact", "approximate"] = Field(
+        "exact",
+        description="exact: 全量计算; approximate: 抽样估计 (仅 CSV，不受分析大小上限约束)"
+    )
+    followup_exact: bool = Field(
+        False,
+        description="近似模式下是否在后台继续执行一次精确分析 (完成后可通过 /tasks/{file_id} 查询)"
+    )
+
+    # 异步提交：立即返回 202 + 任务 ID，分析在后台任务队列中执行，结果通过 /tasks/{file_id} 轮询取回
+    background: bool = Field(
+        False,
+        description="是否异步执行 (true 时立即返回任务 ID，不等待分析完成)"
+    )
+
     # columns: Optional[List[str]] = None
 
 # ==========================================
@@ -29,7 +51,7 @@ class AnomalyDetail(BaseSchema):
     row: int = Field(..., description="行号 (从 1 开始，方便前端展示)")
     column: str = Field(..., description="所在列名")
     value: Any = Field(..., description="具体的异常数值")
-    type: str = Field(..., description="异常类型: 'missing' | 'outlier_iqr' | 'outlier_zscore' | 'format_error'")
+    type: str = Field(..., description="异常类型: 'missing' | 'outlier_iqr' | 'outlier_zscore' | 'outlier_mad' | 'outlier_percentile' | 'format_error'")
     reason: str = Field(..., description="异常原因的文字描述")
 
 class AnomalyStatistics(BaseSchema):
@@ -38,6 +60,12 @@ class AnomalyStatistics(BaseSchema):
     by_type: Dict[str, int] = Field(..., description="按类型统计 (e.g., {'missing': 10, 'outlier': 5})")
     by_column: Dict[str, int] = Field(..., description="按列统计 (e.g., {'age': 3, 'salary': 2})")
     details: List[AnomalyDetail] = Field(default=[], description="异常值详细列表 (可用于前端高亮显示)")
+    methods: Optional[List[str]] = Field(None, description="本次使用的检测方法")
+
+class DuplicateGroup(BaseSchema):
+    """一组内容完全相同的行"""
+    size: int = Field(..., description="组内行数 (含第一次出现)")
+    rows: List[int] = Field(..., description="组内行号 (从 1 开始，最多列出 20 个)")
 
 class DuplicateStatistics(BaseSchema):
     """重复行统计"""
@@ -45,6 +73,7 @@ class DuplicateStatistics(BaseSchema):
     unique_duplicate_groups: int = Field(..., description="存在重复的组数 (例如有3行是一样的，算1组)")
     duplicate_rate: float = Field(..., description="重复率 (0.0 - 1.0)")
     rows: List[int] = Field(..., description="所有重复行的行号列表")
+    largest_groups: Optional[List[DuplicateGroup]] = Field(None, description="行数最多的重复组 (最多 10 组)")
 
 class MissingStatistics(BaseSchema):
     """缺失值统计"""
@@ -53,6 +82,25 @@ class MissingStatistics(BaseSchema):
     by_column: Dict[str, float] = Field(..., description="各列的缺失率 (key=列名, value=比率)")
     columns_with_missing: List[str] = Field(..., description="包含缺失值的列名列表")
 
+class ConfidenceInterval(BaseSchema):
+    """估计值及其置信区间"""
+    estimate: float = Field(..., description="点估计")
+    lower: float = Field(..., description="区间下界")
+    upper: float = Field(..., description="区间上界")
+
+class ApproximationInfo(BaseSchema):
+    """近似模式的抽样说明与误差范围"""
+    sample_rows: int = Field(..., description="实际解析的样本行数")
+    sample_fraction: float = Field(..., description="样本行数 / 总行数")
+    sampling: str = Field("stratified", description="抽样方式 (按文件位置分层，各段同比例抽取)")
+    confidence_level: float = Field(0.95, description="置信水平")
+    duplicate_sketch_fraction: float = Field(..., description="重复草图保留的哈希值域比例 (1.0 表示精确)")
+    missing_rate: ConfidenceInterval = Field(..., description="总体缺失率")
+    duplicate_rate: ConfidenceInterval = Field(..., description="重复率")
+    anomaly_rate: ConfidenceInterval = Field(..., description="异常值占单元格的比例")
+    quality_score: ConfidenceInterval = Field(..., description="质量评分")
+    followup_exact: bool = Field(False, description="是否已在后台安排精确分析")
+
 # ==========================================
 # 3. 响应 Schema (Response)
 # ==========================================
@@ -76,4 +124,8 @@ class QualityCheckResponse(BaseSchema):
     anomalies: AnomalyStatistics = Field(..., description="异常/离群值维度分析")
     
     # 数据类型概览
-    types: Dict[str, str] = Field(..., description="列实际类型分布 (key=列名, value=类型)")
\ No newline at end of file
+    types: Dict[str, str] = Field(..., description="列实际类型分布 (key=列名, value=类型)")
+
+    # 计算模式：approximate 时各项计数为按样本放大的估计值，明细只覆盖样本行
+    mode: Literal["exact", "approximate"] = Field("exact", description="计算模式")
+    approximation: Optional[ApproximationInfo] = Field(None, description="近似模式的抽样与误差说明")
\ No newline at end of file
@@ -1,11 +1,16 @@
+import sys
+import numpy as np
 import pandas as pd
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 
 from src.shared.utils.logger import logger
+from src.shared.utils.dataframe_utils import logical_dtype_names
 from src.features.quality.schemas.inspection import (
     FileInspectionRequest, 
     FileInspectionResponse, 
-    ColumnInfo
+    ColumnInfo,
+    SheetInfo,
+    SheetListResponse
 )
 from src.features.quality.repository.dataset_repository import dataset_repository
 from src.features.quality.utils.validation import validate_file_for_analysis
@@ -21,50 +26,113 @@ class InspectionService:
     def inspect_file(self, req: FileInspectionRequest) -> FileInspectionResponse:
         """
         执行文件探查
+
+        代价与文件大小无关：只解析头部样本，总行数走字节扫描 / Excel 元数据，
+        内存占用由样本外推并给出误差范围。
         """
         logger.info(f"🔍 [Inspection] Start: {req.file_path} (ID: {req.file_id})")
 
-        # 1. 安全预检 (防止加载超大文件导致 OOM)
-        validate_file_for_analysis(req.file_path)
+        # 1. 安全预检 (只读头部，不受分析大小上限约束)
+        validate_file_for_analysis(req.file_path, enforce_size_limit=False)
 
-        # 2. 加载 DataFrame (利用 Repository 屏蔽读取细节)
-        df = dataset_repository.load_dataframe(
-            file_path=req.file_path, 
-            file_id=req.file_id
+        # 2. 有界加载头部样本 (利用 Repository 屏蔽读取细节)
+        profile: Dict[str, Any] = {}
+        df = dataset_repository.load_preview(
+            file_path=req.file_path,
+            file_id=req.file_id,
+            load_profile=profile
         )
 
-        # 3. 构建列结构信息
+        # 3. 总行数：缓存 / sidecar 命中时已精确已知，否则只扫描不解析
+        total_rows = profile.get("num_rows")
+        if total_rows is None:
+            total_rows = dataset_repository.count_rows(req.file_path, load_profile=profile)
+        total_rows = max(int(total_rows), len(df))
+
+        # 4. 构建列结构信息
         # 前端根据 is_numeric 决定是显示 '直方图' 还是 '条形图'
         columns_info: List[ColumnInfo] = []
-        for col_name in df.columns:
-            dtype_obj = df[col_name].dtype
+        for col_name, dtype_obj, dtype_name in zip(df.columns, df.dtypes, logical_dtype_names(df)):
             columns_info.append(
                 ColumnInfo(
                     name=str(col_name),
-                    dtype=str(dtype_obj),
+                    dtype=dtype_name,
                     is_numeric=pd.api.types.is_numeric_dtype(dtype_obj)
                 )
             )
 
-        # 4. 生成预览数据 (Top 5)
+        # 5. 生成预览数据 (Top 5)
         # 转换为 dict records 格式: [{"col1": 1, "col2": "a"}, ...]
         preview_data = df.head(5).to_dict(orient="records")
 
-        # 5. 计算预估内存占用 (MB)
-        memory_usage = df.memory_usage(deep=True).sum() / 1024 / 1024
+        # 6. 内存占用：已在内存缓存中则取精确值，否则样本外推 (样本即全量时误差为 0)
+        if profile.get("memory_bytes") is not None:
+            size_mb, size_mb_error = profile["memory_bytes"] / 1024 / 1024, 0.0
+        else:
+            size_mb, size_mb_error = _estimate_memory_mb(df, total_rows)
 
-        logger.info(f"✅ [Inspection] Done. Cols: {len(columns_info)}, Rows: {len(df)}")
+        logger.info(
+            f"✅ [Inspection] Done. Cols: {len(columns_info)}, Rows: {total_rows} "
+            f"({profile.get('row_count_source', 'exact')}), Sampled: {len(df)}, "
+            f"Size: {size_mb:.2f}±{size_mb_error:.2f} MB"
+        )
 
-        # 6. 返回符合 Schema 的响应
+        # 7. 返回符合 Schema 的响应
         return FileInspectionResponse(
             file_id=req.file_id,
-            rows=int(df.shape[0]),
+            rows=total_rows,
             cols=int(df.shape[1]),
-            size_mb=round(memory_usage, 2),
+            size_mb=round(size_mb, 2),
+            size_mb_error=round(size_mb_error, 2),
+            sampled_rows=len(df),
             columns=columns_info,
             preview=preview_data, # type: ignore
-            encoding="utf-8"  # parse_file 内部通常处理了编码，这里默认 utf-8
+            encoding=profile.get("encoding") or "utf-8"  # Excel 等二进制格式没有文本编码
+        )
+
+    def list_sheets(self, req: FileInspectionRequest) -> SheetListResponse:
+        """
+        列出 Excel 工作表 (只读工作簿结构与 dimension 元数据，不解析单元格)
+        """
+        validate_file_for_analysis(req.file_path, enforce_size_limit=False)
+        sheets = dataset_repository.list_sheets(req.file_path)
+        logger.info(f"📑 [Inspection] Sheets for {req.file_id}: {[s['name'] for s in sheets]}")
+        return SheetListResponse(
+            file_id=req.file_id,
+            sheets=[SheetInfo(**s) for s in sheets]
         )
 
+def _estimate_memory_mb(sample: pd.DataFrame, total_rows: int) -> Tuple[float, float]:
+    """
+    由样本外推全量 DataFrame 的 memory_usage(deep=True)，返回 (估算 MB, ±误差 MB)
+
+    逐行计算样本字节数 (定长 dtype 为 itemsize，object 列为指针 + 对象大小，
+    与 pandas deep 统计口径一致)，总量 = 行数 × 均值；误差取 1.96 倍标准误并做有限总体修正。
+    注意样本取自文件头部而非随机抽样，误差范围只反映行间波动。
+    """
+    n = len(sample)
+    index_bytes = int(sample.index.memory_usage())
+    if n == 0:
+        return index_bytes / 1024 / 1024, 0.0
+
+    per_row = np.zeros(n, dtype=np.float64)
+    for col in sample.columns:
+        series = sample[col]
+        if series.dtype == object:
+            per_row += 8 + series.map(sys.getsizeof).to_numpy(dtype=np.float64)
+        else:
+            per_row += series.memory_usage(index=False, deep=True) / n
+
+    if n >= total_rows:
+        total = per_row.sum() + index_bytes
+        return total / 1024 / 1024, 0.0
+
+    mean = per_row.mean()
+    std = per_row.std(ddof=1) if n > 1 else 0.0
+    fpc = np.sqrt(max(1.0 - n / total_rows, 0.0))
+    total = total_rows * mean + index_bytes
+    error = 1.96 * total_rows * std / np.sqrt(n) * fpc
+    return total / 1024 / 1024, float(error) / 1024 / 1024
+
 # 单例导出
 inspection_service = InspectionService()
\ No newline at end of file
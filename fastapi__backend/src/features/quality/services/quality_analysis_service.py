@@ -1,27 +1,50 @@
 import asyncio
+import os
+import time
+from concurrent.futures.process import BrokenProcessPool
 import pandas as pd
-from typing import Optional, Dict, Any
+from typing import AsyncIterator, Awaitable, Optional, Dict, Any, List, Sequence, Set
+
+from src.app.config.settings import settings
 
 from src.shared.utils.logger import logger
 from src.shared.exceptions.base import BaseAppException
+from src.shared.exceptions.compute_filed import JobQueueFullException, TaskConflictException
+from src.shared.exceptions.file_not_found import FileNotFoundException
+from src.shared.utils.hash_util import generate_cache_key, result_fingerprint
 from src.shared.utils.json_helper import sanitize_json_values
+from src.shared.utils.progress import ProgressReporter, ProgressSnapshot
+from src.shared.utils.single_flight import SingleFlight
+from src.infrastructure.cache.distributed_lock import distributed_flight
+from src.infrastructure.compute.process_pool import process_pool_manager
+from src.infrastructure.jobs.scheduler import job_scheduler
 # Schemas
 from src.features.quality.schemas.quality_analysis import (
     QualityCheckResponse,
     MissingStatistics,
     DuplicateStatistics,
-    AnomalyStatistics
+    AnomalyStatistics,
+    ApproximationInfo,
+    ConfidenceInterval,
 )
 
 # Repositories (数据层)
 from src.features.quality.repository.dataset_repository import dataset_repository
 from src.features.quality.repository.cache_repository import CacheRepository
 from src.features.quality.repository.task_repository import TaskRepository
+from src.features.quality.repository.column_stats_repository import ColumnStatsRepository
 
 # Utils (计算层)
-from src.features.quality.utils import metrics, scoring
+from src.features.quality.utils import approximate, incremental, metrics, scoring
+from src.features.quality.utils.streaming import StreamingQualityAccumulator
 from src.features.quality.utils.validation import validate_file_for_analysis
 
+# 缓存结果的结构版本：响应结构或统计口径变化时递增，旧缓存自动失效
+RESULT_VERSION = 1
+
+# 任务的结束状态 (进度推送在此之后结束)
+TERMINAL_STATUSES = ("completed", "failed")
+
 class AnalysisService:
     """
     数据质量深度分析服务 (Analysis)
@@ -33,31 +56,132 @@ class AnalysisService:
     def __init__(self):
         self.cache_repo = CacheRepository()
         self.task_repo = TaskRepository()
+        self.column_stats_repo = ColumnStatsRepository()
+        # 后台精确分析任务 (持有引用，避免任务在完成前被回收)
+        self._followups: Set[asyncio.Task] = set()
+        # 并发的相同分析只计算一次 (两个标签页 / 网关重试同时触发 force_refresh 时)
+        self._flight = SingleFlight("quality")
 
-    async def perform_analysis(self, file_id: str, file_path: str, force_refresh: bool = True) -> Dict[str, Any]:
+    async def perform_analysis(
+        self,
+        file_id: str,
+        file_path: str,
+        force_refresh: bool = True,
+        methods: Optional[List[str]] = None,
+        mode: str = "exact",
+        followup_exact: bool = False,
+    ) -> Dict[str, Any]:
         """
         执行全量数据质量分析
+
+        Args:
+            methods: 异常检测方法 (默认只做 IQR)，不同组合的结果分别缓存
+            mode: "exact" 全量计算 / "approximate" 抽样估计 (仅 CSV，其余格式按 exact 执行)
+            followup_exact: 近似模式下在后台再执行一次精确分析
         """
-        logger.info(f"🚀 [Analysis] Request received for {file_id}")
+        methods = list(metrics.normalize_methods(methods))
+        is_approximate = mode == "approximate" and self._supports_approximate(file_path)
+        if mode == "approximate" and not is_approximate:
+            logger.warning(f"⚠️ [Analysis] Approximate mode supports CSV only, running exact analysis for {file_id}")
+        followup = is_approximate and followup_exact
+        cache_params = self._cache_params(methods, is_approximate)
+        logger.info(f"🚀 [Analysis] Request received for {file_id} (methods={methods}, mode={mode})")
+
+        # 缓存按文件内容寻址 (默认全量 MD5，大小 / 修改时间未变时不重新读盘)
+        # 文件不存在时不走缓存，由后面的预检统一报错并记录任务失败
+        full_hash = getattr(settings, "QUALITY_CACHE_FULL_HASH", True)
+        try:
+            fingerprint: Optional[str] = await asyncio.to_thread(result_fingerprint, file_path, full_hash)
+        except FileNotFoundException:
+            fingerprint = None
+
+        def run() -> Awaitable[Dict[str, Any]]:
+            return self._analyze(
+                file_id, file_path, force_refresh, methods, fingerprint, cache_params, is_approximate, followup
+            )
+
+        if not fingerprint:
+            return await run()
+
+        # 跨副本：按内容缓存键加租约锁，只有一个副本计算，其余副本等完成通知后从结果缓存读取
+        cache_key = generate_cache_key(CacheRepository.CACHE_PREFIX, fingerprint, cache_params)
+
+        async def load_shared() -> Optional[Dict[str, Any]]:
+            result = await self.cache_repo.get_analysis_result(file_id, fingerprint, cache_params)
+            if result:
+                await self.task_repo.mark_completed(
+                    file_id, result_id=file_id, result_ref=self._result_ref(fingerprint, cache_params)
+                )
+            return result
 
+        # 进程内：同一文件、同一内容、同一参数的并发调用合并为一次计算，共享结果或异常
+        # 任务状态按 file_id 记录，file_id 也在键里：内容相同的其他文件各自等待同一把锁
+        return await self._flight.do(
+            f"{cache_key}:{file_id}",
+            lambda: distributed_flight.do(cache_key, run, load=load_shared),
+        )
+
+    async def _analyze(
+        self,
+        file_id: str,
+        file_path: str,
+        force_refresh: bool,
+        methods: List[str],
+        fingerprint: Optional[str],
+        cache_params: Dict[str, Any],
+        is_approximate: bool,
+        followup: bool,
+    ) -> Dict[str, Any]:
+        """缓存检查 -> 计算 -> 写缓存 / 任务状态 (由 perform_analysis 经 single-flight 调用)"""
         # 1. 检查缓存
-        if not force_refresh:
-            cached_result = await self.cache_repo.get_analysis_result(file_id)
+        if not force_refresh and fingerprint:
+            cached_result = await self.cache_repo.get_analysis_result(file_id, fingerprint, cache_params)
             if cached_result:
-                logger.info(f"🎯 [Analysis] Cache hit for {file_id}")
-                await self.task_repo.mark_completed(file_id, result_id=file_id)
+                logger.info(f"🎯 [Analysis] Cache hit for {file_id} (fingerprint={fingerprint})")
+                await self.task_repo.mark_completed(
+                    file_id, result_id=file_id, result_ref=self._result_ref(fingerprint, cache_params)
+                )
+                if followup and not await self.cache_repo.get_analysis_result(
+                    file_id, fingerprint, self._cache_params(methods)
+                ):
+                    self._schedule_followup(file_id, file_path, methods)
                 return cached_result
 
         # 2. 初始化任务
         await self.task_repo.init_task(file_id)
 
+        # 计算线程只往 reporter 投递进度事件，由 pump 在事件循环里限频写入任务状态
+        progress = ProgressReporter()
+        pump = asyncio.create_task(progress.pump(
+            lambda snapshot: self._write_progress(file_id, snapshot),
+            interval=getattr(settings, "QUALITY_PROGRESS_INTERVAL_MS", 500) / 1000,
+            min_delta=getattr(settings, "QUALITY_PROGRESS_MIN_DELTA", 1.0),
+        ))
+
         try:
-            # 3. 异步计算
-            result = await asyncio.to_thread(
-                self._run_cpu_bound_analysis, 
-                file_id, 
-                file_path
-            )
+            # 3. 异步计算 (各阶段耗时由计算线程写入 timings)
+            timings: Dict[str, float] = {}
+            try:
+                if is_approximate:
+                    result = await asyncio.to_thread(
+                        self._run_approximate_analysis, file_id, file_path, timings, methods, progress
+                    )
+                    result.approximation.followup_exact = followup
+                elif self._should_run_incremental(file_path):
+                    # 增量模式：按列指纹复用已缓存的列统计，只重算内容变化的列
+                    result = await self._run_incremental_analysis(file_id, file_path, timings, methods, progress)
+                else:
+                    result = await asyncio.to_thread(
+                        self._run_cpu_bound_analysis, 
+                        file_id, 
+                        file_path,
+                        timings,
+                        methods,
+                        progress
+                    )
+            finally:
+                # 先停掉 pump，迟到的进度不会覆盖下面写入的完成 / 失败状态
+                await progress.aclose(pump)
 
             # 4. 序列化与清洗 (关键步骤!)
             # 先转成 Dict
@@ -67,10 +191,18 @@ class AnalysisService:
             clean_dict = sanitize_json_values(raw_dict)
 
             # 5. 存入缓存 (存清洗后的数据)
-            await self.cache_repo.save_analysis_result(file_id, clean_dict)
+            if fingerprint:
+                await self.cache_repo.save_analysis_result(file_id, fingerprint, cache_params, clean_dict)
             
-            # 6. 标记完成
-            await self.task_repo.mark_completed(file_id, result_id=file_id)
+            # 6. 标记完成 (耗时明细随任务状态一起保存，/tasks/{file_id} 可查)
+            await self.task_repo.mark_completed(
+                file_id, result_id=file_id, timings=timings,
+                result_ref=self._result_ref(fingerprint, cache_params),
+            )
+
+            # 近似结果已返回，精确分析在后台继续 (同一任务 ID，完成后覆盖任务状态)
+            if followup:
+                self._schedule_followup(file_id, file_path, methods)
             
             # 7. 返回给 Controller
             return clean_dict
@@ -80,36 +212,512 @@ class AnalysisService:
             await self.task_repo.mark_failed(file_id, error_msg=str(e))
             raise e
 
-    def _run_cpu_bound_analysis(self, file_id: str, file_path: str) -> QualityCheckResponse:
+    async def submit_analysis(
+        self,
+        file_id: str,
+        file_path: str,
+        force_refresh: bool = True,
+        methods: Optional[List[str]] = None,
+        mode: str = "exact",
+        followup_exact: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        异步提交分析任务：立即返回，计算由后台任务队列执行
+        结果写入缓存，任务完成后通过 get_task_result 取回
+
+        同一 file_id 的任务在排队或执行中时不重复提交 (沿用进行中的任务)；
+        进行中的任务参数不同时拒绝提交，避免调用方拿到另一份参数的报告
+
+        Raises:
+            JobQueueFullException: 后台任务队列已满
+            TaskConflictException: 同一 file_id 已有参数不同的任务在进行中
+        """
+        job_params = {
+            **self._cache_params(
+                metrics.normalize_methods(methods),
+                mode == "approximate" and self._supports_approximate(file_path),
+            ),
+            "followup_exact": followup_exact,
+        }
+        # 检查与入队之间不能有 await：否则并发提交会同时通过检查
+        active = job_scheduler.active_job(file_id)
+        if active is not None:
+            if active.tag != job_params:
+                raise TaskConflictException(file_id, active.tag, job_params)
+            logger.info(f"🔁 [Analysis] Task for {file_id} already queued/running")
+            return {"task_id": file_id, "status": "processing", "deduplicated": True}
+
+        # 任务状态写入完成前 worker 不开始计算：客户端拿到任务 ID 后立刻轮询也能查到，
+        # 计算中写入的进度也不会被初始状态覆盖
+        initialized = asyncio.get_running_loop().create_future()
+
+        async def run() -> None:
+            if await initialized:
+                await self.perform_analysis(
+                    file_id,
+                    file_path,
+                    force_refresh=force_refresh,
+                    methods=methods,
+                    mode=mode,
+                    followup_exact=followup_exact,
+                )
+
+        try:
+            job_scheduler.submit(file_id, run, tag=job_params)
+        except JobQueueFullException as e:
+            # 没有入队：任务状态不能停留在 pending 或上一次的结果，否则轮询方会一直等下去
+            await self.task_repo.init_task(file_id)
+            await self.task_repo.mark_failed(file_id, e.message)
+            raise
+
+        try:
+            await self.task_repo.init_task(file_id)
+        except BaseException:
+            # 状态写入失败 (或请求被取消)：已入队的任务直接结束，不做计算
+            initialized.set_result(False)
+            raise
+        initialized.set_result(True)
+        return {"task_id": file_id, "status": "pending", "deduplicated": False}
+
+    async def get_task_result(self, file_id: str, include_result: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        任务状态；任务已完成时附带分析报告 (从缓存读取)
+        报告已过期 (缓存 TTL 短于任务状态) 时 result 为 None，需要重新提交
+        """
+        task = await self.task_repo.get_task(file_id)
+        if not task or not include_result or task.get("status") != "completed":
+            return task
+
+        ref = task.get("result_ref")
+        result = None
+        if ref:
+            result = await self.cache_repo.get_analysis_result(file_id, ref["fingerprint"], ref["params"])
+        task["result"] = result
+        return task
+
+    @staticmethod
+    def _result_ref(fingerprint: Optional[str], cache_params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """结果在缓存中的定位信息；没有指纹 (未写缓存) 时为 None"""
+        if not fingerprint:
+            return None
+        return {"fingerprint": fingerprint, "params": cache_params}
+
+    async def _write_progress(self, file_id: str, snapshot: ProgressSnapshot) -> None:
+        await self.task_repo.update_progress(
+            file_id,
+            round(snapshot.progress, 1),
+            message=snapshot.message,
+            phase=snapshot.phase,
+            timings=snapshot.timings,
+        )
+
+    @staticmethod
+    def _cache_params(methods: Sequence[str], approximate: bool = False) -> Dict[str, Any]:
+        """
+        影响分析结果的全部参数 (哈希后进入缓存键)
+        近似结果单独缓存，不会顶替精确结果；结果结构变化时递增 RESULT_VERSION
+        """
+        return {
+            "version": RESULT_VERSION,
+            "methods": list(methods),
+            "mode": "approximate" if approximate else "exact",
+        }
+
+    def _schedule_followup(self, file_id: str, file_path: str, methods: Sequence[str]) -> None:
+        """在后台安排一次精确分析 (结果写入精确模式的缓存键)"""
+        logger.info(f"📅 [Analysis] Follow-up exact analysis scheduled for {file_id}")
+        task = asyncio.create_task(
+            self.perform_analysis(file_id, file_path, force_refresh=True, methods=list(methods))
+        )
+        self._followups.add(task)
+        task.add_done_callback(self._on_followup_done)
+
+    def _on_followup_done(self, task: asyncio.Task) -> None:
+        self._followups.discard(task)
+        # 失败已由 perform_analysis 记录日志并写入任务状态，这里只取走异常，避免 "never retrieved" 警告
+        if not task.cancelled():
+            task.exception()
+
+    def _run_cpu_bound_analysis(
+        self,
+        file_id: str,
+        file_path: str,
+        timings: Optional[Dict[str, float]] = None,
+        methods: Optional[Sequence[str]] = None,
+        progress: Optional[ProgressReporter] = None,
+    ) -> QualityCheckResponse:
         """
         [Sync] CPU 密集型计算逻辑
         这个方法会在独立的线程中运行，可以安全地使用阻塞的 Pandas 操作
+        大 CSV 走流式分块模式 (峰值内存与文件大小无关)
+
+        Args:
+            timings: 可选，写入各阶段耗时 (毫秒)
+            methods: 异常检测方法 (默认只做 IQR)
+            progress: 可选，进度上报通道 (线程里不直接访问 Redis，只投递事件)
         """
+        if timings is None:
+            timings = {}
+        progress = progress or ProgressReporter()
+        methods = metrics.normalize_methods(methods)
+        if self._should_stream(file_path):
+            return self._run_streaming_analysis(file_id, file_path, timings, methods, progress)
 
         # --- 阶段 1: 加载 (10%) ---
+        progress.report(1, phase="load", message="Loading dataset")
+        started = time.perf_counter()
         validate_file_for_analysis(file_path)
         df = dataset_repository.load_dataframe(file_path, file_id)
-        
-        # 既然在线程里，我们可以使用 run_coroutine_threadsafe 更新 Redis，
-        # 但为了简单，这里通常不建议在同步线程里反向调用异步 Redis。
-        # 实际生产中，可以使用 Celery。这里我们简化处理，假设中间步骤不更新 Redis，
-        # 或者只在这一层做计算，状态更新由外层控制（稍微牺牲一点中间进度条的实时性）。
+        timings["load"] = round((time.perf_counter() - started) * 1000, 2)
+        progress.report(10, phase="load", message="Dataset loaded", timings=timings)
 
         row_count = len(df)
         col_count = len(df.columns)
   
-        # --- 阶段 2: 基础指标计算 (缺失 & 重复) ---
-        # 调用 metrics 模块
-        missing_data = metrics.calculate_missing_stats(df)
-        duplicate_data = metrics.calculate_duplicate_stats(df)
-    
-        # --- 阶段 3: 深度指标计算 (异常值) ---
-        # 这一步最耗时
-        anomaly_data = metrics.calculate_anomaly_stats(df, method='iqr')
-   
-        # --- 阶段 4: 评分 & 组装 ---
-        types_map = metrics.infer_column_types(df)
+        # --- 阶段 2 & 3: 缺失 / 重复 / 异常 / 类型 (15% -> 85%) ---
+        # 融合计算：空值掩码与行哈希各只算一次，三项指标从中派生
+        # 宽表且启用了进程池时，数值列按列分块并行 (QUALITY_PARALLEL_WORKERS)
+        progress.report(15, phase="kernel", message="Computing quality metrics")
+        kernel = self._run_kernel(df, timings, methods)
+        progress.report(85, phase="kernel", message="Quality metrics computed", timings=timings)
+        logger.info(f"⏱️ [Analysis] {file_id} timings(ms): {timings}")
    
+        # --- 阶段 4: 评分 & 组装 (95%) ---
+        progress.report(95, phase="build", message="Building report")
+        return self._build_response(
+            file_id,
+            row_count,
+            col_count,
+            kernel["missing"],
+            kernel["duplicates"],
+            kernel["anomalies"],
+            kernel["types"],
+            methods,
+        )
+
+    def _run_kernel(self, df: pd.DataFrame, timings: Dict[str, float], methods: Sequence[str]) -> Dict[str, Any]:
+        executor = process_pool_manager.get_executor()
+        try:
+            return metrics.run_quality_kernel(
+                df, timings=timings, methods=methods,
+                executor=executor, workers=process_pool_manager.workers,
+            )
+        except BrokenProcessPool:
+            # worker 异常退出 (如被 OOM Kill)：丢弃进程池，本次退回单进程计算
+            logger.warning("⚠️ [Analysis] Process pool broken, falling back to single process")
+            process_pool_manager.discard()
+            return metrics.run_quality_kernel(df, timings=timings, methods=methods)
+
+    @staticmethod
+    def _supports_approximate(file_path: str) -> bool:
+        """近似模式依赖原始记录扫描，目前只支持 CSV"""
+        return file_path.lower().endswith(".csv") and os.path.exists(file_path)
+
+    def _run_approximate_analysis(
+        self,
+        file_id: str,
+        file_path: str,
+        timings: Dict[str, float],
+        methods: Sequence[str],
+        progress: Optional[ProgressReporter] = None,
+    ) -> QualityCheckResponse:
+        """
+        [Sync] 近似分析：一遍原始记录扫描 (重复草图 + 分层抽样)，只解析样本
+        不受分析大小上限约束，耗时主要取决于文件字节数，与列数基本无关
+        """
+        progress = progress or ProgressReporter()
+        validate_file_for_analysis(file_path, enforce_size_limit=False)
+        target_rows = getattr(settings, "QUALITY_APPROX_SAMPLE_ROWS", 50000)
+
+        # --- 扫描 (5% -> 80%，按已扫描字节数推进) ---
+        started = time.perf_counter()
+        file_bytes = os.path.getsize(file_path)
+        sampler = approximate.RowSampler(target_rows, file_bytes)
+        scanned = 0
+        progress.report(5, phase="scan", message="Scanning records")
+        for records in dataset_repository.iter_records(file_path):
+            sampler.consume(records)
+            scanned += sum(map(len, records)) + len(records)
+            progress.report(5 + 75 * min(1.0, scanned / file_bytes) if file_bytes else 80, phase="scan",
+                            message=f"Scanned {sampler.total_rows} rows")
+        timings["scan"] = round((time.perf_counter() - started) * 1000, 2)
+        progress.report(80, phase="scan", message=f"Scanned {sampler.total_rows} rows", timings=timings)
+
+        # --- 解析样本 (85%) / 估计 (95%) ---
+        started = time.perf_counter()
+        sample = dataset_repository.parse_records(file_path, sampler.records)
+        rows_mapped = len(sample) == len(sampler.positions)
+        if rows_mapped:
+            # 样本行号即文件中的行位置，异常明细的行号与全量模式一致
+            sample.index = pd.Index(sampler.positions)
+        else:
+            logger.warning(f"⚠️ [Analysis] {file_id}: bad lines dropped from sample, outlier rows cannot be located")
+        timings["parse_sample"] = round((time.perf_counter() - started) * 1000, 2)
+        progress.report(85, phase="estimate", message="Estimating quality metrics", timings=timings)
+
+        started = time.perf_counter()
+        total_rows = sampler.total_rows
+        missing, missing_ci = approximate.estimate_missing(sample, total_rows)
+        duplicates, duplicate_ci = approximate.estimate_duplicates(sampler.duplicates, total_rows)
+        anomalies, anomaly_ci = approximate.estimate_anomalies(sample, total_rows, methods)
+        if not rows_mapped:
+            anomalies["details"] = []
+        types = metrics.infer_column_types(sample)
+        timings["estimate"] = round((time.perf_counter() - started) * 1000, 2)
+        progress.report(95, phase="build", message="Building report", timings=timings)
+        logger.info(
+            f"🎲 [Analysis] Approximate done for {file_id}. Rows: {total_rows}, sample: {len(sample)}, "
+            f"timings(ms): {timings}"
+        )
+
+        response = self._build_response(
+            file_id, total_rows, len(sample.columns), missing, duplicates, anomalies, types, methods,
+        )
+        response.mode = "approximate"
+        response.approximation = ApproximationInfo(
+            sample_rows=len(sample),
+            sample_fraction=round(len(sample) / total_rows, 4) if total_rows else 1.0,
+            confidence_level=approximate.CONFIDENCE_LEVEL,
+            duplicate_sketch_fraction=sampler.duplicates.sampling_rate,
+            missing_rate=ConfidenceInterval(**missing_ci),
+            duplicate_rate=ConfidenceInterval(**duplicate_ci),
+            anomaly_rate=ConfidenceInterval(**anomaly_ci),
+            quality_score=ConfidenceInterval(
+                **approximate.score_interval(response.quality_score, missing_ci, duplicate_ci, anomaly_ci)
+            ),
+        )
+        return response
+
+    def _should_run_incremental(self, file_path: str) -> bool:
+        """增量模式只用于全量加载的路径；流式大文件不持有整表，无法按列取哈希"""
+        if not getattr(settings, "QUALITY_INCREMENTAL_ENABLED", True):
+            return False
+        return not self._should_stream(file_path)
+
+    async def _run_incremental_analysis(
+        self,
+        file_id: str,
+        file_path: str,
+        timings: Dict[str, float],
+        methods: Sequence[str],
+        progress: Optional[ProgressReporter] = None,
+    ) -> QualityCheckResponse:
+        """
+        增量分析：CPU 阶段在线程中执行，Redis 读写在事件循环中执行
+
+        1. 加载 + 一遍列哈希 (得到列指纹与行哈希，行哈希直接用于重复统计)
+        2. 按指纹批量读取列统计
+        3. 只计算未命中的列
+        4. 回写新算出的列统计
+        5. 由列统计汇总缺失 / 异常 / 类型并评分
+        Redis 读写失败时不影响结果，只是退化为全部重算 / 不回写。
+        """
+        progress = progress or ProgressReporter()
+        df, fingerprints, duplicates = await asyncio.to_thread(
+            self._load_and_fingerprint, file_id, file_path, timings, progress
+        )
+        signature = incremental.params_signature(methods)
+
+        progress.report(45, phase="partials_lookup", message="Looking up cached column statistics")
+        started = time.perf_counter()
+        try:
+            cached = await self.column_stats_repo.get_many(signature, fingerprints)
+        except Exception as e:
+            logger.warning(f"⚠️ [Analysis] Column stats lookup failed, recomputing all columns: {e}")
+            cached = [None] * len(fingerprints)
+        timings["partials_lookup"] = round((time.perf_counter() - started) * 1000, 2)
+
+        stale = [i for i, partial in enumerate(cached) if partial is None]
+        progress.report(50, phase="partials_compute", message=f"Computing {len(stale)} changed columns",
+                        timings=timings)
+        fresh = await asyncio.to_thread(self._compute_partials, df, stale, timings, methods)
+        progress.report(85, phase="partials_compute", message="Column statistics computed", timings=timings)
+
+        if fresh:
+            progress.report(90, phase="partials_save", message="Saving column statistics")
+            started = time.perf_counter()
+            ttl = getattr(settings, "QUALITY_COLUMN_STATS_TTL", ColumnStatsRepository.DEFAULT_TTL)
+            try:
+                await self.column_stats_repo.save_many(
+                    signature, {fingerprints[i]: partial for i, partial in fresh.items()}, ttl=ttl
+                )
+            except Exception as e:
+                logger.warning(f"⚠️ [Analysis] Column stats save failed: {e}")
+            timings["partials_save"] = round((time.perf_counter() - started) * 1000, 2)
+
+        partials = [fresh[i] if partial is None else partial for i, partial in enumerate(cached)]
+        logger.info(
+            f"♻️ [Analysis] {file_id} columns reused={len(partials) - len(fresh)}, recomputed={len(fresh)}"
+        )
+        progress.report(95, phase="build", message="Building report", timings=timings)
+        return await asyncio.to_thread(
+            self._assemble_incremental, file_id, df, partials, duplicates, timings, methods
+        )
+
+    def _load_and_fingerprint(
+        self,
+        file_id: str,
+        file_path: str,
+        timings: Dict[str, float],
+        progress: Optional[ProgressReporter] = None,
+    ):
+        """[Sync] 加载 DataFrame，并由同一遍列哈希得到列指纹与重复统计"""
+        progress = progress or ProgressReporter()
+        progress.report(1, phase="load", message="Loading dataset")
+        started = time.perf_counter()
+        validate_file_for_analysis(file_path)
+        df = dataset_repository.load_dataframe(file_path, file_id)
+        timings["load"] = round((time.perf_counter() - started) * 1000, 2)
+        progress.report(10, phase="row_hash", message="Fingerprinting columns", timings=timings)
+
+        started = time.perf_counter()
+        fingerprints, hashes = incremental.fingerprint_columns(df)
+        timings["row_hash"] = round((time.perf_counter() - started) * 1000, 2)
+        progress.report(35, phase="duplicates", message="Counting duplicate rows", timings=timings)
+
+        started = time.perf_counter()
+        duplicates = incremental.duplicate_stats(df, hashes)
+        timings["duplicates"] = round((time.perf_counter() - started) * 1000, 2)
+        progress.report(40, phase="duplicates", message="Duplicate rows counted", timings=timings)
+        return df, fingerprints, duplicates
+
+    def _compute_partials(
+        self,
+        df: pd.DataFrame,
+        positions: List[int],
+        timings: Dict[str, float],
+        methods: Sequence[str],
+    ) -> Dict[int, Dict[str, Any]]:
+        """[Sync] 计算指定列的列统计 (宽表时同样可以走进程池)"""
+        started = time.perf_counter()
+        try:
+            partials = incremental.compute_column_partials(
+                df, positions, methods,
+                executor=process_pool_manager.get_executor(), workers=process_pool_manager.workers,
+            )
+        except BrokenProcessPool:
+            logger.warning("⚠️ [Analysis] Process pool broken, falling back to single process")
+            process_pool_manager.discard()
+            partials = incremental.compute_column_partials(df, positions, methods)
+        timings["partials_compute"] = round((time.perf_counter() - started) * 1000, 2)
+        return partials
+
+    def _assemble_incremental(
+        self,
+        file_id: str,
+        df: pd.DataFrame,
+        partials: List[Dict[str, Any]],
+        duplicates: Dict[str, Any],
+        timings: Dict[str, float],
+        methods: Sequence[str],
+    ) -> QualityCheckResponse:
+        """[Sync] 由列统计汇总数据集级指标并组装响应"""
+        started = time.perf_counter()
+        summary = incremental.assemble_from_partials(df, partials, methods)
+        timings["assemble"] = round((time.perf_counter() - started) * 1000, 2)
+        logger.info(f"⏱️ [Analysis] {file_id} timings(ms): {timings}")
+        return self._build_response(
+            file_id,
+            len(df),
+            len(df.columns),
+            summary["missing"],
+            duplicates,
+            summary["anomalies"],
+            summary["types"],
+            methods,
+        )
+
+    def _should_stream(self, file_path: str) -> bool:
+        """流式模式目前只支持 CSV；Excel 仍走全量加载 (受分析大小上限约束)"""
+        if not getattr(settings, "QUALITY_STREAMING_ENABLED", True):
+            return False
+        if not file_path.lower().endswith(".csv") or not os.path.exists(file_path):
+            return False
+        threshold_mb = getattr(settings, "QUALITY_STREAMING_THRESHOLD_MB", 100)
+        return os.path.getsize(file_path) > threshold_mb * 1024 * 1024
+
+    def _run_streaming_analysis(
+        self,
+        file_id: str,
+        file_path: str,
+        timings: Optional[Dict[str, float]] = None,
+        methods: Sequence[str] = metrics.DEFAULT_ANOMALY_METHODS,
+        progress: Optional[ProgressReporter] = None,
+    ) -> QualityCheckResponse:
+        """
+        [Sync] 流式分块分析：两遍扫描，每遍只持有一个 CHUNK_SIZE 行的数据块
+        第一遍累积缺失 / 行哈希 / 分位数草图，第二遍按各方法的边界定位离群值
+        (请求 mad 时中间多一遍，累积 |x - 中位数| 的草图；列类型中途变化时多一遍重算行哈希)
+        各遍按已处理行数上报进度 (总行数由一次字节扫描得出)
+        """
+        progress = progress or ProgressReporter()
+        timings = timings if timings is not None else {}
+        validate_file_for_analysis(file_path, enforce_size_limit=False)
+        chunk_size = getattr(settings, "CHUNK_SIZE", 50000)
+        logger.info(f"🌊 [Analysis] Streaming mode for {file_id} (chunk={chunk_size} rows)")
+
+        columns = dataset_repository.read_columns(file_path)
+        acc = StreamingQualityAccumulator(columns, methods=list(methods))
+        progress.report(1, phase="count_rows", message="Counting rows")
+        total_rows = dataset_repository.count_rows(file_path)
+
+        # 各遍占用的进度区间：请求 mad 时预留偏差遍 (是否真正执行要等第一遍结束才知道)
+        pass1_end = 40.0 if "mad" in methods else 50.0
+        deviation_end = 65.0 if "mad" in methods else pass1_end
+
+        def _scan(phase: str, start: float, end: float, consume) -> None:
+            started = time.perf_counter()
+            rows = 0
+            progress.report(start, phase=phase, message=f"Running {phase}")
+            for chunk in dataset_repository.iter_chunks(file_path, chunk_size):
+                consume(chunk, rows)
+                rows += len(chunk)
+                done = min(1.0, rows / total_rows) if total_rows else 1.0
+                progress.report(start + (end - start) * done, phase=phase, message=f"{phase}: {rows}/{total_rows} rows")
+            timings[phase] = round((time.perf_counter() - started) * 1000, 2)
+            progress.report(end, phase=phase, message=f"Finished {phase}", timings=timings)
+
+        # --- 第一遍: 缺失 / 重复 / 草图 ---
+        _scan("pass1", 5.0, pass1_end, lambda chunk, offset: acc.consume(chunk))
+
+        # --- 哈希遍 (少见): 有列在后面的块里才确定类型，按最终口径重算行哈希 ---
+        if acc.needs_hash_pass():
+            _scan("hash_pass", pass1_end, pass1_end, lambda chunk, offset: acc.consume_hashes(chunk))
+
+        # --- 偏差遍 (仅 mad): |x - 中位数| 的草图 ---
+        if acc.needs_deviation_pass():
+            _scan("deviation_pass", pass1_end, deviation_end, lambda chunk, offset: acc.consume_deviations(chunk))
+
+        # --- 第二遍: 离群值定位 (没有需要检测的列时跳过整遍扫描) ---
+        if acc.outlier_bounds():
+            _scan("pass2", deviation_end, 95.0, acc.locate_outliers)
+        else:
+            timings["pass2"] = 0.0
+
+        logger.info(f"✅ [Analysis] Streaming done for {file_id}. Rows: {acc.row_count}, timings(ms): {timings}")
+        return self._build_response(
+            file_id,
+            acc.row_count,
+            len(columns),
+            acc.missing_stats(),
+            acc.duplicate_stats(),
+            acc.anomaly_stats(),
+            acc.column_types(),
+            methods,
+        )
+
+    def _build_response(
+        self,
+        file_id: str,
+        row_count: int,
+        col_count: int,
+        missing_data: Dict[str, Any],
+        duplicate_data: Dict[str, Any],
+        anomaly_data: Dict[str, Any],
+        types_map: Dict[str, str],
+        methods: Sequence[str] = metrics.DEFAULT_ANOMALY_METHODS,
+    ) -> QualityCheckResponse:
+        """评分 & 组装 (全量 / 流式两种模式共用)"""
         score = scoring.calculate_quality_score(
             missing_rate=missing_data['missing_rate'],
             duplicate_rate=duplicate_data['duplicate_rate'],
@@ -125,7 +733,7 @@ class AnalysisService:
             quality_score=score,
             missing=MissingStatistics(**missing_data),
             duplicates=DuplicateStatistics(**duplicate_data),
-            anomalies=AnomalyStatistics(**anomaly_data),
+            anomalies=AnomalyStatistics(**anomaly_data, methods=list(methods)),
             types=types_map
         )
      
@@ -135,5 +743,60 @@ class AnalysisService:
         """获取分析任务进度"""
         return await self.task_repo.get_task(file_id) # type: ignore
 
+    async def stream_progress(
+        self,
+        file_id: str,
+        last_event_id: Optional[int] = None,
+        heartbeat: float = 15.0,
+    ) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """
+        任务状态推送 (SSE 用)：先发当前状态，之后每次状态变更发一次，任务结束后停止
+        产出 None 表示心跳 (heartbeat 秒内没有变化)
+
+        状态带递增序号 seq：重连时带上最后收到的 seq (Last-Event-ID)，当前状态没有变化则不重复发送；
+        事件都是完整状态，断线期间的中间进度不需要补发。任务已结束时总是发送结束状态，客户端据此关闭连接。
+        订阅连接断开时结束推送，由客户端带 Last-Event-ID 重连。
+        """
+        # 先订阅再读当前状态：两者之间发生的变更不会丢
+        queue = await self.task_repo.subscribe(file_id)
+        try:
+            task = await self.task_repo.get_task(file_id)
+            floor: Optional[int] = None
+            if task is None:
+                # 任务可能马上创建 (异步提交)，继续等待
+                yield {"status": "unknown", "progress": 0}
+            else:
+                floor = task.get("seq", 0)
+                finished = task.get("status") in TERMINAL_STATUSES
+                if finished or last_event_id is None or floor != last_event_id:
+                    yield task
+                if finished:
+                    return
+
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                if message is None:
+                    return
+                state = self.task_repo.decode_event(message)
+                if state is None:
+                    continue
+                # 读当前状态之前已发布、还留在队列里的旧消息
+                if floor is not None and state.get("seq", 0) <= floor:
+                    continue
+                floor = None
+                yield state
+                if state.get("status") in TERMINAL_STATUSES:
+                    return
+        finally:
+            self.task_repo.unsubscribe(file_id, queue)
+
+    async def get_progress_batch(self, file_ids: Sequence[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """批量获取任务进度 (一次 Redis 往返，不附带分析报告)"""
+        return await self.task_repo.get_tasks(file_ids)
+
 # 导出单例
 analysis_service = AnalysisService()
\ No newline at end of file
@@ -0,0 +1,164 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.app.config.settings import settings
+from src.features.quality.services import quality_analysis_service
+from src.features.quality.utils import metrics
+from src.infrastructure.cache.dataframe_cache import dataframe_cache
+from src.infrastructure.compute.process_pool import ProcessPoolManager
+
+ALL_METHODS = list(metrics.ANOMALY_METHODS)
+
+# 1..30 加一个极端值：分位数 / 中位数 / MAD 都能手算
+#   排序后 n = 31，np.quantile(linear) 的虚拟下标为 30 * q
+#   q1 = (8 + 9) / 2 = 8.5，median = 16，q3 = (23 + 24) / 2 = 23.5，IQR = 15
+#   |x - 16| 排序后第 16 个 (下标 15) 为 8 => MAD = 8
+#   P0.5：下标 0.15 => 1 + 0.15 = 1.15；P99.5：下标 29.85 => 30 + 0.85 * 970 = 854.5
+#   均值 1465 / 31，总体标准差 sqrt(sum((x - mean)^2) / 31) = 174.15435640350321
+GOLDEN = np.array(list(range(1, 31)) + [1000], dtype=np.float64)
+GOLDEN_MEAN = 1465 / 31
+GOLDEN_STD = 174.15435640350321
+
+@pytest.fixture(autouse=True)
+def isolated_caches(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "TEMP_DIR", str(tmp_path / "temp"))
+    dataframe_cache.clear()
+    yield
+    dataframe_cache.clear()
+
+@pytest.fixture
+def spawn_executor():
+    executor = ProcessPoolExecutor(max_workers=2, mp_context=multiprocessing.get_context("spawn"))
+    yield executor
+    executor.shutdown(wait=True, cancel_futures=True)
+
+def _wide_frame(n_rows: int = 400, n_cols: int = 24) -> pd.DataFrame:
+    """多数数值列带离群值 / 缺失，穿插低基数列、常数列、整数列与文本列"""
+    rng = np.random.default_rng(11)
+    data = {}
+    for i in range(n_cols):
+        col = rng.normal(50 + i, 5 + i % 4, n_rows).round(3)
+        col[rng.integers(0, n_rows, 3)] = rng.choice([-1, 1], 3) * (500 + 10 * i)
+        col[rng.integers(0, n_rows, 2)] = np.nan
+        data[f"x{i}"] = col
+    data["level"] = rng.integers(0, 5, n_rows)
+    data["const"] = 7.0
+    data["count"] = rng.integers(0, 10_000, n_rows)
+    data["city"] = rng.choice(["北京", "上海", None], n_rows)
+    df = pd.DataFrame(data)
+    return pd.concat([df, df.iloc[:15]], ignore_index=True)
+
+# -----------------------------------------------------------------------------
+# 各检测方法的边界与命中 (手算金值)
+# -----------------------------------------------------------------------------
+
+@pytest.mark.parametrize("method, lower, upper, values", [
+    ("iqr", 8.5 - 3.0 * 15, 23.5 + 3.0 * 15, [1000.0]),
+    ("zscore", GOLDEN_MEAN - 3.0 * GOLDEN_STD, GOLDEN_MEAN + 3.0 * GOLDEN_STD, [1000.0]),
+    ("mad", 16 - 3.5 * 8 / 0.6745, 16 + 3.5 * 8 / 0.6745, [1000.0]),
+    ("percentile", 1.15, 854.5, [1.0, 1000.0]),
+])
+def test_block_outliers_match_golden_bounds(method, lower, upper, values):
+    block = np.asfortranarray(GOLDEN[:, None])
+    counts, hits = metrics.detect_block_outliers(block, [method])
+
+    assert counts.tolist() == [31]
+    [(col, hit_method, rows, hit_values, hit_lower, hit_upper)] = hits
+    assert (col, hit_method) == (0, method)
+    assert (hit_lower, hit_upper) == (pytest.approx(lower, rel=1e-12), pytest.approx(upper, rel=1e-12))
+    assert sorted(hit_values.tolist()) == values
+    assert sorted(rows.tolist()) == [int(np.flatnonzero(GOLDEN == v)[0]) for v in values]
+
+def test_kernel_reports_golden_details():
+    df = pd.DataFrame({
+        "a": np.append(GOLDEN, np.nan),                     # 缺失值不参与统计
+        "b": np.append(-GOLDEN, np.nan),                    # 镜像：边界取反
+        "level": [i % 5 for i in range(32)],                # 唯一值 <= 20，跳过
+        "const": 7.0,                                       # 离散度为 0，跳过
+    })
+    anomalies = metrics.run_quality_kernel(df, methods=ALL_METHODS)["anomalies"]
+
+    assert anomalies["by_type"] == {
+        "outlier_iqr": 2, "outlier_zscore": 2, "outlier_mad": 2, "outlier_percentile": 4,
+    }
+    assert anomalies["by_column"] == {"a": 5, "b": 5}
+    assert [(d["row"], d["column"], d["value"], d["type"]) for d in anomalies["details"]] == [
+        (1, "a", 1.0, "outlier_percentile"),
+        (1, "b", -1.0, "outlier_percentile"),
+        (31, "a", 1000.0, "outlier_iqr"),
+        (31, "b", -1000.0, "outlier_iqr"),
+        (31, "a", 1000.0, "outlier_zscore"),
+        (31, "b", -1000.0, "outlier_zscore"),
+        (31, "a", 1000.0, "outlier_mad"),
+        (31, "b", -1000.0, "outlier_mad"),
+        (31, "a", 1000.0, "outlier_percentile"),
+        (31, "b", -1000.0, "outlier_percentile"),
+    ]
+    details = {(d["column"], d["type"]): d["reason"] for d in anomalies["details"] if d["row"] == 31}
+    assert details[("a", "outlier_iqr")] == "超出极值范围 [-36.50, 68.50] (IQR x 3.0)"
+    assert details[("a", "outlier_zscore")] == "超出范围 [-475.21, 569.72] (|Z| > 3.0)"
+    assert details[("a", "outlier_mad")] == "超出范围 [-25.51, 57.51] (修正 Z 分数 (MAD) > 3.5)"
+    assert details[("a", "outlier_percentile")] == "超出分位区间 [1.15, 854.50] (P0.5 - P99.5)"
+    assert details[("b", "outlier_iqr")] == "超出极值范围 [-68.50, 36.50] (IQR x 3.0)"
+
+def test_top_outliers_are_capped_and_farthest_first():
+    values = np.concatenate([np.arange(1, 1001, dtype=np.float64), np.arange(1, 81) * 1e6])
+    block = np.asfortranarray(values[:, None])
+    _, [(_, _, rows, hit_values, _, _)] = metrics.detect_block_outliers(block, ["iqr"])
+
+    assert len(rows) == metrics.TOP_OUTLIERS_PER_COLUMN
+    assert hit_values.tolist() == [v * 1e6 for v in range(80, 30, -1)]
+
+# -----------------------------------------------------------------------------
+# 进程池并行与单进程结果一致
+# -----------------------------------------------------------------------------
+
+@pytest.mark.parametrize("methods", [["iqr"], ALL_METHODS])
+def test_parallel_kernel_matches_serial(spawn_executor, monkeypatch, methods):
+    monkeypatch.setattr(settings, "QUALITY_PARALLEL_MIN_COLUMNS", 8)
+    df = _wide_frame()
+
+    serial = metrics.run_quality_kernel(df, methods=methods)
+    parallel = metrics.run_quality_kernel(df, methods=methods, executor=spawn_executor, workers=2)
+
+    assert "parallel_numeric" in parallel["timings"]
+    for key in ("missing", "duplicates", "anomalies", "types"):
+        assert parallel[key] == serial[key]
+    assert serial["anomalies"]["total"] > 0
+
+def test_parallel_waves_match_serial(spawn_executor, monkeypatch):
+    # 共享内存预算只够放 5 列：分多轮提交
+    monkeypatch.setattr(settings, "QUALITY_PARALLEL_MIN_COLUMNS", 8)
+    df = _wide_frame()
+    monkeypatch.setattr(settings, "QUALITY_PARALLEL_SHM_BYTES", len(df) * 8 * 5)
+
+    serial = metrics.run_quality_kernel(df, methods=ALL_METHODS)
+    parallel = metrics.run_quality_kernel(df, methods=ALL_METHODS, executor=spawn_executor, workers=2)
+
+    assert parallel["anomalies"] == serial["anomalies"]
+    assert parallel["missing"] == serial["missing"]
+
+def test_service_report_with_parallel_workers_matches_serial(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "QUALITY_PARALLEL_MIN_COLUMNS", 8)
+    path = tmp_path / "wide.csv"
+    _wide_frame().to_csv(path, index=False)
+    service = quality_analysis_service.analysis_service
+
+    serial = service._run_cpu_bound_analysis("f1", str(path), methods=ALL_METHODS)
+
+    # 等价于 QUALITY_PARALLEL_WORKERS=2
+    manager = ProcessPoolManager(max_workers=2)
+    monkeypatch.setattr(quality_analysis_service, "process_pool_manager", manager)
+    dataframe_cache.clear()
+    timings = {}
+    try:
+        parallel = service._run_cpu_bound_analysis("f1", str(path), timings, methods=ALL_METHODS)
+    finally:
+        manager.shutdown()
+
+    assert "parallel_numeric" in timings
+    assert parallel.model_dump() == serial.model_dump()
@@ -0,0 +1,282 @@
+import hashlib
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.app.config.settings import settings
+from src.features.quality.repository.dataset_repository import dataset_repository
+from src.features.quality.services.quality_analysis_service import analysis_service
+from src.features.quality.utils import approximate, metrics
+from src.features.quality.utils.sketches import DuplicateSketch
+from src.features.quality.utils.streaming import StreamingQualityAccumulator
+from src.infrastructure.cache.dataframe_cache import dataframe_cache
+
+ALL_METHODS = list(metrics.ANOMALY_METHODS)
+
+@pytest.fixture(autouse=True)
+def isolated_caches(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "TEMP_DIR", str(tmp_path / "temp"))
+    dataframe_cache.clear()
+    yield
+    dataframe_cache.clear()
+
+@pytest.fixture
+def quality_csv(tmp_path):
+    """数值列带离群值 / 缺失，另有整数列、布尔列、低基数列、文本列和重复行"""
+    rng = np.random.default_rng(7)
+    n = 1200
+    amount = rng.normal(100, 15, n).round(3)
+    amount[[5, 333, 900]] = [900.0, -500.0, 1500.0]
+    amount[[10, 20]] = np.nan
+    df = pd.DataFrame({
+        "amount": amount,
+        "count": rng.integers(0, 1000, n),
+        "level": rng.integers(0, 5, n),
+        "flag": rng.integers(0, 2, n).astype(bool),
+        "city": rng.choice(["北京", "上海", None], n),
+    })
+    df = pd.concat([df, df.iloc[:40]], ignore_index=True)
+    path = tmp_path / "quality.csv"
+    df.to_csv(path, index=False)
+    return str(path)
+
+def _stream(file_path: str, methods, chunk_size: int = 250) -> StreamingQualityAccumulator:
+    acc = StreamingQualityAccumulator(dataset_repository.read_columns(file_path), methods=methods)
+    for chunk in dataset_repository.iter_chunks(file_path, chunk_size):
+        acc.consume(chunk)
+    if acc.needs_hash_pass():
+        for chunk in dataset_repository.iter_chunks(file_path, chunk_size):
+            acc.consume_hashes(chunk)
+    if acc.needs_deviation_pass():
+        for chunk in dataset_repository.iter_chunks(file_path, chunk_size):
+            acc.consume_deviations(chunk)
+    acc.outlier_bounds()
+    offset = 0
+    for chunk in dataset_repository.iter_chunks(file_path, chunk_size):
+        acc.locate_outliers(chunk, offset)
+        offset += len(chunk)
+    return acc
+
+# -----------------------------------------------------------------------------
+# 流式累积器与全量融合计算口径一致
+# -----------------------------------------------------------------------------
+
+@pytest.mark.parametrize("methods", [["iqr"], ALL_METHODS])
+def test_streaming_matches_full_frame_kernel(quality_csv, methods):
+    df = dataset_repository.load_dataframe(quality_csv, "f1")
+    kernel = metrics.run_quality_kernel(df, methods=methods)
+
+    acc = _stream(quality_csv, methods)
+
+    assert acc.row_count == len(df)
+    assert acc.missing_stats() == kernel["missing"]
+    assert acc.duplicate_stats() == kernel["duplicates"]
+    assert acc.anomaly_stats() == kernel["anomalies"]
+    assert acc.column_types() == kernel["types"]
+    assert kernel["anomalies"]["total"] > 0
+
+def test_streaming_service_report_matches_full_report(quality_csv):
+    full = analysis_service._run_cpu_bound_analysis("f1", quality_csv, methods=ALL_METHODS)
+    streamed = analysis_service._run_streaming_analysis("f1", quality_csv, methods=metrics.normalize_methods(ALL_METHODS))
+
+    assert streamed.model_dump() == full.model_dump()
+
+# -----------------------------------------------------------------------------
+# 流式行哈希按整列类型归一 ("1" / "1.0" / "01" 在数值列里是同一个值)
+# -----------------------------------------------------------------------------
+
+@pytest.fixture
+def variant_csv(tmp_path):
+    """同一行在不同块里写法不同：数值列 1 / 1.0 / 01，布尔列 True / true；code 列是文本，写法不同即不同"""
+    lines = ["amount,flag,maybe,code"]
+    for i in range(12):
+        lines.append(f"{i},True,,c{i}")
+    lines += ["1.0,true,,c1", "01,TRUE,,c1", "1,True,,01", "1,True,,1", "2.50,False,true,x", "2.5,false,True,x"]
+    path = tmp_path / "variants.csv"
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return str(path)
+
+def _duplicates_in_memory(file_path: str):
+    return metrics.run_quality_kernel(dataset_repository.load_dataframe(file_path, "f1"))["duplicates"]
+
+@pytest.mark.parametrize("chunk_size", [3, 100])
+def test_streaming_duplicates_normalise_numeric_and_bool_text(variant_csv, chunk_size):
+    acc = _stream(variant_csv, ["iqr"], chunk_size=chunk_size)
+    expected = _duplicates_in_memory(variant_csv)
+
+    assert acc.needs_hash_pass() is False
+    assert acc.duplicate_stats() == expected
+    # 1.0,true / 01,TRUE 与第 2 行重复；2.50 / 2.5 一组；code 列 "01" 与 "1" 不同
+    assert expected["total_duplicate_rows"] == 3
+
+def test_column_that_turns_to_text_triggers_hash_pass(tmp_path):
+    path = tmp_path / "late_text.csv"
+    rows = ["v,w"] + [f"{i % 4},{i}" for i in range(8)] + ["1.0,1", "abc,9", "01,5"]
+    path.write_text("\n".join(rows) + "\n", encoding="utf-8")
+    expected = _duplicates_in_memory(str(path))
+
+    acc = StreamingQualityAccumulator(["v", "w"], methods=["iqr"])
+    for chunk in dataset_repository.iter_chunks(str(path), 4):
+        acc.consume(chunk)
+    with pytest.raises(RuntimeError, match="Hash pass incomplete"):
+        acc.duplicate_stats()
+
+    assert acc.needs_hash_pass() is True
+    for chunk in dataset_repository.iter_chunks(str(path), 4):
+        acc.consume_hashes(chunk)
+    assert acc.needs_hash_pass() is False
+    # v 列最终是文本："1.0,1" 与第 2 行 "1,1" 不重复，"01,5" 与 "1,5" 也不重复
+    assert acc.duplicate_stats() == expected
+    assert expected["total_duplicate_rows"] == 0
+
+def test_streaming_service_runs_hash_pass_when_needed(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "CHUNK_SIZE", 4)
+    path = tmp_path / "late_text.csv"
+    rows = ["v,w"] + [f"{i % 4},{i % 3}" for i in range(12)] + ["x,1"]
+    path.write_text("\n".join(rows) + "\n", encoding="utf-8")
+    full = analysis_service._run_cpu_bound_analysis("f1", str(path))
+
+    timings = {}
+    streamed = analysis_service._run_streaming_analysis("f1", str(path), timings)
+
+    assert "hash_pass" in timings
+    assert streamed.model_dump() == full.model_dump()
+
+# -----------------------------------------------------------------------------
+# 流式累积器的调用顺序
+# -----------------------------------------------------------------------------
+
+def test_locate_outliers_computes_bounds_lazily(quality_csv):
+    acc = StreamingQualityAccumulator(dataset_repository.read_columns(quality_csv), methods=["iqr"])
+    chunks = list(dataset_repository.iter_chunks(quality_csv, 500))
+    for chunk in chunks:
+        acc.consume(chunk)
+
+    offset = 0
+    for chunk in chunks:
+        acc.locate_outliers(chunk, offset)
+        offset += len(chunk)
+
+    assert acc.anomaly_stats()["total"] == _stream(quality_csv, ["iqr"]).anomaly_stats()["total"] > 0
+
+def test_mad_without_deviation_pass_raises(quality_csv):
+    acc = StreamingQualityAccumulator(dataset_repository.read_columns(quality_csv), methods=["mad"])
+    for chunk in dataset_repository.iter_chunks(quality_csv, 500):
+        acc.consume(chunk)
+
+    with pytest.raises(RuntimeError, match="deviation pass"):
+        acc.outlier_bounds()
+
+def test_anomaly_stats_without_second_pass_raises(quality_csv):
+    acc = StreamingQualityAccumulator(dataset_repository.read_columns(quality_csv), methods=["iqr"])
+    for chunk in dataset_repository.iter_chunks(quality_csv, 500):
+        acc.consume(chunk)
+
+    with pytest.raises(RuntimeError, match="Outlier pass incomplete"):
+        acc.anomaly_stats()
+
+def test_no_eligible_columns_needs_no_second_pass(tmp_path):
+    path = tmp_path / "text.csv"
+    path.write_text("name,level\na,1\nb,2\nc,1\n", encoding="utf-8")
+    acc = StreamingQualityAccumulator(["name", "level"], methods=ALL_METHODS)
+    for chunk in dataset_repository.iter_chunks(str(path), 2):
+        acc.consume(chunk)
+
+    assert acc.needs_deviation_pass() is False
+    assert acc.outlier_bounds() == {}
+    assert acc.anomaly_stats()["total"] == 0
+
+# -----------------------------------------------------------------------------
+# 近似模式：样本量、置信区间与重复草图
+# -----------------------------------------------------------------------------
+
+def _approximate(file_path: str, methods=ALL_METHODS):
+    return analysis_service._run_approximate_analysis("f1", file_path, {}, metrics.normalize_methods(methods))
+
+def _intervals(report):
+    info = report.approximation
+    return [info.missing_rate, info.duplicate_rate, info.anomaly_rate, info.quality_score]
+
+def test_approximate_sample_size_follows_setting(quality_csv, monkeypatch):
+    monkeypatch.setattr(settings, "QUALITY_APPROX_SAMPLE_ROWS", 300)
+    report = _approximate(quality_csv)
+    info = report.approximation
+
+    assert report.mode == "approximate"
+    assert report.row_count == 1240
+    assert 240 <= info.sample_rows <= 360
+    assert info.sample_fraction == round(info.sample_rows / 1240, 4)
+    assert info.confidence_level == 0.95
+    for ci in _intervals(report):
+        assert ci.lower <= ci.estimate <= ci.upper
+    # 缺失 / 异常来自样本，区间有宽度；重复草图覆盖全部行且未升级，结果精确
+    assert info.missing_rate.upper > info.missing_rate.lower
+    assert info.anomaly_rate.upper > info.anomaly_rate.lower
+    assert info.duplicate_sketch_fraction == 1.0
+    assert info.duplicate_rate.lower == info.duplicate_rate.upper
+
+def test_approximate_intervals_cover_exact_rates(quality_csv, monkeypatch):
+    monkeypatch.setattr(settings, "QUALITY_APPROX_SAMPLE_ROWS", 400)
+    report = _approximate(quality_csv)
+    df = dataset_repository.load_dataframe(quality_csv, "f1")
+
+    exact_missing = float(df.isna().to_numpy().mean())
+    ci = report.approximation.missing_rate
+    assert ci.lower <= exact_missing <= ci.upper
+    exact = analysis_service._run_cpu_bound_analysis("f1", quality_csv, methods=ALL_METHODS)
+    ci = report.approximation.quality_score
+    assert ci.lower - 1 <= exact.quality_score <= ci.upper + 1
+
+def test_full_sample_matches_exact_report(quality_csv, monkeypatch):
+    monkeypatch.setattr(settings, "QUALITY_APPROX_SAMPLE_ROWS", 10_000)
+    report = _approximate(quality_csv)
+    exact = analysis_service._run_cpu_bound_analysis("f1", quality_csv, methods=ALL_METHODS)
+    info = report.approximation
+
+    assert (info.sample_rows, info.sample_fraction, info.duplicate_sketch_fraction) == (1240, 1.0, 1.0)
+    # 全量抽样：有限总体校正把区间收窄为一个点
+    assert info.missing_rate.lower == info.missing_rate.estimate == info.missing_rate.upper
+    assert report.missing.model_dump() == exact.missing.model_dump()
+    assert report.duplicates.total_duplicate_rows == exact.duplicates.total_duplicate_rows
+    assert report.duplicates.duplicate_rate == exact.duplicates.duplicate_rate
+    assert info.duplicate_rate.lower == info.duplicate_rate.upper
+
+def _stable_hash(record: bytes) -> int:
+    """与进程无关的记录哈希 (内置 hash 带随机种子，保留哪些重复组每次运行都不同)"""
+    return int.from_bytes(hashlib.blake2b(record, digest_size=8).digest(), "little", signed=True)
+
+@pytest.mark.parametrize("capacity", [64, 256, 512])
+def test_downsampled_duplicate_sketch_stays_within_bounds(quality_csv, monkeypatch, capacity):
+    # 小容量迫使草图升级 (只保留部分哈希值域)
+    monkeypatch.setattr(approximate, "DUPLICATE_SKETCH_CAPACITY", capacity)
+    monkeypatch.setattr(approximate, "hash", _stable_hash, raising=False)
+    report = _approximate(quality_csv)
+    exact = analysis_service._run_cpu_bound_analysis("f1", quality_csv, methods=ALL_METHODS)
+    info = report.approximation
+
+    assert info.duplicate_sketch_fraction < 1.0
+    assert info.duplicate_rate.lower <= exact.duplicates.duplicate_rate <= info.duplicate_rate.upper
+    assert report.duplicates.rows == []
+
+def test_duplicate_sketch_estimate_is_exact_until_it_downsamples():
+    rng = np.random.default_rng(11)
+    unique = rng.integers(np.iinfo(np.int64).min, np.iinfo(np.int64).max, 20_000, dtype=np.int64)
+    # 前 2000 个哈希各再出现一次，前 200 个出现三次
+    hashes = np.concatenate([unique, unique[:2000], unique[:200], unique[:200]])
+    rng.shuffle(hashes)
+    true_duplicates = 2400
+
+    exact = DuplicateSketch(capacity=1 << 16)
+    for batch in np.array_split(hashes, 7):
+        exact.update(batch)
+    assert exact.estimate() == (true_duplicates, 0.0, 2000)
+
+    sampled = DuplicateSketch(capacity=2048)
+    for batch in np.array_split(hashes, 7):
+        sampled.update(batch)
+    total, se, groups = sampled.estimate()
+    assert sampled.level > 0
+    assert se > 0
+    assert abs(total - true_duplicates) <= 4 * se
+    assert abs(groups - 2000) <= 0.35 * 2000
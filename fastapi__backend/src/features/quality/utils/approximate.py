@@ -0,0 +1,195 @@
+# 文件路径: src/features/quality/utils/approximate.py
+
+import math
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.features.quality.utils import metrics, scoring
+from src.features.quality.utils.sketches import DuplicateSketch
+
+# =========================================================
+# 近似质量分析 (Approximate Mode)
+#
+# 一遍原始记录扫描：每条记录的字节哈希进入重复草图 (覆盖全部行)，
+# 同时按文件位置分层抽样 (每个扫描块按相同比例抽取，对按时间等排序的文件也不偏)；
+# 只解析抽中的记录，在样本上计算缺失 / 异常 / 类型，并给出 95% 置信区间。
+# =========================================================
+
+CONFIDENCE_LEVEL = 0.95
+CONFIDENCE_Z = 1.96
+
+# 重复草图保留的不同哈希个数上限 (约 2 MB)
+DUPLICATE_SKETCH_CAPACITY = 1 << 17
+
+class RowSampler:
+    """
+    分层行抽样 + 重复草图，逐批消费 iter_csv_records 产出的原始记录
+
+    抽样比例由第一批记录的平均长度估算总行数得出；各批按同一比例抽取，
+    小数部分跨批累积，总样本量贴近 target_rows。
+    记录哈希使用 Python 内置 hash (带进程级随机种子)，只在同一遍扫描内比较，不持久化。
+    重复按记录原文判断：同一取值写法不同 (如 1.0 与 1) 时不视为重复。
+    """
+
+    def __init__(self, target_rows: int, file_bytes: int, seed: int = 0):
+        self.target_rows = target_rows
+        self.file_bytes = file_bytes
+        self.total_rows = 0
+        self.records: List[bytes] = []
+        self.positions: List[int] = []
+        self.duplicates = DuplicateSketch(DUPLICATE_SKETCH_CAPACITY)
+        self._rate: Optional[float] = None
+        self._carry = 0.0
+        self._rng = np.random.default_rng(seed)
+
+    @property
+    def rate(self) -> float:
+        return self._rate if self._rate is not None else 1.0
+
+    def consume(self, records: List[bytes]) -> None:
+        n = len(records)
+        if n == 0:
+            return
+        self.duplicates.update(np.fromiter(map(hash, records), dtype=np.int64, count=n))
+
+        if self._rate is None:
+            avg_bytes = sum(map(len, records)) / n + 1
+            estimated_rows = max(n, self.file_bytes / avg_bytes)
+            self._rate = min(1.0, self.target_rows / estimated_rows)
+
+        wanted = self._rate * n + self._carry
+        k = min(n, int(wanted))
+        self._carry = wanted - k
+        if k == n:
+            picks = np.arange(n)
+        else:
+            picks = np.sort(self._rng.choice(n, size=k, replace=False))
+        self.records.extend(records[i] for i in picks.tolist())
+        self.positions.extend((picks + self.total_rows).tolist())
+        self.total_rows += n
+
+def _interval(estimate: float, lower: float, upper: float) -> Dict[str, float]:
+    return {
+        "estimate": round(estimate, 4),
+        "lower": round(max(0.0, lower), 4),
+        "upper": round(min(1.0, upper), 4),
+    }
+
+def wilson_interval(successes: float, n: int, z: float = CONFIDENCE_Z) -> Tuple[float, float]:
+    """二项比例的 Wilson 区间 (比例接近 0 时比正态近似可靠)"""
+    if n <= 0:
+        return 0.0, 1.0
+    p = successes / n
+    denom = 1 + z * z / n
+    center = (p + z * z / (2 * n)) / denom
+    half = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+    return max(0.0, center - half), min(1.0, center + half)
+
+def _fpc(sample_rows: int, total_rows: int) -> float:
+    """有限总体校正：样本占比越大区间越窄，全量抽样时为 0"""
+    if total_rows <= 0:
+        return 0.0
+    return math.sqrt(max(0.0, 1.0 - sample_rows / total_rows))
+
+def estimate_missing(sample: pd.DataFrame, total_rows: int) -> Tuple[Dict[str, Any], Dict[str, float]]:
+    """
+    缺失统计 (计数按 总行数 / 样本行数 放大) 与总体缺失率的置信区间
+    区间以行为抽样单元 (同一行的单元格往往同时缺失)，不按单元格独立计算
+    """
+    m = len(sample)
+    null = sample.isna().to_numpy()
+    counts = null.sum(axis=0)
+    scale = total_rows / m if m > 0 else 0.0
+    stats = metrics._missing_from_counts(
+        pd.Series(np.rint(counts * scale).astype(np.int64), index=sample.columns), total_rows
+    )
+    if m == 0 or null.shape[1] == 0:
+        return stats, _interval(0.0, 0.0, 0.0)
+
+    row_fraction = null.mean(axis=1)
+    rate = float(row_fraction.mean())
+    se = float(row_fraction.std(ddof=1)) / math.sqrt(m) * _fpc(m, total_rows) if m > 1 else 0.0
+    return stats, _interval(rate, rate - CONFIDENCE_Z * se, rate + CONFIDENCE_Z * se)
+
+def estimate_duplicates(sketch: DuplicateSketch, total_rows: int) -> Tuple[Dict[str, Any], Dict[str, float]]:
+    """由重复草图估计重复统计 (近似模式不列出具体行号)"""
+    duplicates, se, groups = sketch.estimate()
+    rate = duplicates / total_rows if total_rows > 0 else 0.0
+    stats = {
+        "total_duplicate_rows": int(round(duplicates)),
+        "unique_duplicate_groups": int(round(groups)),
+        "duplicate_rate": round(min(1.0, rate), 4),
+        "rows": [],
+        "largest_groups": None,
+    }
+    if total_rows <= 0:
+        return stats, _interval(rate, rate, rate)
+    half = CONFIDENCE_Z * se / total_rows
+    upper = rate + half
+    if sketch.sampling_rate < 1.0:
+        # 保留的值域里一个重复都没有时标准误为 0，区间会退化成一个点：
+        # 上界至少放宽 3 / 保留比例 行 (零事件的 95% 上界，rule of three)
+        upper = max(upper, rate + 3.0 / sketch.sampling_rate / total_rows)
+    return stats, _interval(rate, rate - half, upper)
+
+def estimate_anomalies(
+    sample: pd.DataFrame,
+    total_rows: int,
+    methods: Sequence[str],
+) -> Tuple[Dict[str, Any], Dict[str, float]]:
+    """
+    在样本上检测离群值：明细来自样本 (行号为文件中的真实行号)，计数按比例放大
+
+    全量模式每列每种方法最多计 TOP_OUTLIERS_PER_COLUMN 个，估计值同样封顶，口径一致。
+    区间由各 (列, 方法) 的 Wilson 区间端点相加得到 (偏保守)，只覆盖样本中检出离群值的列。
+    """
+    m = len(sample)
+    hits: List[metrics.OutlierHit] = []
+    sample_counts: Dict[Tuple[int, str], int] = {}
+    for batch, block in metrics._iter_numeric_blocks(sample, metrics._numeric_positions(sample)):
+        _, block_hits = metrics.detect_block_outliers(block, methods)
+        for j, method, rows, values, lower, upper in block_hits:
+            column = block[:, j]
+            # 命中明细已截取 Top 50，样本内的完整个数按同一边界重新计数
+            sample_counts[(batch[j], method)] = int(((column < lower) | (column > upper)).sum())
+            hits.append((batch[j], method, rows, values, lower, upper))
+    result = metrics.assemble_anomalies(sample, hits, methods)
+
+    cap = metrics.TOP_OUTLIERS_PER_COLUMN
+    by_column: Dict[str, int] = {}
+    by_type = {key: 0 for key in result["by_type"]}
+    estimate = lower_total = upper_total = 0.0
+    for (pos, method), count in sample_counts.items():
+        lo, hi = wilson_interval(count, m)
+        point = min(cap, round(count / m * total_rows))
+        if point > 0:
+            column = sample.columns[pos]
+            by_column[column] = by_column.get(column, 0) + point
+        by_type[f"outlier_{method}"] += point
+        estimate += point
+        lower_total += min(cap, lo * total_rows)
+        upper_total += min(cap, hi * total_rows)
+
+    result["by_column"] = by_column
+    result["by_type"] = by_type
+    result["total"] = int(estimate)
+
+    cells = total_rows * sample.shape[1]
+    if cells == 0:
+        return result, _interval(0.0, 0.0, 0.0)
+    return result, _interval(estimate / cells, lower_total / cells, upper_total / cells)
+
+def score_interval(
+    score: float,
+    missing: Dict[str, float],
+    duplicates: Dict[str, float],
+    anomalies: Dict[str, float],
+) -> Dict[str, float]:
+    """评分随三项比率单调递减：比率区间上界对应评分下界"""
+    def _score(key: str) -> float:
+        return scoring.calculate_quality_score(
+            missing_rate=missing[key], duplicate_rate=duplicates[key], anomaly_rate=anomalies[key]
+        )
+    return {"estimate": score, "lower": min(score, _score("upper")), "upper": max(score, _score("lower"))}
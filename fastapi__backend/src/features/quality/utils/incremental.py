@@ -0,0 +1,131 @@
+# 文件路径: src/features/quality/utils/incremental.py
+
+import hashlib
+import json
+from concurrent.futures import Executor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.features.quality.utils import metrics, parallel
+from src.shared.utils.dataframe_utils import logical_dtype_names
+from src.shared.utils.row_hash import DuplicateGroups, column_fingerprint, combine_column_hashes, hash_columns
+
+# =========================================================
+# 增量质量分析 (Column-fingerprint Incremental Analysis)
+#
+# 每列的统计 (缺失数 / 逻辑 dtype / 各方法的离群值命中) 只依赖该列自身的内容，
+# 按“列内容指纹 + 检测参数签名”持久化后，重新分析时只需重算指纹变化的列；
+# 重复行 / 评分等数据集级指标由列统计 + 一遍新的行哈希重新汇总。
+# 列哈希本身就是行哈希的组成部分，指纹与行哈希共用同一遍哈希。
+# =========================================================
+
+# 列统计的结构版本：结构或口径变化时递增，旧缓存自动失效
+PARTIALS_VERSION = 1
+
+ColumnPartial = Dict[str, Any]
+
+def params_signature(methods: Sequence[str]) -> str:
+    """检测参数签名：方法与全部阈值都参与，任一变化都不会复用旧结果"""
+    params = {
+        "version": PARTIALS_VERSION,
+        "methods": list(methods),
+        "iqr": metrics.IQR_MULTIPLIER,
+        "zscore": metrics.ZSCORE_THRESHOLD,
+        "mad": [metrics.MAD_THRESHOLD, metrics.MAD_SCALE],
+        "percentile": list(metrics.PERCENTILE_BAND),
+        "top": metrics.TOP_OUTLIERS_PER_COLUMN,
+        "categorical": metrics.CATEGORICAL_UNIQUE_THRESHOLD,
+    }
+    raw = json.dumps(params, sort_keys=True, separators=(",", ":"))
+    return hashlib.md5(raw.encode("utf-8")).hexdigest()[:12]
+
+def fingerprint_columns(df: pd.DataFrame) -> Tuple[List[str], np.ndarray]:
+    """
+    一遍哈希同时得到每列的内容指纹与每行的行哈希
+
+    Returns:
+        (列指纹列表 (按列位置), 行哈希)
+    """
+    column_hashes = hash_columns(df)
+    fingerprints = [
+        column_fingerprint(h, dtype_name)
+        for h, dtype_name in zip(column_hashes, logical_dtype_names(df))
+    ]
+    return fingerprints, combine_column_hashes(column_hashes, len(df))
+
+def duplicate_stats(df: pd.DataFrame, hashes: np.ndarray) -> Dict[str, Any]:
+    """由 fingerprint_columns 得到的行哈希计算重复统计 (与 calculate_duplicate_stats 一致)"""
+    return metrics._duplicates_from_groups(DuplicateGroups.from_hashes(hashes), df.index)
+
+def compute_column_partials(
+    df: pd.DataFrame,
+    positions: Sequence[int],
+    methods: Sequence[str],
+    executor: Optional[Executor] = None,
+    workers: int = 1,
+) -> Dict[int, ColumnPartial]:
+    """
+    计算指定列的列统计 (结构可直接 JSON 序列化)
+
+    离群值的行号是 0-based 行位置：列指纹包含行顺序，位置在复用时仍然有效。
+    """
+    positions = list(positions)
+    partials: Dict[int, ColumnPartial] = {}
+    if not positions:
+        return partials
+
+    sub = df.iloc[:, positions]
+    missing_counts = sub.isna().sum().to_numpy()
+    for pos, n_missing, dtype_name in zip(positions, missing_counts.tolist(), logical_dtype_names(sub)):
+        partials[pos] = {"missing": int(n_missing), "dtype": dtype_name, "outliers": []}
+
+    numeric = [i for i in metrics._numeric_positions(df) if i in partials]
+    hits: List[metrics.OutlierHit] = []
+    if executor is not None and parallel.should_parallelize(df.iloc[:, numeric], workers):
+        _, hits = parallel.parallel_numeric_scan(df, methods, executor, workers, positions=numeric)
+    else:
+        for batch, block in metrics._iter_numeric_blocks(df, numeric):
+            _, block_hits = metrics.detect_block_outliers(block, methods)
+            hits.extend((batch[hit[0]],) + hit[1:] for hit in block_hits)
+
+    for pos, method, rows, values, lower, upper in hits:
+        partials[pos]["outliers"].append({
+            "method": method,
+            "rows": rows.tolist(),
+            "values": values.tolist(),
+            "lower": lower,
+            "upper": upper,
+        })
+    return partials
+
+def assemble_from_partials(
+    df: pd.DataFrame,
+    partials: List[ColumnPartial],
+    methods: Sequence[str],
+) -> Dict[str, Any]:
+    """
+    由按列位置排列的列统计汇总出缺失 / 异常 / 类型三项 (结构与 metrics 完全一致)
+    """
+    n_rows = len(df)
+    counts = pd.Series([p["missing"] for p in partials], index=df.columns, dtype=np.int64)
+    missing = metrics._missing_from_counts(counts, n_rows)
+
+    hits: List[metrics.OutlierHit] = []
+    for pos, partial in enumerate(partials):
+        for o in partial["outliers"]:
+            if o["method"] not in methods:
+                continue
+            hits.append((
+                pos,
+                o["method"],
+                np.asarray(o["rows"], dtype=np.int64),
+                np.asarray(o["values"], dtype=np.float64),
+                float(o["lower"]),
+                float(o["upper"]),
+            ))
+    anomalies = metrics.assemble_anomalies(df, hits, methods)
+
+    types = {col: partial["dtype"] for col, partial in zip(df.columns, partials)}
+    return {"missing": missing, "anomalies": anomalies, "types": types}
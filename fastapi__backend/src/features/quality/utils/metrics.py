@@ -1,24 +1,53 @@
 # 文件路径: src/features/quality/utils/metrics.py
 
+import time
+from concurrent.futures import Executor
 import pandas as pd
 import numpy as np
-from typing import Dict, Any, List
+from typing import Dict, Any, Iterator, List, Optional, Sequence, Tuple, Union
+
+from src.shared.utils.dataframe_utils import logical_dtype_names
+from src.shared.utils.row_hash import DuplicateGroups, find_duplicate_groups, hash_rows
+
+# 离群值检测口径 (全量 / 流式 / 融合计算共用)
+IQR_MULTIPLIER = 3.0
+TOP_OUTLIERS_PER_COLUMN = 50
+CATEGORICAL_UNIQUE_THRESHOLD = 20
+
+# 其余检测方法的阈值
+ZSCORE_THRESHOLD = 3.0           # |x - 均值| / 标准差 (总体标准差, ddof=0)
+MAD_THRESHOLD = 3.5              # 修正 Z 分数 0.6745 * |x - 中位数| / MAD (Iglewicz & Hoaglin)
+MAD_SCALE = 0.6745
+PERCENTILE_BAND = (0.005, 0.995) # 落在 P0.5 ~ P99.5 之外
+
+# 支持的检测方法 (输出顺序按此排列)；details.type 为 "outlier_<method>"
+ANOMALY_METHODS = ("iqr", "zscore", "mad", "percentile")
+DEFAULT_ANOMALY_METHODS = ("iqr",)
+
+def normalize_methods(methods: Optional[Sequence[str]]) -> Tuple[str, ...]:
+    """去重并按 ANOMALY_METHODS 的顺序排列；空值表示默认 (只做 IQR)"""
+    if not methods:
+        return DEFAULT_ANOMALY_METHODS
+    unknown = [m for m in methods if m not in ANOMALY_METHODS]
+    if unknown:
+        raise ValueError(f"Unsupported anomaly method(s): {unknown}")
+    return tuple(m for m in ANOMALY_METHODS if m in methods)
 
 # =========================================================
 # 1. 缺失值分析 (Missing)
 # =========================================================
 
-def calculate_missing_stats(df: pd.DataFrame) -> Dict[str, Any]:
-    """计算缺失值统计"""
-    total_cells = df.size
-    total_missing = int(df.isnull().sum().sum())
-    
+def _missing_from_counts(counts: pd.Series, n_rows: int) -> Dict[str, Any]:
+    """[Internal] 由每列缺失计数派生缺失统计 (counts 索引为列名)"""
+    total_cells = n_rows * len(counts)
+    total_missing = int(counts.sum())
+
     overall_rate = (total_missing / total_cells) if total_cells > 0 else 0.0
-    
-    missing_series = df.isnull().sum() / len(df)
+
+    missing_series = counts / n_rows if n_rows > 0 else counts.astype(np.float64)
     # 过滤掉缺失率为0的列，只返回有问题的列
     by_column = missing_series[missing_series > 0].round(4).to_dict()
-    
+
     return {
         "total_missing_cells": total_missing,
         "missing_rate": round(overall_rate, 4),
@@ -26,135 +55,283 @@ def calculate_missing_stats(df: pd.DataFrame) -> Dict[str, Any]:
         "columns_with_missing": list(by_column.keys())
     }
 
+def calculate_missing_stats(df: pd.DataFrame) -> Dict[str, Any]:
+    """计算缺失值统计"""
+    return _missing_from_counts(df.isnull().sum(), len(df))
+
 # =========================================================
 # 2. 重复行分析 (Duplicates)
 # =========================================================
 
-def calculate_duplicate_stats(df: pd.DataFrame) -> Dict[str, Any]:
-    """计算重复行统计"""
-    total_rows = len(df)
+# 重复组明细：最多列出的组数 / 每组最多列出的行号数
+LARGEST_DUPLICATE_GROUPS = 10
+GROUP_ROWS_LIMIT = 20
+
+def _duplicates_from_groups(groups: DuplicateGroups, index: pd.Index) -> Dict[str, Any]:
+    """[Internal] 由行分组派生重复统计 (行号均为 1-based)"""
+    total_rows = groups.n_rows
     if total_rows == 0:
-        return {"total_duplicate_rows": 0, "unique_duplicate_groups": 0, "duplicate_rate": 0.0, "rows": []}
+        return {"total_duplicate_rows": 0, "unique_duplicate_groups": 0, "duplicate_rate": 0.0, "rows": [], "largest_groups": []}
 
     # keep='first' 标记除第一次出现外的所有重复项
-    dup_mask = df.duplicated(keep='first')
-    total_duplicates = int(dup_mask.sum())
-    
-    # 只有当有重复时才计算组数，节省性能
-    unique_groups = 0
-    if total_duplicates > 0:
-        unique_groups = df[df.duplicated(keep=False)].drop_duplicates().shape[0]
+    dup_mask = groups.duplicate_mask(keep="first")
+    total_duplicates = groups.total_duplicates
 
+    largest = [
+        {"size": g["size"], "rows": (index[g["rows"]] + 1).tolist()}
+        for g in groups.largest(LARGEST_DUPLICATE_GROUPS, GROUP_ROWS_LIMIT)
+    ]
     return {
         "total_duplicate_rows": total_duplicates,
-        "unique_duplicate_groups": unique_groups,
+        "unique_duplicate_groups": groups.group_count,
         "duplicate_rate": round(total_duplicates / total_rows, 4),
         # 转换为 1-based 行号，方便前端显示
-        "rows": (df[dup_mask].index + 1).tolist()
+        "rows": (index[dup_mask] + 1).tolist(),
+        "largest_groups": largest,
     }
 
+def calculate_duplicate_stats(df: pd.DataFrame, verify: bool = False) -> Dict[str, Any]:
+    """
+    计算重复行统计 (基于行哈希，一次排序完成分组，不复制重复行)
+
+    Args:
+        verify: 逐值复核哈希相同的行，排除 64 位哈希碰撞
+    """
+    return _duplicates_from_groups(find_duplicate_groups(df, verify=verify), df.index)
+
 # =========================================================
-# 3. 异常值分析 (Anomalies - IQR & Z-score)
+# 3. 异常值分析 (Anomalies - IQR / Z-score / MAD / Percentile)
 # =========================================================
-def _is_likely_categorical(series: pd.Series, threshold_ratio: float = 0.05, threshold_count: int = 20) -> bool:
+# 数值块按列分批处理时每批的内存上限 (原值块 + 排序副本各一份)
+ANOMALY_BLOCK_BYTES = 64 * 1024 * 1024
+
+def _numeric_positions(df: pd.DataFrame) -> List[int]:
+    """[Internal] 数值列的位置 (与 select_dtypes(include=np.number) 一致，bool 不参与)"""
+    return [
+        i for i, dtype in enumerate(df.dtypes)
+        if pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)
+    ]
+
+def _iter_numeric_blocks(df: pd.DataFrame, positions: List[int]) -> Iterator[Tuple[List[int], np.ndarray]]:
     """
-    [Internal] 判断一列数字是否像分类变量 (Categorical/Ordinal)
-    
-    逻辑：
-    1. 如果唯一值数量 (nunique) 非常少 (< 20)，通常是枚举 (如性别 0/1，月份 1-12，评分 1-5)。
-    2. 如果唯一值占比 (nunique/count) 非常低 (< 5%)，说明大量重复，不适合做离群点检测。
-    """
-    # 移除空值后计算
-    clean_series = series.dropna()
-    if len(clean_series) == 0:
-        return False
-        
-    n_unique = clean_series.nunique()
-    ratio = n_unique / len(clean_series)
-    
-    # 判定条件：唯一值很少 OR 唯一值占比极低
-    # 例如：1000行数据，只有 10 个不同的值 -> True (跳过检测)
-    if n_unique <= threshold_count:
-        return True
-    
-    # 宽松模式：如果你希望更严格，可以把这个条件去掉，或者 ratio 设得更小
-    # if ratio < threshold_ratio:
-    #     return True
-        
-    return False
+    [Internal] 把数值列按批拼成 (行数 x 列数) 的 float64 二维块，缺失值为 NaN
 
-def _detect_iqr(series: pd.Series, col_name: str, multiplier: float = 3.0) -> List[Dict[str, Any]]:
+    块为列优先 (Fortran) 布局：沿 axis 0 的排序 / 归约都在连续内存上进行。
     """
-    [Internal] 计算单列 IQR 异常值 (Extreme Outliers)
-    
-    Args:
-        multiplier: 默认 3.0 (极端异常值)，之前是 1.5 (常规异常值)
+    n_rows = len(df)
+    if n_rows == 0:
+        return
+    per_batch = max(1, ANOMALY_BLOCK_BYTES // max(1, 2 * n_rows * 8))
+    for start in range(0, len(positions), per_batch):
+        batch = positions[start:start + per_batch]
+        block = np.empty((n_rows, len(batch)), dtype=np.float64, order="F")
+        for j, i in enumerate(batch):
+            block[:, j] = df.iloc[:, i].to_numpy(dtype=np.float64, na_value=np.nan)
+        yield batch, block
+
+def _sorted_quantiles(sorted_block: np.ndarray, counts: np.ndarray, qs: Sequence[float]) -> np.ndarray:
     """
-    Q1 = series.quantile(0.25)
-    Q3 = series.quantile(0.75)
-    IQR = Q3 - Q1
-    
-    # 防御：如果数据极度集中 (如 75% 的数都是同一个)，IQR 为 0，会导致误判
-    if IQR == 0:
-        return []
+    [Internal] 在已排序 (NaN 在尾部) 的二维块上按列求分位数，返回 (len(qs), 列数)
 
-    lower = Q1 - multiplier * IQR
-    upper = Q3 + multiplier * IQR
-    
-    mask = (series < lower) | (series > upper)
-    outliers = series[mask]
-    
-    details = []
-    # 限制返回数量，只取前 50 个典型的，避免前端渲染卡死
-    # 排序：取偏离最远的 (最大或最小)
-    top_outliers = outliers.sort_values(key=lambda x: abs(x - series.median()), ascending=False).head(50)
-
-    for idx, val in top_outliers.items():
-        details.append({
-            # 🔧 FIX: 类型转换，确保 JSON 序列化安全
-            "row": int(idx) + 1, # type: ignore
-            "column": col_name,
-            "value": float(val), 
-            "type": "outlier_iqr",
-            "reason": f"超出极值范围 [{lower:.2f}, {upper:.2f}] (IQR x {multiplier})"
-        })
-    return details
-
-def calculate_anomaly_stats(df: pd.DataFrame, method: str = 'iqr') -> Dict[str, Any]:
-    """
-    计算异常值统计 (智能优化版)
-    """
-    # 1. 只选数值列
-    numeric_df = df.select_dtypes(include=np.number)
-    
-    all_details = []
+    与 np.quantile(method="linear") 的取点与插值公式逐位一致；没有有效值的列返回 NaN。
+    """
+    qs = np.asarray(qs, dtype=np.float64)[:, None]
+    last = np.maximum(counts - 1, 0)
+    virtual = last * qs
+    previous = np.floor(virtual)
+    above = virtual >= last
+    gamma = virtual - np.where(above, -1.0, previous)
+    lo = np.where(above, last, previous).astype(np.intp)
+    hi = np.where(above, last, previous + 1).astype(np.intp)
+
+    a = np.take_along_axis(sorted_block, lo, axis=0)
+    b = np.take_along_axis(sorted_block, hi, axis=0)
+    diff = b - a
+    result = np.where(gamma >= 0.5, b - diff * (1 - gamma), a + diff * gamma)
+    result[:, counts == 0] = np.nan
+    return result
+
+def _distinct_counts(sorted_block: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """[Internal] 每列唯一值个数 (已排序块上相邻值不同的次数 + 1)"""
+    if sorted_block.shape[0] == 0:
+        return np.zeros(sorted_block.shape[1], dtype=np.int64)
+    changes = (sorted_block[1:] != sorted_block[:-1]) & ~np.isnan(sorted_block[1:])
+    return changes.sum(axis=0) + (counts > 0)
+
+def _top_by_distance(distance: np.ndarray, rows: np.ndarray, limit: int = TOP_OUTLIERS_PER_COLUMN) -> np.ndarray:
+    """
+    [Internal] 取偏离最远的 limit 个的下标 (O(n) 选择，不对全部离群值排序)
+    距离相同时取行号靠前的，保证结果可复现
+    """
+    if distance.size <= limit:
+        return np.arange(distance.size)
+    kth = distance.size - limit
+    cutoff = distance[np.argpartition(distance, kth)[kth]]
+    candidates = np.flatnonzero(distance >= cutoff)
+    order = np.lexsort((rows[candidates], -distance[candidates]))[:limit]
+    return candidates[order]
+
+def outlier_bounds(method: str, stats: Dict[str, Any]) -> Tuple[Any, Any, Any, Any]:
+    """
+    由列统计量得到某方法的 (lower, upper, center, valid)
+
+    stats 的值可以是标量 (流式) 或按列的数组 (全量)，键：q1 / median / q3 / mean / std / mad / p_low / p_high
+    center 用于挑选“偏离最远”的 Top 50；valid 为 False 的列不检测 (离散度为 0 时会把所有非众数值都判为异常)
+    """
+    if method == "iqr":
+        iqr = stats["q3"] - stats["q1"]
+        return stats["q1"] - IQR_MULTIPLIER * iqr, stats["q3"] + IQR_MULTIPLIER * iqr, stats["median"], iqr != 0
+    if method == "zscore":
+        spread = ZSCORE_THRESHOLD * stats["std"]
+        return stats["mean"] - spread, stats["mean"] + spread, stats["mean"], stats["std"] > 0
+    if method == "mad":
+        spread = MAD_THRESHOLD * stats["mad"] / MAD_SCALE
+        return stats["median"] - spread, stats["median"] + spread, stats["median"], stats["mad"] > 0
+    if method == "percentile":
+        return stats["p_low"], stats["p_high"], stats["median"], stats["p_high"] > stats["p_low"]
+    raise ValueError(f"Unsupported anomaly method: {method}")
+
+def outlier_reason(method: str, lower: float, upper: float) -> str:
+    """异常原因的文字描述"""
+    if method == "iqr":
+        return f"超出极值范围 [{lower:.2f}, {upper:.2f}] (IQR x {IQR_MULTIPLIER})"
+    if method == "zscore":
+        return f"超出范围 [{lower:.2f}, {upper:.2f}] (|Z| > {ZSCORE_THRESHOLD})"
+    if method == "mad":
+        return f"超出范围 [{lower:.2f}, {upper:.2f}] (修正 Z 分数 (MAD) > {MAD_THRESHOLD})"
+    low_pct, high_pct = PERCENTILE_BAND[0] * 100, PERCENTILE_BAND[1] * 100
+    return f"超出分位区间 [{lower:.2f}, {upper:.2f}] (P{low_pct:g} - P{high_pct:g})"
+
+def empty_anomaly_stats(methods: Sequence[str] = DEFAULT_ANOMALY_METHODS) -> Dict[str, Any]:
+    """异常统计的初始结构；by_type 始终包含 outlier_iqr / outlier_zscore 两个键 (兼容旧前端)"""
     by_type = {"outlier_iqr": 0, "outlier_zscore": 0}
-    by_column = {}
-    
-    for col in numeric_df.columns:
-        series = numeric_df[col]
-        
-        # 2. ⭐️ 智能跳过逻辑：如果是 ID 列、枚举列、月份列等，跳过检测
-        if _is_likely_categorical(series):
-            # 可以在日志里记录一下：logger.debug(f"Skipping anomaly detection for categorical-like column: {col}")
-            continue
+    by_type.update({f"outlier_{m}": 0 for m in methods})
+    return {"total": 0, "by_type": by_type, "by_column": {}, "details": []}
 
-        # 3. 计算 IQR (使用 3.0 倍率)
-        column_anomalies = _detect_iqr(series, col, multiplier=3.0)
-        
-        if column_anomalies:
-            count = len(column_anomalies)
-            by_column[col] = count
-            by_type["outlier_iqr"] += count
-            all_details.extend(column_anomalies)
+def sort_anomaly_details(details: List[Dict[str, Any]], columns: Sequence[Any]) -> List[Dict[str, Any]]:
+    """按行号排序 (方便前端展示)；同一行内按方法、列的顺序，保证与分批 / 分块方式无关"""
+    method_rank = {f"outlier_{m}": i for i, m in enumerate(ANOMALY_METHODS)}
+    column_rank = {c: i for i, c in enumerate(columns)}
+    return sorted(
+        details,
+        key=lambda x: (x['row'], method_rank.get(x['type'], len(method_rank)), column_rank.get(x['column'], 0)),
+    )
 
-    return {
-        "total": len(all_details),
-        "by_type": by_type,
-        "by_column": by_column,
-        # 按行号排序，方便前端展示
-        "details": sorted(all_details, key=lambda x: x['row'])
+def _block_stats(block: np.ndarray, methods: Sequence[str]) -> Dict[str, np.ndarray]:
+    """
+    [Internal] 一次按列排序，得到所选方法需要的全部列统计量
+    MAD 需要对 |x - 中位数| 再排序一次，只在请求了 mad 时计算
+    """
+    counts = (~np.isnan(block)).sum(axis=0)
+    sorted_block = np.sort(block, axis=0)
+    q1, median, q3, p_low, p_high = _sorted_quantiles(
+        sorted_block, counts, [0.25, 0.5, 0.75, PERCENTILE_BAND[0], PERCENTILE_BAND[1]]
+    )
+    stats = {
+        "count": counts,
+        "distinct": _distinct_counts(sorted_block, counts),
+        "q1": q1, "median": median, "q3": q3, "p_low": p_low, "p_high": p_high,
     }
+    del sorted_block
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        if "zscore" in methods:
+            total = np.nansum(block, axis=0)
+            mean = np.where(counts > 0, total / np.maximum(counts, 1), np.nan)
+            squared = np.nansum((block - mean) ** 2, axis=0)
+            stats["mean"] = mean
+            stats["std"] = np.sqrt(np.where(counts > 0, squared / np.maximum(counts, 1), np.nan))
+        if "mad" in methods:
+            deviation = np.sort(np.abs(block - median), axis=0)
+            stats["mad"] = _sorted_quantiles(deviation, counts, [0.5])[0]
+    return stats
+
+# 单列单方法的命中结果：(列位置, 方法, 行位置, 值, lower, upper)，行 / 值已截取 Top 50
+OutlierHit = Tuple[int, str, np.ndarray, np.ndarray, float, float]
+
+def detect_block_outliers(block: np.ndarray, methods: Sequence[str]) -> Tuple[np.ndarray, List[OutlierHit]]:
+    """
+    在一个数值块上运行所选检测方法 (不依赖 DataFrame，进程池 worker 也直接调用)
+
+    Returns:
+        (每列非空值个数, 命中列表)；命中列表里的列位置是块内的列号
+    """
+    stats = _block_stats(block, methods)
+    hits: List[OutlierHit] = []
+    # ⭐️ 智能跳过：唯一值很少 (<= 20) 的列通常是枚举 (性别 0/1、月份 1-12、评分 1-5)，不做检测
+    eligible = (stats["count"] > 0) & (stats["distinct"] > CATEGORICAL_UNIQUE_THRESHOLD)
+    if not eligible.any():
+        return stats["count"], hits
+
+    for m in methods:
+        lower, upper, center, valid = outlier_bounds(m, stats)
+        active = eligible & valid
+        if not active.any():
+            continue
+
+        # 整块越界掩码 (NaN 比较结果为 False)；转置后按 (列, 行) 顺序取出命中位置
+        mask = (block < lower) | (block > upper)
+        mask[:, ~active] = False
+        hit_cols, hit_rows = np.nonzero(mask.T)
+        if hit_cols.size == 0:
+            continue
+        splits = np.searchsorted(hit_cols, np.arange(1, block.shape[1]))
+
+        for j, rows in enumerate(np.split(hit_rows, splits)):
+            if rows.size == 0:
+                continue
+            values = block[rows, j]
+            pick = _top_by_distance(np.abs(values - center[j]), rows)
+            hits.append((j, m, rows[pick], values[pick], float(lower[j]), float(upper[j])))
+    return stats["count"], hits
+
+def assemble_anomalies(df: pd.DataFrame, hits: List[OutlierHit], methods: Sequence[str]) -> Dict[str, Any]:
+    """
+    把命中结果 (列位置为 DataFrame 中的全局位置) 组装为 AnomalyStatistics 结构
+    先按 (列位置, 方法) 排序，结果与分批 / 分进程方式无关
+    """
+    method_rank = {m: i for i, m in enumerate(ANOMALY_METHODS)}
+    result = empty_anomaly_stats(methods)
+    all_details: List[Dict[str, Any]] = result["details"]
+    by_type: Dict[str, int] = result["by_type"]
+    by_column: Dict[str, int] = result["by_column"]
+
+    for pos, m, rows, values, lower, upper in sorted(hits, key=lambda h: (h[0], method_rank[h[1]])):
+        col = df.columns[pos]
+        reason = outlier_reason(m, lower, upper)
+        for row, val in zip(df.index[rows], values.tolist()):
+            all_details.append({
+                # 🔧 FIX: 类型转换，确保 JSON 序列化安全
+                "row": int(row) + 1,
+                "column": col,
+                "value": float(val),
+                "type": f"outlier_{m}",
+                "reason": reason,
+            })
+        by_column[col] = by_column.get(col, 0) + len(rows)
+        by_type[f"outlier_{m}"] += len(rows)
+
+    result["total"] = len(all_details)
+    result["details"] = sort_anomaly_details(all_details, df.columns)
+    return result
+
+def calculate_anomaly_stats(df: pd.DataFrame, method: Union[str, Sequence[str]] = 'iqr') -> Dict[str, Any]:
+    """
+    计算异常值统计 (向量化版)
+
+    数值列拼成二维块整体处理：一次按列排序得到全部分位数 / 中位数 / 唯一值个数，
+    多种方法共享同一份统计量，越界掩码整块生成，每列每种方法 Top 50 用 argpartition 选出。
+
+    Args:
+        method: 检测方法，单个或列表："iqr" / "zscore" / "mad" / "percentile"
+    """
+    methods = normalize_methods([method] if isinstance(method, str) else method)
+    hits: List[OutlierHit] = []
+    for batch, block in _iter_numeric_blocks(df, _numeric_positions(df)):
+        _, block_hits = detect_block_outliers(block, methods)
+        hits.extend((batch[hit[0]],) + hit[1:] for hit in block_hits)
+    return assemble_anomalies(df, hits, methods)
+
 # =========================================================
 # 4. 类型推断 (Type Inference)
 # =========================================================
@@ -170,5 +347,92 @@ def infer_column_types(df: pd.DataFrame) -> Dict[str, str]:
         Dict[str, str]: e.g. {"age": "int64", "name": "object", "score": "float64"}
     """
     # dtypes 返回的是 Series，索引是列名，值是 dtype 对象
-    # 我们使用 apply(str) 将 dtype 对象转为字符串
-    return df.dtypes.apply(lambda x: str(x)).to_dict()
\ No newline at end of file
+    # 经过 dtype 压缩的列 (int8 / category ...) 映射回默认解析的名称，前端看到的类型不变
+    return dict(zip(df.columns, logical_dtype_names(df)))
+
+# =========================================================
+# 5. 融合计算 (Fused Kernel)
+# =========================================================
+
+def run_quality_kernel(
+    df: pd.DataFrame,
+    timings: Optional[Dict[str, float]] = None,
+    methods: Optional[Sequence[str]] = None,
+    executor: Optional[Executor] = None,
+    workers: int = 1,
+) -> Dict[str, Any]:
+    """
+    一次性计算缺失 / 重复 / 异常 / 类型四项指标
+
+    空值掩码与行哈希各只计算一次，数值列整块做一次排序完成异常检测，
+    输出结构与上面的 calculate_* 函数完全一致。
+
+    Args:
+        timings: 可选，写入各阶段耗时 (毫秒)，用于定位宽表上的瓶颈
+        methods: 异常检测方法，默认只做 IQR
+        executor / workers: 传入进程池且数值列足够多时，数值列的缺失计数与异常检测分块并行 (结果与单进程一致)
+
+    Returns:
+        {"missing": ..., "duplicates": ..., "anomalies": ..., "types": ..., "timings": {...}}
+    """
+    # 局部导入：parallel 依赖本模块
+    from src.features.quality.utils import parallel
+
+    methods = normalize_methods(methods)
+    phase_ms: Dict[str, float] = {}
+    clock = time.perf_counter()
+
+    def _lap(phase: str) -> None:
+        nonlocal clock
+        now = time.perf_counter()
+        phase_ms[phase] = round((now - clock) * 1000, 2)
+        clock = now
+
+    if executor is not None and parallel.should_parallelize(df, workers):
+        # --- 并行：数值列在 worker 中同时得到缺失计数与离群值，父进程只处理其余列 ---
+        numeric_missing, hits = parallel.parallel_numeric_scan(df, methods, executor, workers)
+        _lap("parallel_numeric")
+
+        others = [i for i in range(df.shape[1]) if i not in numeric_missing]
+        counts = np.zeros(df.shape[1], dtype=np.int64)
+        for i, n_missing in numeric_missing.items():
+            counts[i] = n_missing
+        if others:
+            counts[others] = df.iloc[:, others].isna().to_numpy().sum(axis=0)
+        missing = _missing_from_counts(pd.Series(counts, index=df.columns), len(df))
+        anomalies = assemble_anomalies(df, hits, methods)
+        _lap("missing")
+    else:
+        null_mask = df.isna().to_numpy()
+        _lap("null_mask")
+
+        missing = _missing_from_counts(
+            pd.Series(null_mask.sum(axis=0), index=df.columns), len(df)
+        )
+        _lap("missing")
+        anomalies = None
+
+    hashes = hash_rows(df)
+    _lap("row_hash")
+
+    duplicates = _duplicates_from_groups(DuplicateGroups.from_hashes(hashes), df.index)
+    _lap("duplicates")
+
+    if anomalies is None:
+        anomalies = calculate_anomaly_stats(df, methods)
+        _lap("anomalies")
+
+    types = infer_column_types(df)
+    _lap("types")
+
+    phase_ms["kernel_total"] = round(sum(phase_ms.values()), 2)
+    if timings is not None:
+        timings.update(phase_ms)
+
+    return {
+        "missing": missing,
+        "duplicates": duplicates,
+        "anomalies": anomalies,
+        "types": types,
+        "timings": phase_ms,
+    }
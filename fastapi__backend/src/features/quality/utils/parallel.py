@@ -0,0 +1,117 @@
+# 文件路径: src/features/quality/utils/parallel.py
+
+import math
+from concurrent.futures import Executor
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.app.config.settings import settings
+from src.features.quality.utils.metrics import (
+    ANOMALY_BLOCK_BYTES,
+    OutlierHit,
+    _numeric_positions,
+    detect_block_outliers,
+)
+
+# =========================================================
+# 按列分块的并行质量计算 (Column-partitioned Executor)
+#
+# 父进程把数值列写入一块共享内存 (列优先 float64，缺失为 NaN)，
+# worker 按名称挂载后只读取自己负责的列区间，返回非空计数与离群值命中 (Top 50 已截取)，
+# 不经过 pickle 传输数据本身。结果按列区间顺序合并，与单进程路径逐项一致。
+# 行哈希 (需要整行) 与非数值列的缺失计数仍在父进程完成。
+# =========================================================
+
+def _detect_worker(
+    shm_name: str,
+    shape: Tuple[int, int],
+    start: int,
+    stop: int,
+    methods: Sequence[str],
+) -> Tuple[int, np.ndarray, List[OutlierHit]]:
+    """[Worker] 在共享数值块的 [start, stop) 列上运行离群值检测"""
+    # spawn 出的 worker 与父进程共用同一个 resource_tracker，挂载时的登记是幂等的；
+    # 生命周期 (unlink) 只由创建方管理，worker 这里只 close
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        block = np.ndarray(shape, dtype=np.float64, buffer=shm.buf, order="F")
+        counts, hits = detect_block_outliers(block[:, start:stop], methods)
+        del block
+        return start, counts, hits
+    finally:
+        shm.close()
+
+def should_parallelize(df: pd.DataFrame, workers: int) -> bool:
+    """数值列足够多时才值得跨进程 (worker 启动与结果回传都有固定开销)"""
+    if workers <= 1 or len(df) == 0:
+        return False
+    min_columns = getattr(settings, "QUALITY_PARALLEL_MIN_COLUMNS", 64)
+    return len(_numeric_positions(df)) >= min_columns
+
+def _task_ranges(n_cols: int, n_rows: int, workers: int) -> List[Tuple[int, int]]:
+    """
+    把一轮的列切成若干任务：每个 worker 约 4 个任务 (负载均衡)，
+    且单个任务的排序副本不超过 ANOMALY_BLOCK_BYTES
+    """
+    by_memory = max(1, ANOMALY_BLOCK_BYTES // max(1, 2 * n_rows * 8))
+    by_balance = max(1, math.ceil(n_cols / (workers * 4)))
+    step = min(by_memory, by_balance)
+    return [(start, min(start + step, n_cols)) for start in range(0, n_cols, step)]
+
+def parallel_numeric_scan(
+    df: pd.DataFrame,
+    methods: Sequence[str],
+    executor: Executor,
+    workers: int,
+    positions: Optional[List[int]] = None,
+) -> Tuple[Dict[int, int], List[OutlierHit]]:
+    """
+    在进程池中扫描数值列
+
+    Args:
+        positions: 只扫描这些数值列 (默认全部数值列)
+
+    Returns:
+        ({列位置: 缺失个数}, 命中列表 (列位置为全局位置，按列顺序))
+    """
+    if positions is None:
+        positions = _numeric_positions(df)
+    n_rows = len(df)
+    shm_budget = getattr(settings, "QUALITY_PARALLEL_SHM_BYTES", 512 * 1024 * 1024)
+    per_wave = max(1, shm_budget // max(1, n_rows * 8))
+
+    missing: Dict[int, int] = {}
+    hits: List[OutlierHit] = []
+    for wave_start in range(0, len(positions), per_wave):
+        wave = positions[wave_start:wave_start + per_wave]
+        shape = (n_rows, len(wave))
+        shm = shared_memory.SharedMemory(create=True, size=max(1, n_rows * len(wave) * 8))
+        try:
+            block = np.ndarray(shape, dtype=np.float64, buffer=shm.buf, order="F")
+            for j, i in enumerate(wave):
+                block[:, j] = df.iloc[:, i].to_numpy(dtype=np.float64, na_value=np.nan)
+            del block
+
+            futures = [
+                executor.submit(_detect_worker, shm.name, shape, start, stop, list(methods))
+                for start, stop in _task_ranges(len(wave), n_rows, workers)
+            ]
+            try:
+                # 按提交顺序 (即列顺序) 收集，合并结果确定
+                for future in futures:
+                    start, counts, task_hits = future.result()
+                    for j, count in enumerate(counts.tolist()):
+                        missing[wave[start + j]] = n_rows - int(count)
+                    hits.extend((wave[start + hit[0]],) + hit[1:] for hit in task_hits)
+            except BaseException:
+                # 任一任务失败：取消尚未开始的任务，避免它们挂载即将释放的共享内存
+                for future in futures:
+                    future.cancel()
+                raise
+        finally:
+            shm.close()
+            shm.unlink()
+    return missing, hits
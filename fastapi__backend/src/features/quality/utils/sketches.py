@@ -0,0 +1,182 @@
+# 文件路径: src/features/quality/utils/sketches.py
+
+import numpy as np
+from typing import List, Optional, Tuple
+
+# =========================================================
+# 可合并的流式统计草图 (Mergeable Sketches)
+# 分块分析时每块只更新草图，内存占用与总行数无关
+# =========================================================
+
+class QuantileSketch:
+    """
+    KLL 风格的分位数草图 (多层压缩器)
+
+    - 第 h 层的每个元素代表 2^h 个原始值；某层超过容量 k 时排序，随机取奇/偶位提升到上一层
+    - 可合并：两个草图逐层拼接后再压缩，分块 / 多进程结果可以直接 merge
+    - 元素总数不超过 k 时从未压缩，quantile 与 pandas (linear 插值) 完全一致
+    - 秩误差约为 O(log(n/k) / k)，k=4096 时百万级数据的分位点误差在千分之一秩以内
+    """
+
+    def __init__(self, k: int = 4096, seed: int = 0):
+        self.k = k
+        self.count = 0
+        self.min = np.inf
+        self.max = -np.inf
+        self._levels: List[np.ndarray] = [np.empty(0, dtype=np.float64)]
+        self._rng = np.random.default_rng(seed)
+
+    @property
+    def is_exact(self) -> bool:
+        return len(self._levels) == 1
+
+    def update(self, values: np.ndarray) -> None:
+        """加入一批数值 (NaN / inf 会被忽略)"""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[np.isfinite(values)]
+        if values.size == 0:
+            return
+        self.count += int(values.size)
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self._levels[0] = np.concatenate([self._levels[0], values])
+        self._compress()
+
+    def merge(self, other: "QuantileSketch") -> None:
+        """把另一个草图合并进来 (other 不会被修改)"""
+        if other.count == 0:
+            return
+        while len(self._levels) < len(other._levels):
+            self._levels.append(np.empty(0, dtype=np.float64))
+        for h, items in enumerate(other._levels):
+            self._levels[h] = np.concatenate([self._levels[h], items])
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+
+    def _compress(self) -> None:
+        h = 0
+        while h < len(self._levels):
+            items = self._levels[h]
+            if items.size > self.k:
+                items = np.sort(items)
+                # 奇数个时留下一个在本层，保证权重守恒
+                keep = items[-1:] if items.size % 2 else items[:0]
+                even = items[: items.size - keep.size]
+                promoted = even[int(self._rng.integers(2))::2]
+                self._levels[h] = keep
+                if h + 1 == len(self._levels):
+                    self._levels.append(np.empty(0, dtype=np.float64))
+                self._levels[h + 1] = np.concatenate([self._levels[h + 1], promoted])
+            h += 1
+
+    def quantile(self, q: float) -> float:
+        """估算分位数 q ∈ [0, 1]，空草图返回 NaN"""
+        if self.count == 0:
+            return float("nan")
+        if self.is_exact:
+            return float(np.quantile(self._levels[0], q))
+
+        items = np.concatenate(self._levels)
+        weights = np.concatenate([np.full(lv.size, 2 ** h, dtype=np.float64) for h, lv in enumerate(self._levels)])
+        order = np.argsort(items, kind="stable")
+        items, weights = items[order], weights[order]
+        # 权重为 w 的元素覆盖秩 [cum-w, cum)，取区间中点，再按 pandas 的 (n-1)*q 口径线性插值
+        cum = np.cumsum(weights)
+        mid_rank = cum - weights / 2.0 - 0.5
+        value = float(np.interp(q * (self.count - 1), mid_rank, items))
+        return min(max(value, self.min), self.max)
+
+class DistinctCounter:
+    """
+    有上限的精确去重计数：只关心“唯一值是否超过 limit”这类判断时使用
+    超过上限后停止记录，内存恒定
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._values: Optional[set] = set()
+
+    @property
+    def exceeded(self) -> bool:
+        return self._values is None
+
+    def update(self, values: np.ndarray) -> None:
+        if self._values is None:
+            return
+        self._values.update(np.unique(values).tolist())
+        if len(self._values) > self.limit:
+            self._values = None
+
+    def count(self) -> Optional[int]:
+        """唯一值个数；超过上限时返回 None"""
+        return None if self._values is None else len(self._values)
+
+class DuplicateSketch:
+    """
+    按哈希值抽样的重复行草图 (Hash-based Group Sampling)
+
+    - 只保留哈希落在值域前 1/2^level 的行：内容相同的行哈希相同，整组要么全部保留要么全部丢弃，
+      保留部分内的重复行数按 2^level 放大即为全体重复行数的无偏 (Horvitz-Thompson) 估计
+    - 保留的是 (哈希, 出现次数)，超过 capacity 个不同哈希时 level + 1，值域减半，内存恒定
+    - 从未升级 (level = 0) 时结果是精确的
+    """
+
+    def __init__(self, capacity: int = 1 << 17):
+        self.capacity = capacity
+        self.level = 0
+        self.rows = 0
+        self._hashes = np.empty(0, dtype=np.uint64)
+        self._counts = np.empty(0, dtype=np.int64)
+        self._pending: List[np.ndarray] = []
+        self._pending_size = 0
+
+    @property
+    def sampling_rate(self) -> float:
+        """保留的哈希值域比例 (即每组被保留的概率)"""
+        return 2.0 ** -self.level
+
+    def _threshold(self) -> Optional[np.uint64]:
+        return None if self.level == 0 else np.uint64(1 << (64 - self.level))
+
+    def update(self, hashes: np.ndarray) -> None:
+        """加入一批行哈希 (uint64)"""
+        hashes = np.asarray(hashes).view(np.uint64)
+        self.rows += int(hashes.size)
+        threshold = self._threshold()
+        if threshold is not None:
+            hashes = hashes[hashes < threshold]
+        self._pending.append(hashes)
+        self._pending_size += int(hashes.size)
+        if self._pending_size > self.capacity:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self._pending:
+            return
+        merged = np.concatenate([self._hashes] + self._pending)
+        weights = np.concatenate([self._counts] + [np.ones(p.size, dtype=np.int64) for p in self._pending])
+        self._pending, self._pending_size = [], 0
+        keys, inverse = np.unique(merged, return_inverse=True)
+        counts = np.bincount(inverse.reshape(-1), weights=weights, minlength=keys.size).astype(np.int64)
+        while keys.size > self.capacity and self.level < 63:
+            self.level += 1
+            keep = keys < self._threshold()
+            keys, counts = keys[keep], counts[keep]
+        self._hashes, self._counts = keys, counts
+
+    def estimate(self) -> Tuple[float, float, float]:
+        """
+        重复行数 (keep='first' 口径) 的估计值与标准误，以及重复组数的估计值
+
+        Returns:
+            (重复行数, 标准误, 重复组数)；level = 0 时均为精确值，标准误为 0
+        """
+        self._flush()
+        extra = self._counts - 1
+        p = self.sampling_rate
+        total = float(extra.sum()) / p
+        variance = (1.0 - p) / (p * p) * float(np.square(extra, dtype=np.float64).sum())
+        groups = float((extra > 0).sum()) / p
+        return total, float(np.sqrt(variance)), groups
@@ -0,0 +1,371 @@
+# 文件路径: src/features/quality/utils/streaming.py
+
+import pandas as pd
+import numpy as np
+from typing import Dict, Any, List, Optional, Tuple
+
+from src.features.quality.utils.sketches import QuantileSketch, DistinctCounter
+from src.features.quality.utils.metrics import (
+    CATEGORICAL_UNIQUE_THRESHOLD,
+    PERCENTILE_BAND,
+    _duplicates_from_groups,
+    _top_by_distance,
+    empty_anomaly_stats,
+    sort_anomaly_details,
+    normalize_methods,
+    outlier_bounds,
+    outlier_reason,
+)
+from src.shared.utils.row_hash import DuplicateGroups, hash_rows
+
+# =========================================================
+# 流式质量分析 (Streaming Quality Metrics)
+#
+# 两遍扫描，每遍逐块消费，输出与 metrics.py 的全量计算口径一致：
+#   第一遍：缺失计数 (精确) + 行哈希 (重复检测) + 数值列分位数草图 / 均值方差 + 类型推断
+#   (仅 mad 方法) 偏差遍：按中位数累积 |x - 中位数| 的草图
+#   第二遍：用各方法的边界定位离群值，每列每种方法只保留偏离最大的 50 个
+#
+# 数据块按 dtype=str 读取：各块独立推断 dtype 会出现同一列一块是 int、一块是 object 的情况，
+# 这里统一按文本读入，再按整列口径判断是否数值 (与全量解析的推断规则一致)。
+#
+# 行哈希同样按整列口径归一：全量解析后数值列里的 "1" / "1.0" / "01" 都是 1.0，
+# 布尔列里的 "True" / "true" 都是 True，object 列保留原文本。数值列一律按 float64 哈希
+# (超过 2^53 的相邻整数会被视为相同，全量路径的 int64 列能区分)。
+# 某列在后面的块里才变成 object / 不再是布尔列时，前面按旧口径算的哈希作废，需要多扫一遍 (见 needs_hash_pass)。
+# =========================================================
+
+# pandas C 解析器默认识别的布尔字面量
+_BOOL_LITERALS = {"True", "TRUE", "true", "False", "FALSE", "false"}
+_TRUE_LITERALS = {"True", "TRUE", "true"}
+
+class _Candidates:
+    """单列单方法的离群值候选 (只保留偏离最远的 50 个)"""
+
+    def __init__(self):
+        self.rows = np.empty(0, dtype=np.int64)
+        self.values = np.empty(0, dtype=np.float64)
+        self.distance = np.empty(0, dtype=np.float64)
+
+    def add(self, rows: np.ndarray, values: np.ndarray, distance: np.ndarray) -> None:
+        rows = np.concatenate([self.rows, rows])
+        values = np.concatenate([self.values, values])
+        distance = np.concatenate([self.distance, distance])
+        keep = np.sort(_top_by_distance(distance, rows))
+        self.rows, self.values, self.distance = rows[keep], values[keep], distance[keep]
+
+class _ColumnState:
+    """单列的流式累积状态"""
+
+    def __init__(self, sketch_k: int):
+        self.missing = 0
+        self.numeric = True      # 所有非空值都能解析为数字
+        self.integral = True     # 每块都解析为整数且无缺失 -> int64
+        self.bool_like = True    # 全部是布尔字面量且无缺失 -> bool
+        self.bool_values = True  # 非空值全部是布尔字面量 (有缺失时全量解析为 True / False / NaN 的 object 列)
+        self.sketch: Optional[QuantileSketch] = QuantileSketch(k=sketch_k)
+        self.distinct = DistinctCounter(CATEGORICAL_UNIQUE_THRESHOLD)
+
+        # 均值 / 方差 (按块合并的 Chan 公式，zscore 使用)
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+        # 偏差遍：|x - 中位数| 的草图 (mad 使用)
+        self.median = float("nan")
+        self.deviation: Optional[QuantileSketch] = None
+
+        # 第二遍：离群值候选 (按方法)
+        self.outliers: Dict[str, _Candidates] = {}
+
+    def update_moments(self, values: np.ndarray) -> None:
+        n = int(values.size)
+        if n == 0:
+            return
+        mean = float(values.mean())
+        m2 = float(((values - mean) ** 2).sum())
+        total = self.n + n
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += m2 + delta * delta * self.n * n / total
+        self.n = total
+
+    @property
+    def eligible(self) -> bool:
+        """参与离群值检测：数值列、非布尔、唯一值超过 20 个"""
+        return (
+            self.numeric and not self.bool_like and self.sketch is not None
+            and self.sketch.count > 0 and self.distinct.exceeded
+        )
+
+    @property
+    def hash_mode(self) -> str:
+        """行哈希的归一口径：numeric / bool / text"""
+        if self.numeric:
+            return "numeric"
+        if self.bool_values:
+            return "bool"
+        return "text"
+
+    def dtype_name(self) -> str:
+        if self.bool_like:
+            return "bool"
+        if self.numeric:
+            return "int64" if self.integral else "float64"
+        return "object"
+
+class StreamingQualityAccumulator:
+    """
+    分块累积质量指标
+
+    内存：每列一个分位数草图 (约 k 个 float) + 每行 8 字节的行哈希，
+    与列宽无关；行哈希用于在结束时一次性 np.unique 得到精确的重复统计 (忽略 64 位哈希碰撞)。
+
+    调用顺序：consume (全部块) -> [needs_hash_pass 为 True 时 consume_hashes (全部块)]
+    -> [needs_deviation_pass 为 True 时 consume_deviations (全部块)]
+    -> outlier_bounds -> locate_outliers (全部块) -> 输出。
+    locate_outliers 在边界未计算时自动计算；顺序错误 (缺少偏差遍 / 第二遍未扫完) 时抛 RuntimeError，
+    不会静默返回空的离群值报告。
+    """
+
+    def __init__(self, columns: List[str], sketch_k: int = 4096, methods: Optional[List[str]] = None):
+        self.columns = [str(c) for c in columns]
+        self.methods = normalize_methods(methods)
+        self.row_count = 0
+        self._sketch_k = sketch_k
+        self._state: Dict[str, _ColumnState] = {c: _ColumnState(sketch_k) for c in self.columns}
+        self._row_hashes: List[np.ndarray] = []
+        # 已生成的行哈希所用的各列口径；口径变化后 _stale_hashes 为 True，需要 consume_hashes 重算
+        self._hash_modes: Optional[Dict[str, str]] = None
+        self._stale_hashes = False
+        self._hashed_rows = 0
+        # None 表示尚未计算边界 (第一遍未结束)
+        self._bounds: Optional[Dict[Tuple[str, str], Tuple[float, float, float]]] = None
+        self._located_rows = 0
+
+    # ---------------- 第一遍 ----------------
+
+    def consume(self, chunk: pd.DataFrame) -> None:
+        """第一遍：累积缺失 / 行哈希 / 数值草图"""
+        if chunk.empty:
+            return
+        self.row_count += len(chunk)
+
+        missing = chunk.isna().sum()
+        for col in chunk.columns:
+            state = self._state[str(col)]
+            raw = chunk[col]
+            n_missing = int(missing[col])
+            state.missing += n_missing
+
+            if state.bool_values:
+                state.bool_values = bool((raw.isin(_BOOL_LITERALS) | raw.isna()).all())
+            if state.bool_like:
+                state.bool_like = n_missing == 0 and state.bool_values
+
+            if not state.numeric:
+                continue
+            values = pd.to_numeric(raw, errors="coerce")
+            if int(values.notna().sum()) < len(raw) - n_missing:
+                # 出现非数字文本：整列按 object 处理，草图作废
+                state.numeric = False
+                state.sketch = None
+                continue
+            state.integral = state.integral and values.dtype.kind in "iu"
+            finite = values.to_numpy(dtype=np.float64, na_value=np.nan)
+            finite = finite[~np.isnan(finite)]
+            state.sketch.update(finite)
+            state.distinct.update(finite)
+            state.update_moments(finite)
+
+        # 本块的类型信息已并入后再算哈希：同一块内先出现的值也按最新口径归一
+        modes = {col: state.hash_mode for col, state in self._state.items()}
+        if self._hash_modes is not None and modes != self._hash_modes:
+            self._stale_hashes = True
+        self._hash_modes = modes
+        if not self._stale_hashes:
+            self._row_hashes.append(self._hash_chunk(chunk))
+            self._hashed_rows += len(chunk)
+
+    def _hash_chunk(self, chunk: pd.DataFrame) -> np.ndarray:
+        """[Internal] 按各列当前口径归一后计算行哈希"""
+        typed = {}
+        for i, col in enumerate(self.columns):
+            raw = chunk.iloc[:, i]
+            mode = self._state[col].hash_mode
+            if mode == "numeric":
+                typed[i] = pd.to_numeric(raw, errors="coerce").astype(np.float64)
+            elif mode == "bool":
+                # 固定为 object：各块 (有无缺失) 的哈希口径一致
+                typed[i] = raw.isin(_TRUE_LITERALS).astype(object).where(raw.notna(), None)
+            else:
+                typed[i] = raw
+        return hash_rows(pd.DataFrame(typed, index=chunk.index))
+
+    # ---------------- 哈希遍 (列口径在后面的块里发生变化时) ----------------
+
+    def needs_hash_pass(self) -> bool:
+        """第一遍中途有列的哈希口径发生变化 (如前几块全是数字、后面出现文本)，需要按最终口径重算行哈希"""
+        if self._stale_hashes and self._hashed_rows == self.row_count:
+            # 已经重算完毕
+            return False
+        if self._stale_hashes:
+            self._row_hashes = []
+            self._hashed_rows = 0
+        return self._stale_hashes
+
+    def consume_hashes(self, chunk: pd.DataFrame) -> None:
+        if chunk.empty:
+            return
+        self._row_hashes.append(self._hash_chunk(chunk))
+        self._hashed_rows += len(chunk)
+
+    # ---------------- 偏差遍 (mad) ----------------
+
+    def needs_deviation_pass(self) -> bool:
+        """请求了 mad 且存在可检测的列时，需要在第二遍之前多扫描一遍"""
+        if "mad" not in self.methods:
+            return False
+        targets = [s for s in self._state.values() if s.eligible]
+        for state in targets:
+            state.median = state.sketch.quantile(0.5)
+            state.deviation = QuantileSketch(k=self._sketch_k)
+        return bool(targets)
+
+    def consume_deviations(self, chunk: pd.DataFrame) -> None:
+        for col, state in self._state.items():
+            if state.deviation is None:
+                continue
+            values = pd.to_numeric(chunk[col], errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+            values = values[~np.isnan(values)]
+            state.deviation.update(np.abs(values - state.median))
+
+    def outlier_bounds(self) -> Dict[Tuple[str, str], Tuple[float, float, float]]:
+        """
+        第一遍 (及偏差遍) 结束后计算每个 (方法, 列) 的 (lower, upper, center)
+        跳过枚举类数值列 (唯一值 <= 20) 与离散度为 0 的列，规则同 metrics.calculate_anomaly_stats
+
+        Raises:
+            RuntimeError: 请求了 mad 但偏差遍没有执行
+        """
+        bounds: Dict[Tuple[str, str], Tuple[float, float, float]] = {}
+        for col, state in self._state.items():
+            if not state.eligible:
+                continue
+            if "mad" in self.methods and (state.deviation is None or state.deviation.count == 0):
+                raise RuntimeError(
+                    "mad bounds need the deviation pass: call needs_deviation_pass() and "
+                    "consume_deviations() on every chunk before outlier_bounds()"
+                )
+            sketch = state.sketch
+            stats = {
+                "q1": sketch.quantile(0.25),
+                "median": sketch.quantile(0.5),
+                "q3": sketch.quantile(0.75),
+                "p_low": sketch.quantile(PERCENTILE_BAND[0]),
+                "p_high": sketch.quantile(PERCENTILE_BAND[1]),
+                "mean": state.mean,
+                "std": float(np.sqrt(state.m2 / state.n)) if state.n else float("nan"),
+                "mad": state.deviation.quantile(0.5) if state.deviation is not None else float("nan"),
+            }
+            for method in self.methods:
+                lower, upper, center, valid = outlier_bounds(method, stats)
+                if valid:
+                    bounds[(method, col)] = (lower, upper, center)
+                    state.outliers[method] = _Candidates()
+        self._bounds = bounds
+        return bounds
+
+    # ---------------- 第二遍 ----------------
+
+    def locate_outliers(self, chunk: pd.DataFrame, row_offset: int) -> None:
+        """
+        第二遍：定位超出边界的值，每列每种方法只保留偏离最远的 50 个
+
+        Args:
+            row_offset: 本块第一行在整个文件中的 0-based 行号
+        """
+        if self._bounds is None:
+            self.outlier_bounds()
+        self._located_rows += len(chunk)
+        converted: Dict[str, np.ndarray] = {}
+        for (method, col), (lower, upper, center) in self._bounds.items():
+            if col not in converted:
+                converted[col] = pd.to_numeric(chunk[col], errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+            values = converted[col]
+            positions = np.flatnonzero((values < lower) | (values > upper))
+            if positions.size == 0:
+                continue
+            hit_values = values[positions]
+            self._state[col].outliers[method].add(
+                positions.astype(np.int64) + row_offset, hit_values, np.abs(hit_values - center)
+            )
+
+    # ---------------- 输出 (与 metrics.py 的返回结构一致) ----------------
+
+    def missing_stats(self) -> Dict[str, Any]:
+        total_cells = self.row_count * len(self.columns)
+        total_missing = sum(s.missing for s in self._state.values())
+        by_column = {
+            col: round(s.missing / self.row_count, 4)
+            for col, s in self._state.items()
+            if s.missing > 0 and self.row_count > 0
+        }
+        return {
+            "total_missing_cells": int(total_missing),
+            "missing_rate": round(total_missing / total_cells, 4) if total_cells > 0 else 0.0,
+            "by_column": by_column,
+            "columns_with_missing": list(by_column.keys()),
+        }
+
+    def duplicate_stats(self) -> Dict[str, Any]:
+        """
+        Raises:
+            RuntimeError: 行哈希口径已变化，但哈希遍 (consume_hashes) 没有扫完全部行
+        """
+        if self._hashed_rows != self.row_count:
+            raise RuntimeError(
+                f"Hash pass incomplete: hashed {self._hashed_rows} of {self.row_count} rows; "
+                "call needs_hash_pass() and consume_hashes() on every chunk before duplicate_stats()"
+            )
+        hashes = np.concatenate(self._row_hashes) if self._row_hashes else np.empty(0, dtype=np.uint64)
+        groups = DuplicateGroups.from_hashes(hashes)
+        # 分块读取时行号即 0-based 位置
+        return _duplicates_from_groups(groups, pd.RangeIndex(self.row_count))
+
+    def anomaly_stats(self) -> Dict[str, Any]:
+        """
+        Raises:
+            RuntimeError: 存在需要检测的列，但第二遍 (locate_outliers) 没有扫完全部行
+        """
+        result = empty_anomaly_stats(self.methods)
+        bounds = self.outlier_bounds() if self._bounds is None else self._bounds
+        if bounds and self._located_rows < self.row_count:
+            raise RuntimeError(
+                f"Outlier pass incomplete: located {self._located_rows} of {self.row_count} rows; "
+                "call locate_outliers() on every chunk before anomaly_stats()"
+            )
+        for (method, col), (lower, upper, _) in bounds.items():
+            found = self._state[col].outliers[method]
+            if len(found.rows) == 0:
+                continue
+            reason = outlier_reason(method, lower, upper)
+            for row, val in zip(found.rows.tolist(), found.values.tolist()):
+                result["details"].append({
+                    "row": int(row) + 1,
+                    "column": col,
+                    "value": float(val),
+                    "type": f"outlier_{method}",
+                    "reason": reason,
+                })
+            result["by_column"][col] = result["by_column"].get(col, 0) + len(found.rows)
+            result["by_type"][f"outlier_{method}"] += len(found.rows)
+
+        result["total"] = len(result["details"])
+        result["details"] = sort_anomaly_details(result["details"], self.columns)
+        return result
+
+    def column_types(self) -> Dict[str, str]:
+        if self.row_count == 0:
+            return {col: "object" for col in self.columns}
+        return {col: state.dtype_name() for col, state in self._state.items()}
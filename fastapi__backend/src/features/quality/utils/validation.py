@@ -10,12 +10,13 @@ from src.shared.utils.logger import logger
 # (Pandas 读取 100MB CSV 可能会消耗 500MB+ 内存，需谨慎设置)
 DEFAULT_MAX_MB = 100
 
-def validate_file_for_analysis(file_path: str) -> None:
+def validate_file_for_analysis(file_path: str, enforce_size_limit: bool = True) -> None:
     """
     文件分析前的安全预检 (Validation)
     
     Args:
         file_path: 文件的绝对路径
+        enforce_size_limit: 是否检查大小上限 (只读取头部的有界操作可关闭)
         
     Raises:
         BaseAppException: 当文件过大或无法访问时抛出
@@ -43,7 +44,7 @@ def validate_file_for_analysis(file_path: str) -> None:
         file_size = path.stat().st_size
         
         # 3. 大小检查 (防止 OOM)
-        if file_size > max_bytes:
+        if enforce_size_limit and file_size > max_bytes:
             size_in_mb = file_size / (1024 * 1024)
             logger.warning(f"⚠️ File too large for analysis: {file_path} ({size_in_mb:.2f} MB > {max_mb} MB)")
             
@@ -0,0 +1,211 @@
+import json
+import threading
+import time
+import zlib
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple, Union
+
+from src.app.config.settings import settings
+from src.shared.utils.logger import logger
+
+# 可选依赖：缺失时自动降级 (msgpack -> json，zstd -> zlib)，不影响功能
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# =========================================================
+# 缓存值编解码 (Payload Codec)
+#
+# 二进制格式：[版本字节][编码/压缩字节][负载]
+#   - 版本字节 FORMAT_VERSION (0x01)，旧版纯 JSON 文本以 '{' / '[' 开头，二者不会混淆
+#   - 第二字节高 4 位为编码 (json / msgpack)，低 4 位为压缩 (none / zlib / zstd)
+# 头部记录了写入时实际使用的编码，读取端与配置无关；切换配置后旧值仍可解码。
+# =========================================================
+
+FORMAT_VERSION = 0x01
+
+CODEC_JSON = 1
+CODEC_MSGPACK = 2
+COMPRESS_NONE = 0
+COMPRESS_ZLIB = 1
+COMPRESS_ZSTD = 2
+
+_CODEC_NAMES = {CODEC_JSON: "json", CODEC_MSGPACK: "msgpack"}
+_COMPRESS_NAMES = {COMPRESS_NONE: "none", COMPRESS_ZLIB: "zlib", COMPRESS_ZSTD: "zstd"}
+
+class CodecError(ValueError):
+    """缓存值无法解码 (格式损坏 / 版本未知 / 缺少写入时使用的可选依赖)"""
+
+@dataclass
+class CodecStats:
+    encoded: int = 0
+    decoded: int = 0
+    legacy_decoded: int = 0
+    errors: int = 0
+    raw_bytes: int = 0      # 编码后、压缩前的字节数
+    stored_bytes: int = 0   # 实际写入 Redis 的字节数 (含头部)
+    decoded_bytes: int = 0
+    encode_ms: float = 0.0
+    decode_ms: float = 0.0
+    by_format: Dict[str, int] = field(default_factory=dict)
+
+def _json_dumps(obj: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def _json_loads(data: Union[bytes, str]) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+class PayloadCodec:
+    """
+    可插拔的缓存值编解码器 (Infrastructure Layer)
+
+    职责：
+    1. 按配置编码 (msgpack / json) 并按需压缩 (zstd / zlib)
+    2. 解码时按头部选择解码方式；无头部的旧值按 JSON 文本解码
+    3. 统计编码前后体积与耗时，便于评估 Redis 内存与网络占用
+    """
+
+    def __init__(self, codec: str = "msgpack", compression: str = "zstd", compress_min_bytes: int = 1024, level: int = 3):
+        self.codec, self.compression = self._resolve(codec, compression)
+        self.compress_min_bytes = compress_min_bytes
+        self.level = level
+        self._lock = threading.Lock()
+        self._stats = CodecStats()
+
+    @staticmethod
+    def _resolve(codec: str, compression: str) -> Tuple[int, int]:
+        """把配置名映射为格式编号，可选依赖缺失时降级 (启动时记录一次)"""
+        codec_id = CODEC_MSGPACK if codec == "msgpack" else CODEC_JSON
+        if codec_id == CODEC_MSGPACK and msgpack is None:
+            logger.info("ℹ️ [Codec] msgpack not installed, falling back to json")
+            codec_id = CODEC_JSON
+
+        compress_id = {"zstd": COMPRESS_ZSTD, "zlib": COMPRESS_ZLIB}.get(compression, COMPRESS_NONE)
+        if compress_id == COMPRESS_ZSTD and zstandard is None:
+            logger.info("ℹ️ [Codec] zstandard not installed, falling back to zlib")
+            compress_id = COMPRESS_ZLIB
+        return codec_id, compress_id
+
+    @property
+    def name(self) -> str:
+        return f"{_CODEC_NAMES[self.codec]}+{_COMPRESS_NAMES[self.compression]}"
+
+    def encode(self, obj: Any) -> bytes:
+        started = time.perf_counter()
+        if self.codec == CODEC_MSGPACK:
+            raw = msgpack.packb(obj, use_bin_type=True)
+        else:
+            raw = _json_dumps(obj)
+
+        compression = self.compression if len(raw) >= self.compress_min_bytes else COMPRESS_NONE
+        if compression == COMPRESS_ZSTD:
+            body = zstandard.ZstdCompressor(level=self.level).compress(raw)
+        elif compression == COMPRESS_ZLIB:
+            body = zlib.compress(raw, self.level)
+        else:
+            body = raw
+        data = bytes((FORMAT_VERSION, (self.codec << 4) | compression)) + body
+
+        fmt = f"{_CODEC_NAMES[self.codec]}+{_COMPRESS_NAMES[compression]}"
+        with self._lock:
+            self._stats.encoded += 1
+            self._stats.raw_bytes += len(raw)
+            self._stats.stored_bytes += len(data)
+            self._stats.encode_ms += (time.perf_counter() - started) * 1000
+            self._stats.by_format[fmt] = self._stats.by_format.get(fmt, 0) + 1
+        return data
+
+    def decode(self, data: Union[bytes, str]) -> Any:
+        """
+        解码缓存值 (bytes 或文本客户端读出的 str)
+
+        Raises:
+            CodecError: 格式损坏、版本未知，或写入时使用的可选依赖在本进程不可用
+        """
+        started = time.perf_counter()
+        try:
+            if isinstance(data, str) or data[:1] in (b"{", b"["):
+                value = _json_loads(data)
+                legacy = True
+            else:
+                value = self._decode_binary(data)
+                legacy = False
+        except CodecError:
+            with self._lock:
+                self._stats.errors += 1
+            raise
+        except Exception as e:
+            with self._lock:
+                self._stats.errors += 1
+            raise CodecError(f"Corrupted cache payload: {e}") from e
+
+        with self._lock:
+            self._stats.decoded += 1
+            self._stats.legacy_decoded += int(legacy)
+            self._stats.decoded_bytes += len(data)
+            self._stats.decode_ms += (time.perf_counter() - started) * 1000
+        return value
+
+    @staticmethod
+    def _decode_binary(data: bytes) -> Any:
+        if len(data) < 2 or data[0] != FORMAT_VERSION:
+            raise CodecError(f"Unknown cache payload version: {data[:1]!r}")
+        codec, compression = data[1] >> 4, data[1] & 0x0F
+        body = data[2:]
+
+        if compression == COMPRESS_ZSTD:
+            if zstandard is None:
+                raise CodecError("Payload is zstd-compressed but zstandard is not installed")
+            body = zstandard.ZstdDecompressor().decompress(body)
+        elif compression == COMPRESS_ZLIB:
+            body = zlib.decompress(body)
+        elif compression != COMPRESS_NONE:
+            raise CodecError(f"Unknown compression id: {compression}")
+
+        if codec == CODEC_MSGPACK:
+            if msgpack is None:
+                raise CodecError("Payload is msgpack-encoded but msgpack is not installed")
+            return msgpack.unpackb(body, raw=False)
+        if codec == CODEC_JSON:
+            return _json_loads(body)
+        raise CodecError(f"Unknown codec id: {codec}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            s = self._stats
+            return {
+                "format": self.name,
+                "encoded": s.encoded,
+                "decoded": s.decoded,
+                "legacy_decoded": s.legacy_decoded,
+                "errors": s.errors,
+                "raw_bytes": s.raw_bytes,
+                "stored_bytes": s.stored_bytes,
+                "compression_ratio": round(s.raw_bytes / s.stored_bytes, 3) if s.stored_bytes else None,
+                "decoded_bytes": s.decoded_bytes,
+                "avg_encode_ms": round(s.encode_ms / s.encoded, 3) if s.encoded else 0.0,
+                "avg_decode_ms": round(s.decode_ms / s.decoded, 3) if s.decoded else 0.0,
+                "by_format": dict(s.by_format),
+            }
+
+# 导出单例对象
+payload_codec = PayloadCodec(
+    codec=getattr(settings, "CACHE_CODEC", "msgpack"),
+    compression=getattr(settings, "CACHE_COMPRESSION", "zstd"),
+    compress_min_bytes=getattr(settings, "CACHE_COMPRESS_MIN_BYTES", 1024),
+)
@@ -0,0 +1,249 @@
+import json
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.app.config.settings import settings
+from src.shared.utils.logger import logger
+
+CacheKey = Tuple[str, int, int, str]
+
+@dataclass
+class _CacheEntry:
+    df: pd.DataFrame
+    profile: Dict[str, Any]
+    nbytes: int
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    rejected: int = 0  # 单个 DataFrame 超过预算，不进入缓存
+    by_loader: Dict[str, Dict[str, int]] = field(default_factory=dict)
+
+def _freeze(df: pd.DataFrame) -> None:
+    """
+    把 DataFrame 底层数组标记为只读
+
+    pandas 没有公开的只读 DataFrame，这里直接设置各 block 的 numpy 数组 writeable=False。
+    调用方任何原地写 (loc/iat 赋值、inplace=True) 都会抛 ValueError，而不是悄悄污染缓存；
+    需要修改数据的调用方 (如 cleaning replay) 本来就会先 copy(deep=True)。
+
+    object 列不冻结：pandas 的部分 Cython 例程 (memory_usage(deep=True) 等) 要求可写缓冲区，
+    对只读 object 数组会直接抛错。
+    """
+    try:
+        for block in df._mgr.blocks:
+            if block.dtype == object:
+                continue
+            values = block.values
+            if hasattr(values, "_pa_array"):  # Arrow 数组本身不可变
+                continue
+            arrays = [values, getattr(values, "_ndarray", None), getattr(values, "_data", None), getattr(values, "_mask", None)]
+            for arr in arrays:
+                if isinstance(arr, np.ndarray):
+                    arr.flags.writeable = False
+    except Exception as e:  # pandas 内部结构变化时降级为“不冻结”，不影响功能
+        logger.debug(f"DataFrameCache: freeze skipped: {e}")
+
+def _handout(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    发放给调用方的副本：已冻结的列共享底层数组 (浅拷贝)，未冻结的 object 列单独深拷贝
+
+    object 列无法冻结，浅拷贝会与缓存共享同一个数组，调用方的 loc 赋值会直接改写缓存内容；
+    这里只复制这些列，数值列仍然零拷贝。
+    """
+    out = df.copy(deep=False)
+    for i, dtype in enumerate(df.dtypes):
+        if dtype == object:
+            out.isetitem(i, df.iloc[:, i].copy(deep=True))
+    return out
+
+class DataFrameCache:
+    """
+    进程级 DataFrame 缓存 (Infrastructure Layer)
+
+    职责：
+    1. quality / cleaning / analysis 三个模块的加载器共享同一份解析结果
+    2. Key = (绝对路径, 文件大小, 修改时间, 解析选项)，文件被替换后自动失效
+    3. 按 memory_usage(deep=True) 计量的内存预算 + LRU 淘汰
+    4. 只读发放：缓存内的 DataFrame 底层数组被冻结，发放的是浅拷贝 (object 列深拷贝，见 _handout)
+    """
+
+    def __init__(self, max_bytes: int, enabled: bool = True):
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self._entries: "OrderedDict[CacheKey, _CacheEntry]" = OrderedDict()
+        self._current_bytes = 0
+        self._lock = threading.RLock()
+        self._stats = CacheStats()
+
+    @staticmethod
+    def make_key(file_path: str, options: Optional[Dict[str, Any]] = None) -> CacheKey:
+        st = os.stat(file_path)
+        option_str = json.dumps(options or {}, sort_keys=True, separators=(",", ":"), default=str)
+        return os.path.abspath(file_path), st.st_size, st.st_mtime_ns, option_str
+
+    def _count(self, loader: str, name: str) -> None:
+        bucket = self._stats.by_loader.setdefault(loader, {"hits": 0, "misses": 0})
+        bucket[name] += 1
+
+    def _lookup(self, file_path: str, options: Optional[Dict[str, Any]]) -> Optional[_CacheEntry]:
+        try:
+            key = self.make_key(file_path, options)
+        except OSError:
+            return None
+        with self._lock:
+            return self._entries.get(key)
+
+    def describe(self, file_path: str, options: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """
+        只读取缓存中 DataFrame 的元信息 (总行数 / 列名 / 内存)，不发放数据、不计入命中统计
+        """
+        if not self.enabled:
+            return None
+        entry = self._lookup(file_path, options)
+        if entry is None:
+            return None
+        return {
+            "num_rows": len(entry.df),
+            "columns": [str(c) for c in entry.df.columns],
+            "memory_bytes": entry.nbytes,
+        }
+
+    def get(
+        self,
+        file_path: str,
+        options: Optional[Dict[str, Any]] = None,
+        columns: Optional[List[str]] = None,
+        rows: Optional[Tuple[int, Optional[int]]] = None,
+    ) -> Optional[Tuple[pd.DataFrame, Dict[str, Any]]]:
+        """
+        命中时返回 (发放副本, profile 副本)，未命中返回 None
+
+        Args:
+            columns / rows: 可选，先投影 / 切片 (iloc[start:stop]) 再发放，只需要一部分数据时
+                object 列只复制这一部分
+        """
+        if not self.enabled:
+            return None
+        try:
+            key = self.make_key(file_path, options)
+        except OSError:
+            return None
+
+        loader = (options or {}).get("loader", "default")
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats.misses += 1
+                self._count(loader, "misses")
+                return None
+            self._entries.move_to_end(key)
+            self._stats.hits += 1
+            self._count(loader, "hits")
+        df = entry.df
+        if columns is not None:
+            df = df[columns]
+        if rows is not None:
+            df = df.iloc[rows[0]:rows[1]]
+        return _handout(df), dict(entry.profile)
+
+    def put(self, file_path: str, df: pd.DataFrame, profile: Optional[Dict[str, Any]] = None,
+            options: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
+        """
+        放入缓存，返回应交给调用方的发放副本
+        (放入后原 df 的底层数组被冻结，调用方不应再持有原对象做原地修改)
+        """
+        if not self.enabled:
+            return df
+        try:
+            key = self.make_key(file_path, options)
+        except OSError:
+            return df
+
+        nbytes = int(df.memory_usage(deep=True).sum())
+        if nbytes > self.max_bytes:
+            with self._lock:
+                self._stats.rejected += 1
+            logger.info(f"DataFrameCache: {os.path.basename(file_path)} ({nbytes / 1024 / 1024:.1f} MB) exceeds budget, not cached")
+            return df
+
+        _freeze(df)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._current_bytes -= old.nbytes
+            self._entries[key] = _CacheEntry(df=df, profile=dict(profile or {}), nbytes=nbytes)
+            self._current_bytes += nbytes
+            self._evict_locked()
+        return _handout(df)
+
+    def get_or_load(
+        self,
+        file_path: str,
+        loader: Callable[[], Tuple[pd.DataFrame, Dict[str, Any]]],
+        options: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[pd.DataFrame, Dict[str, Any], bool]:
+        """
+        命中直接返回；未命中调用 loader() 加载后放入缓存
+
+        Returns:
+            (df, profile, hit)
+        """
+        cached = self.get(file_path, options)
+        if cached is not None:
+            return cached[0], cached[1], True
+
+        df, profile = loader()
+        return self.put(file_path, df, profile, options), profile, False
+
+    def _evict_locked(self) -> None:
+        # LRU：OrderedDict 头部是最久未使用的
+        while self._current_bytes > self.max_bytes and self._entries:
+            key, entry = self._entries.popitem(last=False)
+            self._current_bytes -= entry.nbytes
+            self._stats.evictions += 1
+            logger.debug(f"DataFrameCache: evicted {key[0]} ({entry.nbytes} bytes)")
+
+    def invalidate(self, file_path: str) -> int:
+        """删除某个路径的全部缓存 (不区分解析选项)，返回删除条数"""
+        abs_path = os.path.abspath(file_path)
+        with self._lock:
+            keys = [k for k in self._entries if k[0] == abs_path]
+            for k in keys:
+                self._current_bytes -= self._entries.pop(k).nbytes
+        return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._current_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self._stats.hits + self._stats.misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "bytes": self._current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self._stats.hits,
+                "misses": self._stats.misses,
+                "hit_rate": round(self._stats.hits / total, 4) if total else 0.0,
+                "evictions": self._stats.evictions,
+                "rejected": self._stats.rejected,
+                "by_loader": {k: dict(v) for k, v in self._stats.by_loader.items()},
+            }
+
+# 导出单例对象
+dataframe_cache = DataFrameCache(
+    max_bytes=settings.DATAFRAME_CACHE_MAX_BYTES,
+    enabled=settings.DATAFRAME_CACHE_ENABLED,
+)
@@ -0,0 +1,283 @@
+import asyncio
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+from src.app.config.settings import settings
+from src.infrastructure.cache.codec import CodecError, payload_codec
+from src.infrastructure.cache.pubsub_hub import PubSubHub
+from src.infrastructure.cache.redis_client import get_redis, get_redis_binary
+from src.shared.utils.logger import logger
+
+T = TypeVar("T")
+
+# =========================================================
+# 跨副本任务去重 (Redis Lease Lock)
+#
+# 多个副本收到相同任务时，只有拿到租约的副本计算，其余副本订阅完成通知后读取结果：
+#   - 租约：SET lock:{key} {token} NX PX ttl，持有者每 ttl/3 续约一次 (Lua 校验 token)
+#   - 释放：Lua 校验 token 后 DEL 并在同一脚本里 PUBLISH lock:done:{key} (ok / failed)
+#   - 等待：每个进程只有一个 PSUBSCRIBE lock:done:* 连接，按 key 分发给等待者；
+#          另按 LOCK_POLL_INTERVAL_MS 检查锁是否还在，持有者崩溃 (租约过期) 或通知丢失时不会一直等
+# Redis 不可用时退化为本地直接计算，不影响功能。
+# =========================================================
+
+LOCK_PREFIX = "lock"
+DONE_PREFIX = "lock:done"
+RESULT_PREFIX = "lock:result"
+
+STATUS_OK = "ok"
+STATUS_FAILED = "failed"
+# 锁已消失但没收到通知 (持有者崩溃后租约过期 / 通知丢失)
+STATUS_RELEASED = "released"
+
+# 续约：只有 token 一致 (仍是自己的租约) 时才延长过期时间
+RENEW_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+# 释放并通知：删除与发布在同一脚本里，等待者收到通知时锁一定已经释放
+RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    redis.call('del', KEYS[1])
+    redis.call('publish', ARGV[2], ARGV[3])
+    return 1
+end
+return 0
+"""
+
+class LeaseLock:
+    """
+    带 token 的 Redis 租约锁 (持有期间由后台心跳续约)
+    """
+
+    def __init__(self, key: str, ttl_ms: int):
+        self.name = key
+        self.key = f"{LOCK_PREFIX}:{key}"
+        self.channel = f"{DONE_PREFIX}:{key}"
+        self.ttl_ms = ttl_ms
+        self.token = uuid.uuid4().hex
+        self.lost = False
+        self.renewals = 0
+        self._heartbeat: Optional[asyncio.Task] = None
+
+    async def acquire(self) -> bool:
+        return bool(await get_redis().set(self.key, self.token, nx=True, px=self.ttl_ms))
+
+    async def renew(self) -> bool:
+        return bool(await get_redis().eval(RENEW_SCRIPT, 1, self.key, self.token, self.ttl_ms))
+
+    async def release(self, status: str = STATUS_OK) -> bool:
+        """释放租约并发布完成通知；租约已丢失 (过期后被他人取得) 时返回 False"""
+        return bool(await get_redis().eval(RELEASE_SCRIPT, 1, self.key, self.token, self.channel, status))
+
+    def start_heartbeat(self) -> None:
+        self._heartbeat = asyncio.create_task(self._renew_loop())
+
+    async def stop_heartbeat(self) -> None:
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+            await asyncio.gather(self._heartbeat, return_exceptions=True)
+            self._heartbeat = None
+
+    async def _renew_loop(self) -> None:
+        interval = self.ttl_ms / 3000
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                if not await self.renew():
+                    # 租约已过期并可能被其他副本取得：本次计算照常完成，只是不再独占
+                    self.lost = True
+                    logger.warning(f"⚠️ [Lock] Lease lost for {self.key}")
+                    return
+                self.renewals += 1
+            except Exception as e:
+                # 临时网络错误：下一轮再试，租约在 ttl 内仍然有效
+                logger.warning(f"⚠️ [Lock] Renew failed for {self.key}: {e}")
+
+@dataclass
+class LockStats:
+    acquired: int = 0
+    waits: int = 0
+    served_by_peer: int = 0
+    recomputed_after_wait: int = 0
+    timeouts: int = 0
+    degraded: int = 0
+    lost_leases: int = 0
+    renewals: int = 0
+    wait_ms: float = 0.0
+    max_wait_ms: float = 0.0
+
+class DistributedFlight:
+    """
+    跨副本的 single-flight (Infrastructure Layer)
+
+    do(key, compute, load)：
+    1. 拿到租约 -> 计算 (心跳续约) -> 释放并通知
+    2. 没拿到 -> 等完成通知 -> load() 读取结果 (如从结果缓存)；
+       未提供 load 时，持有者把结果 (JSON 结构) 短暂存入 lock:result:{key} 供等待者读取
+    3. 持有者失败 / 崩溃或结果读不到 -> 重新竞争租约，自己计算
+    4. 等待超时 (LOCK_WAIT_TIMEOUT_S) 或 Redis 不可用 -> 本地直接计算
+    """
+
+    def __init__(self, ttl_ms: int = 30000, poll_interval_ms: int = 1000, wait_timeout_s: float = 600, result_ttl: int = 120):
+        self.ttl_ms = ttl_ms
+        self.poll_interval = poll_interval_ms / 1000
+        self.wait_timeout = wait_timeout_s
+        self.result_ttl = result_ttl
+        # 完成通知只需要最新一条 (ok / failed)
+        self._done = PubSubHub(f"{DONE_PREFIX}:*", maxsize=1)
+        self._stats = LockStats()
+        self._waiting = 0
+
+    async def do(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[T]],
+        load: Optional[Callable[[], Awaitable[Optional[T]]]] = None,
+    ) -> T:
+        deadline = time.monotonic() + self.wait_timeout
+        while True:
+            lease = LeaseLock(key, self.ttl_ms)
+            try:
+                acquired = await lease.acquire()
+            except Exception as e:
+                self._stats.degraded += 1
+                logger.warning(f"⚠️ [Lock] Redis unavailable, computing {key} locally: {e}")
+                return await compute()
+
+            if acquired:
+                self._stats.acquired += 1
+                return await self._run_holder(lease, compute, share=load is None)
+
+            try:
+                status = await self._wait(lease, deadline)
+            except Exception as e:
+                # 等待期间 Redis 断开：同样退化为本地计算
+                self._stats.degraded += 1
+                logger.warning(f"⚠️ [Lock] Redis unavailable while waiting, computing {key} locally: {e}")
+                return await compute()
+            if status is None:
+                self._stats.timeouts += 1
+                logger.warning(f"⚠️ [Lock] Timed out waiting for {key}, computing locally")
+                return await compute()
+
+            if status in (STATUS_OK, STATUS_RELEASED):
+                try:
+                    value = await (load() if load is not None else self._load_shared(key))
+                except Exception as e:
+                    logger.warning(f"⚠️ [Lock] Failed to load shared result for {key}: {e}")
+                    value = None
+                if value is not None:
+                    self._stats.served_by_peer += 1
+                    logger.info(f"🤝 [Lock] {key} served by another worker")
+                    return value
+            # 持有者失败 / 崩溃 / 结果已过期：重新竞争租约
+            self._stats.recomputed_after_wait += 1
+
+    async def _run_holder(self, lease: LeaseLock, compute: Callable[[], Awaitable[T]], share: bool) -> T:
+        lease.start_heartbeat()
+        status = STATUS_FAILED
+        try:
+            result = await compute()
+            if share:
+                await self._store_shared(lease, result)
+            status = STATUS_OK
+            return result
+        finally:
+            await lease.stop_heartbeat()
+            self._stats.renewals += lease.renewals
+            if lease.lost:
+                self._stats.lost_leases += 1
+            try:
+                await lease.release(status)
+            except Exception as e:
+                # 释放失败时租约到期自动释放，等待者经轮询发现
+                logger.warning(f"⚠️ [Lock] Release failed for {lease.key}: {e}")
+
+    async def _wait(self, lease: LeaseLock, deadline: float) -> Optional[str]:
+        """等待持有者完成：返回 ok / failed / released，超时返回 None"""
+        started = time.monotonic()
+        self._stats.waits += 1
+        self._waiting += 1
+        queue: Optional[asyncio.Queue] = None
+        try:
+            try:
+                # 订阅生效之后才检查锁：两者之间发布的通知不会漏掉
+                queue = await self._done.subscribe(lease.channel)
+            except Exception as e:
+                logger.warning(f"⚠️ [Lock] Subscribe failed, polling {lease.key}: {e}")
+            while True:
+                # 先查锁：订阅生效前已经完成的任务不会再有通知
+                if not await get_redis().exists(lease.key):
+                    status = queue.get_nowait() if queue is not None and not queue.empty() else None
+                    return status or STATUS_RELEASED
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                timeout = min(self.poll_interval, remaining)
+                if queue is None:
+                    await asyncio.sleep(timeout)
+                    continue
+                try:
+                    status = await asyncio.wait_for(queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    continue
+                if status is None:
+                    # 订阅断开：改为轮询，锁消失时按 released 处理
+                    self._done.unsubscribe(lease.channel, queue)
+                    queue = None
+                    continue
+                return status
+        finally:
+            if queue is not None:
+                self._done.unsubscribe(lease.channel, queue)
+            self._waiting -= 1
+            elapsed = (time.monotonic() - started) * 1000
+            self._stats.wait_ms += elapsed
+            self._stats.max_wait_ms = max(self._stats.max_wait_ms, elapsed)
+
+    async def _store_shared(self, lease: LeaseLock, result: Any) -> None:
+        """在释放租约 (发布通知) 之前写入，等待者收到通知时结果一定可读"""
+        result_key = f"{RESULT_PREFIX}:{lease.name}"
+        try:
+            await get_redis_binary().set(result_key, payload_codec.encode(result), ex=self.result_ttl)
+        except Exception as e:
+            logger.warning(f"⚠️ [Lock] Failed to share result for {lease.key}: {e}")
+
+    async def _load_shared(self, key: str) -> Optional[Any]:
+        data = await get_redis_binary().get(f"{RESULT_PREFIX}:{key}")
+        if not data:
+            return None
+        try:
+            return payload_codec.decode(data)
+        except CodecError:
+            return None
+
+    def stats(self) -> Dict[str, Any]:
+        s = self._stats
+        return {
+            "waiting": self._waiting,
+            "acquired": s.acquired,
+            "waits": s.waits,
+            "served_by_peer": s.served_by_peer,
+            "recomputed_after_wait": s.recomputed_after_wait,
+            "timeouts": s.timeouts,
+            "degraded": s.degraded,
+            "lost_leases": s.lost_leases,
+            "renewals": s.renewals,
+            "avg_wait_ms": round(s.wait_ms / s.waits, 2) if s.waits else 0.0,
+            "max_wait_ms": round(s.max_wait_ms, 2),
+        }
+
+# 导出单例对象
+distributed_flight = DistributedFlight(
+    ttl_ms=getattr(settings, "LOCK_TTL_MS", 30000),
+    poll_interval_ms=getattr(settings, "LOCK_POLL_INTERVAL_MS", 1000),
+    wait_timeout_s=getattr(settings, "LOCK_WAIT_TIMEOUT_S", 600),
+    result_ttl=getattr(settings, "LOCK_RESULT_TTL", 120),
+)
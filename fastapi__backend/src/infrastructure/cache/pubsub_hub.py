@@ -0,0 +1,82 @@
+import asyncio
+from typing import Any, Dict, List, Optional
+
+from src.infrastructure.cache.redis_client import get_redis
+from src.shared.utils.logger import logger
+
+class PubSubHub:
+    """
+    进程内共享的 Redis 订阅 (Infrastructure Layer)
+
+    一个 PSUBSCRIBE 连接服务本进程内的所有订阅者，按频道分发到各自的队列，
+    订阅者数量不受连接池大小限制；没有订阅者时自动退订并归还连接。
+
+    队列满时丢弃最旧的消息 (适合 "最新状态" 类消息，慢消费者只会跳过中间状态)。
+    订阅连接异常断开时，向所有队列投递 None，订阅者据此结束并重新订阅。
+    """
+
+    def __init__(self, pattern: str, maxsize: int = 16):
+        self.pattern = pattern
+        self.maxsize = maxsize
+        self._queues: Dict[str, List[asyncio.Queue]] = {}
+        self._listener: Optional[asyncio.Task] = None
+        self._ready: Optional[asyncio.Event] = None
+
+    async def subscribe(self, channel: str) -> "asyncio.Queue[Optional[Any]]":
+        """订阅频道，订阅生效后返回消息队列 (之后发布的消息不会漏收)"""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.maxsize)
+        self._queues.setdefault(channel, []).append(queue)
+        if self._listener is None or self._listener.done():
+            self._ready = asyncio.Event()
+            self._listener = asyncio.create_task(self._listen(self._ready))
+        ready, listener = self._ready, self._listener
+        subscribed = asyncio.ensure_future(ready.wait())
+        await asyncio.wait({subscribed, listener}, return_when=asyncio.FIRST_COMPLETED)
+        if not ready.is_set():
+            subscribed.cancel()
+            self.unsubscribe(channel, queue)
+            listener.result()  # 订阅失败：抛出原始异常
+        return queue
+
+    def unsubscribe(self, channel: str, queue: asyncio.Queue) -> None:
+        queues = self._queues.get(channel)
+        if queues and queue in queues:
+            queues.remove(queue)
+            if not queues:
+                del self._queues[channel]
+
+    @property
+    def subscribers(self) -> int:
+        return sum(len(queues) for queues in self._queues.values())
+
+    def _deliver(self, queue: asyncio.Queue, message: Optional[Any]) -> None:
+        if queue.full():
+            queue.get_nowait()
+        queue.put_nowait(message)
+
+    async def _listen(self, ready: asyncio.Event) -> None:
+        pubsub = get_redis().pubsub()
+        try:
+            await pubsub.psubscribe(self.pattern)
+            ready.set()
+            while self._queues:
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                if not message or message.get("type") != "pmessage":
+                    continue
+                for queue in self._queues.get(message["channel"], []):
+                    self._deliver(queue, message["data"])
+            # 先摘掉自己，退订期间到来的 subscribe 会启动新的订阅
+            if self._listener is asyncio.current_task():
+                self._listener = None
+        except Exception as e:
+            logger.warning(f"⚠️ [PubSub] Subscriber for {self.pattern} stopped: {e}")
+            if not ready.is_set():
+                raise
+            for queues in self._queues.values():
+                for queue in queues:
+                    self._deliver(queue, None)
+        finally:
+            try:
+                await pubsub.aclose()
+            except Exception:
+                pass
@@ -12,6 +12,8 @@ class RedisClient:
 
     def __init__(self):
         self.client: Optional[redis.Redis] = None
+        # 二进制客户端 (decode_responses=False)：读写编码后的大体积缓存值，不经过 UTF-8 解码
+        self.binary_client: Optional[redis.Redis] = None
 
     @classmethod
     def get_instance(cls) -> 'RedisClient':
@@ -45,6 +47,12 @@ class RedisClient:
                 socket_timeout=5,      # 超时控制
                 max_connections=10     # 连接池大小控制
             )
+            self.binary_client = redis.from_url(
+                url,
+                decode_responses=False,
+                socket_timeout=5,
+                max_connections=10
+            )
 
             # 发送 Ping 检测连接是否真正可用
             await self.client.ping() # type: ignore
@@ -64,6 +72,9 @@ class RedisClient:
             await self.client.close()
             logger.info("🧹 Redis connection closed")
             self.client = None
+        if self.binary_client:
+            await self.binary_client.close()
+            self.binary_client = None
 
     def get_client(self) -> redis.Redis:
         """
@@ -74,6 +85,14 @@ class RedisClient:
             raise RuntimeError("Redis client is not initialized. call 'connect()' first.")
         return self.client
 
+    def get_binary_client(self) -> redis.Redis:
+        """
+        获取二进制安全的 Redis 客户端 (返回 bytes，不做解码)
+        """
+        if self.binary_client is None:
+            raise RuntimeError("Redis client is not initialized. call 'connect()' first.")
+        return self.binary_client
+
 # 导出单例对象
 redis_manager = RedisClient.get_instance()
 
@@ -82,4 +101,7 @@ redis_manager = RedisClient.get_instance()
 # from src.infrastructure.cache.redis_client import get_redis
 # await get_redis().set("key", "val")
 def get_redis() -> redis.Redis:
-    return redis_manager.get_client()
\ No newline at end of file
+    return redis_manager.get_client()
+
+def get_redis_binary() -> redis.Redis:
+    return redis_manager.get_binary_client()
@@ -0,0 +1,3 @@
+from .process_pool import ProcessPoolManager, process_pool_manager
+
+__all__ = ["ProcessPoolManager", "process_pool_manager"]
@@ -0,0 +1,67 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from src.app.config.settings import settings
+from src.shared.utils.logger import logger
+
+class ProcessPoolManager:
+    """
+    计算进程池管理器 (Infrastructure Layer)
+
+    职责：
+    1. 按配置懒加载一个进程级共享的 ProcessPoolExecutor (首次使用时才启动 worker)
+    2. 使用 spawn 方式启动：worker 不继承父进程的线程 / 锁 / Redis 连接，行为与平台无关
+    3. 应用关闭 (Lifespan) 时统一回收；pool 损坏 (worker 被 OOM Kill 等) 时丢弃，下次使用重建
+    """
+
+    def __init__(self, max_workers: int):
+        self._configured = max_workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @property
+    def workers(self) -> int:
+        """实际 worker 数 (0 表示使用全部 CPU 核数)"""
+        if self._configured == 0:
+            return os.cpu_count() or 1
+        return max(1, self._configured)
+
+    @property
+    def enabled(self) -> bool:
+        return self.workers > 1
+
+    def get_executor(self) -> Optional[ProcessPoolExecutor]:
+        """获取进程池；未启用 (workers <= 1) 时返回 None，调用方走单进程路径"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+                logger.info(f"⚙️ ProcessPool started with {self.workers} workers")
+            return self._executor
+
+    def discard(self) -> None:
+        """pool 已损坏 (BrokenProcessPool) 时调用，下次 get_executor 会重建"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+            logger.warning("⚠️ ProcessPool discarded, will be recreated on next use")
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+            logger.info("🛑 ProcessPool shut down")
+
+# 导出单例对象
+process_pool_manager = ProcessPoolManager(
+    max_workers=getattr(settings, "QUALITY_PARALLEL_WORKERS", 1),
+)
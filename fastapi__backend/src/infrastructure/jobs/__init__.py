@@ -0,0 +1,3 @@
+from .scheduler import JobScheduler, job_scheduler
+
+__all__ = ["JobScheduler", "job_scheduler"]
@@ -0,0 +1,164 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from src.app.config.settings import settings
+from src.shared.exceptions.compute_filed import JobQueueFullException
+from src.shared.utils.logger import logger
+
+# =========================================================
+# 进程内后台任务调度 (Job Scheduler)
+#
+# HTTP 请求只负责入队并立即返回 (202)，固定数量的 worker 协程从有界队列中取任务执行：
+#   - 并发上限 = worker 数，避免突发请求同时占满线程池 / 内存
+#   - 队列满时拒绝提交 (503)，由调用方稍后重试，而不是无限堆积
+#   - 同一个 key 排队或执行中时不重复入队
+# 任务状态与结果由业务侧写入 Redis (TaskRepository / CacheRepository)，调度器只管执行；
+# 进程重启时队列中未执行的任务会丢失，客户端轮询看到的状态停留在 pending，重新提交即可。
+# =========================================================
+
+@dataclass
+class Job:
+    key: str
+    factory: Callable[[], Awaitable[Any]]
+    tag: Any = None
+    submitted_at: float = field(default_factory=time.monotonic)
+    started_at: Optional[float] = None
+
+@dataclass
+class JobStats:
+    submitted: int = 0
+    deduplicated: int = 0
+    rejected: int = 0
+    completed: int = 0
+    failed: int = 0
+    wait_ms: float = 0.0
+    run_ms: float = 0.0
+
+class JobScheduler:
+    """
+    有界的进程内任务调度器 (Infrastructure Layer)
+
+    职责：
+    1. 按配置启动固定数量的 worker 协程 (Lifespan 启动时，或首次提交时懒启动)
+    2. 有界队列 + 按 key 去重，队列满时抛出 JobQueueFullException
+    3. 应用关闭时取消 worker (执行中的任务随之取消)
+    """
+
+    def __init__(self, max_concurrency: int = 2, max_queue: int = 100):
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue = max(1, max_queue)
+        self._queue: Optional["asyncio.Queue[Job]"] = None
+        self._workers: List[asyncio.Task] = []
+        self._active: Dict[str, Job] = {}
+        self._stats = JobStats()
+
+    def start(self) -> None:
+        if self._workers:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._workers = [
+            asyncio.create_task(self._worker(i), name=f"job-worker-{i}")
+            for i in range(self.max_concurrency)
+        ]
+        logger.info(f"⚙️ JobScheduler started with {self.max_concurrency} workers (queue={self.max_queue})")
+
+    async def shutdown(self) -> None:
+        workers, self._workers = self._workers, []
+        if not workers:
+            return
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        dropped = self._queue.qsize() if self._queue is not None else 0
+        self._queue = None
+        self._active.clear()
+        logger.info(f"🛑 JobScheduler shut down ({dropped} queued jobs dropped)")
+
+    def is_active(self, key: str) -> bool:
+        """key 对应的任务是否在排队或执行中"""
+        return key in self._active
+
+    def active_job(self, key: str) -> Optional[Job]:
+        """key 对应的排队或执行中的任务，没有时为 None"""
+        return self._active.get(key)
+
+    def submit(self, key: str, factory: Callable[[], Awaitable[Any]], tag: Any = None) -> bool:
+        """
+        提交任务 (不等待执行)
+
+        Args:
+            key: 去重键，同一 key 排队或执行中时不重复入队
+            factory: 无参协程工厂，轮到执行时才创建协程
+            tag: 调用方附带的任务描述 (如计算参数)，供去重时比对
+
+        Returns:
+            True 表示新入队，False 表示同 key 的任务已在排队或执行中
+
+        Raises:
+            JobQueueFullException: 队列已满
+        """
+        self.start()
+        if key in self._active:
+            self._stats.deduplicated += 1
+            return False
+
+        job = Job(key=key, factory=factory, tag=tag)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self._stats.rejected += 1
+            logger.warning(f"⚠️ [Jobs] Queue full ({self.max_queue}), rejected {key}")
+            raise JobQueueFullException(self.max_queue)
+
+        self._active[key] = job
+        self._stats.submitted += 1
+        logger.info(f"📥 [Jobs] Queued {key} (queued={self._queue.qsize()}, running={self.running})")
+        return True
+
+    async def _worker(self, index: int) -> None:
+        while True:
+            job = await self._queue.get()
+            job.started_at = time.monotonic()
+            self._stats.wait_ms += (job.started_at - job.submitted_at) * 1000
+            try:
+                await job.factory()
+                self._stats.completed += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # 失败状态由业务侧写入任务状态，这里只记录，worker 继续处理下一个任务
+                self._stats.failed += 1
+                logger.error(f"💥 [Jobs] {job.key} failed on worker {index}: {e}")
+            finally:
+                self._stats.run_ms += (time.monotonic() - job.started_at) * 1000
+                self._active.pop(job.key, None)
+                self._queue.task_done()
+
+    @property
+    def running(self) -> int:
+        return sum(1 for job in self._active.values() if job.started_at is not None)
+
+    def stats(self) -> Dict[str, Any]:
+        s = self._stats
+        finished = s.completed + s.failed
+        return {
+            "workers": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "queued": len(self._active) - self.running,
+            "running": self.running,
+            "submitted": s.submitted,
+            "deduplicated": s.deduplicated,
+            "rejected": s.rejected,
+            "completed": s.completed,
+            "failed": s.failed,
+            "avg_wait_ms": round(s.wait_ms / finished, 2) if finished else 0.0,
+            "avg_run_ms": round(s.run_ms / finished, 2) if finished else 0.0,
+        }
+
+# 导出单例对象
+job_scheduler = JobScheduler(
+    max_concurrency=getattr(settings, "JOB_MAX_CONCURRENCY", 2),
+    max_queue=getattr(settings, "JOB_QUEUE_SIZE", 100),
+)
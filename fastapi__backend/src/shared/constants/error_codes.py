@@ -26,6 +26,9 @@ class ErrorCode(IntEnum):
     # 404: 请求的资源(如临时文件)不存在
     NOT_FOUND = 40004
 
+    # 409: 同一资源已有参数不同的任务在排队或执行中
+    TASK_CONFLICT = 40009
+
     # --- 文件/数据 IO 类错误 ---
     
     # 文件读取失败 (IOError, 权限不足或路径不存在)
@@ -66,4 +69,7 @@ class ErrorCode(IntEnum):
     EXTERNAL_SERVICE_ERROR = 50020
     
     # 基础设施错误 (如 Redis 连接失败)
-    INFRASTRUCTURE_ERROR = 50030
\ No newline at end of file
+    INFRASTRUCTURE_ERROR = 50030
+
+    # 后台任务队列已满 (稍后重试)
+    JOB_QUEUE_FULL = 50040
\ No newline at end of file
@@ -17,4 +17,30 @@ class ComputeFailedException(BaseAppException):
             code=ErrorCode.COMPUTE_FAILED,
             status_code=500,
             details={"error": error_msg}
-        )
\ No newline at end of file
+        )
+
+class JobQueueFullException(BaseAppException):
+    """
+    后台任务队列已满，拒绝新的异步提交
+    """
+    def __init__(self, max_queue: int):
+        super().__init__(
+            message="Too many pending jobs, please retry later.",
+            code=ErrorCode.JOB_QUEUE_FULL,
+            status_code=503,
+            details={"max_queue": max_queue}
+        )
+
+
+class TaskConflictException(BaseAppException):
+    """
+    同一 file_id 已有参数不同的任务在排队或执行中
+    (任务 ID 即 file_id，两份参数不同的报告无法共用同一个任务状态)
+    """
+    def __init__(self, task_id: str, active_params: Any, requested_params: Any):
+        super().__init__(
+            message="Another analysis with different parameters is in progress for this file, please retry later.",
+            code=ErrorCode.TASK_CONFLICT,
+            status_code=409,
+            details={"task_id": task_id, "active": active_params, "requested": requested_params}
+        )
@@ -0,0 +1,201 @@
+# src/shared/utils/columnar_cache.py
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.app.config.settings import settings
+from src.shared.utils.hash_util import cached_file_fingerprint
+from src.shared.utils.logger import logger
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as pa_ipc
+except ImportError:  # pyarrow 为可选依赖，缺失时旁路缓存整体关闭
+    pa = None
+    pa_ipc = None
+
+# =========================================================
+# 列式旁路缓存 (Columnar Sidecar)
+#
+# 同一个上传文件会被 /quality/inspect -> /quality/analyze -> /cleaning/run
+# -> /analysis/run 反复解析。首次解析成功后把结果写成 Arrow IPC 文件，
+# 之后直接内存映射读取，跳过文本解析。
+#
+# 文件名: {源路径哈希}-{内容键}.arrow
+#   - 源路径哈希：源路径 + 解析选项，同一来源的旧 sidecar 在写入新版本时被清理
+#   - 内容键：内容指纹 + mtime + 解析选项，源文件变化即失效
+# =========================================================
+
+SIDECAR_SUFFIX = ".arrow"
+PROFILE_METADATA_KEY = b"load_profile"
+
+def sidecar_dir() -> Path:
+    return Path(settings.TEMP_DIR) / "columnar"
+
+def is_enabled() -> bool:
+    return pa is not None and bool(getattr(settings, "COLUMNAR_CACHE_ENABLED", True))
+
+def _option_str(options: Optional[Dict[str, Any]]) -> str:
+    return json.dumps(options or {}, sort_keys=True, separators=(",", ":"), default=str)
+
+def _path_prefix(file_path: str, options: Optional[Dict[str, Any]] = None) -> str:
+    source = f"{os.path.abspath(file_path)}:{_option_str(options)}"
+    return hashlib.md5(source.encode("utf-8")).hexdigest()[:16]
+
+def sidecar_path(file_path: str, options: Optional[Dict[str, Any]] = None) -> Path:
+    """
+    计算源文件对应的 sidecar 路径 (不检查是否存在)
+    指纹按 (路径, 大小, 修改时间) 缓存，同一文件反复读写 sidecar 时不再重新采样读盘
+    """
+    fingerprint = cached_file_fingerprint(file_path)
+    mtime_ns = os.stat(file_path).st_mtime_ns
+    content_key = hashlib.md5(f"{fingerprint}:{mtime_ns}:{_option_str(options)}".encode("utf-8")).hexdigest()
+    return sidecar_dir() / f"{_path_prefix(file_path, options)}-{content_key}{SIDECAR_SUFFIX}"
+
+def _restore_missing_values(df: pd.DataFrame) -> pd.DataFrame:
+    """Arrow 的字符串空值还原为 pandas 的 None，统一回 NaN，保证与文本解析结果一致"""
+    obj_cols = df.select_dtypes(include="object").columns
+    if len(obj_cols) > 0:
+        df[obj_cols] = df[obj_cols].where(df[obj_cols].notna(), np.nan)
+    return df
+
+def load_sidecar(
+    file_path: str,
+    options: Optional[Dict[str, Any]] = None,
+    columns: Optional[List[str]] = None,
+    rows: Optional[Tuple[int, Optional[int]]] = None,
+) -> Optional[Tuple[pd.DataFrame, Dict[str, Any]]]:
+    """
+    尝试从 sidecar 读取 DataFrame
+
+    Args:
+        columns: 可选，只物化这些列 (列投影在 Arrow 层完成，零拷贝)
+        rows: 可选，(start, stop) 行区间，stop 为 None 表示到末尾；只转换这部分行
+
+    Returns:
+        (df, 首次解析时记录的 load_profile)；未命中或读取失败返回 None
+        profile["num_rows"] 为 sidecar 的总行数 (切片前)
+    """
+    if not is_enabled():
+        return None
+
+    try:
+        path = sidecar_path(file_path, options)
+        if not path.exists():
+            return None
+
+        with pa.memory_map(str(path), "r") as source:
+            table = pa_ipc.open_file(source).read_all()
+            num_rows = table.num_rows
+            if columns is not None:
+                table = table.select(columns)
+            if rows is not None:
+                start, stop = rows
+                stop = num_rows if stop is None else min(stop, num_rows)
+                table = table.slice(start, max(stop - start, 0))
+            df = _restore_missing_values(table.to_pandas())
+
+        metadata = table.schema.metadata or {}
+        profile = json.loads(metadata.get(PROFILE_METADATA_KEY, b"{}"))
+        profile["sidecar"] = str(path)
+        profile["num_rows"] = num_rows
+        return df, profile
+
+    except Exception as e:
+        # 缓存层永远不阻断主流程，读不了就回退到文本解析
+        logger.warning(f"Columnar sidecar read failed for {file_path}: {e}")
+        return None
+
+def sidecar_row_count(file_path: str, options: Optional[Dict[str, Any]] = None) -> Optional[int]:
+    """
+    只读 sidecar 的 record batch 元数据得到总行数 (不物化任何列)，未命中返回 None
+    """
+    if not is_enabled():
+        return None
+    try:
+        path = sidecar_path(file_path, options)
+        if not path.exists():
+            return None
+        with pa.memory_map(str(path), "r") as source:
+            reader = pa_ipc.open_file(source)
+            return sum(reader.get_batch(i).num_rows for i in range(reader.num_record_batches))
+    except Exception as e:
+        logger.debug(f"Columnar sidecar row count failed for {file_path}: {e}")
+        return None
+
+def sidecar_columns(file_path: str, options: Optional[Dict[str, Any]] = None) -> Optional[List[str]]:
+    """
+    只读 sidecar 的 schema 得到列名 (不物化任何列)，未命中返回 None
+    """
+    if not is_enabled():
+        return None
+    try:
+        path = sidecar_path(file_path, options)
+        if not path.exists():
+            return None
+        with pa.memory_map(str(path), "r") as source:
+            return list(pa_ipc.open_file(source).schema.names)
+    except Exception as e:
+        logger.debug(f"Columnar sidecar schema read failed for {file_path}: {e}")
+        return None
+
+def write_sidecar(
+    file_path: str,
+    df: pd.DataFrame,
+    load_profile: Optional[Dict[str, Any]] = None,
+    options: Optional[Dict[str, Any]] = None,
+) -> Optional[Path]:
+    """
+    把解析结果写成 Arrow IPC sidecar (best-effort)
+
+    混合类型的 object 列等无法转换为 Arrow 的数据会直接跳过，不影响本次请求。
+    """
+    if not is_enabled():
+        return None
+
+    tmp_path: Optional[Path] = None
+    try:
+        path = sidecar_path(file_path, options)
+        if path.exists():
+            return path
+
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        metadata = dict(table.schema.metadata or {})
+        metadata[PROFILE_METADATA_KEY] = json.dumps(load_profile or {}, default=str).encode("utf-8")
+        table = table.replace_schema_metadata(metadata)
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        with pa.OSFile(str(tmp_path), "wb") as sink:
+            with pa_ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        # 原子替换，并发请求不会读到写了一半的文件
+        os.replace(tmp_path, path)
+
+        _remove_stale_sidecars(file_path, options, keep=path)
+        logger.info(f"🗂️ [Columnar] Sidecar written for {os.path.basename(file_path)} -> {path.name}")
+        return path
+
+    except Exception as e:
+        logger.debug(f"Columnar sidecar skipped for {file_path}: {e}")
+        try:
+            if tmp_path is not None and tmp_path.exists():
+                tmp_path.unlink()
+        except OSError:
+            pass
+        return None
+
+def _remove_stale_sidecars(file_path: str, options: Optional[Dict[str, Any]], keep: Path) -> None:
+    """同一源路径 (+解析选项) 只保留最新的 sidecar，源文件被替换后旧版本在这里回收"""
+    prefix = _path_prefix(file_path, options)
+    for old in sidecar_dir().glob(f"{prefix}-*{SIDECAR_SUFFIX}"):
+        if old != keep:
+            try:
+                old.unlink()
+            except OSError:
+                pass
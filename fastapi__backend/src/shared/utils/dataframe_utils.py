@@ -1,7 +1,7 @@
 # src/shared/utils/dataframe_utils.py
 import pandas as pd
 import numpy as np
-from typing import List
+from typing import Any, Dict, List, Tuple
 
 def validate_dataframe(df: pd.DataFrame, min_rows: int = 1, min_cols: int = 1) -> bool:
     """
@@ -53,4 +53,128 @@ def get_dataframe_summary(df: pd.DataFrame) -> dict:
         "rows": int(df.shape[0]),
         "cols": int(df.shape[1]),
         "memory_usage_mb": round(df.memory_usage(deep=True).sum() / 1024 / 1024, 2)
-    }
\ No newline at end of file
+    }
+
+# =========================================================
+# 内存压缩 (dtype compaction)
+# 解析后可选的压缩阶段：只做值不变的转换；被改动的列在 DataFrame.attrs 中记下原 dtype，
+# 对外展示的类型按记录映射回去 (attrs 随 copy / 投影 / 切片一起传递)
+# =========================================================
+
+# DataFrame.attrs 中记录压缩前 dtype 的键：{列名: {"from": 原 dtype, "to": 压缩后 dtype}}
+COMPACTED_DTYPES_ATTR = "compacted_dtypes"
+
+# 整数下转型的候选顺序 (从小到大)
+_INT_CANDIDATES = [np.int8, np.int16, np.int32]
+_UINT_CANDIDATES = [np.uint8, np.uint16, np.uint32]
+
+def _downcast_integer(series: pd.Series) -> pd.Series:
+    """按取值范围选最小的整数类型，值完全不变"""
+    if series.empty:
+        return series
+    lo, hi = series.min(), series.max()
+    candidates = _UINT_CANDIDATES if lo >= 0 and series.dtype.kind == "u" else _INT_CANDIDATES
+    for dtype in candidates:
+        info = np.iinfo(dtype)
+        if info.min <= lo and hi <= info.max:
+            return series.astype(dtype)
+    return series
+
+def _downcast_float(series: pd.Series) -> pd.Series:
+    """float64 -> float32，仅当每个值往返转换后完全相等 (NaN 视为相等)"""
+    values = series.to_numpy()
+    narrowed = values.astype(np.float32)
+    same = (narrowed.astype(np.float64) == values) | (np.isnan(values) & np.isnan(narrowed))
+    return series.astype(np.float32) if bool(same.all()) else series
+
+def _arrow_strings_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+def compact_dtypes(
+    df: pd.DataFrame,
+    category_max_ratio: float = 0.5,
+    downcast_floats: bool = False,
+    arrow_strings: bool = False,
+) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """
+    压缩 DataFrame 内存占用 (返回新的 DataFrame，不修改入参)
+
+    - 整数列：按取值范围下转型 (int64 -> int8/16/32)
+    - 浮点列：downcast_floats=True 时，逐值无损才转 float32 (默认关闭：float32 上的均值/方差累加精度不同)
+    - 字符串列：唯一值占比 <= category_max_ratio 转 category；
+      其余在 arrow_strings=True 且安装了 pyarrow 时转 Arrow 字符串，否则保持 object
+
+    Returns:
+        (压缩后的 df, report)，report["columns"] 记录每列 before/after 字节数与 dtype 变化；
+        同样的 dtype 变化写入 df.attrs[COMPACTED_DTYPES_ATTR]，供 logical_dtype_names 还原
+    """
+    use_arrow = arrow_strings and _arrow_strings_available()
+    compacted: List[pd.Series] = []
+    columns_report: Dict[str, Dict[str, Any]] = {}
+
+    # 按位置取列，重复列名也能逐列处理
+    for i, col in enumerate(df.columns):
+        series = df.iloc[:, i]
+        before = int(series.memory_usage(index=False, deep=True))
+        kind = series.dtype.kind
+
+        if kind in "iu":
+            new = _downcast_integer(series)
+        elif kind == "f" and downcast_floats and series.dtype == np.float64:
+            new = _downcast_float(series)
+        elif series.dtype == object and pd.api.types.infer_dtype(series, skipna=True) == "string":
+            non_null = int(series.notna().sum())
+            if non_null and series.nunique(dropna=True) / non_null <= category_max_ratio:
+                new = series.astype("category")
+            elif use_arrow:
+                new = series.astype("string[pyarrow]")
+            else:
+                new = series
+        else:
+            new = series
+
+        after = int(new.memory_usage(index=False, deep=True)) if new is not series else before
+        if after >= before:
+            new, after = series, before
+        compacted.append(new)
+        columns_report[str(col)] = {
+            "from": str(series.dtype),
+            "to": str(new.dtype),
+            "before_bytes": before,
+            "after_bytes": after,
+        }
+
+    result = pd.concat(compacted, axis=1) if compacted else df.copy()
+    result.columns = df.columns
+    before_total = sum(c["before_bytes"] for c in columns_report.values())
+    after_total = sum(c["after_bytes"] for c in columns_report.values())
+    changed = {k: v for k, v in columns_report.items() if v["from"] != v["to"]}
+    report = {
+        "before_bytes": before_total,
+        "after_bytes": after_total,
+        "ratio": round(before_total / after_total, 2) if after_total else 1.0,
+        "columns": changed,
+    }
+    result.attrs = {
+        **df.attrs,
+        COMPACTED_DTYPES_ATTR: {k: {"from": v["from"], "to": v["to"]} for k, v in changed.items()},
+    }
+    return result, report
+
+def logical_dtype_names(df: pd.DataFrame) -> List[str]:
+    """
+    每列 (按位置) 对外展示的 dtype 名称，保证对外展示的类型不因压缩而变化
+
+    只有 compact_dtypes 改过、且当前 dtype 仍是压缩结果的列才映射回原 dtype；
+    其余列 (未开启压缩、或本来就是 Int64 / float32 / string 的列) 原样返回 str(dtype)
+    """
+    compacted = df.attrs.get(COMPACTED_DTYPES_ATTR) or {}
+    names = []
+    for col, dtype in zip(df.columns, df.dtypes):
+        change = compacted.get(str(col))
+        names.append(change["from"] if change and change["to"] == str(dtype) else str(dtype))
+    return names
@@ -0,0 +1,154 @@
+# src/shared/utils/excel_reader.py
+import os
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+from pandas.io.parsers import TextParser
+
+from src.shared.utils.logger import logger
+
+# =========================================================
+# 流式 Excel 读取 (xlsx / xlsm)
+#
+# pd.read_excel 的 openpyxl 路径会为每个单元格构造 Cell 对象再转换；
+# 这里直接用 read_only + values_only 逐行迭代，拿到的就是 Python 值，
+# 最后交给 pandas 自己的 TextParser 做表头 / 空值 / 类型推断，结果与 pd.read_excel 一致。
+# =========================================================
+
+SheetRef = Union[str, int, None]
+
+# Excel 错误值：openpyxl values_only 模式下以字符串返回，pandas 会把错误单元格转为 NaN
+EXCEL_ERROR_VALUES = {"#NULL!", "#DIV/0!", "#VALUE!", "#REF!", "#NAME?", "#NUM!", "#N/A", "#GETTING_DATA"}
+
+def _open_workbook(file_path: str):
+    from openpyxl import load_workbook
+    return load_workbook(file_path, read_only=True, data_only=True, keep_links=False)
+
+def _select_sheet(wb, sheet_name: SheetRef):
+    """按名称或序号选择工作表，默认第一个；找不到时与 pandas 一样抛 ValueError"""
+    if sheet_name is None:
+        sheet_name = 0
+    if isinstance(sheet_name, int):
+        if sheet_name < 0 or sheet_name >= len(wb.worksheets):
+            raise ValueError(f"Worksheet index {sheet_name} is invalid, {len(wb.worksheets)} worksheets found")
+        return wb.worksheets[sheet_name]
+    if sheet_name not in wb.sheetnames:
+        raise ValueError(f"Worksheet named '{sheet_name}' not found")
+    return wb[sheet_name]
+
+def list_sheets(file_path: str) -> List[Dict[str, Any]]:
+    """
+    列出工作簿中的全部工作表 (不解析单元格数据)
+
+    行列数来自每个工作表 XML 头部的 dimension 元数据；部分第三方工具导出的文件没有该元数据，此时为 None。
+    rows 为含表头的物理行数。
+    """
+    wb = _open_workbook(file_path)
+    try:
+        sheets = []
+        for index, ws in enumerate(wb.worksheets):
+            sheets.append({
+                "name": ws.title,
+                "index": index,
+                "rows": ws.max_row,
+                "cols": ws.max_column,
+                "state": getattr(ws, "sheet_state", "visible"),
+            })
+        return sheets
+    finally:
+        wb.close()
+
+def sheet_dimensions(file_path: str, sheet_name: SheetRef = None, exact: bool = False) -> Dict[str, Optional[int]]:
+    """
+    工作表的 (rows, cols)，rows 含表头
+
+    Args:
+        exact: dimension 元数据缺失时是否流式遍历一次得到精确行列数 (仍不构建 DataFrame)
+    """
+    wb = _open_workbook(file_path)
+    try:
+        ws = _select_sheet(wb, sheet_name)
+        rows, cols = ws.max_row, ws.max_column
+        if exact and (rows is None or cols is None):
+            rows, cols = 0, 0
+            for row in ws.iter_rows(values_only=True):
+                rows += 1
+                cols = max(cols, len(row))
+        return {"rows": rows, "cols": cols}
+    finally:
+        wb.close()
+
+def _convert_value(value: Any) -> Any:
+    """与 pandas OpenpyxlReader._convert_cell 的口径一致"""
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        if value.is_integer():
+            return int(value)
+        return value
+    if isinstance(value, str) and value in EXCEL_ERROR_VALUES:
+        return np.nan
+    return value
+
+def iter_excel_rows(
+    file_path: str,
+    sheet_name: SheetRef = None,
+    max_rows: Optional[int] = None,
+) -> Iterator[List[Any]]:
+    """
+    逐行产出已转换的单元格值 (含表头行)，行尾空单元格已裁剪
+
+    Args:
+        max_rows: 最多读取的物理行数，达到后立即停止 (后续 XML 不再解析)
+    """
+    wb = _open_workbook(file_path)
+    try:
+        ws = _select_sheet(wb, sheet_name)
+        for i, row in enumerate(ws.iter_rows(values_only=True)):
+            if max_rows is not None and i >= max_rows:
+                break
+            converted = [_convert_value(v) for v in row]
+            while converted and converted[-1] == "":
+                converted.pop()
+            yield converted
+    finally:
+        wb.close()
+
+def read_excel_streaming(
+    file_path: str,
+    sheet_name: SheetRef = None,
+    nrows: Optional[int] = None,
+    usecols: Optional[Sequence[Any]] = None,
+    na_values: Optional[Sequence[str]] = None,
+    keep_default_na: bool = True,
+) -> pd.DataFrame:
+    """
+    流式读取一个工作表为 DataFrame (表头为第一行)，语义与 pd.read_excel(header=0) 一致
+
+    Args:
+        nrows: 只读取前 nrows 个数据行，读到即停止解析剩余 XML
+        usecols: 只保留这些列 (列名或列序号)
+    """
+    max_rows = nrows + 1 if nrows is not None else None
+    data = list(iter_excel_rows(file_path, sheet_name, max_rows=max_rows))
+
+    # 去掉尾部空行，并把参差不齐的行补齐到同一宽度 (同 pandas)
+    while data and not data[-1]:
+        data.pop()
+    width = max((len(r) for r in data), default=0)
+    data = [r + [""] * (width - len(r)) for r in data]
+    if not data:
+        return pd.DataFrame()
+
+    parser = TextParser(
+        data,
+        header=0,
+        nrows=nrows,
+        usecols=usecols,
+        na_values=na_values,
+        keep_default_na=keep_default_na,
+    )
+    df = parser.read()
+    logger.debug(f"Excel streamed {os.path.basename(file_path)} [{sheet_name or 0}]: shape={df.shape}")
+    return df
@@ -1,101 +1,456 @@
 # src/shared/utils/file_parser.py
+import codecs
+import csv
+import io
+import os
+import numpy as np
 import pandas as pd
-import chardet
+from chardet import UniversalDetector
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
 from src.shared.utils.logger import logger
 
 from src.app.config.settings import settings
+from src.shared.utils import columnar_cache, excel_reader
+from src.shared.utils.dataframe_utils import compact_dtypes
+from src.infrastructure.cache.dataframe_cache import dataframe_cache
 from src.shared.exceptions.data_parse import DataParseException
 from src.shared.exceptions.file_decodeException import FileDecodeException
 from src.shared.exceptions.data_empty import DataEmptyException
 
+class _FileMemo:
+    """
+    按文件签名 (绝对路径, 大小, 修改时间) 缓存探测结果
+    文件被替换/修改后签名变化，旧结果自然失效；容量满时按插入顺序淘汰
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._data: Dict[Tuple[str, int, int], Any] = {}
+
+    def get(self, file_path: str) -> Optional[Any]:
+        try:
+            return self._data.get(_file_signature(file_path))
+        except OSError:
+            return None
+
+    def put(self, file_path: str, value: Any) -> None:
+        try:
+            sig = _file_signature(file_path)
+        except OSError:
+            return
+        if sig not in self._data and len(self._data) >= self.max_entries:
+            self._data.pop(next(iter(self._data)))
+        self._data[sig] = value
+
+def _file_signature(file_path: str) -> Tuple[str, int, int]:
+    """文件签名 (绝对路径, 大小, 修改时间)，文件被替换后签名随之变化"""
+    st = os.stat(file_path)
+    return os.path.abspath(file_path), st.st_size, st.st_mtime_ns
+
+# 编码探测结果缓存，三个模块反复打开同一上传文件时直接命中
+_ENCODING_CACHE = _FileMemo()
+
+def _normalize_encoding(name: Optional[str]) -> Optional[str]:
+    if not name:
+        return None
+    try:
+        return codecs.lookup(name).name
+    except LookupError:
+        return None
+
+def _decodes_cleanly(block: bytes, encoding: str, at_start: bool) -> bool:
+    """
+    校验一段字节能否被指定编码解码
+    非文件开头的块可能从多字节字符中间切入，允许跳过最多 3 个前导字节；
+    块尾的半个字符由增量解码器 (final=False) 容忍
+    """
+    offsets = [0] if at_start else [0, 1, 2, 3]
+    for offset in offsets:
+        decoder = codecs.getincrementaldecoder(encoding)()
+        try:
+            decoder.decode(block[offset:], final=False)
+            return True
+        except UnicodeDecodeError:
+            continue
+    return False
+
+def _validation_blocks(file_path: str, head: bytes) -> List[Tuple[bytes, bool]]:
+    """头部 + 中部 + 尾部样本块，用于校验候选编码"""
+    block_size = getattr(settings, 'ENCODING_VALIDATE_BLOCK_SIZE', 65536)
+    size = os.path.getsize(file_path)
+    blocks = [(head, True)]
+    if size <= len(head):
+        return blocks
+
+    with open(file_path, 'rb') as f:
+        for offset in (size // 2, max(size - block_size, 0)):
+            if offset < len(head):
+                continue
+            f.seek(offset)
+            blocks.append((f.read(block_size), False))
+    return blocks
+
 def detect_encoding(file_path: str) -> str:
     """
     智能编码探测 + 鲁棒回退
+
+    1. 增量探测：分块喂给 UniversalDetector，置信度收敛或字节预算用尽即停止
+    2. 校验：候选编码需能解码头部、中部、尾部样本块 (防止“前面全是 ASCII，后面才出现中文”)
+    3. 缓存：按 (path, size, mtime) 记忆结果
     """
+    cached = _ENCODING_CACHE.get(file_path)
+    if cached:
+        return cached
+
     try:
-        sample_size = getattr(settings, 'ENCODING_SAMPLE_SIZE', 20000) # 稍微加大采样
+        chunk_size = getattr(settings, 'ENCODING_CHUNK_SIZE', 16384)
+        max_bytes = getattr(settings, 'ENCODING_SAMPLE_SIZE', 1048576)
+
+        detector = UniversalDetector()
+        head = bytearray()
         with open(file_path, 'rb') as f:
-            raw_data = f.read(sample_size)
-        
-        result = chardet.detect(raw_data)
-        encoding = result['encoding']
-        confidence = result['confidence']
-        
-        # 🚨 核心防御：如果探测结果是 ascii 或者是低置信度
-        # 绝不相信 ascii，因为它读不动任何特殊字符，直接强制转 utf-8 或 gbk
-        if not encoding or encoding.lower() == 'ascii' or (confidence and confidence < 0.7):
-            return 'utf-8' # 或者尝试 'gbk'
-            
-        return encoding
+            while len(head) < max_bytes:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    break
+                head.extend(chunk)
+                detector.feed(chunk)
+                if detector.done:
+                    break
+        detector.close()
+
+        detected = _normalize_encoding(detector.result.get('encoding'))
+        confidence = detector.result.get('confidence') or 0.0
+
+        # 🚨 核心防御：绝不相信 ascii，它读不动任何特殊字符
+        # 候选顺序：utf-8 (能通过校验几乎就是它) -> 高置信度探测结果 -> 配置列表 -> 低置信度探测结果
+        candidates: List[str] = ['utf-8']
+        if detected and detected != 'ascii' and confidence >= 0.7:
+            candidates.append(detected)
+        candidates.extend(filter(None, (_normalize_encoding(e) for e in settings.ENCODING_LIST)))
+        if detected and detected != 'ascii':
+            candidates.append(detected)
+        candidates = list(dict.fromkeys(candidates))
+
+        blocks = _validation_blocks(file_path, bytes(head))
+        for encoding in candidates:
+            if all(_decodes_cleanly(block, encoding, at_start) for block, at_start in blocks):
+                logger.debug(
+                    f"Encoding detected for {file_path}: {encoding} "
+                    f"(detector={detected}, confidence={confidence:.2f}, sampled={len(head)} bytes)"
+                )
+                _ENCODING_CACHE.put(file_path, encoding)
+                return encoding
+
+        logger.warning(f"No candidate encoding validated for {file_path}, fallback to utf-8")
+        return 'utf-8'
     except Exception as e:
         logger.warning(f"Encoding detection failed: {e}, fallback to utf-8")
         return 'utf-8'
+
 # src/shared/utils/file_parser.py
 
-def parse_csv(file_path: str, filename: str) -> pd.DataFrame:
+def _csv_engine_tiers() -> List[str]:
     """
-    升级版：带有智能嗅探功能的 CSV 解析器
+    CSV 解析引擎分级 (快 -> 慢)
+    pyarrow (可选) -> c -> python，python 引擎只作为最后兜底
     """
-    encoding = detect_encoding(file_path)
-    
-    # 🚀 绝杀招式：利用 Python 标准库的 Sniffer 自动探测分隔符
-    import csv
-    try:
-        with open(file_path, 'r', encoding=encoding) as f:
-            # 采样前 2048 字节进行嗅探
-            sample = f.read(2048)
-            # 强制要求包含几种常见分隔符之一，防止嗅探器犯糊涂
-            dialect = csv.Sniffer().sniff(sample, delimiters=',;\t|')
-            detected_sep = dialect.delimiter
-            logger.info(f"Sniffer detected separator: '{detected_sep}' for {filename}")
-    except Exception as e:
-        logger.warning(f"Sniffer failed, falling back to comma. Error: {e}")
-        detected_sep = ','
+    tiers = []
+    if getattr(settings, 'CSV_PYARROW_ENGINE', False):
+        try:
+            import pyarrow  # noqa: F401
+            tiers.append('pyarrow')
+        except ImportError:
+            logger.debug("pyarrow not installed, skip pyarrow CSV engine")
+    tiers.extend(['c', 'python'])
+    return tiers
 
-    # 定义一套重试优先级：嗅探出来的优先，然后是常见的
-    separators = [detected_sep, ',', ';', '\t', '|']
-    # 去重
-    separators = list(dict.fromkeys(separators))
+# pyarrow 引擎不支持的读取参数，出现时直接从 c 引擎开始
+_PYARROW_UNSUPPORTED_KWARGS = ('nrows', 'skiprows')
+
+def _read_csv_tiered(file_path: str, sep: str, encoding: str, **read_kwargs: Any) -> Tuple[pd.DataFrame, str, int]:
+    """
+    按引擎分级读取 CSV，返回 (df, 实际使用的引擎, 跳过的坏行数)
+    快引擎严格解析，失败 (引号异常、编码问题、字段数多于表头的坏行等) 时才降级到下一层；
+    只有兜底的 python 引擎跳过坏行，并逐行计数
+
+    Args:
+        read_kwargs: 透传给 pd.read_csv 的额外参数 (如 nrows / usecols)
+    """
+    last_error: Optional[Exception] = None
+    for engine in _csv_engine_tiers():
+        if engine == 'pyarrow' and any(read_kwargs.get(k) is not None for k in _PYARROW_UNSUPPORTED_KWARGS):
+            continue
+
+        skipped = [0]
+
+        def skip_bad_line(fields: List[str]) -> None:
+            skipped[0] += 1
+            return None
 
-    for sep in separators:
         try:
             df = pd.read_csv(
                 file_path,
                 sep=sep,
                 encoding=encoding,
-                engine='python',
-                on_bad_lines='skip'
+                engine=engine,
+                on_bad_lines=skip_bad_line if engine == 'python' else 'error',
+                **read_kwargs
             )
-            
-            # 🌟 关键校验：只有列数 > 1 的才被认为是“解析成功”
-            # 如果用逗号去切分分号分隔的文件，列数通常只有 1
-            if not df.empty and df.shape[1] > 1:
-                return df
-                
-        except Exception:
+        except Exception as e:
+            logger.debug(f"CSV engine '{engine}' failed (sep={sep!r}): {e}")
+            last_error = e
+            continue
+        if skipped[0]:
+            logger.warning(f"CSV engine '{engine}' skipped {skipped[0]} malformed lines in {file_path}")
+        return df, engine, skipped[0]
+    raise last_error if last_error else DataParseException(filename=file_path, reason="No CSV engine available")
+
+# =========================================================
+# CSV 方言判定 (Dialect Resolution)
+# 基于头部采样一次性决定分隔符，避免逐个分隔符全量试解析
+# =========================================================
+
+CANDIDATE_SEPARATORS = [',', ';', '\t', '|']
+
+# 已判定的方言缓存，同一文件被 quality / cleaning / analysis 反复读取时跳过判定
+_DIALECT_CACHE = _FileMemo()
+
+def _read_head_sample(file_path: str, encoding: str, sample_bytes: int) -> str:
+    """读取头部样本，截断到最后一个完整行，避免半行干扰字段计数"""
+    with open(file_path, 'rb') as f:
+        raw = f.read(sample_bytes)
+        truncated = bool(f.read(1))
+
+    if truncated:
+        cut = raw.rfind(b'\n')
+        if cut > 0:
+            raw = raw[:cut + 1]
+
+    return raw.decode(encoding, errors='replace')
+
+def _score_separator(sample: str, sep: str, quotechar: str = '"') -> Dict[str, Any]:
+    """
+    对单个候选分隔符打分 (0 ~ 1)
+
+    1. consistency: 每行字段数与众数一致的比例 (众数 <= 1 直接判 0)
+    2. quote_balance: 解析后残留在字段内部的引号越少越好 (说明引号落在字段边界上)
+    3. header: 首行字段非空、不重复、不全是数字
+    """
+    try:
+        rows = [r for r in csv.reader(io.StringIO(sample), delimiter=sep, quotechar=quotechar) if r]
+    except csv.Error:
+        return {"sep": sep, "score": 0.0, "fields": 0}
+
+    if not rows:
+        return {"sep": sep, "score": 0.0, "fields": 0}
+
+    counts = pd.Series([len(r) for r in rows])
+    mode_fields = int(counts.mode().iloc[0])
+    if mode_fields <= 1:
+        return {"sep": sep, "score": 0.0, "fields": mode_fields}
+
+    consistency = float((counts == mode_fields).mean())
+
+    total_fields = int(counts.sum())
+    stray_quotes = sum(1 for r in rows for field in r if quotechar in field)
+    quote_balance = 1.0 - stray_quotes / total_fields if total_fields else 0.0
+
+    header = [h.strip() for h in rows[0]]
+    checks = [
+        len(header) == mode_fields,
+        all(header),
+        len(set(header)) == len(header),
+        not all(_looks_numeric(h) for h in header if h),
+    ]
+    header_score = sum(checks) / len(checks)
+
+    score = consistency * quote_balance * (0.5 + 0.5 * header_score)
+    return {
+        "sep": sep,
+        "score": round(score, 4),
+        "fields": mode_fields,
+        "has_header": header_score >= 0.75,
+    }
+
+def _looks_numeric(text: str) -> bool:
+    try:
+        float(text)
+        return True
+    except ValueError:
+        return False
+
+def resolve_csv_dialect(file_path: str, encoding: str, filename: Optional[str] = None) -> Dict[str, Any]:
+    """
+    基于头部有界样本判定 CSV 方言
+
+    候选顺序：csv.Sniffer 的猜测优先，其余按常见程度排列；得分相同时取靠前者。
+    所有候选都只切出一个字段时按单列文件处理 (sep=",")；
+    其余所有候选得分为 0 的情况返回 sep=None，交给 python 引擎自动推断。
+
+    Returns:
+        {"sep", "quotechar", "encoding", "fields", "has_header", "score"}
+    """
+    sample_bytes = getattr(settings, 'CSV_DIALECT_SAMPLE_BYTES', 65536)
+    sample = _read_head_sample(file_path, encoding, sample_bytes)
+    label = filename or file_path
+
+    candidates = list(CANDIDATE_SEPARATORS)
+    try:
+        sniffed = csv.Sniffer().sniff(sample[:8192], delimiters=''.join(CANDIDATE_SEPARATORS)).delimiter
+        candidates = [sniffed] + [c for c in candidates if c != sniffed]
+    except csv.Error:
+        pass
+
+    scored = [_score_separator(sample, sep) for sep in candidates]
+    best = max(scored, key=lambda x: x["score"])  # max 返回第一个最大值，保留候选顺序优先级
+
+    if best["score"] <= 0 and all(c["fields"] == 1 for c in scored):
+        # 每个候选切出来都只有一个字段：单列文件。不能交给 sep=None 推断，
+        # csv.Sniffer 会把表头里的某个字母当成分隔符
+        logger.info(f"Dialect resolved for {label}: single column")
+        return {"sep": ",", "quotechar": '"', "encoding": encoding, "fields": 1, "has_header": True, "score": 0.0}
+
+    if best["score"] <= 0:
+        logger.warning(f"Dialect resolution found no plausible separator for {label}, fallback to inference")
+        return {"sep": None, "quotechar": '"', "encoding": encoding, "fields": None, "has_header": True, "score": 0.0}
+
+    logger.info(
+        f"Dialect resolved for {label}: sep={best['sep']!r}, fields={best['fields']}, score={best['score']} "
+        f"(candidates: {[(c['sep'], c['score']) for c in scored]})"
+    )
+    return {
+        "sep": best["sep"],
+        "quotechar": '"',
+        "encoding": encoding,
+        "fields": best["fields"],
+        "has_header": best.get("has_header", True),
+        "score": best["score"],
+    }
+
+def _read_csv_with_dialect(
+    file_path: str, sep: Optional[str], encoding: str, **read_kwargs: Any
+) -> Tuple[pd.DataFrame, str, int]:
+    if sep is None:
+        # 兜底：方言无法判定，交给 python 引擎自动推断（让它自生自灭或抛出异常）
+        return pd.read_csv(file_path, sep=None, encoding=encoding, engine='python', **read_kwargs), 'python', 0
+    return _read_csv_tiered(file_path, sep, encoding, **read_kwargs)
+
+def _retry_with_fallback_encodings(
+    file_path: str, sep: Optional[str], failed_encoding: str, **read_kwargs: Any
+) -> Tuple[pd.DataFrame, str, int, str]:
+    """全量解析中途出现解码错误时，按 ENCODING_LIST 依次重试"""
+    last_error: Optional[Exception] = None
+    for encoding in settings.ENCODING_LIST:
+        if _normalize_encoding(encoding) == _normalize_encoding(failed_encoding):
             continue
+        try:
+            df, engine, skipped = _read_csv_with_dialect(file_path, sep, encoding, **read_kwargs)
+            logger.warning(f"Encoding {failed_encoding} failed mid-file for {file_path}, recovered with {encoding}")
+            return df, engine, skipped, encoding
+        except UnicodeDecodeError as e:
+            last_error = e
+    raise FileDecodeException(
+        filename=os.path.basename(file_path),
+        encoding_error=str(last_error) if last_error else f"{failed_encoding} decode failed",
+        details=None,
+    )
+
+def _lookup_dialect(
+    file_path: str, filename: str, dialect: Optional[Dict[str, Any]] = None
+) -> Tuple[Dict[str, Any], str]:
+    """方言来源优先级：调用方提示 -> 进程内缓存 -> 头部采样判定；返回 (dialect, 来源)"""
+    if dialect is not None:
+        return dialect, "hint"
+    cached = _DIALECT_CACHE.get(file_path)
+    if cached is not None:
+        return cached, "cache"
+    encoding = detect_encoding(file_path)
+    dialect = resolve_csv_dialect(file_path, encoding, filename)
+    _DIALECT_CACHE.put(file_path, dialect)
+    return dialect, "resolved"
 
-    # 兜底：如果都失败了，最后尝试一次原生的 read_csv（让它自生自灭或抛出异常）
-    return pd.read_csv(file_path, sep=None, encoding=encoding, engine='python')
+def parse_csv(
+    file_path: str,
+    filename: str,
+    load_profile: Optional[Dict[str, Any]] = None,
+    dialect: Optional[Dict[str, Any]] = None,
+    read_options: Optional[Dict[str, Any]] = None,
+) -> pd.DataFrame:
+    """
+    CSV 解析器：先判定方言，再只做一次全量解析
 
-def parse_excel(file_path: str, filename: str) -> pd.DataFrame:
+    Args:
+        load_profile: 可选，传入 dict 时会写入本次解析的元信息 (engine / dialect / skipped_lines)
+        dialect: 可选，上一次 load_profile 中返回的方言，传入后跳过方言判定
+        read_options: 可选，透传给 pd.read_csv 的读取范围参数 (nrows / usecols / skiprows)
+    """
+    read_options = read_options or {}
+    dialect, dialect_source = _lookup_dialect(file_path, filename, dialect)
+
+    sep = dialect.get("sep")
+    encoding = dialect.get("encoding") or detect_encoding(file_path)
+
+    try:
+        df, engine, skipped = _read_csv_with_dialect(file_path, sep, encoding, **read_options)
+    except UnicodeDecodeError:
+        # 校验块之间仍可能藏着非法字节：按配置列表换编码重试，并修正缓存
+        df, engine, skipped, encoding = _retry_with_fallback_encodings(file_path, sep, encoding, **read_options)
+        dialect = {**dialect, "encoding": encoding}
+        _ENCODING_CACHE.put(file_path, encoding)
+        _DIALECT_CACHE.put(file_path, dialect)
+
+    logger.info(
+        f"📄 [Parser] {filename}: engine={engine}, sep={sep!r}, encoding={encoding}, "
+        f"dialect={dialect_source}, shape={df.shape}, skipped_lines={skipped}"
+    )
+    if load_profile is not None:
+        load_profile.update({
+            "engine": engine,
+            "sep": sep,
+            "encoding": encoding,
+            "dialect": dict(dialect),
+            "dialect_source": dialect_source,
+            "skipped_lines": skipped,
+        })
+    return df
+
+def parse_excel(
+    file_path: str,
+    filename: str,
+    load_profile: Optional[Dict[str, Any]] = None,
+    nrows: Optional[int] = None,
+    usecols: Optional[List[str]] = None,
+    sheet_name: Union[str, int, None] = None,
+) -> pd.DataFrame:
     """
     Parse Excel file
+
+    Args:
+        nrows: optional, only read the first N data rows (stops reading the sheet early)
+        usecols: optional, only materialize these columns
+        sheet_name: optional sheet name or index, defaults to the first sheet
     """
     path = Path(file_path)
     suffix = path.suffix.lower()
     
-    # Select engine based on suffix
-    engine = 'openpyxl' if suffix == '.xlsx' else 'xlrd'
+    # xlsx / xlsm 走 read_only 流式读取；旧版 .xls 只能交给 xlrd
+    engine = 'openpyxl_stream' if suffix in ('.xlsx', '.xlsm') else 'xlrd'
+    sheet = sheet_name if sheet_name is not None else 0
     
     try:
-        df = pd.read_excel(file_path, sheet_name=0, engine=engine)
+        if engine == 'openpyxl_stream':
+            df = excel_reader.read_excel_streaming(file_path, sheet_name=sheet, nrows=nrows, usecols=usecols)
+        else:
+            df = pd.read_excel(file_path, sheet_name=sheet, engine=engine, nrows=nrows, usecols=usecols)
         
-        if df.empty:
-            raise DataEmptyException(detail=f"Excel file '{filename}' contains no data in the first sheet.")
-            
+        # nrows=0 是只读表头的有意请求，不算空文件
+        if df.empty and nrows != 0:
+            raise DataEmptyException(detail=f"Excel file '{filename}' contains no data in sheet {sheet!r}.")
+
+        if load_profile is not None:
+            load_profile.update({"engine": engine, "sheet_name": sheet})
         return df
 
     except ValueError as e:
@@ -118,9 +473,78 @@ def parse_excel(file_path: str, filename: str) -> pd.DataFrame:
     
 
 
-def parse_file(file_path: str, original_filename: Optional[str] = None) -> pd.DataFrame:
+def parse_file(
+    file_path: str,
+    original_filename: Optional[str] = None,
+    load_profile: Optional[Dict[str, Any]] = None,
+    dialect: Optional[Dict[str, Any]] = None,
+    sheet_name: Union[str, int, None] = None,
+    compact: Optional[bool] = None,
+) -> pd.DataFrame:
     """
     Unified parsing entry point
+
+    Args:
+        load_profile: optional dict, filled with parser metadata (engine, dialect, encoding ...)
+        dialect: optional CSV dialect from a previous load_profile, skips dialect resolution
+        sheet_name: optional Excel sheet name or index (ignored for CSV)
+        compact: optional, compact dtypes after parsing (defaults to settings.DATAFRAME_COMPACT_DTYPES);
+            per-column before/after bytes are reported in load_profile["compaction"]
+    """
+    _, filename, ext = _resolve_source(file_path, original_filename)
+    compact = _resolve_compact(compact)
+
+    def _load() -> Tuple[pd.DataFrame, Dict[str, Any]]:
+        df, profile = _load_file(file_path, filename, ext, dialect, sheet_name)
+        if compact:
+            df, report = compact_dtypes(
+                df,
+                category_max_ratio=getattr(settings, 'DATAFRAME_CATEGORY_MAX_RATIO', 0.5),
+                arrow_strings=getattr(settings, 'DATAFRAME_ARROW_STRINGS', False),
+            )
+            profile = {**profile, "compaction": report}
+            logger.info(
+                f"📄 [Parser] {filename}: compacted {report['before_bytes']} -> {report['after_bytes']} bytes "
+                f"(x{report['ratio']})"
+            )
+        return df, profile
+
+    # 1. 进程内 DataFrame 缓存 (只读发放)，未命中时走 sidecar / 文本解析
+    df, profile, hit = dataframe_cache.get_or_load(
+        file_path,
+        _load,
+        options=_memory_cache_options(ext, sheet_name, compact),
+    )
+    if hit:
+        logger.info(f"📄 [Parser] {filename}: memory cache hit, shape={df.shape}")
+
+    if load_profile is not None:
+        load_profile.update(profile)
+        load_profile["memory_cache"] = "hit" if hit else "miss"
+    return df
+
+def _source_options(ext: str, sheet_name: Union[str, int, None]) -> Dict[str, Any]:
+    """
+    影响解析结果的来源选项，参与内存缓存 / sidecar 的 key
+    默认工作表 (None / 0) 返回空 dict，保持与只读第一个工作表时的 key 一致
+    """
+    if ext == '.csv' or sheet_name in (None, 0):
+        return {}
+    return {"sheet_name": sheet_name}
+
+def _resolve_compact(compact: Optional[bool]) -> bool:
+    return bool(getattr(settings, 'DATAFRAME_COMPACT_DTYPES', False) if compact is None else compact)
+
+def _memory_cache_options(ext: str, sheet_name: Union[str, int, None], compact: bool) -> Dict[str, Any]:
+    """内存缓存 key 的选项：来源选项 + 是否压缩 (压缩与否是两份不同的 DataFrame)"""
+    options: Dict[str, Any] = {"loader": "parse_file", **_source_options(ext, sheet_name)}
+    if compact:
+        options["compact"] = True
+    return options
+
+def _resolve_source(file_path: str, original_filename: Optional[str] = None) -> Tuple[Path, str, str]:
+    """
+    存在性 + 扩展名检查，返回 (path, 用于日志/报错的文件名, 小写扩展名)
     """
     path = Path(file_path)
     
@@ -138,14 +562,447 @@ def parse_file(file_path: str, original_filename: Optional[str] = None) -> pd.Da
 
     ext = path.suffix.lower()
 
-    if ext == '.csv':
-        return parse_csv(file_path, filename)
-    elif ext in ['.xlsx', '.xls', '.xlsm']:
-        return parse_excel(file_path, filename)
-    else:
+    if ext not in ['.csv', '.xlsx', '.xls', '.xlsm']:
         # FIX: Add details dictionary
         raise DataParseException(
             filename=filename, 
             reason=f"Unsupported file extension: {ext}. Supported formats: .csv, .xlsx, .xls",
 
-        )
\ No newline at end of file
+        )
+    return path, filename, ext
+
+def _load_file(
+    file_path: str,
+    filename: str,
+    ext: str,
+    dialect: Optional[Dict[str, Any]] = None,
+    sheet_name: Union[str, int, None] = None,
+) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """
+    不经过内存缓存的加载：sidecar 命中则内存映射读取，否则文本解析并写 sidecar
+    """
+    sidecar_options = _source_options(ext, sheet_name) or None
+
+    # 1. 列式旁路缓存命中：直接内存映射读取，跳过文本解析
+    cached = columnar_cache.load_sidecar(file_path, sidecar_options)
+    if cached is not None:
+        df, cached_profile = cached
+        logger.info(f"📄 [Parser] {filename}: engine=arrow_ipc (sidecar), shape={df.shape}")
+        cached_profile.update({"engine": "arrow_ipc", "source_engine": cached_profile.get("engine")})
+        return df, cached_profile
+
+    # 2. 文本解析
+    profile: Dict[str, Any] = {}
+    if ext == '.csv':
+        df = parse_csv(file_path, filename, profile, dialect)
+    else:
+        df = parse_excel(file_path, filename, profile, sheet_name=sheet_name)
+
+    # 3. 写入 sidecar，供后续请求复用 (best-effort，失败不影响本次结果)
+    columnar_cache.write_sidecar(file_path, df, profile, sidecar_options)
+    return df, profile
+
+# =========================================================
+# 有界读取 (Bounded Reads)
+# 文件探查只需要头部样本 + 总行数，不做全量解析
+# =========================================================
+
+def parse_file_head(
+    file_path: str,
+    original_filename: Optional[str] = None,
+    nrows: Optional[int] = None,
+    load_profile: Optional[Dict[str, Any]] = None,
+    sheet_name: Union[str, int, None] = None,
+) -> pd.DataFrame:
+    """
+    只读取头部 nrows 行
+
+    顺序：内存缓存 (已有全量结果) -> sidecar 行切片 -> 文本/Excel 有界解析。
+    前两者命中时 load_profile["num_rows"] 为精确总行数，调用方无需再计数；
+    内存缓存命中时另有精确的 load_profile["memory_bytes"]。
+    """
+    _, filename, ext = _resolve_source(file_path, original_filename)
+    if nrows is None:
+        nrows = getattr(settings, 'INSPECT_SAMPLE_ROWS', 1000)
+    options = _source_options(ext, sheet_name)
+    profile: Dict[str, Any] = {}
+
+    cache_options = _memory_cache_options(ext, sheet_name, _resolve_compact(None))
+    meta = dataframe_cache.describe(file_path, cache_options)
+    cached = dataframe_cache.get(file_path, cache_options, rows=(0, nrows)) if meta is not None else None
+    if cached is not None:
+        df, profile = cached
+        profile.update({
+            "memory_cache": "hit",
+            "num_rows": meta["num_rows"],
+            "memory_bytes": meta["memory_bytes"],
+        })
+    else:
+        sidecar = columnar_cache.load_sidecar(file_path, options or None, rows=(0, nrows))
+        if sidecar is not None:
+            df, profile = sidecar
+            profile.update({"engine": "arrow_ipc", "source_engine": profile.get("engine")})
+        elif ext == '.csv':
+            df = parse_csv(file_path, filename, profile, read_options={"nrows": nrows})
+        else:
+            df = parse_excel(file_path, filename, profile, nrows=nrows, sheet_name=sheet_name)
+
+    if load_profile is not None:
+        load_profile.update(profile)
+        load_profile["sampled_rows"] = len(df)
+    return df
+
+def count_file_rows(
+    file_path: str,
+    load_profile: Optional[Dict[str, Any]] = None,
+    sheet_name: Union[str, int, None] = None,
+) -> int:
+    """
+    不解析数据统计数据行数 (不含表头)
+
+    - CSV：引号感知的换行字节扫描 (与 pandas 默认行为一致：跳过空行，引号内换行不计)
+    - Excel：读取工作表 dimension 元数据，缺失时流式遍历行
+    - 已有 sidecar 时直接读取 Arrow 元数据 (精确)
+
+    load_profile 中写入 row_count_source，便于调用方判断是否精确。
+    """
+    _, filename, ext = _resolve_source(file_path)
+    options = _source_options(ext, sheet_name)
+    profile = load_profile if load_profile is not None else {}
+
+    rows = columnar_cache.sidecar_row_count(file_path, options or None)
+    if rows is not None:
+        profile["row_count_source"] = "sidecar"
+        return rows
+
+    if ext == '.csv':
+        dialect = _DIALECT_CACHE.get(file_path)
+        encoding = (dialect or {}).get("encoding") or detect_encoding(file_path)
+        quotechar = (dialect or {}).get("quotechar") or '"'
+        profile["row_count_source"] = "byte_scan"
+        return count_csv_rows(file_path, encoding=encoding, quotechar=quotechar)
+
+    if ext in ('.xlsx', '.xlsm'):
+        rows = _count_excel_rows(file_path, sheet_name)
+        if rows is not None:
+            profile["row_count_source"] = "excel_metadata"
+            return rows
+
+    # .xls 等没有廉价元数据的格式：退回全量解析 (命中缓存时代价很小)
+    profile["row_count_source"] = "full_parse"
+    return len(parse_file(file_path, filename, sheet_name=sheet_name))
+
+def count_csv_rows(file_path: str, encoding: Optional[str] = None, quotechar: str = '"') -> int:
+    """
+    按块扫描换行符统计 CSV 数据行数 (不含表头)
+
+    块内用 numpy 计算引号奇偶性：位于引号内的换行属于字段内容，不计为行尾；
+    "" 转义会翻转两次，奇偶性不变，天然正确。空行 (含 \\r\\n 空行) 与 pandas 一样不计。
+    UTF-16/32 这类非 ASCII 兼容编码先转码为 UTF-8 再扫描。
+    """
+    chunk_bytes = getattr(settings, 'ROW_COUNT_CHUNK_BYTES', 4 * 1024 * 1024)
+    quote = ord(quotechar.encode('ascii'))
+    newline, carriage = ord('\n'), ord('\r')
+
+    records = 0
+    in_quote = 0
+    line_len = 0         # 当前 (未结束) 行已扫描的字节数
+    last_byte = -1       # 上一块的最后一个字节，用于判断跨块的 \r\n 空行
+
+    for chunk in _iter_ascii_compatible_chunks(file_path, encoding, chunk_bytes):
+        buf = np.frombuffer(chunk, dtype=np.uint8)
+        quotes = buf == quote
+        if in_quote or quotes.any():
+            parity = (np.cumsum(quotes, dtype=np.int64) + in_quote) & 1
+            ends = np.flatnonzero((buf == newline) & (parity == 0))
+            in_quote = int(parity[-1])
+        else:
+            ends = np.flatnonzero(buf == newline)
+
+        if len(ends) > 0:
+            starts = np.empty_like(ends)
+            starts[0] = -1
+            starts[1:] = ends[:-1]
+            lengths = ends - starts - 1
+            lengths[0] += line_len
+            # 行内容只有一个 \r 也是空行
+            before = np.where(ends > 0, buf[np.maximum(ends - 1, 0)], last_byte)
+            blank = (lengths == 0) | ((lengths == 1) & (before == carriage))
+            records += int(len(ends) - blank.sum())
+            line_len = len(buf) - int(ends[-1]) - 1
+        else:
+            line_len += len(buf)
+        last_byte = int(buf[-1])
+
+    # 末行没有换行符
+    if line_len > 0 and not (line_len == 1 and last_byte == carriage):
+        records += 1
+    # 首个非空行为表头
+    return max(records - 1, 0)
+
+def _iter_ascii_compatible_chunks(file_path: str, encoding: Optional[str], chunk_bytes: int):
+    normalized = _normalize_encoding(encoding) or ''
+    if normalized.startswith(('utf-16', 'utf-32')):
+        with open(file_path, 'r', encoding=encoding, newline='') as f:
+            while True:
+                text = f.read(chunk_bytes)
+                if not text:
+                    break
+                yield text.encode('utf-8')
+        return
+
+    with open(file_path, 'rb') as f:
+        head = True
+        while True:
+            chunk = f.read(chunk_bytes)
+            if not chunk:
+                break
+            if head and chunk.startswith(codecs.BOM_UTF8):
+                chunk = chunk[len(codecs.BOM_UTF8):]
+            head = False
+            if chunk:
+                yield chunk
+
+def _count_excel_rows(file_path: str, sheet_name: Union[str, int, None] = None) -> Optional[int]:
+    """
+    读取工作表 dimension 元数据得到行数 (不含表头)
+    元数据缺失 (部分第三方工具导出) 时流式遍历，仍不构建 DataFrame
+    """
+    try:
+        dims = excel_reader.sheet_dimensions(file_path, sheet_name, exact=True)
+        return max(int(dims["rows"] or 0) - 1, 0)
+    except Exception as e:
+        logger.debug(f"Excel row count via metadata failed for {file_path}: {e}")
+        return None
+
+def read_file_columns(
+    file_path: str,
+    original_filename: Optional[str] = None,
+    sheet_name: Union[str, int, None] = None,
+) -> List[str]:
+    """
+    返回列名列表 (与 parse_file 的列名一致)
+
+    顺序：内存缓存的列名 -> sidecar schema -> 只解析表头
+    """
+    _, _, ext = _resolve_source(file_path, original_filename)
+    meta = dataframe_cache.describe(file_path, _memory_cache_options(ext, sheet_name, _resolve_compact(None)))
+    if meta is not None:
+        return meta["columns"]
+    columns = columnar_cache.sidecar_columns(file_path, _source_options(ext, sheet_name) or None)
+    if columns is not None:
+        return columns
+    df = parse_file_head(file_path, original_filename, nrows=0, sheet_name=sheet_name)
+    return [str(c) for c in df.columns]
+
+def parse_file_projection(
+    file_path: str,
+    original_filename: Optional[str] = None,
+    columns: Optional[List[str]] = None,
+    rows: Optional[Tuple[int, int]] = None,
+    load_profile: Optional[Dict[str, Any]] = None,
+    sheet_name: Union[str, int, None] = None,
+) -> pd.DataFrame:
+    """
+    带列投影 / 行区间下推的读取
+
+    Args:
+        columns: 只物化这些列 (None 为全部)；必须是表头中存在的列名
+        rows: (start, end)，end 不包含；结果的 index 与全量读取后 iloc[start:end] 一致
+
+    顺序：内存缓存 (切片) -> sidecar (Arrow 层投影 + 切片) -> 未命中时：
+      - 文件小于 PROJECTION_PUSHDOWN_THRESHOLD_MB：经 parse_file 全量加载一次 (同时写入内存缓存和 sidecar)，
+        再投影 / 切片，后续请求 (包括其他列组合) 都走缓存
+      - 更大的文件：文本/Excel 有界解析 (只物化需要的列和行，不进入缓存)
+    文本解析只用 nrows=end 截断尾部，不用 skiprows 跳过头部：skiprows 按物理行计数，
+    遇到空行、引号内换行、被跳过的坏行时会与 pandas 解析后的行号错位。
+    """
+    path, filename, ext = _resolve_source(file_path, original_filename)
+    start, end = rows if rows is not None else (0, None)
+    options = _source_options(ext, sheet_name)
+    cache_options = _memory_cache_options(ext, sheet_name, _resolve_compact(None))
+    profile: Dict[str, Any] = {}
+
+    meta = dataframe_cache.describe(file_path, cache_options)
+    cached = dataframe_cache.get(file_path, cache_options, columns=columns, rows=(start, end)) if meta is not None else None
+    sidecar = None if cached is not None else columnar_cache.load_sidecar(
+        file_path, options or None, columns=columns, rows=(start, end)
+    )
+    threshold_mb = getattr(settings, 'PROJECTION_PUSHDOWN_THRESHOLD_MB', 64)
+
+    if cached is not None:
+        df, profile = cached
+        profile.update({"memory_cache": "hit", "num_rows": meta["num_rows"]})
+    elif sidecar is not None:
+        df, profile = sidecar
+        profile.update({"engine": "arrow_ipc", "source_engine": profile.get("engine")})
+        df.index = pd.RangeIndex(start, start + len(df))
+    elif path.stat().st_size < threshold_mb * 1024 * 1024:
+        full_df = parse_file(file_path, original_filename, load_profile=profile, sheet_name=sheet_name)
+        profile["num_rows"] = len(full_df)
+        df = full_df if columns is None else full_df[columns]
+        df = df.iloc[start:end]
+    else:
+        if ext == '.csv':
+            read_options = {"usecols": columns, "nrows": end}
+            df = parse_csv(file_path, filename, profile, read_options=read_options)
+        else:
+            df = parse_excel(file_path, filename, profile, nrows=end, usecols=columns, sheet_name=sheet_name)
+        df = df.iloc[start:]
+
+    if load_profile is not None:
+        load_profile.update(profile)
+        load_profile["pushdown"] = {"columns": columns, "rows": [start, end]}
+    return df
+
+# =========================================================
+# 分块读取 (Chunked Reads)
+# 流式分析按 CHUNK_SIZE 逐块消费，峰值内存只与块大小有关
+# =========================================================
+
+def iter_csv_chunks(
+    file_path: str,
+    original_filename: Optional[str] = None,
+    chunksize: Optional[int] = None,
+    dtype: Any = None,
+    load_profile: Optional[Dict[str, Any]] = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    按块迭代 CSV (复用方言判定结果)，index 跨块连续，与全量读取的行号一致
+
+    Args:
+        dtype: 透传给 pd.read_csv；流式分析传 str，避免各块独立推断出不一致的 dtype
+    """
+    _, filename, ext = _resolve_source(file_path, original_filename)
+    if ext != '.csv':
+        raise DataParseException(filename=filename, reason=f"Chunked reading supports CSV only, got {ext}")
+
+    chunksize = chunksize or getattr(settings, 'CHUNK_SIZE', 50000)
+    dialect, dialect_source = _lookup_dialect(file_path, filename)
+    sep = dialect.get("sep")
+    encoding = dialect.get("encoding") or detect_encoding(file_path)
+    # 分块读取不支持 pyarrow；方言无法判定时交给 python 引擎推断
+    engines = ['c', 'python'] if sep is not None else ['python']
+
+    if load_profile is not None:
+        load_profile.update({
+            "sep": sep,
+            "encoding": encoding,
+            "dialect": dict(dialect),
+            "dialect_source": dialect_source,
+            "chunksize": chunksize,
+        })
+
+    for i, engine in enumerate(engines):
+        yielded = False
+        try:
+            reader = pd.read_csv(
+                file_path,
+                sep=sep,
+                encoding=encoding,
+                engine=engine,
+                on_bad_lines='skip',
+                dtype=dtype,
+                chunksize=chunksize,
+            )
+            with reader:
+                for chunk in reader:
+                    yielded = True
+                    yield chunk
+            if load_profile is not None:
+                load_profile["engine"] = engine
+            return
+        except UnicodeDecodeError as e:
+            raise FileDecodeException(filename=filename, encoding_error=str(e), details=None)
+        except Exception as e:
+            # 已经产出过数据块就不能换引擎重来，否则调用方会重复消费
+            if yielded or i == len(engines) - 1:
+                raise
+            logger.debug(f"Chunked CSV engine '{engine}' failed before first chunk: {e}")
+
+# =========================================================
+# 原始记录扫描 (Record Scan)
+# 不解析字段，只按引号感知的行尾切分出每条记录的原始字节；
+# 近似质量分析据此对全部记录做哈希草图，并只解析抽中的少量记录
+# =========================================================
+
+def _split_records(buf: bytes, quote: bytes) -> Tuple[List[bytes], bytes]:
+    """把缓冲区切成完整记录与末尾不完整的剩余部分 (缓冲区必须从记录边界开始)"""
+    if quote not in buf:
+        records = buf.split(b'\n')
+        return records[:-1], records[-1]
+    arr = np.frombuffer(buf, dtype=np.uint8)
+    parity = np.cumsum(arr == ord(quote), dtype=np.int64) & 1
+    ends = np.flatnonzero((arr == ord('\n')) & (parity == 0))
+    if len(ends) == 0:
+        return [], buf
+    starts = np.empty_like(ends)
+    starts[0] = 0
+    starts[1:] = ends[:-1] + 1
+    records = [buf[s:e] for s, e in zip(starts.tolist(), ends.tolist())]
+    return records, buf[int(ends[-1]) + 1:]
+
+def iter_csv_records(file_path: str, original_filename: Optional[str] = None) -> Iterator[List[bytes]]:
+    """
+    按块产出 CSV 数据记录的原始字节 (不含表头与行尾，已跳过空行，与 count_csv_rows 的计数一致)
+
+    引号内的换行属于字段内容 (同 count_csv_rows 的奇偶规则)；\\r\\n 统一为 \\n。
+    UTF-16/32 文件先转码为 UTF-8，解析记录时用 parse_csv_records 即可自动对应。
+    """
+    _, filename, ext = _resolve_source(file_path, original_filename)
+    if ext != '.csv':
+        raise DataParseException(filename=filename, reason=f"Record scan supports CSV only, got {ext}")
+
+    dialect, _ = _lookup_dialect(file_path, filename)
+    encoding = dialect.get("encoding") or detect_encoding(file_path)
+    quote = (dialect.get("quotechar") or '"').encode('ascii')
+    chunk_bytes = getattr(settings, 'ROW_COUNT_CHUNK_BYTES', 4 * 1024 * 1024)
+
+    carry = b''
+    header_seen = False
+    for chunk in _iter_ascii_compatible_chunks(file_path, encoding, chunk_bytes):
+        buf = carry + chunk
+        if b'\r' in buf:
+            buf = buf.replace(b'\r\n', b'\n')
+        records, carry = _split_records(buf, quote)
+        records = [r for r in records if r]
+        if not header_seen and records:
+            header_seen = True
+            records = records[1:]
+        if records:
+            yield records
+
+    # 末行没有换行符；整个文件只有一行时它就是表头
+    tail = carry.rstrip(b'\r\n')
+    if tail and header_seen:
+        yield [tail]
+
+def parse_csv_records(
+    file_path: str,
+    records: List[bytes],
+    original_filename: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    用文件自身的方言与表头解析 iter_csv_records 产出的部分记录 (列名与 parse_file 一致)
+    坏行与全量读取一样被跳过，调用方可比较行数判断是否有记录被丢弃
+    """
+    _, filename, _ = _resolve_source(file_path, original_filename)
+    dialect, _ = _lookup_dialect(file_path, filename)
+    encoding = dialect.get("encoding") or detect_encoding(file_path)
+    if (_normalize_encoding(encoding) or '').startswith(('utf-16', 'utf-32')):
+        # iter_csv_records 已把这类编码转成 UTF-8
+        encoding = 'utf-8'
+    columns = read_file_columns(file_path, original_filename)
+    if not records:
+        return pd.DataFrame(columns=columns)
+
+    sep = dialect.get("sep")
+    return pd.read_csv(
+        io.BytesIO(b'\n'.join(records)),
+        sep=sep,
+        encoding=encoding,
+        header=None,
+        names=columns,
+        engine='c' if sep is not None else 'python',
+        on_bad_lines='skip',
+    )
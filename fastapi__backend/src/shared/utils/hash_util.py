@@ -1,7 +1,7 @@
 import hashlib
 import json
 import os
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 from src.shared.exceptions.file_not_found import FileNotFoundException
 
 def calculate_file_md5(file_path: str, chunk_size: int = 65536) -> str:
@@ -56,4 +56,96 @@ def generate_cache_key(prefix: str, identifier: str, params: Optional[Dict[str,
         key_parts.append(param_hash)
     
     # 3. 拼接
-    return ":".join(key_parts)
\ No newline at end of file
+    return ":".join(key_parts)
+
+def calculate_file_fingerprint(
+    file_path: str,
+    block_size: int = 65536,
+    sample_blocks: int = 8,
+    full_hash: bool = False,
+) -> str:
+    """
+    计算文件内容指纹 (廉价版)
+
+    默认只读取均匀分布的若干采样块 (含头尾) + 文件大小做 MD5，
+    对 GB 级文件也只需读取 block_size * sample_blocks 字节。
+    full_hash=True 时退化为全量 MD5 (更严格，但需要完整读一遍文件)。
+
+    Args:
+        file_path: 文件绝对路径
+        block_size: 单个采样块大小，默认 64KB
+        sample_blocks: 采样块数量 (包含头部和尾部)
+        full_hash: 是否计算全量哈希
+
+    Returns:
+        32位十六进制哈希字符串
+
+    Raises:
+        FileNotFoundException: 当文件不存在时抛出
+    """
+    if not os.path.exists(file_path):
+        raise FileNotFoundException(file_path)
+
+    size = os.path.getsize(file_path)
+    if full_hash or size <= block_size * sample_blocks:
+        content_hash = calculate_file_md5(file_path)
+        return hashlib.md5(f"{size}:{content_hash}".encode("utf-8")).hexdigest()
+
+    hasher = hashlib.md5(str(size).encode("utf-8"))
+    step = (size - block_size) // (sample_blocks - 1)
+    try:
+        with open(file_path, "rb") as f:
+            for i in range(sample_blocks):
+                f.seek(i * step)
+                hasher.update(f.read(block_size))
+        return hasher.hexdigest()
+    except OSError as e:
+        raise FileNotFoundException(f"{file_path} (IO Error: {str(e)})")
+
+
+# 指纹缓存：(绝对路径, 大小, 修改时间, 是否全量) -> 指纹
+# 修改时间只用于判断“是否需要重新读取”，不进入指纹本身，内容相同的文件得到相同指纹
+_FINGERPRINT_MEMO: Dict[Tuple[str, int, int, bool], str] = {}
+_FINGERPRINT_MEMO_SIZE = 1024
+
+def cached_file_fingerprint(file_path: str, full_hash: bool = False) -> str:
+    """
+    带进程内缓存的 calculate_file_fingerprint
+    同一文件 (大小与修改时间都未变) 重复请求时不再读盘
+
+    Raises:
+        FileNotFoundException: 当文件不存在时抛出
+    """
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        raise FileNotFoundException(file_path)
+
+    memo_key = (os.path.abspath(file_path), st.st_size, st.st_mtime_ns, full_hash)
+    fingerprint = _FINGERPRINT_MEMO.get(memo_key)
+    if fingerprint is None:
+        fingerprint = calculate_file_fingerprint(file_path, full_hash=full_hash)
+        if len(_FINGERPRINT_MEMO) >= _FINGERPRINT_MEMO_SIZE:
+            _FINGERPRINT_MEMO.pop(next(iter(_FINGERPRINT_MEMO)))
+        _FINGERPRINT_MEMO[memo_key] = fingerprint
+    return fingerprint
+
+def result_fingerprint(file_path: str, full_hash: bool = True) -> str:
+    """
+    结果缓存键使用的文件指纹
+
+    full_hash=True：全量 MD5，纯内容寻址 (相同内容的不同文件得到相同指纹)
+    full_hash=False：采样指纹 + 修改时间。采样块之外的等长修改不会改变采样指纹，
+        必须靠修改时间区分，代价是内容相同的副本不再共用结果
+
+    Raises:
+        FileNotFoundException: 当文件不存在时抛出
+    """
+    fingerprint = cached_file_fingerprint(file_path, full_hash=full_hash)
+    if full_hash:
+        return fingerprint
+    try:
+        mtime_ns = os.stat(file_path).st_mtime_ns
+    except OSError:
+        raise FileNotFoundException(file_path)
+    return hashlib.md5(f"{fingerprint}:{mtime_ns}".encode("utf-8")).hexdigest()
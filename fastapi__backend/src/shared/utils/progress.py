@@ -0,0 +1,127 @@
+# src/shared/utils/progress.py
+import asyncio
+import queue
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Iterator, Optional
+
+# =========================================================
+# 线程安全的进度通道 (Progress Channel)
+#
+# 计算线程 (asyncio.to_thread / 线程池) 只往线程安全队列里投递事件，不碰 Redis；
+# 事件循环侧的 pump 按固定间隔取出全部事件、合并为一条快照再写一次存储，
+# 写入频率与计算线程上报的频率无关 (前端高频轮询时也不会放大 Redis 写入)。
+# =========================================================
+
+@dataclass
+class ProgressSnapshot:
+    """合并后的进度状态 (进度只增不减，耗时按阶段累积)"""
+    progress: float = 0.0
+    phase: str = ""
+    message: str = ""
+    timings: Dict[str, float] = field(default_factory=dict)
+
+class ProgressReporter:
+    """
+    计算线程 -> 事件循环 的进度上报
+
+    用法：
+        reporter = ProgressReporter()
+        pump = asyncio.create_task(reporter.pump(sink))    # 事件循环侧
+        await asyncio.to_thread(work, reporter)             # 计算线程里调用 report / phase
+        await reporter.aclose(pump)                         # 停止 pump (等待进行中的写入结束)
+
+    没有 pump 时上报只会进入队列，不影响计算本身。
+    """
+
+    def __init__(self):
+        self._queue: "queue.SimpleQueue[ProgressSnapshot]" = queue.SimpleQueue()
+        self._state = ProgressSnapshot()
+        self._written: Optional[ProgressSnapshot] = None
+        self._closed = asyncio.Event()
+
+    # ---------------- 计算线程侧 ----------------
+
+    def report(self, progress: float, phase: str = "", message: str = "", timings: Optional[Dict[str, float]] = None) -> None:
+        """投递一条进度事件 (任意线程可调用，不阻塞)"""
+        self._queue.put(ProgressSnapshot(
+            progress=float(progress),
+            phase=phase,
+            message=message,
+            timings=dict(timings) if timings else {},
+        ))
+
+    @contextmanager
+    def phase(self, name: str, start: float, end: float, message: str = "") -> Iterator[None]:
+        """
+        包裹一个计算阶段：开始时上报 start，结束时上报 end 并附带该阶段耗时 (毫秒)
+        """
+        self.report(start, phase=name, message=message or f"Running {name}")
+        started = time.perf_counter()
+        yield
+        elapsed = round((time.perf_counter() - started) * 1000, 2)
+        self.report(end, phase=name, message=message or f"Finished {name}", timings={name: elapsed})
+
+    # ---------------- 事件循环侧 ----------------
+
+    def drain(self) -> ProgressSnapshot:
+        """取出队列中全部事件并合并进当前状态 (进度取最大值，阶段 / 消息取最新)"""
+        while True:
+            try:
+                event = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if event.progress >= self._state.progress:
+                self._state.progress = event.progress
+                self._state.phase = event.phase or self._state.phase
+                self._state.message = event.message or self._state.message
+            self._state.timings.update(event.timings)
+        return self._state
+
+    def _should_write(self, snapshot: ProgressSnapshot, min_delta: float) -> bool:
+        last = self._written
+        if last is None:
+            return True
+        return (
+            snapshot.phase != last.phase
+            or snapshot.progress - last.progress >= min_delta
+            or snapshot.timings != last.timings
+        )
+
+    async def pump(
+        self,
+        sink: Callable[[ProgressSnapshot], Awaitable[None]],
+        interval: float = 0.5,
+        min_delta: float = 1.0,
+    ) -> None:
+        """
+        每 interval 秒合并一次事件，状态有实质变化 (阶段切换 / 进度变化 >= min_delta / 新阶段耗时) 时写一次 sink
+        sink 抛出的异常只影响本次写入，不会中断计算
+        """
+        while not self._closed.is_set():
+            try:
+                await asyncio.wait_for(self._closed.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
+            if self._closed.is_set():
+                break
+            snapshot = self.drain()
+            if not self._should_write(snapshot, min_delta):
+                continue
+            written = ProgressSnapshot(snapshot.progress, snapshot.phase, snapshot.message, dict(snapshot.timings))
+            try:
+                await sink(written)
+                self._written = written
+            except Exception:
+                # 进度只是展示信息，写失败时等下一轮重试
+                pass
+
+    async def aclose(self, pump_task: Optional["asyncio.Task[None]"] = None) -> None:
+        """
+        停止 pump：不再写入新的进度，并等待进行中的写入结束
+        (之后写入的最终状态不会被迟到的进度覆盖)
+        """
+        self._closed.set()
+        if pump_task is not None:
+            await pump_task
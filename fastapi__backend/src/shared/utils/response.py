@@ -27,7 +27,8 @@ class ComputeJSONResponse(JSONResponse):
 
 def success_response(
     data: Optional[Any] = None, 
-    message: str = "success"
+    message: str = "success",
+    status_code: int = 200
 ) -> ComputeJSONResponse:
     """
     成功响应 (HTTP 200)
@@ -35,6 +36,7 @@ def success_response(
     Args:
         data: 业务数据 (可以是 Pydantic Model, Dict, List, 甚至包含 Numpy 数组)
         message: 提示信息
+        status_code: HTTP 状态码 (异步提交等场景用 202)
     """
     # 1. 使用 Schema 封装，确保结构字段 (code, message, data) 绝对正确
     resp_model = ResponseSchema(
@@ -49,7 +51,7 @@ def success_response(
 
     # 3. 返回自定义响应
     return ComputeJSONResponse(
-        status_code=200,
+        status_code=status_code,
         content=content
     )
 
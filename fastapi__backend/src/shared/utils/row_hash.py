@@ -0,0 +1,203 @@
+# src/shared/utils/row_hash.py
+import hashlib
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+# pandas 合成行哈希的内部实现 (hash_pandas_object 使用的同一函数)，用于由列哈希直接得到行哈希
+from pandas.core.util.hashing import combine_hash_arrays
+
+from src.shared.utils.logger import logger
+
+# =========================================================
+# 基于行哈希的重复检测 (quality 统计 / cleaning 去重共用)
+#
+# 每行一个 64 位哈希，一次 np.unique 排序得到全部分组；
+# 额外内存约为 行数 x (8 字节哈希 + 8 字节组号)，不再像 df[df.duplicated(keep=False)] 那样复制重复行。
+# 64 位哈希碰撞的概率约为 n^2 / 2^65 (千万行约 3e-6)，需要绝对精确时 (如删除数据) 打开 verify 逐值复核。
+# =========================================================
+
+KeepOption = Union[str, bool]
+
+def hash_columns(df: pd.DataFrame, subset: Optional[Sequence[Any]] = None) -> List[np.ndarray]:
+    """
+    每列一个 uint64 哈希数组 (逐值，不含索引)
+
+    duplicated() 认为 0.0 与 -0.0 相等，但二者哈希不同；仅当浮点列里确实有 -0.0 时才归一化该列。
+    列哈希既是行哈希的组成部分，也可单独作为列内容指纹 (见 column_fingerprint)。
+    """
+    frame = df if subset is None else df[list(subset)]
+    hashes = []
+    for i, dtype in enumerate(frame.dtypes):
+        series = frame.iloc[:, i]
+        if dtype.kind == "f":
+            values = series.to_numpy()
+            if np.any((values == 0) & np.signbit(values)):
+                series = series + 0.0
+        hashes.append(pd.util.hash_pandas_object(series, index=False).to_numpy())
+    return hashes
+
+def combine_column_hashes(column_hashes: Sequence[np.ndarray], n_rows: int) -> np.ndarray:
+    """按 pandas hash_pandas_object(DataFrame) 的方式把列哈希合成为行哈希"""
+    if not column_hashes:
+        return np.zeros(n_rows, dtype=np.uint64)
+    return combine_hash_arrays(iter(column_hashes), len(column_hashes))
+
+def hash_rows(df: pd.DataFrame, subset: Optional[Sequence[Any]] = None) -> np.ndarray:
+    """
+    每行一个 uint64 哈希 (不含索引)，与 pd.util.hash_pandas_object(df, index=False) 一致 (-0.0 已归一化)
+
+    Args:
+        subset: 只按这些列计算 (同 drop_duplicates 的 subset)
+    """
+    return combine_column_hashes(hash_columns(df, subset), len(df))
+
+def column_fingerprint(column_hash: np.ndarray, dtype_name: str) -> str:
+    """列内容指纹：逐值哈希 + 逻辑 dtype 名称 (值相同但类型不同的列视为不同)"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(dtype_name.encode("utf-8"))
+    digest.update(np.ascontiguousarray(column_hash).tobytes())
+    return digest.hexdigest()
+
+@dataclass
+class DuplicateGroups:
+    """
+    行分组结果：内容相同的行属于同一组
+
+    Attributes:
+        group_ids: 每行所属的组号 (长度 = 行数)
+        first_index: 每组第一次出现的行位置
+        last_index: 每组最后一次出现的行位置
+        counts: 每组行数
+        verified: 是否做过逐值复核 (False 时忽略了哈希碰撞)
+        collisions: 复核时发现并拆开的碰撞组数
+    """
+    group_ids: np.ndarray
+    first_index: np.ndarray
+    last_index: np.ndarray
+    counts: np.ndarray
+    verified: bool = False
+    collisions: int = 0
+
+    @classmethod
+    def from_hashes(cls, hashes: np.ndarray) -> "DuplicateGroups":
+        """由行哈希直接分组 (流式分析拼接的哈希也可用)"""
+        return cls._from_keys(np.asarray(hashes))
+
+    @classmethod
+    def _from_keys(cls, keys: np.ndarray, **kwargs: Any) -> "DuplicateGroups":
+        n = len(keys)
+        if n == 0:
+            empty = np.empty(0, dtype=np.int64)
+            return cls(empty, empty, empty, empty, **kwargs)
+        _, first_index, group_ids, counts = np.unique(
+            keys, return_index=True, return_inverse=True, return_counts=True
+        )
+        group_ids = group_ids.reshape(-1)
+        last_index = np.full(len(counts), -1, dtype=np.int64)
+        # 同一组号多次赋值时保留最后一次写入，即最后出现的位置
+        last_index[group_ids] = np.arange(n)
+        return cls(group_ids, first_index, last_index, counts, **kwargs)
+
+    @property
+    def n_rows(self) -> int:
+        return len(self.group_ids)
+
+    @property
+    def total_duplicates(self) -> int:
+        """keep='first' 口径的重复行数 (除每组第一行外都算重复)"""
+        return int(self.n_rows - len(self.counts))
+
+    @property
+    def group_count(self) -> int:
+        """存在重复的组数 (组内行数 > 1)"""
+        return int((self.counts > 1).sum())
+
+    def duplicate_mask(self, keep: KeepOption = "first") -> np.ndarray:
+        """
+        与 DataFrame.duplicated(keep=...) 一致的布尔掩码
+
+        Args:
+            keep: "first" / "last" 保留每组第一 / 最后一行，False 标记所有重复组的全部行
+        """
+        positions = np.arange(self.n_rows)
+        if keep == "first":
+            return self.first_index[self.group_ids] != positions
+        if keep == "last":
+            return self.last_index[self.group_ids] != positions
+        if keep is False:
+            return self.counts[self.group_ids] > 1
+        raise ValueError("keep must be either 'first', 'last' or False")
+
+    def members(self, group_id: int) -> np.ndarray:
+        """某组全部行位置 (升序)"""
+        return np.flatnonzero(self.group_ids == group_id)
+
+    def largest(self, n: int = 10, max_rows: int = 20) -> List[Dict[str, Any]]:
+        """
+        行数最多的 n 个重复组 (按行数降序，行数相同按首次出现位置)
+
+        Args:
+            max_rows: 每组最多列出的行位置数 (0-based)
+        """
+        dup_groups = np.flatnonzero(self.counts > 1)
+        if dup_groups.size == 0 or n <= 0:
+            return []
+        order = np.lexsort((self.first_index[dup_groups], -self.counts[dup_groups]))[:n]
+        result = []
+        for g in dup_groups[order]:
+            result.append({
+                "group_id": int(g),
+                "size": int(self.counts[g]),
+                "rows": self.members(int(g))[:max_rows].tolist(),
+            })
+        return result
+
+def _verify_groups(df: pd.DataFrame, groups: DuplicateGroups) -> DuplicateGroups:
+    """
+    逐值复核：把每个重复行与其组首行比较，发现碰撞时对涉及的行按实际值重新分组
+    只复制重复行 (与组首行)，不复制整表
+    """
+    dup_positions = np.flatnonzero(groups.counts[groups.group_ids] > 1)
+    if dup_positions.size == 0:
+        return DuplicateGroups(groups.group_ids, groups.first_index, groups.last_index, groups.counts, verified=True)
+
+    anchors = groups.first_index[groups.group_ids[dup_positions]]
+    left = df.iloc[dup_positions].reset_index(drop=True)
+    right = df.iloc[anchors].reset_index(drop=True)
+    # NaN 与 NaN 视为相等 (同 duplicated)
+    same = ((left == right) | (left.isna() & right.isna())).all(axis=1).to_numpy()
+    if same.all():
+        return DuplicateGroups(groups.group_ids, groups.first_index, groups.last_index, groups.counts, verified=True)
+
+    bad_groups = np.unique(groups.group_ids[dup_positions[~same]])
+    logger.warning(f"RowHash: {len(bad_groups)} hash collision group(s) detected, regrouping exactly")
+
+    # 碰撞组内按实际值重新编号 (罕见路径，按行构造元组即可)
+    keys = groups.group_ids.astype(np.int64).astype(object)
+    rows = np.flatnonzero(np.isin(groups.group_ids, bad_groups))
+    sub = df.iloc[rows].astype(object)
+    sub = sub.where(sub.notna(), None)
+    for pos, values in zip(rows.tolist(), sub.itertuples(index=False, name=None)):
+        keys[pos] = (int(groups.group_ids[pos]),) + values
+    codes, _ = pd.factorize(keys)
+    return DuplicateGroups._from_keys(codes, verified=True, collisions=int(len(bad_groups)))
+
+def find_duplicate_groups(
+    df: pd.DataFrame,
+    subset: Optional[Sequence[Any]] = None,
+    verify: bool = False,
+) -> DuplicateGroups:
+    """
+    按行内容分组
+
+    Args:
+        subset: 只按这些列判断重复
+        verify: 逐值复核哈希相同的行，结果与 DataFrame.duplicated 完全一致
+    """
+    groups = DuplicateGroups.from_hashes(hash_rows(df, subset))
+    if verify:
+        frame = df if subset is None else df[list(subset)]
+        groups = _verify_groups(frame, groups)
+    return groups
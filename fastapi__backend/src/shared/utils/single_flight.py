@@ -0,0 +1,77 @@
+# src/shared/utils/single_flight.py
+import asyncio
+import hashlib
+import json
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, TypeVar
+
+from src.shared.utils.logger import logger
+
+T = TypeVar("T")
+
+# =========================================================
+# 进程内请求合并 (Single Flight)
+#
+# 同一个 key 同时只执行一次：第一个调用方启动计算，并发到达的调用方等待同一个 Task，
+# 共享结果或异常；计算结束后 key 立即释放，之后的调用重新计算 (不是缓存)。
+# 计算以独立 Task 运行：某个调用方断开 (请求被取消) 不会取消其他调用方正在等待的计算。
+# =========================================================
+
+@dataclass
+class SingleFlightStats:
+    started: int = 0
+    shared: int = 0
+    failed: int = 0
+
+class SingleFlight:
+    """
+    按 key 合并并发的相同计算
+
+    注意：所有调用方拿到的是同一个结果对象，调用方不应原地修改结果。
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: Dict[str, "asyncio.Task[Any]"] = {}
+        self._stats = SingleFlightStats()
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        task = self._inflight.get(key)
+        if task is not None:
+            self._stats.shared += 1
+            logger.info(f"🔗 [SingleFlight:{self.name}] Joined in-flight {key}")
+        else:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            self._stats.started += 1
+            task.add_done_callback(lambda t: self._on_done(key, t))
+        # shield：调用方被取消时只停止等待，不取消共享的计算
+        return await asyncio.shield(task)
+
+    def _on_done(self, key: str, task: "asyncio.Task[Any]") -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # 所有调用方都已断开时也要取走异常，避免 "exception was never retrieved"
+        if not task.cancelled() and task.exception() is not None:
+            self._stats.failed += 1
+
+    @property
+    def inflight(self) -> int:
+        return len(self._inflight)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "inflight": self.inflight,
+            "started": self._stats.started,
+            "shared": self._stats.shared,
+            "failed": self._stats.failed,
+        }
+
+def payload_key(prefix: str, payload: Any) -> str:
+    """
+    请求体的稳定哈希键 (字段顺序无关)，用于合并请求体完全相同的调用
+    payload 需是可 JSON 序列化的结构 (如 model_dump(mode="json") 的结果)
+    """
+    raw = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return f"{prefix}:{hashlib.sha256(raw.encode('utf-8')).hexdigest()}"
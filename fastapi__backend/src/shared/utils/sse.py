@@ -0,0 +1,43 @@
+# src/shared/utils/sse.py
+import json
+from typing import Any, Optional
+
+# =========================================================
+# Server-Sent Events 报文格式
+# 每条事件：[id:] [event:] data: 一行 JSON，以空行结束；以冒号开头的行是注释 (用作心跳)
+# =========================================================
+
+SSE_MEDIA_TYPE = "text/event-stream"
+
+# 心跳：注释行不会触发客户端事件，只用于保持连接活跃
+SSE_HEARTBEAT = ": keep-alive\n\n"
+
+# 禁止缓存 / 代理缓冲 (nginx 默认会缓冲响应，事件会攒到一起才下发)
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    "X-Accel-Buffering": "no",
+}
+
+def format_sse(
+    data: Any,
+    event: Optional[str] = None,
+    event_id: Optional[Any] = None,
+    retry_ms: Optional[int] = None,
+) -> str:
+    """
+    格式化一条 SSE 事件
+
+    Args:
+        event_id: 事件 ID，客户端断线重连时通过 Last-Event-ID 请求头带回
+        retry_ms: 建议客户端的重连间隔
+    """
+    lines = []
+    if retry_ms is not None:
+        lines.append(f"retry: {retry_ms}")
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    if event:
+        lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, ensure_ascii=False, separators=(',', ':'))}")
+    return "\n".join(lines) + "\n\n"
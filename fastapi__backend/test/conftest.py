@@ -0,0 +1,9 @@
+import pytest
+
+from mocks.redis_mock import install_fake_redis
+from src.infrastructure.cache.redis_client import redis_manager
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    """Redis 替身：get_redis() / get_redis_binary() 返回共享同一数据的 fakeredis 客户端"""
+    return install_fake_redis(redis_manager, monkeypatch)
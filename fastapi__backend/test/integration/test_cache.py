@@ -0,0 +1,330 @@
+import json
+import os
+
+import pandas as pd
+import pytest
+
+from src.app.config.settings import settings
+from src.features.analysis.schema.analysis_request_schema import DataRef, DataSelection, RowRange
+from src.features.analysis.service import loader_service
+from src.features.quality.repository.cache_repository import CacheRepository
+from src.features.quality.services.quality_analysis_service import AnalysisService
+from src.infrastructure.cache.codec import CodecError, PayloadCodec
+from src.infrastructure.cache.dataframe_cache import DataFrameCache, dataframe_cache
+from src.shared.utils import columnar_cache, file_parser, hash_util
+from src.shared.utils.hash_util import cached_file_fingerprint, generate_cache_key, result_fingerprint
+
+@pytest.fixture
+def csv_file(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_text("name,score\nalice,1\nbob,2\n", encoding="utf-8")
+    return str(path)
+
+@pytest.fixture
+def frame():
+    return pd.DataFrame({"name": ["alice", "bob"], "score": [1, 2]})
+
+# -----------------------------------------------------------------------------
+# DataFrameCache：发放的副本与缓存隔离
+# -----------------------------------------------------------------------------
+
+def test_string_column_write_on_handout_does_not_leak(csv_file, frame):
+    cache = DataFrameCache(max_bytes=1 << 20)
+    cache.put(csv_file, frame)
+
+    df, _ = cache.get(csv_file)
+    df.loc[0, "name"] = "ZZZ"
+
+    again, _ = cache.get(csv_file)
+    assert again.loc[0, "name"] == "alice"
+
+def test_write_on_put_result_does_not_leak(csv_file, frame):
+    cache = DataFrameCache(max_bytes=1 << 20)
+    df = cache.put(csv_file, frame)
+    df.loc[1, "name"] = "ZZZ"
+
+    again, _ = cache.get(csv_file)
+    assert again["name"].tolist() == ["alice", "bob"]
+
+def test_numeric_column_is_read_only(csv_file, frame):
+    cache = DataFrameCache(max_bytes=1 << 20)
+    cache.put(csv_file, frame)
+
+    df, _ = cache.get(csv_file)
+    with pytest.raises(ValueError):
+        df["score"].values[0] = 99
+
+    again, _ = cache.get(csv_file)
+    assert again["score"].tolist() == [1, 2]
+
+def test_column_replacement_on_handout_does_not_leak(csv_file, frame):
+    cache = DataFrameCache(max_bytes=1 << 20)
+    cache.put(csv_file, frame)
+
+    df, _ = cache.get(csv_file)
+    df["score"] = df["score"] * 10
+    df.drop(columns=["name"], inplace=True)
+
+    again, _ = cache.get(csv_file)
+    assert list(again.columns) == ["name", "score"]
+    assert again["score"].tolist() == [1, 2]
+
+def test_profile_is_copied(csv_file, frame):
+    cache = DataFrameCache(max_bytes=1 << 20)
+    cache.put(csv_file, frame, profile={"encoding": "utf-8"})
+
+    _, profile = cache.get(csv_file)
+    profile["encoding"] = "gbk"
+
+    assert cache.get(csv_file)[1] == {"encoding": "utf-8"}
+
+def test_file_change_invalidates_entry(csv_file, frame):
+    cache = DataFrameCache(max_bytes=1 << 20)
+    cache.put(csv_file, frame)
+
+    with open(csv_file, "a", encoding="utf-8") as f:
+        f.write("carol,3\n")
+
+    assert cache.get(csv_file) is None
+
+def test_over_budget_frame_is_not_cached(csv_file, frame):
+    cache = DataFrameCache(max_bytes=1)
+    cache.put(csv_file, frame)
+
+    assert cache.get(csv_file) is None
+    assert cache.stats()["rejected"] == 1
+
+# -----------------------------------------------------------------------------
+# /analysis/run 加载器：投影下推也要经过缓存
+# -----------------------------------------------------------------------------
+
+@pytest.fixture
+def isolated_caches(tmp_path, monkeypatch):
+    """sidecar 写到临时目录，内存缓存清空，并统计文本解析次数"""
+    monkeypatch.setattr(settings, "TEMP_DIR", str(tmp_path / "temp"))
+    dataframe_cache.clear()
+    calls = {"full": 0, "bounded": 0}
+    original = file_parser.parse_csv
+
+    def counting_parse_csv(*args, **kwargs):
+        calls["bounded" if kwargs.get("read_options") else "full"] += 1
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(file_parser, "parse_csv", counting_parse_csv)
+    yield calls
+    dataframe_cache.clear()
+
+@pytest.fixture
+def wide_csv(tmp_path):
+    path = tmp_path / "wide.csv"
+    lines = ["id,name,score,city"] + [f"{i},user{i},{i * 1.5},c{i % 3}" for i in range(50)]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return str(path)
+
+def test_projected_loads_parse_text_once(isolated_caches, wide_csv):
+    ref = DataRef(type="local_file", path=wide_csv)
+    selection = DataSelection(columns=["name", "score"], rows=RowRange(start=10, end=20))
+
+    results = [loader_service.load_dataframe(ref, selection)]
+    # 首次：表头 (nrows=0) + 一次全文解析，结果进入内存缓存
+    assert isolated_caches == {"full": 1, "bounded": 1}
+
+    # 之后表头和数据都来自内存缓存，不再解析文本
+    results += [loader_service.load_dataframe(ref, selection) for _ in range(2)]
+    assert isolated_caches == {"full": 1, "bounded": 1}
+    assert dataframe_cache.stats()["entries"] == 1
+    for df, profile, _ in results:
+        assert list(df.columns) == ["name", "score"]
+        assert list(df.index) == list(range(10, 20))
+        assert df["name"].iloc[0] == "user10"
+        assert profile["rows"] == 50
+        assert profile["columns"] == ["id", "name", "score", "city"]
+
+def test_projection_served_from_sidecar_after_memory_eviction(isolated_caches, wide_csv):
+    ref = DataRef(type="local_file", path=wide_csv)
+    selection = DataSelection(columns=["city"], rows=RowRange(start=0, end=5))
+    loader_service.load_dataframe(ref, selection)
+
+    dataframe_cache.clear()
+    df, profile, _ = loader_service.load_dataframe(ref, selection)
+
+    # 表头来自 sidecar schema，数据来自 sidecar 投影
+    assert isolated_caches == {"full": 1, "bounded": 1}
+    assert profile["engine"] == "arrow_ipc"
+    assert df["city"].tolist() == ["c0", "c1", "c2", "c0", "c1"]
+
+def test_large_file_uses_text_projection(isolated_caches, wide_csv, monkeypatch):
+    monkeypatch.setattr(settings, "PROJECTION_PUSHDOWN_THRESHOLD_MB", 0)
+    ref = DataRef(type="local_file", path=wide_csv)
+    selection = DataSelection(columns=["score"], rows=RowRange(start=0, end=3))
+
+    df, profile, _ = loader_service.load_dataframe(ref, selection)
+
+    assert df.shape == (3, 1)
+    assert profile["rows"] == 50
+    assert dataframe_cache.stats()["entries"] == 0
+
+# -----------------------------------------------------------------------------
+# 列式 sidecar
+# -----------------------------------------------------------------------------
+
+def test_sidecar_path_reuses_memoised_fingerprint(csv_file, monkeypatch):
+    calls = {"n": 0}
+    original = hash_util.calculate_file_fingerprint
+
+    def counting_fingerprint(*args, **kwargs):
+        calls["n"] += 1
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(hash_util, "calculate_file_fingerprint", counting_fingerprint)
+    first = columnar_cache.sidecar_path(csv_file)
+    assert columnar_cache.sidecar_path(csv_file) == first
+    assert calls["n"] == 1
+
+    with open(csv_file, "a", encoding="utf-8") as f:
+        f.write("carol,3\n")
+    assert columnar_cache.sidecar_path(csv_file) != first
+
+# -----------------------------------------------------------------------------
+# 缓存值编解码
+# -----------------------------------------------------------------------------
+
+REPORT = {
+    "file_id": "f1",
+    "row_count": 3,
+    "columns": {"名称": {"missing": 0, "ratio": 0.0}, "score": {"missing": 1, "ratio": 0.3333}},
+    "outliers": [1.5, None, -2],
+    "ok": True,
+}
+
+@pytest.mark.parametrize("codec", ["json", "msgpack"])
+@pytest.mark.parametrize("compression", ["none", "zlib", "zstd"])
+def test_codec_round_trip(codec, compression):
+    if codec == "msgpack":
+        pytest.importorskip("msgpack")
+    if compression == "zstd":
+        pytest.importorskip("zstandard")
+    payload_codec = PayloadCodec(codec=codec, compression=compression, compress_min_bytes=0)
+    assert payload_codec.name == f"{codec}+{compression}"
+
+    data = payload_codec.encode(REPORT)
+
+    # 读取端按头部解码，与自身配置无关
+    assert PayloadCodec(codec="json", compression="none").decode(data) == REPORT
+    assert payload_codec.stats()["by_format"] == {f"{codec}+{compression}": 1}
+
+def test_codec_skips_compression_for_small_values():
+    payload_codec = PayloadCodec(codec="json", compression="zlib", compress_min_bytes=1 << 20)
+    payload_codec.encode(REPORT)
+    assert payload_codec.stats()["by_format"] == {"json+none": 1}
+
+@pytest.mark.parametrize("legacy", [json.dumps(REPORT, ensure_ascii=False), json.dumps(REPORT).encode("utf-8")])
+def test_codec_decodes_legacy_json(legacy):
+    payload_codec = PayloadCodec()
+    assert payload_codec.decode(legacy) == REPORT
+    assert payload_codec.stats()["legacy_decoded"] == 1
+
+@pytest.mark.parametrize("data", [b"\x09\x11abc", b"\x01\x11not-zlib", b"\x01\xf0{}"])
+def test_codec_rejects_corrupted_payload(data):
+    with pytest.raises(CodecError):
+        PayloadCodec().decode(data)
+
+# -----------------------------------------------------------------------------
+# 质量报告缓存键：文件内容指纹 + 参数哈希
+# -----------------------------------------------------------------------------
+
+def test_cache_key_ignores_param_order():
+    a = generate_cache_key("quality:analysis", "fp", {"methods": ["iqr"], "mode": "exact", "version": 1})
+    b = generate_cache_key("quality:analysis", "fp", {"version": 1, "mode": "exact", "methods": ["iqr"]})
+    assert a == b
+
+@pytest.mark.parametrize("changed", [
+    AnalysisService._cache_params(["iqr", "mad"]),
+    AnalysisService._cache_params(["iqr"], approximate=True),
+    {**AnalysisService._cache_params(["iqr"]), "version": -1},
+])
+def test_cache_key_changes_with_params(changed):
+    base = generate_cache_key("quality:analysis", "fp", AnalysisService._cache_params(["iqr"]))
+    assert generate_cache_key("quality:analysis", "fp", changed) != base
+
+def test_fingerprint_follows_content_not_path(tmp_path):
+    a = tmp_path / "a.csv"
+    b = tmp_path / "b.csv"
+    a.write_text("x,y\n1,2\n", encoding="utf-8")
+    b.write_text("x,y\n1,2\n", encoding="utf-8")
+    assert cached_file_fingerprint(str(a)) == cached_file_fingerprint(str(b))
+
+    b.write_text("x,y\n1,3\n", encoding="utf-8")
+    assert cached_file_fingerprint(str(a)) != cached_file_fingerprint(str(b))
+
+def _edit_middle_in_place(path, old: bytes, new: bytes) -> None:
+    """等长替换文件中间的一个值 (文件大小不变，修改时间前进 1 秒)"""
+    st = os.stat(path)
+    data = path.read_bytes()
+    pos = data.index(old, len(data) // 3)
+    path.write_bytes(data[:pos] + new + data[pos + len(old):])
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+@pytest.fixture
+def large_csv(tmp_path):
+    """超过采样覆盖范围 (8 x 64KB) 的 CSV"""
+    path = tmp_path / "large.csv"
+    path.write_text("a,b\n" + "".join(f"{i},{i * 2}\n" for i in range(120000)), encoding="utf-8")
+    assert path.stat().st_size > 8 * 65536
+    return path
+
+@pytest.mark.asyncio
+async def test_same_size_edit_in_large_file_misses_cache(fake_redis, large_csv):
+    repo = CacheRepository()
+    params = AnalysisService._cache_params(["iqr"])
+    before = result_fingerprint(str(large_csv))
+    sampled_before = hash_util.calculate_file_fingerprint(str(large_csv))
+    await repo.save_analysis_result("f1", before, params, {"file_id": "f1"})
+
+    _edit_middle_in_place(large_csv, b"\n60000,120000\n", b"\n69999,120000\n")
+    after = result_fingerprint(str(large_csv))
+
+    # 修改落在采样块之外：单看采样指纹无法区分，结果键必须能区分
+    assert hash_util.calculate_file_fingerprint(str(large_csv)) == sampled_before
+    assert after != before
+    assert await repo.get_analysis_result("f1", after, params) is None
+
+def test_sampled_fingerprint_includes_mtime(large_csv):
+    before = result_fingerprint(str(large_csv), full_hash=False)
+    _edit_middle_in_place(large_csv, b"\n60000,120000\n", b"\n69999,120000\n")
+
+    assert result_fingerprint(str(large_csv), full_hash=False) != before
+
+def test_full_fingerprint_is_shared_by_identical_copies(large_csv, tmp_path):
+    copy = tmp_path / "copy.csv"
+    copy.write_bytes(large_csv.read_bytes())
+    assert result_fingerprint(str(copy)) == result_fingerprint(str(large_csv))
+
+@pytest.mark.asyncio
+async def test_cached_report_is_keyed_by_params(fake_redis):
+    repo = CacheRepository()
+    params = AnalysisService._cache_params(["iqr"])
+    await repo.save_analysis_result("f1", "fp", params, {"file_id": "f1", "row_count": 3})
+
+    assert await repo.get_analysis_result("f1", "fp", AnalysisService._cache_params(["iqr", "zscore"])) is None
+    assert await repo.get_analysis_result("f1", "fp", AnalysisService._cache_params(["iqr"], approximate=True)) is None
+    assert await repo.get_analysis_result("f1", "other-fp", params) is None
+
+    # 同内容的其他 file_id 共用结果，file_id 改写为请求方
+    shared = await repo.get_analysis_result("f2", "fp", params)
+    assert shared == {"file_id": "f2", "row_count": 3}
+    assert await repo.get_fingerprint("f2") == "fp"
+
+@pytest.mark.asyncio
+async def test_delete_removes_every_param_variant(fake_redis):
+    repo = CacheRepository()
+    exact = AnalysisService._cache_params(["iqr"])
+    approx = AnalysisService._cache_params(["iqr"], approximate=True)
+    await repo.save_analysis_result("f1", "fp", exact, {"file_id": "f1"})
+    await repo.save_analysis_result("f1", "fp", approx, {"file_id": "f1"})
+
+    await repo.delete_analysis_result("f1")
+
+    assert await repo.get_analysis_result("f1", "fp", exact) is None
+    assert await repo.get_analysis_result("f1", "fp", approx) is None
+    assert await repo.get_fingerprint("f1") is None
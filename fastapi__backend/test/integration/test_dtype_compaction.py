@@ -0,0 +1,132 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.app.config.settings import settings
+from src.features.quality.utils import metrics
+from src.infrastructure.cache.dataframe_cache import dataframe_cache
+from src.shared.utils import file_parser
+from src.shared.utils.dataframe_utils import COMPACTED_DTYPES_ATTR, compact_dtypes, logical_dtype_names
+
+@pytest.fixture(autouse=True)
+def isolated_caches(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "TEMP_DIR", str(tmp_path / "temp"))
+    dataframe_cache.clear()
+    yield
+    dataframe_cache.clear()
+
+@pytest.fixture
+def frame():
+    n = 200
+    return pd.DataFrame({
+        "small": np.arange(n, dtype=np.int64) % 100,
+        "wide": np.arange(n, dtype=np.int64) * 100_000,
+        "huge": np.arange(n, dtype=np.int64) + 2**40,
+        "unsigned": (np.arange(n) % 200).astype(np.uint64),
+        "halves": np.arange(n) / 2,
+        "thirds": np.arange(n) / 3,
+        "city": ["北京", "上海", None, "广州"] * (n // 4),
+        "name": [f"user{i}" for i in range(n)],
+    })
+
+# -----------------------------------------------------------------------------
+# compact_dtypes
+# -----------------------------------------------------------------------------
+
+def test_compact_dtypes_narrows_without_changing_values(frame):
+    original = frame.copy()
+    compacted, report = compact_dtypes(frame, category_max_ratio=0.5, downcast_floats=True)
+
+    assert compacted.dtypes.astype(str).to_dict() == {
+        "small": "int8",
+        "wide": "int32",
+        "huge": "int64",
+        "unsigned": "uint8",
+        "halves": "float32",        # 逐值无损
+        "thirds": "float64",        # 1/3 在 float32 下有损，保持不变
+        "city": "category",
+        "name": "object",           # 唯一值占比高于阈值
+    }
+    pd.testing.assert_frame_equal(compacted, original, check_dtype=False, check_categorical=False)
+    pd.testing.assert_frame_equal(frame, original)
+
+    assert set(report["columns"]) == {"small", "wide", "unsigned", "halves", "city"}
+    assert report["columns"]["small"] == {
+        "from": "int64", "to": "int8",
+        "before_bytes": 1600, "after_bytes": 200,
+    }
+    assert report["after_bytes"] < report["before_bytes"]
+    assert report["ratio"] == round(report["before_bytes"] / report["after_bytes"], 2)
+
+def test_compact_dtypes_keeps_floats_and_arrow_strings_opt_in(frame):
+    compacted, _ = compact_dtypes(frame)
+    assert str(compacted["halves"].dtype) == "float64"
+    assert compacted["name"].dtype == object
+
+    arrow, _ = compact_dtypes(frame, arrow_strings=True)
+    assert str(arrow["name"].dtype) == "string"
+    assert arrow["name"].tolist() == frame["name"].tolist()
+
+def test_compact_dtypes_handles_duplicate_and_empty_frames():
+    dup = pd.DataFrame([[1, 2], [3, 4]], columns=["a", "a"])
+    compacted, _ = compact_dtypes(dup)
+    assert list(compacted.columns) == ["a", "a"]
+    assert compacted.to_numpy().tolist() == [[1, 2], [3, 4]]
+
+    empty, report = compact_dtypes(pd.DataFrame())
+    assert empty.empty and report["columns"] == {}
+
+# -----------------------------------------------------------------------------
+# logical_dtype_names：只还原被压缩改动过的列
+# -----------------------------------------------------------------------------
+
+def test_logical_names_restore_compacted_columns(frame):
+    compacted, _ = compact_dtypes(frame, downcast_floats=True)
+
+    assert logical_dtype_names(compacted) == logical_dtype_names(frame) == [
+        "int64", "int64", "int64", "uint64", "float64", "float64", "object", "object",
+    ]
+    assert set(compacted.attrs[COMPACTED_DTYPES_ATTR]) == {"small", "wide", "unsigned", "halves", "city"}
+
+def test_logical_names_leave_uncompacted_dtypes_alone():
+    df = pd.DataFrame({
+        "nullable": pd.array([1, None, 3], dtype="Int64"),
+        "unsigned": np.array([1, 2, 3], dtype=np.uint8),
+        "single": np.array([0.5, 1.5, 2.5], dtype=np.float32),
+        "text": pd.array(["a", "b", None], dtype="string"),
+        "cat": pd.Categorical(["x", "y", "x"]),
+    })
+
+    assert logical_dtype_names(df) == ["Int64", "uint8", "float32", "string", "category"]
+
+def test_logical_names_follow_projection_and_later_changes(frame):
+    compacted, _ = compact_dtypes(frame)
+
+    assert logical_dtype_names(compacted[["city", "small"]]) == ["object", "int64"]
+    assert logical_dtype_names(compacted.iloc[10:20, :2]) == ["int64", "int64"]
+    assert logical_dtype_names(compacted.copy(deep=False)) == logical_dtype_names(frame)
+
+    # 压缩后被改写的列按当前 dtype 展示
+    changed = compacted.copy()
+    changed["small"] = changed["small"].astype(np.float64) / 2
+    assert logical_dtype_names(changed)[0] == "float64"
+
+# -----------------------------------------------------------------------------
+# 解析入口：开启压缩时对外类型不变
+# -----------------------------------------------------------------------------
+
+def test_reported_types_do_not_depend_on_compaction(frame, tmp_path):
+    path = tmp_path / "data.csv"
+    frame.to_csv(path, index=False)
+
+    plain = file_parser.parse_file(str(path), compact=False)
+    profile = {}
+    compacted = file_parser.parse_file(str(path), compact=True, load_profile=profile)
+    # 第二次从内存缓存发放
+    cached = file_parser.parse_file(str(path), compact=True)
+
+    assert profile["compaction"]["columns"]
+    assert str(compacted["small"].dtype) == "int8"
+    assert metrics.infer_column_types(compacted) == metrics.infer_column_types(plain)
+    assert metrics.infer_column_types(cached) == metrics.infer_column_types(plain)
+    assert metrics.run_quality_kernel(compacted)["types"] == metrics.run_quality_kernel(plain)["types"]
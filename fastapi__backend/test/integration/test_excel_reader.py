@@ -0,0 +1,133 @@
+import datetime
+
+import pandas as pd
+import pytest
+from openpyxl import Workbook
+
+from src.app.config.settings import settings
+from src.infrastructure.cache.dataframe_cache import dataframe_cache
+from src.shared.exceptions.data_parse import DataParseException
+from src.shared.utils import excel_reader, file_parser
+
+@pytest.fixture(autouse=True)
+def isolated_caches(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "TEMP_DIR", str(tmp_path / "temp"))
+    dataframe_cache.clear()
+    yield
+    dataframe_cache.clear()
+
+@pytest.fixture
+def workbook(tmp_path):
+    """三个工作表：混合类型的 Sales、较短的 Stock、隐藏的 Notes"""
+    wb = Workbook()
+    sales = wb.active
+    sales.title = "Sales"
+    sales.append(["id", "amount", "region", "day", "note"])
+    for i in range(1, 31):
+        sales.append([
+            i,
+            float(i) if i % 5 else i + 0.5,            # 整数值的浮点数按整数读出
+            None if i % 7 == 0 else f"r{i % 3}",
+            datetime.datetime(2024, 1, i),
+            "#DIV/0!" if i == 3 else None,             # Excel 错误值 -> NaN
+        ])
+
+    stock = wb.create_sheet("Stock")
+    stock.append(["sku", "qty"])
+    for i in range(5):
+        stock.append([f"s{i}", i * 10])
+
+    notes = wb.create_sheet("Notes")
+    notes.append(["text"])
+    notes.append(["hidden"])
+    notes.sheet_state = "hidden"
+
+    path = tmp_path / "book.xlsx"
+    wb.save(path)
+    return str(path)
+
+# -----------------------------------------------------------------------------
+# 流式读取与 pd.read_excel 一致
+# -----------------------------------------------------------------------------
+
+@pytest.mark.parametrize("sheet", [None, "Sales", "Stock", 1, "Notes"])
+def test_streaming_reader_matches_read_excel(workbook, sheet):
+    expected = pd.read_excel(workbook, sheet_name=sheet if sheet is not None else 0, engine="openpyxl")
+    actual = excel_reader.read_excel_streaming(workbook, sheet_name=sheet)
+
+    pd.testing.assert_frame_equal(actual, expected)
+
+def test_streaming_reader_nrows_and_usecols(workbook):
+    expected = pd.read_excel(workbook, nrows=4, usecols=["id", "region"], engine="openpyxl")
+    actual = excel_reader.read_excel_streaming(workbook, nrows=4, usecols=["id", "region"])
+    pd.testing.assert_frame_equal(actual, expected)
+
+    header_only = excel_reader.read_excel_streaming(workbook, nrows=0)
+    assert list(header_only.columns) == ["id", "amount", "region", "day", "note"]
+    assert header_only.empty
+
+def test_streaming_reader_stops_after_max_rows(workbook):
+    rows = list(excel_reader.iter_excel_rows(workbook, "Sales", max_rows=3))
+
+    assert len(rows) == 3
+    assert rows[0] == ["id", "amount", "region", "day", "note"]
+    assert rows[1] == [1, 1, "r1", datetime.datetime(2024, 1, 1)]  # 行尾空单元格已裁剪
+    assert len(rows[2]) == 4
+
+# -----------------------------------------------------------------------------
+# 工作表列表与行列数
+# -----------------------------------------------------------------------------
+
+def test_list_sheets(workbook):
+    sheets = excel_reader.list_sheets(workbook)
+
+    assert [(s["name"], s["index"], s["rows"], s["cols"], s["state"]) for s in sheets] == [
+        ("Sales", 0, 31, 5, "visible"),
+        ("Stock", 1, 6, 2, "visible"),
+        ("Notes", 2, 2, 1, "hidden"),
+    ]
+
+@pytest.mark.parametrize("sheet, expected", [
+    (None, {"rows": 31, "cols": 5}),
+    ("Stock", {"rows": 6, "cols": 2}),
+    (2, {"rows": 2, "cols": 1}),
+])
+def test_sheet_dimensions(workbook, sheet, expected):
+    assert excel_reader.sheet_dimensions(workbook, sheet, exact=True) == expected
+
+@pytest.mark.parametrize("sheet", ["Missing", 5])
+def test_unknown_sheet_raises_value_error(workbook, sheet):
+    with pytest.raises(ValueError):
+        excel_reader.sheet_dimensions(workbook, sheet)
+
+# -----------------------------------------------------------------------------
+# sheet_name 在解析入口中的路由
+# -----------------------------------------------------------------------------
+
+def test_parse_file_routes_sheet_name(workbook):
+    profile = {}
+    first = file_parser.parse_file(workbook, load_profile=profile)
+    assert (profile["engine"], profile["sheet_name"]) == ("openpyxl_stream", 0)
+    assert first.shape == (30, 5)
+
+    by_name = file_parser.parse_file(workbook, sheet_name="Stock")
+    by_index = file_parser.parse_file(workbook, sheet_name=1)
+    assert by_name.to_dict("list") == {"sku": [f"s{i}" for i in range(5)], "qty": [0, 10, 20, 30, 40]}
+    pd.testing.assert_frame_equal(by_index, by_name)
+
+    # 不同工作表不共用内存缓存条目
+    assert file_parser.parse_file(workbook).shape == (30, 5)
+
+def test_head_columns_and_row_count_follow_sheet_name(workbook):
+    head = file_parser.parse_file_head(workbook, nrows=2, sheet_name="Stock")
+    assert head["sku"].tolist() == ["s0", "s1"]
+
+    assert file_parser.read_file_columns(workbook, sheet_name="Stock") == ["sku", "qty"]
+    assert file_parser.read_file_columns(workbook) == ["id", "amount", "region", "day", "note"]
+
+    assert file_parser.count_file_rows(workbook, sheet_name="Stock") == 5
+    assert file_parser.count_file_rows(workbook) == 30
+
+def test_parse_file_with_unknown_sheet_raises_parse_error(workbook):
+    with pytest.raises(DataParseException):
+        file_parser.parse_file(workbook, sheet_name="Missing")
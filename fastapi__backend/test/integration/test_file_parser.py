@@ -0,0 +1,275 @@
+import os
+
+import pandas as pd
+import pytest
+
+from src.app.config.settings import settings
+from src.shared.utils import file_parser
+
+@pytest.fixture
+def engine_log(monkeypatch):
+    """记录每次 pd.read_csv 调用使用的引擎"""
+    engines = []
+    real_read_csv = pd.read_csv
+
+    def spy(*args, **kwargs):
+        engines.append(kwargs.get("engine"))
+        return real_read_csv(*args, **kwargs)
+    monkeypatch.setattr(file_parser.pd, "read_csv", spy)
+    return engines
+
+def _write(tmp_path, name: str, text: str, encoding: str = "utf-8"):
+    path = tmp_path / name
+    path.write_bytes(text.encode(encoding))
+    return str(path)
+
+# -----------------------------------------------------------------------------
+# 分级解析引擎
+# -----------------------------------------------------------------------------
+
+def test_engine_tiers_follow_settings(monkeypatch):
+    monkeypatch.setattr(settings, "CSV_PYARROW_ENGINE", True, raising=False)
+    assert file_parser._csv_engine_tiers() == ["pyarrow", "c", "python"]
+    monkeypatch.setattr(settings, "CSV_PYARROW_ENGINE", False, raising=False)
+    assert file_parser._csv_engine_tiers() == ["c", "python"]
+
+def test_clean_file_uses_fastest_engine(monkeypatch, tmp_path, engine_log):
+    path = _write(tmp_path, "clean.csv", "a,b\n1,2\n3,4\n")
+    monkeypatch.setattr(settings, "CSV_PYARROW_ENGINE", True, raising=False)
+
+    df, engine, skipped = file_parser._read_csv_tiered(path, ",", "utf-8")
+    assert (engine, skipped, len(df)) == ("pyarrow", 0, 2)
+
+    # pyarrow 不支持 nrows：直接从 c 引擎开始
+    df, engine, _ = file_parser._read_csv_tiered(path, ",", "utf-8", nrows=1)
+    assert (engine, len(df)) == ("c", 1)
+    assert engine_log == ["pyarrow", "c"]
+
+def test_engines_fall_back_in_order(monkeypatch, tmp_path, engine_log):
+    # 多字符分隔符只有 python 引擎支持
+    path = _write(tmp_path, "multi.csv", "a::b\n1::2\n")
+    monkeypatch.setattr(settings, "CSV_PYARROW_ENGINE", True, raising=False)
+
+    df, engine, skipped = file_parser._read_csv_tiered(path, "::", "utf-8")
+
+    assert engine_log == ["pyarrow", "c", "python"]
+    assert (engine, skipped) == ("python", 0)
+    assert df.to_dict("list") == {"a": [1], "b": [2]}
+
+def test_malformed_lines_are_skipped_and_counted(monkeypatch, tmp_path, engine_log):
+    path = _write(tmp_path, "bad.csv", "a,b\n1,2\n3,4,5\n6,7\n8,9,10,11\n")
+    monkeypatch.setattr(settings, "CSV_PYARROW_ENGINE", False, raising=False)
+
+    df, engine, skipped = file_parser._read_csv_tiered(path, ",", "utf-8")
+
+    # c 引擎严格解析失败，只有 python 引擎跳过坏行
+    assert engine_log == ["c", "python"]
+    assert (engine, skipped) == ("python", 2)
+    assert df.to_dict("list") == {"a": [1, 6], "b": [2, 7]}
+
+def test_load_profile_reports_engine_and_skipped_lines(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "CSV_PYARROW_ENGINE", False, raising=False)
+    clean = _write(tmp_path, "clean.csv", "a,b\n1,2\n3,4\n")
+    bad = _write(tmp_path, "bad.csv", "a,b\n1,2\n3,4,5\n6,7\n")
+
+    profile = {}
+    file_parser.parse_csv(clean, "clean.csv", load_profile=profile)
+    assert (profile["engine"], profile["skipped_lines"]) == ("c", 0)
+
+    profile = {}
+    df = file_parser.parse_csv(bad, "bad.csv", load_profile=profile)
+    assert (profile["engine"], profile["skipped_lines"]) == ("python", 1)
+    assert len(df) == 2
+
+def test_last_engine_error_is_raised_when_every_tier_fails(monkeypatch, tmp_path):
+    path = _write(tmp_path, "gbk.csv", "名称,数量\n苹果,1\n", encoding="gbk")
+    monkeypatch.setattr(settings, "CSV_PYARROW_ENGINE", False, raising=False)
+
+    with pytest.raises(UnicodeDecodeError):
+        file_parser._read_csv_tiered(path, ",", "utf-8")
+
+# -----------------------------------------------------------------------------
+# 方言判定
+# -----------------------------------------------------------------------------
+
+@pytest.mark.parametrize("sep", [";", "\t", "|"])
+def test_dialect_resolves_separator(tmp_path, sep):
+    rows = ["id,name,score".replace(",", sep)] + [f"{i}{sep}n{i}{sep}{i * 1.5}" for i in range(20)]
+    path = _write(tmp_path, "data.csv", "\n".join(rows) + "\n")
+
+    dialect = file_parser.resolve_csv_dialect(path, "utf-8")
+
+    assert (dialect["sep"], dialect["fields"], dialect["has_header"]) == (sep, 3, True)
+    profile = {}
+    df = file_parser.parse_csv(path, "data.csv", load_profile=profile)
+    assert list(df.columns) == ["id", "name", "score"]
+    assert len(df) == 20
+    assert profile["sep"] == sep
+
+def test_dialect_ignores_separator_inside_quotes(tmp_path):
+    # 每行都有被引号包住的 ";"，字段数一致的仍是 ","
+    rows = ['id,comment,city'] + [f'{i},"a;b;c;{i}",x' for i in range(20)]
+    path = _write(tmp_path, "quoted.csv", "\n".join(rows) + "\n")
+
+    dialect = file_parser.resolve_csv_dialect(path, "utf-8")
+    assert (dialect["sep"], dialect["fields"]) == (",", 3)
+
+    df = file_parser.parse_csv(path, "quoted.csv")
+    assert df["comment"].iloc[3] == "a;b;c;3"
+
+def test_dialect_quoted_separator_does_not_split_fields(tmp_path):
+    rows = ['id;comment'] + [f'{i};"x, y, z"' for i in range(20)]
+    path = _write(tmp_path, "semi_quoted.csv", "\n".join(rows) + "\n")
+
+    assert file_parser.resolve_csv_dialect(path, "utf-8")["sep"] == ";"
+    df = file_parser.parse_csv(path, "semi_quoted.csv")
+    assert list(df.columns) == ["id", "comment"]
+    assert (df["comment"] == "x, y, z").all()
+
+def test_single_column_file_is_not_split(tmp_path):
+    path = _write(tmp_path, "single.csv", "value\n" + "".join(f"{i}\n" for i in range(20)))
+
+    dialect = file_parser.resolve_csv_dialect(path, "utf-8")
+    assert (dialect["sep"], dialect["fields"]) == (",", 1)
+
+    df = file_parser.parse_csv(path, "single.csv")
+    assert list(df.columns) == ["value"]
+    assert df["value"].tolist() == list(range(20))
+
+def test_resolved_dialect_is_reused(tmp_path, monkeypatch):
+    path = _write(tmp_path, "data.csv", "a;b\n1;2\n")
+    profile = {}
+    file_parser.parse_csv(path, "data.csv", load_profile=profile)
+    assert profile["dialect_source"] == "resolved"
+
+    calls = []
+    monkeypatch.setattr(file_parser, "resolve_csv_dialect", lambda *args, **kwargs: calls.append(args))
+    profile = {}
+    file_parser.parse_csv(path, "data.csv", load_profile=profile)
+    assert (profile["dialect_source"], profile["sep"], calls) == ("cache", ";", [])
+
+    # 调用方提示的方言优先
+    profile_hint = {}
+    file_parser.parse_csv(path, "data.csv", load_profile=profile_hint, dialect=profile["dialect"])
+    assert profile_hint["dialect_source"] == "hint"
+
+# -----------------------------------------------------------------------------
+# 编码探测
+# -----------------------------------------------------------------------------
+
+CHINESE_ROWS = "名称,城市,数量\n" + "".join(f"苹果{i},北京,{i}\n" for i in range(50))
+
+@pytest.mark.parametrize("encoding, expected", [
+    ("gbk", "gbk"),
+    ("utf-8-sig", "utf-8"),
+])
+def test_detect_encoding_of_chinese_files(tmp_path, encoding, expected):
+    path = _write(tmp_path, "data.csv", CHINESE_ROWS, encoding=encoding)
+
+    assert file_parser.detect_encoding(path) == expected
+    df = file_parser.parse_csv(path, "data.csv")
+    assert list(df.columns) == ["名称", "城市", "数量"]
+    assert df["名称"].iloc[7] == "苹果7"
+
+def test_detect_encoding_of_gb18030_only_characters(tmp_path):
+    # 𠀀 (扩展 B 区) 只有 GB18030 能编码，GBK 解码会失败
+    text = "名称,数量\n" + "".join(f"𠀀字{i},{i}\n" for i in range(50))
+    path = _write(tmp_path, "data.csv", text, encoding="gb18030")
+
+    assert file_parser.detect_encoding(path) == "gb18030"
+    df = file_parser.parse_csv(path, "data.csv")
+    assert df["名称"].iloc[3] == "𠀀字3"
+
+def test_non_ascii_after_head_sample_is_validated(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "ENCODING_SAMPLE_SIZE", 16384)
+    monkeypatch.setattr(settings, "ENCODING_CHUNK_SIZE", 4096)
+    monkeypatch.setattr(settings, "ENCODING_VALIDATE_BLOCK_SIZE", 4096)
+    ascii_part = "name,city\n" + "".join(f"item{i},beijing\n" for i in range(8000))
+    gbk_part = "".join(f"苹果{i},北京\n" for i in range(8000))
+    path = _write(tmp_path, "late.csv", ascii_part + gbk_part, encoding="gbk")
+    assert len(ascii_part) > 16384
+
+    # 头部样本全是 ASCII；中部/尾部校验块排除 utf-8
+    assert file_parser.detect_encoding(path) == "gbk"
+    df = file_parser.parse_csv(path, "late.csv")
+    assert len(df) == 16000
+    assert df["city"].iloc[-1] == "北京"
+
+def test_encoding_memo_is_invalidated_by_file_changes(tmp_path, monkeypatch):
+    detections = []
+    real_detector = file_parser.UniversalDetector
+
+    def counting_detector():
+        detections.append(1)
+        return real_detector()
+    monkeypatch.setattr(file_parser, "UniversalDetector", counting_detector)
+
+    path = _write(tmp_path, "data.csv", CHINESE_ROWS, encoding="gbk")
+    assert file_parser.detect_encoding(path) == "gbk"
+    assert file_parser.detect_encoding(path) == "gbk"
+    assert len(detections) == 1
+
+    # 内容与大小都变：签名变化，重新探测
+    _write(tmp_path, "data.csv", CHINESE_ROWS + "香蕉,上海,1\n", encoding="utf-8")
+    assert file_parser.detect_encoding(path) == "utf-8"
+    assert len(detections) == 2
+
+def test_file_memo_keys_on_size_and_mtime(tmp_path):
+    memo = file_parser._FileMemo(max_entries=2)
+    path = tmp_path / "a.csv"
+    path.write_text("a\n1\n")
+    memo.put(str(path), "first")
+    assert memo.get(str(path)) == "first"
+
+    # 大小不变，只有修改时间变化
+    st = os.stat(path)
+    path.write_text("a\n2\n")
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    assert memo.get(str(path)) is None
+
+    # 容量满时淘汰最早写入的条目；文件不存在时不报错
+    for name in ("b.csv", "c.csv"):
+        (tmp_path / name).write_text("x\n")
+        memo.put(str(tmp_path / name), name)
+    assert len(memo._data) == 2
+    assert memo.get(str(tmp_path / "b.csv")) == "b.csv"
+    assert memo.get(str(tmp_path / "c.csv")) == "c.csv"
+    assert memo.get(str(tmp_path / "missing.csv")) is None
+
+# -----------------------------------------------------------------------------
+# 行数统计
+# -----------------------------------------------------------------------------
+
+ROW_COUNT_CASES = {
+    "embedded_newlines": 'id,text\n1,"line one\nline two"\n2,"a\n\nb"\n3,plain\n',
+    "crlf": 'id,text\r\n1,a\r\n2,"x\r\ny"\r\n\r\n3,c\r\n',
+    "no_trailing_newline": 'id,text\n1,a\n2,"b\nc"\n3,d',
+    "escaped_quotes": 'id,text\n1,"say ""hi""\nthere"\n2,""""\n3,"a,""b"""\n',
+    "blank_lines": 'id,text\n\n1,a\n\n\n2,b\n\n',
+}
+
+@pytest.mark.parametrize("chunk_bytes", [1, 2, 3, 5, 7, 64, 4 * 1024 * 1024])
+@pytest.mark.parametrize("case", sorted(ROW_COUNT_CASES))
+def test_count_csv_rows_matches_pandas(tmp_path, monkeypatch, case, chunk_bytes):
+    # 小块迫使引号对、"" 转义与 \r\n 跨块
+    monkeypatch.setattr(settings, "ROW_COUNT_CHUNK_BYTES", chunk_bytes)
+    path = tmp_path / f"{case}.csv"
+    path.write_bytes(ROW_COUNT_CASES[case].encode("utf-8"))
+
+    assert file_parser.count_csv_rows(str(path)) == len(pd.read_csv(path))
+
+def test_count_csv_rows_with_quote_pair_split_at_chunk_boundary(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "ROW_COUNT_CHUNK_BYTES", 16)
+    # 开引号落在第一块末尾，闭引号与中间的换行落在后续块
+    text = 'id,text\n' + "x" * 6 + ',"a\n,\nb"\n2,b\n3,"c\n"'
+    path = tmp_path / "split.csv"
+    path.write_bytes(text.encode("utf-8"))
+    assert text.encode("utf-8")[15:16] == b'"'
+
+    assert file_parser.count_csv_rows(str(path)) == len(pd.read_csv(path)) == 3
+
+def test_count_csv_rows_of_utf16_file(tmp_path):
+    path = tmp_path / "utf16.csv"
+    path.write_bytes(ROW_COUNT_CASES["embedded_newlines"].encode("utf-16"))
+
+    assert file_parser.count_csv_rows(str(path), encoding="utf-16") == len(pd.read_csv(path, encoding="utf-16"))
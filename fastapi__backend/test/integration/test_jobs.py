@@ -0,0 +1,171 @@
+import asyncio
+
+import httpx
+import pytest
+import pytest_asyncio
+
+from src.app.config.settings import settings
+from src.app.main import app
+from src.features.quality.repository.task_repository import TaskRepository
+from src.features.quality.services import quality_analysis_service
+from src.infrastructure.jobs.scheduler import JobScheduler
+from src.shared.exceptions.compute_filed import JobQueueFullException, TaskConflictException
+
+@pytest_asyncio.fixture
+async def scheduler():
+    jobs = JobScheduler(max_concurrency=1, max_queue=1)
+    yield jobs
+    await jobs.shutdown()
+
+def _blocking_job(release: asyncio.Event, log: list, name: str):
+    async def run():
+        log.append(f"{name}:start")
+        await release.wait()
+        log.append(f"{name}:done")
+    return run
+
+# -----------------------------------------------------------------------------
+# JobScheduler
+# -----------------------------------------------------------------------------
+
+@pytest.mark.asyncio
+async def test_same_key_is_not_queued_twice(scheduler):
+    release, log = asyncio.Event(), []
+    assert scheduler.submit("a", _blocking_job(release, log, "a")) is True
+    assert scheduler.submit("a", _blocking_job(release, log, "a2")) is False
+    assert scheduler.is_active("a")
+
+    release.set()
+    await asyncio.sleep(0.01)
+
+    assert log == ["a:start", "a:done"]
+    assert not scheduler.is_active("a")
+    assert scheduler.stats()["deduplicated"] == 1
+    # 结束后同一个 key 可以再次提交
+    assert scheduler.submit("a", _blocking_job(release, log, "a3")) is True
+
+@pytest.mark.asyncio
+async def test_full_queue_rejects_with_503(scheduler):
+    release, log = asyncio.Event(), []
+    scheduler.submit("running", _blocking_job(release, log, "running"))
+    await asyncio.sleep(0)  # worker 取走第一个任务
+    scheduler.submit("queued", _blocking_job(release, log, "queued"))
+
+    with pytest.raises(JobQueueFullException) as exc_info:
+        scheduler.submit("rejected", _blocking_job(release, log, "rejected"))
+
+    assert exc_info.value.status_code == 503
+    assert not scheduler.is_active("rejected")
+    stats = scheduler.stats()
+    assert (stats["running"], stats["queued"], stats["rejected"]) == (1, 1, 1)
+
+    release.set()
+    await asyncio.sleep(0.01)
+    assert log == ["running:start", "running:done", "queued:start", "queued:done"]
+
+@pytest.mark.asyncio
+async def test_failed_job_does_not_stop_the_worker(scheduler):
+    log = []
+
+    async def boom():
+        raise ValueError("boom")
+
+    async def ok():
+        log.append("ok")
+
+    scheduler.submit("boom", boom)
+    await asyncio.sleep(0.01)
+    scheduler.submit("ok", ok)
+    await asyncio.sleep(0.01)
+
+    assert log == ["ok"]
+    assert not scheduler.is_active("boom")
+    stats = scheduler.stats()
+    assert (stats["failed"], stats["completed"]) == (1, 1)
+
+@pytest.mark.asyncio
+async def test_shutdown_cancels_running_jobs(scheduler):
+    release, log = asyncio.Event(), []
+    scheduler.submit("a", _blocking_job(release, log, "a"))
+    await asyncio.sleep(0)
+
+    await scheduler.shutdown()
+
+    assert log == ["a:start"]
+    assert not scheduler.is_active("a")
+
+# -----------------------------------------------------------------------------
+# 后台提交接口
+# -----------------------------------------------------------------------------
+
+@pytest.mark.asyncio
+async def test_background_submit_returns_503_when_queue_is_full(fake_redis, scheduler, monkeypatch, tmp_path):
+    monkeypatch.setattr(quality_analysis_service, "job_scheduler", scheduler)
+    release, log = asyncio.Event(), []
+    scheduler.submit("busy", _blocking_job(release, log, "busy"))
+    await asyncio.sleep(0)
+    scheduler.submit("waiting", _blocking_job(release, log, "waiting"))
+
+    body = {"file_id": "f1", "file_path": str(tmp_path / "a.csv"), "background": True}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post(f"{settings.API_PREFIX}/quality/analyze", json=body)
+
+    assert response.status_code == 503
+    # 未入队的任务标记为失败，轮询方不会一直停在 pending
+    task = await TaskRepository().get_task("f1")
+    assert task["status"] == "failed"
+    release.set()
+
+@pytest.mark.asyncio
+async def test_background_submit_rejects_conflicting_params(fake_redis, scheduler, monkeypatch, tmp_path):
+    monkeypatch.setattr(quality_analysis_service, "job_scheduler", scheduler)
+    release, log = asyncio.Event(), []
+    scheduler.submit("busy", _blocking_job(release, log, "busy"))
+    await asyncio.sleep(0)
+
+    service = quality_analysis_service.AnalysisService()
+    path = str(tmp_path / "a.csv")
+    first = await service.submit_analysis("f1", path, methods=["iqr"])
+    same = await service.submit_analysis("f1", path, methods=["iqr"])
+    assert first["deduplicated"] is False
+    assert same["deduplicated"] is True
+
+    # 参数不同的提交不能沿用进行中的任务 (否则会拿到另一份参数的报告)
+    with pytest.raises(TaskConflictException):
+        await service.submit_analysis("f1", path, methods=["zscore"])
+    with pytest.raises(TaskConflictException):
+        await service.submit_analysis("f1", path, methods=["iqr"], mode="approximate", followup_exact=True)
+    release.set()
+
+@pytest.mark.asyncio
+async def test_concurrent_background_submits_queue_once(fake_redis, scheduler, monkeypatch, tmp_path):
+    monkeypatch.setattr(quality_analysis_service, "job_scheduler", scheduler)
+    release, log = asyncio.Event(), []
+    scheduler.submit("busy", _blocking_job(release, log, "busy"))
+    await asyncio.sleep(0)
+
+    service = quality_analysis_service.AnalysisService()
+    path = str(tmp_path / "a.csv")
+    results = await asyncio.gather(*(service.submit_analysis("f1", path) for _ in range(3)))
+
+    assert [r["deduplicated"] for r in results].count(False) == 1
+    assert scheduler.stats()["submitted"] == 2
+    assert (await TaskRepository().get_task("f1"))["status"] == "pending"
+    release.set()
+
+@pytest.mark.asyncio
+async def test_queued_job_waits_for_initial_state(fake_redis, scheduler, monkeypatch, tmp_path):
+    monkeypatch.setattr(quality_analysis_service, "job_scheduler", scheduler)
+    service = quality_analysis_service.AnalysisService()
+    seen = []
+
+    async def record_state(*args, **kwargs):
+        seen.append((await TaskRepository().get_task("f1"))["status"])
+    monkeypatch.setattr(service, "perform_analysis", record_state)
+
+    await service.submit_analysis("f1", str(tmp_path / "a.csv"))
+    await scheduler._queue.join()
+
+    # 计算开始时初始状态已经写入 (不会反过来覆盖计算中的进度)
+    assert seen == ["pending"]
@@ -0,0 +1,147 @@
+import asyncio
+
+import pytest
+
+from src.infrastructure.cache.distributed_lock import DistributedFlight, LeaseLock
+from src.infrastructure.cache.redis_client import get_redis, redis_manager
+
+def _replica(**kwargs) -> DistributedFlight:
+    """每个 DistributedFlight 实例模拟一个副本 (各自的通知订阅与统计)"""
+    return DistributedFlight(**{"ttl_ms": 3000, "poll_interval_ms": 50, "wait_timeout_s": 5, **kwargs})
+
+def _counting(calls: list, value, delay: float = 0.05):
+    async def compute():
+        calls.append(value)
+        await asyncio.sleep(delay)
+        return value
+    return compute
+
+# -----------------------------------------------------------------------------
+# Redis 不可用：退化为本地计算
+# -----------------------------------------------------------------------------
+
+@pytest.mark.asyncio
+async def test_redis_down_computes_locally(fake_redis):
+    fake_redis.connected = False
+    flight, calls = _replica(), []
+
+    assert await flight.do("k", _counting(calls, {"rows": 1})) == {"rows": 1}
+    assert calls == [{"rows": 1}]
+    assert flight.stats()["degraded"] == 1
+
+@pytest.mark.asyncio
+async def test_redis_not_connected_computes_locally(monkeypatch):
+    monkeypatch.setattr(redis_manager, "client", None)
+    flight, calls = _replica(), []
+
+    assert await flight.do("k", _counting(calls, 1)) == 1
+    assert flight.stats()["degraded"] == 1
+
+@pytest.mark.asyncio
+async def test_redis_lost_while_waiting_computes_locally(fake_redis):
+    await get_redis().set("lock:k", "someone-else")
+    flight, calls = _replica(), []
+
+    async def drop_redis():
+        await asyncio.sleep(0.1)
+        fake_redis.connected = False
+
+    dropper = asyncio.create_task(drop_redis())
+    assert await flight.do("k", _counting(calls, 2)) == 2
+    await dropper
+    assert calls == [2]
+    assert flight.stats()["degraded"] == 1
+
+# -----------------------------------------------------------------------------
+# 跨副本去重
+# -----------------------------------------------------------------------------
+
+@pytest.mark.asyncio
+async def test_peer_result_is_shared_across_replicas(fake_redis):
+    a, b, calls = _replica(), _replica(), []
+
+    results = await asyncio.gather(
+        a.do("k", _counting(calls, {"score": 90}, delay=0.2)),
+        b.do("k", _counting(calls, {"score": 90}, delay=0.2)),
+    )
+
+    assert results == [{"score": 90}, {"score": 90}]
+    assert len(calls) == 1
+    assert a.stats()["acquired"] + b.stats()["acquired"] == 1
+    assert a.stats()["served_by_peer"] + b.stats()["served_by_peer"] == 1
+    assert not await get_redis().exists("lock:k")
+
+@pytest.mark.asyncio
+async def test_waiter_uses_load_callback(fake_redis):
+    a, b, calls, store = _replica(), _replica(), [], {}
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.1)
+        store["k"] = "from-cache"
+        return "computed"
+
+    async def load():
+        return store.get("k")
+
+    results = await asyncio.gather(a.do("k", compute, load=load), b.do("k", compute, load=load))
+
+    assert sorted(results) == ["computed", "from-cache"]
+    assert calls == [1]
+
+@pytest.mark.asyncio
+async def test_holder_failure_makes_waiter_recompute(fake_redis):
+    a, b = _replica(), _replica()
+
+    async def failing():
+        await asyncio.sleep(0.1)
+        raise ValueError("boom")
+
+    holder = asyncio.create_task(a.do("k", failing))
+    await asyncio.sleep(0.02)
+    waiter_calls = []
+    assert await b.do("k", _counting(waiter_calls, "ok")) == "ok"
+
+    with pytest.raises(ValueError):
+        await holder
+    assert waiter_calls == ["ok"]
+    assert b.stats()["recomputed_after_wait"] == 1
+
+@pytest.mark.asyncio
+async def test_crashed_holder_lease_expires(fake_redis):
+    # 持有者崩溃：锁没有释放也没有通知，等待者在租约过期后接手
+    await get_redis().set("lock:k", "crashed", px=200)
+    flight, calls = _replica(), []
+
+    assert await flight.do("k", _counting(calls, "mine")) == "mine"
+    assert calls == ["mine"]
+
+# -----------------------------------------------------------------------------
+# 租约
+# -----------------------------------------------------------------------------
+
+@pytest.mark.asyncio
+async def test_heartbeat_keeps_long_computation_exclusive(fake_redis):
+    a, b, calls = _replica(ttl_ms=300), _replica(ttl_ms=300), []
+
+    results = await asyncio.gather(
+        a.do("k", _counting(calls, "v", delay=0.7)),
+        b.do("k", _counting(calls, "v", delay=0.7)),
+    )
+
+    assert results == ["v", "v"]
+    assert len(calls) == 1
+    assert a.stats()["renewals"] + b.stats()["renewals"] >= 2
+
+@pytest.mark.asyncio
+async def test_release_requires_own_token(fake_redis):
+    mine = LeaseLock("k", ttl_ms=3000)
+    assert await mine.acquire()
+
+    other = LeaseLock("k", ttl_ms=3000)
+    assert not await other.acquire()
+    assert not await other.release()
+    assert await get_redis().get("lock:k") == mine.token
+
+    assert await mine.release()
+    assert not await get_redis().exists("lock:k")
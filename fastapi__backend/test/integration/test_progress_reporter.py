@@ -0,0 +1,138 @@
+import asyncio
+import threading
+
+import pytest
+
+from src.app.config.settings import settings
+from src.features.quality.services import quality_analysis_service
+from src.shared.utils.progress import ProgressReporter, ProgressSnapshot
+
+TICK = 0.01
+
+class _Sink:
+    """记录写入的快照；fail 次数内抛异常模拟存储写失败"""
+
+    def __init__(self, fail: int = 0):
+        self.writes = []
+        self.fail = fail
+
+    async def __call__(self, snapshot: ProgressSnapshot) -> None:
+        if self.fail:
+            self.fail -= 1
+            raise ConnectionError("redis down")
+        self.writes.append((snapshot.progress, snapshot.phase, dict(snapshot.timings)))
+
+async def _settle():
+    """等 pump 至少跑过几轮"""
+    await asyncio.sleep(TICK * 5)
+
+@pytest.mark.asyncio
+async def test_drain_merges_events():
+    reporter = ProgressReporter()
+    reporter.report(10, phase="load", message="loading", timings={"load": 1.0})
+    reporter.report(30, phase="kernel")
+    reporter.report(20, phase="late", message="stale")
+
+    state = reporter.drain()
+    # 进度只增不减；倒退的事件不改阶段 / 消息，但耗时照常累积
+    assert (state.progress, state.phase, state.message) == (30.0, "kernel", "loading")
+    assert state.timings == {"load": 1.0}
+
+@pytest.mark.asyncio
+async def test_burst_of_reports_is_coalesced_into_few_writes():
+    reporter, sink = ProgressReporter(), _Sink()
+    pump = asyncio.create_task(reporter.pump(sink, interval=0.05, min_delta=1.0))
+
+    def work():
+        for i in range(1000):
+            reporter.report(i / 10, phase="kernel")
+    await asyncio.to_thread(work)
+    await asyncio.sleep(0.12)
+    await reporter.aclose(pump)
+
+    assert 1 <= len(sink.writes) <= 3
+    assert sink.writes[-1][0] == 99.9
+
+@pytest.mark.asyncio
+async def test_small_progress_changes_are_not_written():
+    reporter, sink = ProgressReporter(), _Sink()
+    pump = asyncio.create_task(reporter.pump(sink, interval=TICK, min_delta=5.0))
+
+    reporter.report(10, phase="kernel")
+    await _settle()
+    reporter.report(14.9, phase="kernel")
+    await _settle()
+    assert [w[0] for w in sink.writes] == [10.0]
+
+    reporter.report(15, phase="kernel")
+    await _settle()
+    await reporter.aclose(pump)
+    assert [w[0] for w in sink.writes] == [10.0, 15.0]
+
+@pytest.mark.asyncio
+async def test_phase_change_and_new_timings_force_a_write():
+    reporter, sink = ProgressReporter(), _Sink()
+    pump = asyncio.create_task(reporter.pump(sink, interval=TICK, min_delta=50.0))
+
+    reporter.report(10, phase="load")
+    await _settle()
+    reporter.report(10.1, phase="kernel")
+    await _settle()
+    reporter.report(10.2, phase="kernel", timings={"load": 12.5})
+    await _settle()
+    await reporter.aclose(pump)
+
+    assert sink.writes == [(10.0, "load", {}), (10.1, "kernel", {}), (10.2, "kernel", {"load": 12.5})]
+
+@pytest.mark.asyncio
+async def test_failed_write_is_retried_and_close_stops_writes():
+    reporter, sink = ProgressReporter(), _Sink(fail=2)
+    pump = asyncio.create_task(reporter.pump(sink, interval=TICK, min_delta=1.0))
+
+    reporter.report(40, phase="kernel")
+    await _settle()
+    assert sink.writes == [(40.0, "kernel", {})]
+
+    await reporter.aclose(pump)
+    reporter.report(90, phase="build")
+    await _settle()
+    assert pump.done()
+    assert sink.writes == [(40.0, "kernel", {})]
+
+@pytest.mark.asyncio
+async def test_reports_from_several_threads_keep_the_maximum():
+    reporter = ProgressReporter()
+
+    def work(offset: int):
+        for i in range(200):
+            reporter.report(offset + i * 0.1, phase=f"t{offset}")
+    threads = [threading.Thread(target=work, args=(offset,)) for offset in (0, 50)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    state = reporter.drain()
+    assert (state.progress, state.phase) == (69.9, "t50")
+
+@pytest.mark.asyncio
+async def test_analysis_pump_uses_configured_interval_and_delta(fake_redis, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "QUALITY_PROGRESS_INTERVAL_MS", 20)
+    monkeypatch.setattr(settings, "QUALITY_PROGRESS_MIN_DELTA", 7.5)
+    monkeypatch.setattr(settings, "TEMP_DIR", str(tmp_path / "temp"))
+    seen = {}
+    real_pump = ProgressReporter.pump
+
+    async def recording_pump(self, sink, interval=0.5, min_delta=1.0):
+        seen.update(interval=interval, min_delta=min_delta)
+        await real_pump(self, sink, interval=interval, min_delta=min_delta)
+    monkeypatch.setattr(ProgressReporter, "pump", recording_pump)
+
+    path = tmp_path / "data.csv"
+    path.write_text("a,b\n" + "".join(f"{i},{i % 7}\n" for i in range(200)), encoding="utf-8")
+    service = quality_analysis_service.AnalysisService()
+    await service.perform_analysis("f1", str(path), force_refresh=True, methods=["iqr"])
+
+    assert seen == {"interval": 0.02, "min_delta": 7.5}
+    task = await service.task_repo.get_task("f1")
+    assert (task["status"], task["progress"]) == ("completed", 100.0)
@@ -0,0 +1,131 @@
+import asyncio
+
+import httpx
+import pytest
+
+from src.app.config.settings import settings
+from src.app.main import app
+from src.features.quality.repository import task_repository
+from src.features.quality.repository.task_repository import TaskRepository
+from src.features.quality.services.quality_analysis_service import AnalysisService
+from src.infrastructure.cache.pubsub_hub import PubSubHub
+
+@pytest.fixture
+def repo(fake_redis, monkeypatch):
+    # 每个用例独立的订阅 (监听协程绑定在用例自己的事件循环上)
+    monkeypatch.setattr(task_repository, "task_events", PubSubHub(f"{task_repository.EVENTS_PREFIX}:*"))
+    return TaskRepository()
+
+async def _next_event(stream, timeout: float = 2.0):
+    """下一条状态事件 (跳过心跳)"""
+    while True:
+        state = await asyncio.wait_for(stream.__anext__(), timeout)
+        if state is not None:
+            return state
+
+def _parse_sse(body: str):
+    """SSE 文本 -> [(id, event, data)]，心跳注释记为 ("heartbeat", None, None)"""
+    events = []
+    for block in body.strip().split("\n\n"):
+        if block.startswith(":"):
+            events.append(("heartbeat", None, None))
+            continue
+        fields = dict(line.split(": ", 1) for line in block.splitlines() if ": " in line)
+        events.append((fields.get("id"), fields.get("event"), fields.get("data")))
+    return events
+
+# -----------------------------------------------------------------------------
+# stream_progress
+# -----------------------------------------------------------------------------
+
+@pytest.mark.asyncio
+async def test_stream_emits_each_state_change_until_finished(repo):
+    service = AnalysisService()
+    await repo.init_task("t")
+    stream = service.stream_progress("t", heartbeat=5)
+
+    first = await _next_event(stream)
+    assert first["status"] == "pending"
+
+    await repo.update_progress("t", 40, message="pass1", phase="pass1")
+    progress = await _next_event(stream)
+    assert (progress["status"], progress["progress"], progress["phase"]) == ("processing", 40.0, "pass1")
+    assert progress["seq"] > first["seq"]
+
+    # 进度倒退不会写入，也不会推送
+    await repo.update_progress("t", 10)
+    await repo.mark_completed("t", "t")
+    done = await _next_event(stream)
+    assert (done["status"], done["progress"]) == ("completed", 100.0)
+    assert done["seq"] > progress["seq"]
+
+    with pytest.raises(StopAsyncIteration):
+        await stream.__anext__()
+
+@pytest.mark.asyncio
+async def test_resume_skips_unchanged_state_and_sends_heartbeats(repo):
+    service = AnalysisService()
+    await repo.init_task("t")
+    await repo.update_progress("t", 30)
+    seq = (await repo.get_task("t"))["seq"]
+
+    # 带上最新 seq 重连：当前状态不重复发送，无变化时发心跳
+    stream = service.stream_progress("t", last_event_id=seq, heartbeat=0.05)
+    assert await asyncio.wait_for(stream.__anext__(), 2) is None
+
+    await repo.update_progress("t", 60)
+    state = await _next_event(stream)
+    assert (state["progress"], state["seq"]) == (60.0, seq + 1)
+    await stream.aclose()
+
+    # 带旧 seq 重连：先补发当前状态
+    stale = service.stream_progress("t", last_event_id=seq, heartbeat=5)
+    assert (await _next_event(stale))["progress"] == 60.0
+    await stale.aclose()
+
+@pytest.mark.asyncio
+async def test_resume_of_finished_task_sends_final_state_once(repo):
+    service = AnalysisService()
+    await repo.init_task("t")
+    await repo.mark_failed("t", "boom")
+    seq = (await repo.get_task("t"))["seq"]
+
+    states = [s async for s in service.stream_progress("t", last_event_id=seq, heartbeat=5)]
+
+    assert [(s["status"], s["message"], s["seq"]) for s in states] == [("failed", "boom", seq)]
+
+# -----------------------------------------------------------------------------
+# SSE 接口
+# -----------------------------------------------------------------------------
+
+@pytest.mark.asyncio
+async def test_sse_endpoint_formats_events_and_heartbeats(repo, monkeypatch):
+    monkeypatch.setattr(settings, "QUALITY_SSE_HEARTBEAT_S", 0.05, raising=False)
+    await repo.init_task("f1")
+    url = f"{settings.API_PREFIX}/quality/tasks/f1/events"
+
+    async def publish():
+        await asyncio.sleep(0.2)
+        await repo.update_progress("f1", 50, phase="kernel")
+        await asyncio.sleep(0.1)
+        await repo.mark_completed("f1", "f1")
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        publisher = asyncio.create_task(publish())
+        response = await asyncio.wait_for(client.get(url), 5)
+        await publisher
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = _parse_sse(response.text)
+        statuses = [(event_id, name) for event_id, name, _ in events if name == "status"]
+        assert [name for _, name in statuses] == ["status"] * 3
+        assert [int(event_id) for event_id, _ in statuses] == sorted(int(event_id) for event_id, _ in statuses)
+        assert ("heartbeat", None, None) in events
+        assert '"completed"' in events[-1][2]
+
+        # 任务结束后带 Last-Event-ID 重连：只收到一次结束状态
+        last_id = statuses[-1][0]
+        resumed = await client.get(url, headers={"Last-Event-ID": last_id})
+        assert [(event_id, name) for event_id, name, _ in _parse_sse(resumed.text)] == [(last_id, "status")]
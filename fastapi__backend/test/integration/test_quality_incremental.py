@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.app.config.settings import settings
+from src.features.quality.services.quality_analysis_service import AnalysisService
+from src.features.quality.utils import incremental, metrics
+from src.infrastructure.cache.dataframe_cache import dataframe_cache
+
+METHODS = metrics.normalize_methods(["iqr", "zscore", "mad", "percentile"])
+
+@pytest.fixture(autouse=True)
+def isolated_caches(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "TEMP_DIR", str(tmp_path / "temp"))
+    dataframe_cache.clear()
+    yield
+    dataframe_cache.clear()
+
+@pytest.fixture
+def recompute_log(monkeypatch):
+    """记录每次重算的列位置"""
+    positions = []
+    original = incremental.compute_column_partials
+
+    def spy(df, cols, *args, **kwargs):
+        positions.append(sorted(cols))
+        return original(df, cols, *args, **kwargs)
+    monkeypatch.setattr(incremental, "compute_column_partials", spy)
+    return positions
+
+def _frame(seed: int = 3, n: int = 600) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    amount = rng.normal(100, 15, n).round(3)
+    amount[[4, 250]] = [800.0, -400.0]
+    amount[[9]] = np.nan
+    df = pd.DataFrame({
+        "amount": amount,
+        "count": rng.integers(0, 1000, n),
+        "ratio": rng.uniform(0, 1, n).round(4),
+        "city": rng.choice(["北京", "上海", None], n),
+    })
+    return pd.concat([df, df.iloc[:25]], ignore_index=True)
+
+def _write(df: pd.DataFrame, path) -> str:
+    df.to_csv(path, index=False)
+    return str(path)
+
+def _report(result) -> dict:
+    return result.model_dump()
+
+@pytest.mark.asyncio
+async def test_incremental_report_matches_full_report(fake_redis, tmp_path, recompute_log):
+    path = _write(_frame(), tmp_path / "data.csv")
+    service = AnalysisService()
+
+    first = await service._run_incremental_analysis("f1", path, {}, METHODS)
+    # 第二次全部命中列统计缓存
+    second = await service._run_incremental_analysis("f1", path, {}, METHODS)
+    full = service._run_cpu_bound_analysis("f1", path, methods=METHODS)
+
+    assert recompute_log == [[0, 1, 2, 3], []]
+    assert _report(first) == _report(full)
+    assert _report(second) == _report(full)
+    assert full.anomalies.total > 0
+
+@pytest.mark.asyncio
+async def test_only_changed_columns_are_recomputed(fake_redis, tmp_path, recompute_log):
+    df = _frame()
+    service = AnalysisService()
+    await service._run_incremental_analysis("f1", _write(df, tmp_path / "v1.csv"), {}, METHODS)
+
+    # 只改 ratio 一列 (另一个文件：列统计的键与文件无关)
+    edited = df.copy()
+    edited.loc[[7, 300], "ratio"] = [55.0, np.nan]
+    path = _write(edited, tmp_path / "v2.csv")
+    result = await service._run_incremental_analysis("f2", path, {}, METHODS)
+
+    assert recompute_log == [[0, 1, 2, 3], [2]]
+    full = service._run_cpu_bound_analysis("f2", path, methods=METHODS)
+    assert _report(result) == _report(full)
+
+@pytest.mark.asyncio
+async def test_changed_methods_do_not_reuse_partials(fake_redis, tmp_path, recompute_log):
+    path = _write(_frame(), tmp_path / "data.csv")
+    service = AnalysisService()
+
+    await service._run_incremental_analysis("f1", path, {}, METHODS)
+    iqr_only = await service._run_incremental_analysis("f1", path, {}, ["iqr"])
+
+    assert recompute_log == [[0, 1, 2, 3], [0, 1, 2, 3]]
+    assert _report(iqr_only) == _report(service._run_cpu_bound_analysis("f1", path, methods=["iqr"]))
+
+@pytest.mark.asyncio
+async def test_redis_outage_recomputes_every_column(fake_redis, tmp_path, recompute_log):
+    path = _write(_frame(), tmp_path / "data.csv")
+    service = AnalysisService()
+    await service._run_incremental_analysis("f1", path, {}, METHODS)
+
+    fake_redis.connected = False
+    result = await service._run_incremental_analysis("f1", path, {}, METHODS)
+
+    assert recompute_log == [[0, 1, 2, 3], [0, 1, 2, 3]]
+    assert _report(result) == _report(service._run_cpu_bound_analysis("f1", path, methods=METHODS))
@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+
+from src.shared.utils.single_flight import SingleFlight, payload_key
+
+def _gated(release: asyncio.Event, calls: list, result=None, error: Exception = None):
+    async def run():
+        calls.append(1)
+        await release.wait()
+        if error is not None:
+            raise error
+        return result
+    return run
+
+@pytest.mark.asyncio
+async def test_joiners_receive_leader_result():
+    flight, release, calls = SingleFlight("t"), asyncio.Event(), []
+    result = {"rows": 3}
+
+    waiters = [asyncio.create_task(flight.do("k", _gated(release, calls, result))) for _ in range(3)]
+    await asyncio.sleep(0)
+    assert flight.inflight == 1
+    release.set()
+
+    assert all(r is result for r in await asyncio.gather(*waiters))
+    assert calls == [1]
+    assert flight.stats() == {"name": "t", "inflight": 0, "started": 1, "shared": 2, "failed": 0}
+
+@pytest.mark.asyncio
+async def test_exception_propagates_to_every_waiter():
+    flight, release, calls = SingleFlight("t"), asyncio.Event(), []
+    error = ValueError("boom")
+
+    waiters = [asyncio.create_task(flight.do("k", _gated(release, calls, error=error))) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+
+    outcomes = await asyncio.gather(*waiters, return_exceptions=True)
+    assert all(o is error for o in outcomes)
+    assert calls == [1]
+    assert (flight.inflight, flight.stats()["failed"]) == (0, 1)
+
+@pytest.mark.asyncio
+async def test_key_is_released_after_completion():
+    flight, release, calls = SingleFlight("t"), asyncio.Event(), []
+    release.set()
+
+    assert await flight.do("k", _gated(release, calls, 1)) == 1
+    assert flight.inflight == 0
+    # 不是缓存：之后的调用重新计算
+    assert await flight.do("k", _gated(release, calls, 2)) == 2
+    assert calls == [1, 1]
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_shared_computation():
+    flight, release, calls = SingleFlight("t"), asyncio.Event(), []
+    leader = asyncio.create_task(flight.do("k", _gated(release, calls, "ok")))
+    joiner = asyncio.create_task(flight.do("k", _gated(release, calls, "other")))
+    await asyncio.sleep(0)
+
+    leader.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+    release.set()
+
+    assert await joiner == "ok"
+    assert (calls, flight.inflight) == ([1], 0)
+
+@pytest.mark.asyncio
+async def test_key_is_released_when_every_caller_cancels():
+    flight, release, calls = SingleFlight("t"), asyncio.Event(), []
+    waiters = [asyncio.create_task(flight.do("k", _gated(release, calls, error=ValueError("late")))) for _ in range(2)]
+    await asyncio.sleep(0)
+    for waiter in waiters:
+        waiter.cancel()
+    await asyncio.gather(*waiters, return_exceptions=True)
+
+    # 计算仍在进行，结束 (包括失败) 后释放 key
+    assert flight.inflight == 1
+    release.set()
+    for _ in range(3):
+        await asyncio.sleep(0)
+    assert (flight.inflight, flight.stats()["failed"]) == (0, 1)
+
+@pytest.mark.asyncio
+async def test_key_is_released_when_computation_is_cancelled():
+    flight, release, calls = SingleFlight("t"), asyncio.Event(), []
+    waiter = asyncio.create_task(flight.do("k", _gated(release, calls)))
+    await asyncio.sleep(0)
+
+    flight._inflight["k"].cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    assert flight.inflight == 0
+
+def test_payload_key_ignores_field_order():
+    assert payload_key("p", {"a": 1, "b": [1, 2]}) == payload_key("p", {"b": [1, 2], "a": 1})
+    assert payload_key("p", {"a": 1}) != payload_key("p", {"a": 2})
+    assert payload_key("p", {"a": 1}).startswith("p:")
@@ -0,0 +1,112 @@
+import json
+
+import pytest
+
+from src.features.quality.repository.task_repository import TaskRepository
+from src.infrastructure.cache.redis_client import get_redis
+
+@pytest.fixture
+def repo(fake_redis):
+    return TaskRepository()
+
+# -----------------------------------------------------------------------------
+# 进度更新脚本 (Lua)
+# -----------------------------------------------------------------------------
+
+@pytest.mark.asyncio
+async def test_progress_never_goes_backwards(repo):
+    await repo.init_task("t")
+
+    assert await repo.update_progress("t", 40, message="pass1", phase="pass1", timings={"load": 1.5})
+    assert not await repo.update_progress("t", 20, message="late")
+
+    task = await repo.get_task("t")
+    assert (task["status"], task["progress"], task["message"]) == ("processing", 40.0, "pass1")
+    assert task["phase"] == "pass1"
+    assert task["timings"] == {"load": 1.5}
+
+@pytest.mark.asyncio
+async def test_terminal_state_ignores_progress(repo):
+    await repo.init_task("t")
+    await repo.update_progress("t", 50, phase="kernel")
+    await repo.mark_completed("t", "t", timings={"kernel": 3.0}, result_ref={"fingerprint": "fp", "params": {"v": 1}})
+
+    assert not await repo.update_progress("t", 99, message="late")
+    task = await repo.get_task("t")
+    assert (task["status"], task["progress"], task["result_id"]) == ("completed", 100.0, "t")
+    assert "phase" not in task
+    assert task["result_ref"] == {"fingerprint": "fp", "params": {"v": 1}}
+
+    await repo.mark_failed("t", "boom")
+    task = await repo.get_task("t")
+    assert (task["status"], task["message"], task["result_id"]) == ("failed", "boom", None)
+    assert "result_ref" not in task
+    assert not await repo.update_progress("t", 10)
+
+@pytest.mark.asyncio
+async def test_init_task_clears_previous_run(repo):
+    await repo.init_task("t")
+    await repo.update_progress("t", 70, phase="pass2", timings={"pass1": 2.0})
+    await repo.mark_failed("t", "boom")
+
+    await repo.init_task("t")
+
+    task = await repo.get_task("t")
+    assert (task["status"], task["progress"]) == ("pending", 0.0)
+    assert "phase" not in task and "timings" not in task
+    assert await repo.update_progress("t", 5)
+
+@pytest.mark.asyncio
+async def test_state_is_a_hash_with_ttl(repo):
+    await repo.init_task("t")
+    key = repo._make_key("t")
+    assert await get_redis().type(key) == "hash"
+    assert 0 < await get_redis().ttl(key) <= TaskRepository.DEFAULT_TTL
+
+# -----------------------------------------------------------------------------
+# 旧版 JSON String 格式兼容
+# -----------------------------------------------------------------------------
+
+LEGACY = {"status": "processing", "progress": 40.0, "message": "old", "result_id": None}
+
+@pytest.mark.asyncio
+async def test_legacy_string_key_is_readable(repo):
+    await get_redis().set(repo._make_key("old"), json.dumps(LEGACY))
+    assert await repo.get_task("old") == LEGACY
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("write", ["progress", "completed", "init"])
+async def test_legacy_string_key_is_converted_on_write(repo, write):
+    key = repo._make_key("old")
+    await get_redis().set(key, json.dumps(LEGACY))
+
+    if write == "progress":
+        assert await repo.update_progress("old", 10, phase="pass1")
+        expected = ("processing", 10.0)
+    elif write == "completed":
+        await repo.mark_completed("old", "old")
+        expected = ("completed", 100.0)
+    else:
+        await repo.init_task("old")
+        expected = ("pending", 0.0)
+
+    assert await get_redis().type(key) == "hash"
+    task = await repo.get_task("old")
+    assert (task["status"], task["progress"]) == expected
+
+# -----------------------------------------------------------------------------
+# 批量读取
+# -----------------------------------------------------------------------------
+
+@pytest.mark.asyncio
+async def test_get_tasks_mixes_hash_legacy_and_missing(repo):
+    await repo.init_task("new")
+    await get_redis().set(repo._make_key("old"), json.dumps(LEGACY))
+
+    tasks = await repo.get_tasks(["new", "old", "missing"])
+
+    assert list(tasks) == ["new", "old", "missing"]
+    assert tasks["new"]["status"] == "pending"
+    assert tasks["old"] == LEGACY
+    assert tasks["missing"] is None
+    assert await repo.get_tasks([]) == {}
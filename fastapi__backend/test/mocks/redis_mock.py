@@ -0,0 +1,18 @@
+import fakeredis
+
+# =========================================================
+# Redis 替身 (基于 fakeredis，支持 Lua 脚本 / MULTI 管道 / pub/sub)
+# 文本客户端与二进制客户端共享同一个 FakeServer，与生产环境的 redis_manager 结构一致
+# =========================================================
+
+def install_fake_redis(manager, monkeypatch) -> fakeredis.FakeServer:
+    """
+    用 fakeredis 替换 redis_manager 的两个客户端
+
+    Returns:
+        FakeServer：测试中设置 server.connected = False 可模拟 Redis 不可用
+    """
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(manager, "client", fakeredis.FakeAsyncRedis(server=server, decode_responses=True))
+    monkeypatch.setattr(manager, "binary_client", fakeredis.FakeAsyncRedis(server=server))
+    return server